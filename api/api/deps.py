@@ -311,6 +311,27 @@ def require_owner_or_admin(resource_user_id: int):
     return _dep
 
 
+def ensure_admin(current_user: User) -> None:
+    """Raise 403 unless the user's token has the api:admin scope."""
+    token_payload = getattr(current_user, "_token_payload", None)
+    if not token_payload:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # Auth0 only - legacy tokens have no admin scope
+    if token_payload.get("token_type") == "auth0":
+        if not has_scope(token_payload, "api:admin"):
+            raise HTTPException(
+                status_code=403, detail="Missing required scope: api:admin"
+            )
+
+
+def ensure_owner_or_admin(current_user: User, *owner_ids: int) -> None:
+    """Raise 403 unless the user owns every resource given or is an admin."""
+    if all(int(owner_id) == int(current_user.id) for owner_id in owner_ids):
+        return
+    ensure_admin(current_user)
+
+
 def verify_m2m_token(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
 ) -> dict:
@@ -10,6 +10,7 @@ from api.api.v1.endpoints import (
     logs,
     photos,
     stats,
+    stream,
     trigs,
     users,
 )
@@ -20,6 +21,9 @@ api_router.include_router(trigs.router, prefix="/trigs", tags=["trig"])
 api_router.include_router(users.router, prefix="/users", tags=["user"])
 api_router.include_router(logs.router, prefix="/logs", tags=["log"])
 api_router.include_router(photos.router, prefix="/photos", tags=["photo"])
+api_router.include_router(logs.bulk_router, tags=["log"])
+api_router.include_router(photos.bulk_router, tags=["photo"])
 api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
+api_router.include_router(stream.router, prefix="/stream", tags=["stream"])
 api_router.include_router(legacy.router, prefix="/legacy", tags=["legacy"])
 api_router.include_router(debug.router, prefix="/debug", tags=["debug"])
@@ -5,24 +5,47 @@ Only PATCH (no PUT). DELETE is hard-delete for logs and soft-deletes their photo
 """
 
 from typing import Dict, List, Optional
+from urllib.parse import quote
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from api.api.deps import get_current_user, get_db
+from api.api.deps import ensure_owner_or_admin, get_current_user, get_db
 from api.api.lifecycle import openapi_lifecycle
+from api.core.config import settings
+from api.crud import read_model
 from api.crud import tlog as tlog_crud
 from api.crud import tphoto as tphoto_crud
 from api.models.server import Server
 from api.models.trig import Trig
 from api.models.user import TLog as TLogModel
 from api.models.user import User
-from api.schemas.tlog import TLogCreate, TLogResponse, TLogUpdate, TLogWithIncludes
-from api.schemas.tphoto import TPhotoResponse
+from api.schemas.tlog import (
+    TLogBulkDeleteRequest,
+    TLogBulkDeleteResponse,
+    TLogCreate,
+    TLogResponse,
+    TLogUpdate,
+    TLogWithIncludes,
+)
+from api.schemas.tphoto import TPhotoRenditionResponse, TPhotoResponse
+from api.services.activity import (
+    LOG_CREATED,
+    LOG_DELETED,
+    LOG_UPDATED,
+    publish_activity,
+)
+from api.services.log_search import get_log_search_index
+from api.services.recent_logs import get_recent_logs_page
 from api.utils.url import join_url
 
 router = APIRouter()
 
+# Extra search hits read per page in case some logs have gone
+_SEARCH_SPARE_HITS = 10
+# Collection-level custom methods (/logs:verb) cannot sit under the /logs prefix
+bulk_router = APIRouter()
+
 
 def enrich_logs_with_names(db: Session, logs: List[TLogModel]) -> List[Dict]:
     """
@@ -73,15 +96,22 @@ def list_logs(
     ),
     db: Session = Depends(get_db),
 ):
-    items = tlog_crud.list_logs_filtered(
-        db, trig_id=trig_id, user_id=user_id, order=order, skip=skip, limit=limit
+    # Unfiltered newest-first pages are served from the in-memory ring buffer
+    recent = (
+        get_recent_logs_page(skip=skip, limit=limit)
+        if trig_id is None and user_id is None and not order and not include
+        else None
     )
-    total = tlog_crud.count_logs_filtered(db, trig_id=trig_id, user_id=user_id)
-
-    # Add denormalized trig_name and user_name fields
-    items_serialized = enrich_logs_with_names(db, items)
+    if recent is not None:
+        items_serialized, total = recent
+    else:
+        # Column-only query with trig_name and user_name joined in
+        items_serialized = read_model.list_logs(
+            db, trig_id=trig_id, user_id=user_id, order=order, skip=skip, limit=limit
+        )
+        total = tlog_crud.count_logs_filtered(db, trig_id=trig_id, user_id=user_id)
 
-    # Handle includes
+    # Handle includes (never set on the ring buffer path above)
     if include:
         tokens = {t.strip() for t in include.split(",") if t.strip()}
 
@@ -95,8 +125,9 @@ def list_logs(
             )
         if "photos" in tokens:
             # Attach photos list for each log item
-            for out, orig in zip(items_serialized, items):
-                photos = tphoto_crud.list_all_photos_for_log(db, log_id=int(orig.id))
+            for out in items_serialized:
+                photos = tphoto_crud.list_all_photos_for_log(db, log_id=int(out["id"]))
+                renditions = read_model.get_renditions(db, [int(p.id) for p in photos])
                 # Build base URLs per photo server
                 out["photos"] = []
                 for p in photos:
@@ -110,7 +141,7 @@ def list_logs(
                         TPhotoResponse(
                             id=int(p.id),
                             log_id=int(p.tlog_id),
-                            user_id=int(orig.user_id),
+                            user_id=int(out["user_id"]),
                             type=photo_type,
                             filesize=int(p.filesize),
                             height=int(p.height),
@@ -123,9 +154,13 @@ def list_logs(
                             public_ind=str(p.public_ind),
                             photo_url=join_url(base_url, str(p.filename)),
                             icon_url=join_url(base_url, str(p.icon_filename)),
+                            renditions=[
+                                TPhotoRenditionResponse.model_validate(r)
+                                for r in renditions.get(int(p.id), [])
+                            ],
                         ).model_dump()
                     )
-    has_more = (skip + len(items)) < total
+    has_more = (skip + len(items_serialized)) < total
     base = "/v1/logs"
     params = [f"limit={limit}"]
     if trig_id is not None:
@@ -154,6 +189,67 @@ def list_logs(
     }
 
 
+@router.get(
+    "/search",
+    openapi_extra=openapi_lifecycle("alpha", note="Full-text search of log comments"),
+)
+def search_logs(
+    q: str = Query(
+        ...,
+        min_length=1,
+        max_length=200,
+        description='Words to find (all must match); use "double quotes" for phrases',
+    ),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Search log comments, newest first.
+
+    Every word must appear in the comment (AND). A quoted phrase such as
+    `"flush bracket missing"` must appear with its words in that order.
+    Matching ignores case and punctuation.
+    """
+    index = get_log_search_index()
+    if index is None:
+        # Enabled but still building in the background
+        retry = {"Retry-After": "10"} if settings.LOG_SEARCH_ENABLED else None
+        raise HTTPException(
+            status_code=503, detail="Log search is unavailable", headers=retry
+        )
+
+    # The index can lag behind deletes made elsewhere (until the next
+    # rebuild), so read a few spare hits to fill the page past any gone
+    log_ids = index.search(q)
+    total = len(log_ids)
+    items_serialized = read_model.get_logs_by_ids(
+        db, log_ids[skip : skip + limit + _SEARCH_SPARE_HITS]
+    )[:limit]
+
+    has_more = (skip + limit) < total
+    base = "/v1/logs/search"
+    params = [f"q={quote(q)}", f"limit={limit}"]
+    self_link = base + "?" + "&".join(params + [f"skip={skip}"])
+    next_link = (
+        base + "?" + "&".join(params + [f"skip={skip + limit}"]) if has_more else None
+    )
+    prev_offset = max(skip - limit, 0)
+    prev_link = (
+        base + "?" + "&".join(params + [f"skip={prev_offset}"]) if skip > 0 else None
+    )
+    return {
+        "items": items_serialized,
+        "pagination": {
+            "total": total,
+            "limit": limit,
+            "offset": skip,
+            "has_more": has_more,
+        },
+        "links": {"self": self_link, "next": next_link, "prev": prev_link},
+    }
+
+
 @router.get(
     "/{log_id}",
     response_model=TLogWithIncludes,
@@ -230,6 +326,8 @@ def create_log(
     log = tlog_crud.create_log(
         db, trig_id=trig_id, user_id=int(current_user.id), values=payload.model_dump()
     )
+    # Push to live activity subscribers (SSE) now the row is committed
+    publish_activity(LOG_CREATED, enrich_logs_with_names(db, [log])[0])
     return TLogResponse.model_validate(log)
 
 
@@ -250,30 +348,14 @@ def update_log_endpoint(
     existing: Optional[TLogModel] = tlog_crud.get_log_by_id(db, log_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Log not found")
-    if int(existing.user_id) != int(current_user.id):
-        # Require admin scope if not owner
-        # Check admin privileges using token payload from current_user
-        token_payload = getattr(current_user, "_token_payload", None)
-        if not token_payload:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        from api.core.security import extract_scopes
-
-        pass  # Auth0 only - no legacy admin check needed
-
-        if token_payload.get("token_type") == "auth0":
-            scopes = extract_scopes(token_payload)
-            if "api:admin" not in scopes:
-                raise HTTPException(
-                    status_code=403, detail="Missing required scope: api:admin"
-                )
-        # Legacy tokens not supported - Auth0 only
+    ensure_owner_or_admin(current_user, int(existing.user_id))
 
     updated = tlog_crud.update_log(
         db, log_id=log_id, updates=payload.model_dump(exclude_none=True)
     )
     if not updated:
         raise HTTPException(status_code=404, detail="Log not found")
+    publish_activity(LOG_UPDATED, enrich_logs_with_names(db, [updated])[0])
     return TLogResponse.model_validate(updated)
 
 
@@ -293,32 +375,53 @@ def delete_log_endpoint(
     existing = tlog_crud.get_log_by_id(db, log_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Log not found")
-    if int(existing.user_id) != int(current_user.id):
-        # Check admin privileges using token payload from current_user
-        token_payload = getattr(current_user, "_token_payload", None)
-        if not token_payload:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        from api.core.security import extract_scopes
-
-        pass  # Auth0 only - no legacy admin check needed
-
-        if token_payload.get("token_type") == "auth0":
-            scopes = extract_scopes(token_payload)
-            if "api:admin" not in scopes:
-                raise HTTPException(
-                    status_code=403, detail="Missing required scope: api:admin"
-                )
-        # Legacy tokens not supported - Auth0 only
+    ensure_owner_or_admin(current_user, int(existing.user_id))
 
     # Soft-delete photos then hard-delete log
     tlog_crud.soft_delete_photos_for_log(db, log_id=log_id)
     ok = tlog_crud.delete_log_hard(db, log_id=log_id)
     if not ok:
         raise HTTPException(status_code=404, detail="Log not found")
+    publish_activity(LOG_DELETED, {"id": log_id})
     return None
 
 
+@bulk_router.post(
+    "/logs:bulkDelete",
+    response_model=TLogBulkDeleteResponse,
+    openapi_extra={
+        **openapi_lifecycle("alpha", note="Admin clean-up of many logs at once"),
+        "security": [{"OAuth2": []}],
+    },
+)
+def bulk_delete_logs(
+    payload: TLogBulkDeleteRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> TLogBulkDeleteResponse:
+    """
+    Hard-delete many logs and soft-delete their photos in one transaction.
+
+    Authorisation is checked once for the whole batch: every log must belong
+    to the caller, otherwise the api:admin scope is required. Ids that do not
+    exist are reported in `not_found` and otherwise ignored.
+    """
+    log_ids = sorted(set(payload.ids))
+    owners = tlog_crud.get_log_owners(db, log_ids)
+
+    ensure_owner_or_admin(current_user, *owners.values())
+
+    found_ids = sorted(owners)
+    deleted, photos_deleted = tlog_crud.delete_logs_bulk(db, log_ids=found_ids)
+    for log_id in found_ids:
+        publish_activity(LOG_DELETED, {"id": log_id})
+    return TLogBulkDeleteResponse(
+        deleted=deleted,
+        photos_deleted=photos_deleted,
+        not_found=[log_id for log_id in log_ids if log_id not in owners],
+    )
+
+
 @router.get(
     "/{log_id}/photos",
     openapi_extra=openapi_lifecycle("beta"),
@@ -340,6 +443,7 @@ def list_photos_for_log(
     )
     # Build response shape similar to other collections
     # Need user_id from joining TLog for each photo
+    renditions = read_model.get_renditions(db, [int(p.id) for p in items])
     photos = []
     for p in items:
         # fetch user_id via TLog
@@ -367,6 +471,10 @@ def list_photos_for_log(
                 public_ind=str(p.public_ind),
                 photo_url=join_url(base_url, str(p.filename)),
                 icon_url=join_url(base_url, str(p.icon_filename)),
+                renditions=[
+                    TPhotoRenditionResponse.model_validate(r)
+                    for r in renditions.get(int(p.id), [])
+                ],
             ).model_dump()
         )
     has_more = (skip + len(items)) < total
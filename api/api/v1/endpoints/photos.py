@@ -2,43 +2,87 @@
 Photo endpoints (CRuD) and user photo count, plus filtered collections.
 """
 
-import io
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlencode
 
-import requests
+import anyio
 from fastapi import (
     APIRouter,
     Depends,
     File,
     Form,
+    Header,
     HTTPException,
     Query,
     Request,
+    Response,
     UploadFile,
 )
-from PIL import Image
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, RedirectResponse
 from sqlalchemy.orm import Session
 
-from api.api.deps import get_current_user, get_db
+from api.api.deps import (
+    ensure_admin,
+    ensure_owner_or_admin,
+    get_current_user,
+    get_db,
+)
 from api.api.lifecycle import openapi_lifecycle
 from api.core.config import settings
+from api.crud import read_model
 from api.crud import tphoto as tphoto_crud
 from api.models.server import Server
+from api.models.tphoto import TPhoto, TPhotoRendition
 from api.models.user import TLog, User
 from api.schemas.tphoto import (
+    TPhotoBatchRotateRequest,
+    TPhotoBatchRotateResponse,
+    TPhotoBulkUpdateRequest,
+    TPhotoBulkUpdateResponse,
+    TPhotoCreateResponse,
     TPhotoEvaluationResponse,
+    TPhotoIngestJobResponse,
     TPhotoResponse,
+    TPhotoRotateFailure,
     TPhotoRotateRequest,
     TPhotoUpdate,
+    TPhotoUpload,
+    TPhotoUploadUrlResponse,
+)
+from api.services import photo_evaluation
+from api.services.image_formats import FORMATS, negotiate, variant_formats
+from api.services.photo_ingest import (
+    PhotoIngestError,
+    ingest_photo,
+    photo_ingest_service,
+    read_upload,
+)
+from api.services.photo_resize import (
+    PhotoResizeError,
+    photo_resize_service,
+    resize_spec,
+    resize_version,
+)
+from api.services.photo_rotation import (
+    PhotoRotationError,
+    RenderedRotation,
+    apply_rotation,
+    render_rotation,
 )
-from api.services.image_processor import ImageProcessor
-from api.services.rekognition import RekognitionService, get_image_dimensions
+from api.services.rekognition import RekognitionService
 from api.services.s3_service import S3Service
 from api.utils.url import join_url
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
+# Collection-level custom methods (/photos:verb) cannot sit under the /photos prefix
+bulk_router = APIRouter()
 
 
 @router.get("", openapi_extra=openapi_lifecycle("beta"))
@@ -50,42 +94,18 @@ def list_photos(
     limit: int = Query(10, ge=1, le=100),
     db: Session = Depends(get_db),
 ):
-    items = tphoto_crud.list_photos_filtered(
+    # Column-only query with owner and server URL joined in
+    result_items = read_model.list_photos(
         db, trig_id=trig_id, log_id=log_id, user_id=user_id, skip=skip, limit=limit
     )
     # total estimate with same filters
-    total = len(items) if len(items) < limit else (db.query(tphoto_crud.TPhoto).count())
-
-    # Serialise with URLs populated
-    result_items = []
-    for p in items:
-        # Resolve user via TLog
-        tlog = db.query(TLog).filter(TLog.id == p.tlog_id).first()
-        server: Server | None = (
-            db.query(Server).filter(Server.id == p.server_id).first()
-        )
-        base_url = str(server.url) if server and server.url else ""
-        result_items.append(
-            {
-                "id": int(p.id),
-                "log_id": int(p.tlog_id),
-                "user_id": int(tlog.user_id) if tlog else 0,
-                "type": str(p.type),
-                "filesize": int(p.filesize),
-                "height": int(p.height),
-                "width": int(p.width),
-                "icon_filesize": int(p.icon_filesize),
-                "icon_height": int(p.icon_height),
-                "icon_width": int(p.icon_width),
-                "caption": str(p.name),
-                "text_desc": str(p.text_desc),
-                "license": str(p.public_ind),
-                "photo_url": join_url(base_url, str(p.filename)),
-                "icon_url": join_url(base_url, str(p.icon_filename)),
-            }
-        )
+    total = (
+        len(result_items)
+        if len(result_items) < limit
+        else (db.query(tphoto_crud.TPhoto).count())
+    )
 
-    has_more = (skip + len(items)) < total
+    has_more = (skip + len(result_items)) < total
     base = "/v1/photos"
     params = [f"limit={limit}"]
     if trig_id is not None:
@@ -114,10 +134,72 @@ def list_photos(
     }
 
 
+@router.post(
+    "/upload-url",
+    response_model=TPhotoUploadUrlResponse,
+    openapi_extra={
+        **openapi_lifecycle("alpha", note="Presigned direct-to-storage upload"),
+        "security": [{"OAuth2": []}],
+    },
+)
+def create_photo_upload_url(
+    request: Request,
+    payload: TPhotoUpload,
+    log_id: int = Query(..., description="Parent log ID"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> TPhotoUploadUrlResponse:
+    """
+    Start a photo upload that goes straight to storage, not through the API.
+
+    1. POST `fields` plus the JPEG as `file` (last) to `upload_url` as a
+       multipart form, before `expires_at`.
+    2. POST `complete_url`; the photo is then processed in the background
+       like a `Prefer: respond-async` upload. Poll the job for the result.
+
+    Job records are only shared between workers through Redis; without it,
+    completing or polling on another worker than the one that issued the
+    URL answers 404.
+    """
+    tlog = _authorised_log(db, log_id, current_user)
+    fields = {
+        "type": payload.type,
+        "name": payload.name,
+        "text_desc": payload.text_desc,
+        "public_ind": payload.licence,
+    }
+    try:
+        job, presigned = photo_ingest_service.create_upload(
+            tlog=tlog,
+            fields=fields,
+            client_ip=request.client.host if request.client else "127.0.0.1",
+            s3_service=S3Service(),
+        )
+    except PhotoIngestError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    expires_at = datetime.now(timezone.utc) + timedelta(
+        seconds=settings.PHOTO_UPLOAD_URL_EXPIRY_SECONDS
+    )
+    return TPhotoUploadUrlResponse(
+        job_id=job["id"],
+        upload_url=presigned["url"],
+        fields=presigned["fields"],
+        expires_at=expires_at.isoformat(),
+        complete_url=f"{settings.API_V1_STR}/photos/jobs/{job['id']}/complete",
+    )
+
+
 @router.post(
     "",
-    response_model=TPhotoResponse,
+    response_model=TPhotoCreateResponse,
     status_code=201,
+    responses={
+        202: {
+            "model": TPhotoIngestJobResponse,
+            "description": "Accepted for background processing "
+            "(sent `Prefer: respond-async`)",
+        }
+    },
     openapi_extra={
         **openapi_lifecycle("beta"),
         "security": [{"OAuth2": []}],
@@ -142,162 +224,141 @@ def create_photo(
     - **text_desc**: Photo description (optional)
     - **type**: Photo type (T=trigpoint, F=flush bracket, L=landscape, P=people, O=other)
     - **license**: License (Y=public domain, C=creative commons, N=private)
-    """
-    # Authorise based on log ownership or admin
-    tlog: TLog | None = db.query(TLog).filter(TLog.id == log_id).first()
-    if not tlog:
-        raise HTTPException(status_code=404, detail="Log not found")
-    if int(current_user.id) != int(tlog.user_id):
-        # Check admin privileges using token payload from current_user
-        token_payload = getattr(current_user, "_token_payload", None)
-        if not token_payload:
-            raise HTTPException(status_code=403, detail="Access denied")
 
-        from api.core.security import extract_scopes
+    Uploads over the size limit (413) or not starting with a JPEG header
+    (400) are refused while the body is still arriving.
 
-        pass  # Auth0 only - no legacy admin check needed
+    `similar_photo_ids` lists the uploader's existing photos that look nearly
+    identical (409 instead when duplicates are rejected).
 
-        if token_payload.get("token_type") == "auth0":
-            scopes = extract_scopes(token_payload)
-            if "api:admin" not in scopes:
-                raise HTTPException(
-                    status_code=403, detail="Missing required scope: api:admin"
-                )
-        # Legacy tokens not supported - Auth0 only
+    Send `Prefer: respond-async` to get `202 Accepted` with a job as soon as
+    the upload is received; poll `/v1/photos/jobs/{job_id}` for the result.
+    Async mode needs Redis, so every worker sees the job: without it the
+    preference is ignored and the photo is processed within the request
+    (201, no `Preference-Applied` header).
+    """
+    tlog = _authorised_log(db, log_id, current_user)
 
     client_ip = request.client.host if request.client else "127.0.0.1"
+    fields = {
+        "type": type,
+        "name": caption,
+        "text_desc": text_desc,
+        "public_ind": license,
+    }
 
-    # Read file contents
-    try:
-        file_contents = file.file.read()
-        if not file_contents:
-            raise HTTPException(status_code=400, detail="Empty file")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
-
-    # Validate image
-    image_processor = ImageProcessor()
-    is_valid, validation_message = image_processor.validate_image(file_contents)
-    if not is_valid:
-        raise HTTPException(status_code=400, detail=validation_message)
-
-    # Process image
-    processed_photo, processed_thumbnail, image_dims, thumbnail_dims = (
-        image_processor.process_image(file_contents)
-    )
-
-    if (
-        not processed_photo
-        or not processed_thumbnail
-        or not image_dims
-        or not thumbnail_dims
-    ):
-        raise HTTPException(status_code=500, detail="Failed to process image")
+    # Prefer: respond-async (RFC 7240) spools the upload and processes it on
+    # the ingest worker pool, so this request ends once the body is received.
+    # Only honoured when job records are shared, so any worker can answer polls
+    prefer = request.headers.get("prefer", "").lower()
+    if "respond-async" in prefer and photo_ingest_service.jobs.is_shared():
+        try:
+            job = photo_ingest_service.submit(
+                source=file.file, tlog=tlog, fields=fields, client_ip=client_ip
+            )
+        except PhotoIngestError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        job_url = f"{settings.API_V1_STR}/photos/jobs/{job['id']}"
+        return JSONResponse(
+            status_code=202,
+            content=jsonable_encoder(_job_response(job)),
+            headers={"Location": job_url, "Preference-Applied": "respond-async"},
+        )
 
-    # Create optimistic database record
     try:
-        created = tphoto_crud.create_photo(
+        return ingest_photo(
             db,
-            log_id=log_id,
-            values={
-                "server_id": settings.PHOTOS_SERVER_ID,
-                "type": type,
-                "filename": "",  # Will be updated after S3 upload
-                "filesize": len(processed_photo),
-                "height": image_dims[1],
-                "width": image_dims[0],
-                "icon_filename": "",  # Will be updated after S3 upload
-                "icon_filesize": len(processed_thumbnail),
-                "icon_height": thumbnail_dims[1],
-                "icon_width": thumbnail_dims[0],
-                "name": caption,
-                "text_desc": text_desc,
-                "ip_addr": client_ip,
-                "public_ind": license,
-                "deleted_ind": "N",
-                "source": "F",
-            },
+            tlog=tlog,
+            file_contents=read_upload(file.file),
+            fields=fields,
+            client_ip=client_ip,
         )
-    except Exception as e:
-        logger.error(f"Failed to create photo record: {e}")
-        raise HTTPException(status_code=500, detail="Failed to create photo record")
-
-    # Upload to S3
-    s3_service = S3Service()
-    photo_key, thumbnail_key = s3_service.upload_photo_and_thumbnail(
-        int(created.id), processed_photo, processed_thumbnail
+    except PhotoIngestError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+def _job_response(job: dict) -> TPhotoIngestJobResponse:
+    return TPhotoIngestJobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        log_id=job["log_id"],
+        photo_id=job.get("photo_id"),
+        photo=job.get("photo"),
+        error=job.get("error"),
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
     )
 
-    if not photo_key or not thumbnail_key:
-        # Rollback: delete the database record
-        try:
-            db.delete(created)
-            db.commit()
-        except Exception as rollback_error:
-            logger.error(f"Failed to rollback database record: {rollback_error}")
 
-        raise HTTPException(status_code=500, detail="Failed to upload files")
+@router.get(
+    "/jobs/{job_id}",
+    response_model=TPhotoIngestJobResponse,
+    openapi_extra={
+        **openapi_lifecycle("alpha", note="Status of a background photo upload"),
+        "security": [{"OAuth2": []}],
+    },
+)
+def get_photo_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+) -> TPhotoIngestJobResponse:
+    """
+    Status of a photo upload accepted with `Prefer: respond-async`, or of
+    a direct upload (which starts as `awaiting_upload` until completed).
 
-    # Update database record with S3 paths
-    try:
-        setattr(created, "filename", photo_key)
-        setattr(created, "icon_filename", thumbnail_key)
-        db.add(created)
-        db.commit()
-        db.refresh(created)
-    except Exception as e:
-        logger.error(f"Failed to update photo record: {e}")
-        # Clean up S3 files
-        s3_service.delete_photo_and_thumbnail(int(created.id))
-        # Delete database record
-        try:
-            db.delete(created)
-            db.commit()
-        except Exception as cleanup_error:
-            logger.error(f"Failed to cleanup database record: {cleanup_error}")
+    `status` moves from `queued` to `processing` and then `succeeded` (with
+    `photo` holding the created photo) or `failed` (with `error`). Jobs are
+    kept for a day.
+    """
+    return _job_response(_authorised_job(job_id, current_user))
 
-        raise HTTPException(status_code=500, detail="Failed to update photo record")
 
-    # Trigger async content moderation
+@router.post(
+    "/jobs/{job_id}/complete",
+    status_code=202,
+    response_model=TPhotoIngestJobResponse,
+    openapi_extra={
+        **openapi_lifecycle("alpha", note="Process a direct photo upload"),
+        "security": [{"OAuth2": []}],
+    },
+)
+def complete_photo_upload(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Queue a photo uploaded with `/photos/upload-url` for processing.
+
+    Call once the presigned POST has succeeded. Poll the returned job's
+    Location for the created photo.
+    """
+    _authorised_job(job_id, current_user)
     try:
-        # Import here to avoid circular imports
-        from api.services.content_moderation import moderate_photo_async
+        job = photo_ingest_service.complete_upload(job_id, S3Service())
+    except PhotoIngestError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return JSONResponse(
+        status_code=202,
+        content=jsonable_encoder(_job_response(job)),
+        headers={"Location": f"{settings.API_V1_STR}/photos/jobs/{job_id}"},
+    )
 
-        moderate_photo_async(int(created.id))
-    except Exception as e:
-        logger.warning(f"Failed to trigger content moderation: {e}")
-        # Don't fail the upload, just log the warning
 
-    # Return response
-    server: Server | None = (
-        db.query(Server).filter(Server.id == created.server_id).first()
-    )
-    base_url = str(server.url) if server and server.url else ""
+def _authorised_log(db: Session, log_id: int, current_user: User) -> TLog:
+    """The log to add a photo to, if it is the user's own (or they are admin)."""
+    tlog: TLog | None = db.query(TLog).filter(TLog.id == log_id).first()
+    if not tlog:
+        raise HTTPException(status_code=404, detail="Log not found")
+    ensure_owner_or_admin(current_user, int(tlog.user_id))
+    return tlog
 
-    def join_url(base: str, path: str) -> str:
-        if not base:
-            return path
-        if base.endswith("/"):
-            return f"{base}{path}"
-        return f"{base}/{path}"
 
-    return {
-        "id": created.id,
-        "log_id": created.tlog_id,
-        "user_id": int(tlog.user_id),
-        "type": str(created.type),
-        "filesize": int(created.filesize),
-        "height": int(created.height),
-        "width": int(created.width),
-        "icon_filesize": int(created.icon_filesize),
-        "icon_height": int(created.icon_height),
-        "icon_width": int(created.icon_width),
-        "caption": str(created.name),
-        "text_desc": str(created.text_desc),
-        "license": str(created.public_ind),
-        "photo_url": join_url(base_url, str(created.filename)),
-        "icon_url": join_url(base_url, str(created.icon_filename)),
-    }
+def _authorised_job(job_id: str, current_user: User) -> dict:
+    job = photo_ingest_service.jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    ensure_owner_or_admin(current_user, int(job["user_id"]))
+    return job
 
 
 @router.get(
@@ -342,10 +403,144 @@ def get_photo(photo_id: int, db: Session = Depends(get_db)):
         "license": str(photo.public_ind),
         "photo_url": join_url(base_url, str(photo.filename)),
         "icon_url": join_url(base_url, str(photo.icon_filename)),
+        "renditions": read_model.get_renditions(db, [int(photo.id)]).get(
+            int(photo.id), []
+        ),
     }
     return response
 
 
+def _negotiated_redirect(
+    request: Request, base_url: str, jpeg_filename: str, variants: Dict[str, str]
+) -> RedirectResponse:
+    """Redirect to the best format of an image for the request's Accept."""
+    format_key = negotiate(request.headers.get("accept"), variants)
+    filename = variants.get(format_key, jpeg_filename)
+    return RedirectResponse(
+        join_url(base_url, filename),
+        status_code=307,
+        headers={"Vary": "Accept", "Cache-Control": "public, max-age=300"},
+    )
+
+
+def _live_photo_and_base_url(db: Session, photo_id: int) -> tuple[TPhoto, str]:
+    photo = tphoto_crud.get_photo_by_id(db, photo_id=photo_id)
+    if not photo:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    server: Server | None = (
+        db.query(Server).filter(Server.id == photo.server_id).first()
+    )
+    return photo, str(server.url) if server and server.url else ""
+
+
+@router.get(
+    "/{photo_id}/thumbnail",
+    status_code=307,
+    openapi_extra=openapi_lifecycle(
+        "alpha", note="Redirects to the thumbnail in the best accepted format"
+    ),
+)
+def get_photo_thumbnail(photo_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Redirect to the photo's thumbnail as AVIF, WebP or JPEG.
+
+    The format is the smallest stored one that the `Accept` header names
+    explicitly; clients that only send wildcards get the JPEG.
+    """
+    photo, base_url = _live_photo_and_base_url(db, photo_id)
+    variants = tphoto_crud.get_photo_variants(db, photo_id=photo_id, size=0)
+    return _negotiated_redirect(request, base_url, str(photo.icon_filename), variants)
+
+
+@router.get(
+    "/{photo_id}/renditions/{size}",
+    status_code=307,
+    openapi_extra=openapi_lifecycle(
+        "alpha", note="Redirects to a rendition in the best accepted format"
+    ),
+)
+def get_photo_rendition(
+    photo_id: int, size: int, request: Request, db: Session = Depends(get_db)
+):
+    """Redirect to one of the photo's renditions as AVIF, WebP or JPEG."""
+    _, base_url = _live_photo_and_base_url(db, photo_id)
+    rendition = (
+        db.query(TPhotoRendition)
+        .filter(TPhotoRendition.photo_id == photo_id, TPhotoRendition.size == size)
+        .first()
+    )
+    if rendition is None:
+        raise HTTPException(status_code=404, detail="Rendition not found")
+    variants = tphoto_crud.get_photo_variants(db, photo_id=photo_id, size=size)
+    return _negotiated_redirect(request, base_url, str(rendition.filename), variants)
+
+
+@router.get(
+    "/{photo_id}/image",
+    responses={
+        200: {"content": {"image/jpeg": {}, "image/webp": {}}},
+        307: {"description": "Redirect to the current version's URL"},
+    },
+    openapi_extra=openapi_lifecycle("alpha", note="Photo resized on demand"),
+)
+def get_photo_image(
+    photo_id: int,
+    request: Request,
+    w: Optional[int] = Query(None, description="Width (see PHOTO_RESIZE_SIZES)"),
+    h: Optional[int] = Query(None, description="Height (see PHOTO_RESIZE_SIZES)"),
+    fit: str = Query("contain", regex="^(contain|cover)$", description="Fit mode"),
+    v: Optional[str] = Query(None, description="Photo version"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    The photo resized to fit (`contain`) or fill and crop to (`cover`) a box.
+
+    Widths and heights must be from the allowed list. A request without the
+    photo's current version `v` is redirected to the versioned URL, which is
+    cached forever since rotating a photo gives it a new version. The format
+    is WebP when the `Accept` header names it, JPEG otherwise.
+    """
+    photo, base_url = _live_photo_and_base_url(db, photo_id)
+    try:
+        spec = resize_spec(w, h, fit)
+    except PhotoResizeError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    version = resize_version(photo)
+    if v != version:
+        params = {"w": w, "h": h, "fit": fit, "v": version}
+        query = urlencode({k: value for k, value in params.items() if value})
+        return RedirectResponse(
+            f"{settings.API_V1_STR}/photos/{photo_id}/image?{query}",
+            status_code=307,
+            headers={"Cache-Control": "public, max-age=300"},
+        )
+
+    available = {image_format.name.lower() for image_format in variant_formats()}
+    image_format = FORMATS[negotiate(request.headers.get("accept"), available)]
+    renditions = (
+        db.query(TPhotoRendition).filter(TPhotoRendition.photo_id == photo_id).all()
+    )
+    try:
+        resized = photo_resize_service.get(
+            photo, renditions, base_url, spec, image_format
+        )
+    except PhotoResizeError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    headers = {
+        "ETag": resized.etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Vary": "Accept",
+    }
+    if if_none_match == resized.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        resized.image_bytes, media_type=image_format.mime_type, headers=headers
+    )
+
+
 @router.patch(
     "/{photo_id}",
     response_model=TPhotoResponse,
@@ -370,24 +565,7 @@ def update_photo(
     if not tlog:
         raise HTTPException(status_code=404, detail="TLog not found for photo")
 
-    # If not owner, require admin scope
-    if int(current_user.id) != int(tlog.user_id):
-        # Check admin privileges using token payload from current_user
-        token_payload = getattr(current_user, "_token_payload", None)
-        if not token_payload:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        from api.core.security import extract_scopes
-
-        pass  # Auth0 only - no legacy admin check needed
-
-        if token_payload.get("token_type") == "auth0":
-            scopes = extract_scopes(token_payload)
-            if "api:admin" not in scopes:
-                raise HTTPException(
-                    status_code=403, detail="Missing required scope: api:admin"
-                )
-        # Legacy tokens not supported - Auth0 only
+    ensure_owner_or_admin(current_user, int(tlog.user_id))
 
     # Proceed with update
     updated = tphoto_crud.update_photo(
@@ -424,6 +602,9 @@ def update_photo(
         "license": str(updated.public_ind),
         "photo_url": join_url(base_url, str(updated.filename)),
         "icon_url": join_url(base_url, str(updated.icon_filename)),
+        "renditions": read_model.get_renditions(db, [int(updated.id)]).get(
+            int(updated.id), []
+        ),
     }
     return response
 
@@ -450,23 +631,7 @@ def delete_photo(
     if not tlog:
         raise HTTPException(status_code=404, detail="TLog not found for photo")
 
-    if int(current_user.id) != int(tlog.user_id):
-        # Check admin privileges using token payload from current_user
-        token_payload = getattr(current_user, "_token_payload", None)
-        if not token_payload:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        from api.core.security import extract_scopes
-
-        pass  # Auth0 only - no legacy admin check needed
-
-        if token_payload.get("token_type") == "auth0":
-            scopes = extract_scopes(token_payload)
-            if "api:admin" not in scopes:
-                raise HTTPException(
-                    status_code=403, detail="Missing required scope: api:admin"
-                )
-        # Legacy tokens not supported - Auth0 only
+    ensure_owner_or_admin(current_user, int(tlog.user_id))
 
     ok = tphoto_crud.delete_photo(db, photo_id=photo_id, soft=True)
     if not ok:
@@ -474,6 +639,44 @@ def delete_photo(
     return None
 
 
+@bulk_router.post(
+    "/photos:bulkUpdate",
+    response_model=TPhotoBulkUpdateResponse,
+    openapi_extra={
+        **openapi_lifecycle("alpha", note="Admin clean-up of many photos at once"),
+        "security": [{"OAuth2": []}],
+    },
+)
+def bulk_update_photos(
+    payload: TPhotoBulkUpdateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> TPhotoBulkUpdateResponse:
+    """
+    Apply the same metadata changes (e.g. licence) to many photos at once.
+
+    Authorisation is checked once for the whole batch: every photo must belong
+    to the caller, otherwise the api:admin scope is required. Ids that do not
+    exist (or are deleted) are reported in `not_found` and otherwise ignored.
+    """
+    updates = payload.updates.model_dump(exclude_none=True)
+    if not updates:
+        raise HTTPException(status_code=400, detail="No updates supplied")
+
+    photo_ids = sorted(set(payload.ids))
+    owners = tphoto_crud.get_photo_owners(db, photo_ids)
+
+    ensure_owner_or_admin(current_user, *owners.values())
+
+    updated = tphoto_crud.update_photos_bulk(
+        db, photo_ids=sorted(owners), updates=updates
+    )
+    return TPhotoBulkUpdateResponse(
+        updated=updated,
+        not_found=[photo_id for photo_id in photo_ids if photo_id not in owners],
+    )
+
+
 @router.get(
     "/{photo_id}/evaluate",
     response_model=TPhotoEvaluationResponse,
@@ -488,6 +691,10 @@ def evaluate_photo(photo_id: int, db: Session = Depends(get_db)):
     - Dimension validation against database
     - Orientation analysis (90°, 180°, 270° rotation detection)
     - Content moderation (inappropriate content detection)
+
+    Downloads and analyses run concurrently under an overall deadline
+    (PHOTO_EVALUATE_DEADLINE_SECONDS); checks still running at the deadline
+    are reported in `errors`.
     """
     # Look up photo in database
     photo = tphoto_crud.get_photo_by_id(db, photo_id=photo_id)
@@ -500,120 +707,46 @@ def evaluate_photo(photo_id: int, db: Session = Depends(get_db)):
     )
     base_url = str(server.url) if server and server.url else ""
 
-    def join_url(base: str, path: str) -> str:
-        if not base:
-            return path
-        if base.endswith("/"):
-            return f"{base}{path}"
-        return f"{base}/{path}"
-
-    photo_url = join_url(base_url, str(photo.filename))
-    icon_url = join_url(base_url, str(photo.icon_filename))
-
-    # Initialise response
-    response = TPhotoEvaluationResponse(
-        photo_id=photo_id,
-        photo_accessible=False,
-        icon_accessible=False,
-        photo_dimension_match=False,
-        icon_dimension_match=False,
-        errors=[],
+    # A plain route, so the queries above ran on the threadpool; only the
+    # concurrent downloads and analysis go back to the event loop
+    return anyio.from_thread.run(
+        partial(
+            photo_evaluation.evaluate_photo,
+            photo,
+            join_url(base_url, str(photo.filename)),
+            join_url(base_url, str(photo.icon_filename)),
+            rekognition=RekognitionService(),
+            deadline_seconds=settings.PHOTO_EVALUATE_DEADLINE_SECONDS,
+        )
     )
 
-    # Initialise Rekognition service
-    rekognition = RekognitionService()
-
-    # Download and analyse main photo
-    photo_bytes = None
-    try:
-        logger.info(f"Downloading photo from: {photo_url}")
-        photo_response = requests.get(photo_url, timeout=30)
-        photo_response.raise_for_status()
-        photo_bytes = photo_response.content
-        response.photo_accessible = True
-
-        # Check dimensions
-        actual_width, actual_height = get_image_dimensions(photo_bytes)
-        if actual_width is not None and actual_height is not None:
-            response.photo_width_actual = actual_width
-            response.photo_height_actual = actual_height
-            response.photo_dimension_match = (
-                actual_width == photo.width and actual_height == photo.height
-            )
-            if not response.photo_dimension_match:
-                response.errors.append(
-                    f"Photo dimensions mismatch: DB({photo.width}x{photo.height}) "
-                    f"vs Actual({actual_width}x{actual_height})"
-                )
-        else:
-            response.errors.append("Could not determine photo dimensions")
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to download photo {photo_url}: {e}")
-        response.errors.append(f"Photo download failed: {str(e)}")
-    except Exception as e:
-        logger.error(f"Error processing photo {photo_url}: {e}")
-        response.errors.append(f"Photo processing error: {str(e)}")
-
-    # Download and analyse icon
-    try:
-        logger.info(f"Downloading icon from: {icon_url}")
-        icon_response = requests.get(icon_url, timeout=30)
-        icon_response.raise_for_status()
-        icon_bytes = icon_response.content
-        response.icon_accessible = True
-
-        # Check dimensions
-        actual_width, actual_height = get_image_dimensions(icon_bytes)
-        if actual_width is not None and actual_height is not None:
-            response.icon_width_actual = actual_width
-            response.icon_height_actual = actual_height
-            response.icon_dimension_match = (
-                actual_width == photo.icon_width and actual_height == photo.icon_height
-            )
-            if not response.icon_dimension_match:
-                response.errors.append(
-                    f"Icon dimensions mismatch: DB({photo.icon_width}x{photo.icon_height}) "
-                    f"vs Actual({actual_width}x{actual_height})"
-                )
-        else:
-            response.errors.append("Could not determine icon dimensions")
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to download icon {icon_url}: {e}")
-        response.errors.append(f"Icon download failed: {str(e)}")
-    except Exception as e:
-        logger.error(f"Error processing icon {icon_url}: {e}")
-        response.errors.append(f"Icon processing error: {str(e)}")
-
-    # Run AWS Rekognition analysis on main photo if available
-    if photo_bytes and len(photo_bytes) > 0:
-        try:
-            # Orientation analysis
-            orientation_result = rekognition.analyse_orientation(photo_bytes)
-            if orientation_result:
-                response.orientation_analysis = orientation_result
-            else:
-                response.errors.append(
-                    "Orientation analysis unavailable (AWS configuration issue)"
-                )
-
-            # Content moderation
-            moderation_result = rekognition.moderate_content(photo_bytes)
-            if moderation_result:
-                response.content_moderation = moderation_result
-            else:
-                response.errors.append(
-                    "Content moderation unavailable (AWS configuration issue)"
-                )
-
-        except Exception as e:
-            logger.error(f"AWS Rekognition analysis failed: {e}")
-            response.errors.append(f"AWS analysis error: {str(e)}")
-    else:
-        response.errors.append("No photo data available for AWS analysis")
 
-    return response
+def _rotated_photo_response(db: Session, photo: TPhoto, user_id: int) -> dict:
+    # Fetch the server after the update, since rotation moves photos to S3
+    server: Server | None = (
+        db.query(Server).filter(Server.id == photo.server_id).first()
+    )
+    base_url = str(server.url) if server and server.url else ""
+    return {
+        "id": photo.id,
+        "log_id": photo.tlog_id,
+        "user_id": user_id,
+        "type": str(photo.type),
+        "filesize": int(photo.filesize),
+        "height": int(photo.height),
+        "width": int(photo.width),
+        "icon_filesize": int(photo.icon_filesize),
+        "icon_height": int(photo.icon_height),
+        "icon_width": int(photo.icon_width),
+        "caption": str(photo.name),
+        "text_desc": str(photo.text_desc),
+        "license": str(photo.public_ind),
+        "photo_url": join_url(base_url, str(photo.filename)),
+        "icon_url": join_url(base_url, str(photo.icon_filename)),
+        "renditions": read_model.get_renditions(db, [int(photo.id)]).get(
+            int(photo.id), []
+        ),
+    }
 
 
 @router.post(
@@ -631,7 +764,7 @@ def rotate_photo(
 
     - **angle**: Rotation angle in degrees (90, 180, 270)
 
-    The original photo is soft-deleted and a new photo record is created.
+    The photo record is updated in place to point at new revision files.
     This endpoint is open to all users to allow collaborative photo correction.
     """
     logger.info(f"Rotating photo {photo_id} by {rotate_request.angle} degrees")
@@ -651,141 +784,120 @@ def rotate_photo(
         db.query(Server).filter(Server.id == existing_photo.server_id).first()
     )
     base_url = str(server.url) if server and server.url else ""
-    photo_url = join_url(base_url, str(existing_photo.filename))
-
-    # Download the existing photo
-    try:
-        logger.info(f"Downloading photo from: {photo_url}")
-        photo_response = requests.get(photo_url, timeout=30)
-        photo_response.raise_for_status()
-        photo_bytes = photo_response.content
-
-        if not photo_bytes:
-            raise HTTPException(status_code=500, detail="Failed to download photo")
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to download photo {photo_url}: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to download photo: {str(e)}"
-        )
-    except Exception as e:
-        logger.error(f"Error downloading photo {photo_url}: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Error downloading photo: {str(e)}"
-        )
 
-    # Load and rotate the image
     try:
-        image = Image.open(io.BytesIO(photo_bytes))
-
-        # Rotate the image
-        rotated_image = image.rotate(-rotate_request.angle, expand=True)
-
-        # Process the rotated image
-        image_processor = ImageProcessor()
-
-        # Convert rotated image to bytes
-        rotated_buffer = io.BytesIO()
-        rotated_image.save(rotated_buffer, format="JPEG", quality=95)
-        rotated_bytes = rotated_buffer.getvalue()
-
-        # Process image to get final photo and thumbnail
-        processed_photo, processed_thumbnail, image_dims, thumbnail_dims = (
-            image_processor.process_image(rotated_bytes)
+        rendered = render_rotation(
+            int(existing_photo.id),
+            int(existing_photo.server_id),
+            join_url(base_url, str(existing_photo.filename)),
+            str(existing_photo.filename),
+            str(existing_photo.icon_filename),
+            rotate_request.angle,
         )
+        updated_photo = apply_rotation(db, rendered)
+    except PhotoRotationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-        if (
-            not processed_photo
-            or not processed_thumbnail
-            or not image_dims
-            or not thumbnail_dims
-        ):
-            raise HTTPException(
-                status_code=500, detail="Failed to process rotated image"
-            )
-
-    except Exception as e:
-        logger.error(f"Failed to rotate image: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to rotate image: {str(e)}")
-
-    # Generate new revision filenames
-    s3_service = S3Service()
-    new_photo_key = s3_service.generate_revision_filename(str(existing_photo.filename))
-    new_thumbnail_key = s3_service.generate_revision_filename(
-        str(existing_photo.icon_filename)
-    )
-
-    # Upload rotated images to S3 with new revision filenames
-    photo_key, thumbnail_key = s3_service.upload_photo_and_thumbnail_with_keys(
-        processed_photo, processed_thumbnail, new_photo_key, new_thumbnail_key
+    logger.info(
+        f"Successfully rotated photo {photo_id}: "
+        f"{existing_photo.filename} -> {updated_photo.filename}"
     )
+    return _rotated_photo_response(db, updated_photo, int(tlog.user_id))
 
-    if not photo_key or not thumbnail_key:
-        raise HTTPException(status_code=500, detail="Failed to upload rotated files")
 
-    # Update existing photo record with new file information
-    try:
-        logger.info(
-            f"Updating photo {existing_photo.id}: server_id {existing_photo.server_id} -> {settings.PHOTOS_SERVER_ID}"
-        )
-        updated_photo = tphoto_crud.update_photo(
-            db,
-            photo_id=int(existing_photo.id),
-            updates={
-                "server_id": settings.PHOTOS_SERVER_ID,
-                "filename": photo_key,
-                "icon_filename": thumbnail_key,
-                "filesize": len(processed_photo),
-                "icon_filesize": len(processed_thumbnail),
-                "height": image_dims[1],
-                "width": image_dims[0],
-                "icon_height": thumbnail_dims[1],
-                "icon_width": thumbnail_dims[0],
-                "source": "R",  # R for revised/rotated
-            },
-        )
+@bulk_router.post(
+    "/photos:rotate",
+    response_model=TPhotoBatchRotateResponse,
+    openapi_extra={
+        **openapi_lifecycle(
+            "alpha", note="Moderation: fix the orientation of many photos at once"
+        ),
+        "security": [{"OAuth2": []}],
+    },
+)
+def batch_rotate_photos(
+    payload: TPhotoBatchRotateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> TPhotoBatchRotateResponse:
+    """
+    Rotate many photos in one call (requires the api:admin scope).
 
-        if updated_photo:
-            logger.info(
-                f"Photo {updated_photo.id} updated: server_id now {updated_photo.server_id}"
+    Photos are downloaded, rotated and uploaded in parallel, then their
+    records are updated one at a time. Each photo succeeds or fails on its
+    own; failures are listed with the status code the single-photo endpoint
+    would have returned.
+    """
+    ensure_admin(current_user)
+
+    failed: List[TPhotoRotateFailure] = []
+    angles: Dict[int, int] = {}
+    for item in payload.items:
+        if item.photo_id in angles:
+            failed.append(
+                TPhotoRotateFailure(
+                    photo_id=item.photo_id,
+                    status_code=400,
+                    detail="Photo listed more than once",
+                )
             )
+        else:
+            angles[item.photo_id] = item.angle
 
-        if not updated_photo:
-            # Rollback S3 uploads if database update fails
-            logger.error("Failed to update photo record in database")
-            # Note: We keep original S3 objects, only new ones need cleanup
-            # But since they're revisions, they're safe to keep as backups
-            raise HTTPException(status_code=500, detail="Failed to update photo record")
-
-    except Exception as e:
-        logger.error(f"Failed to update photo record: {e}")
-        raise HTTPException(status_code=500, detail="Failed to update photo record")
+    owners = tphoto_crud.get_photo_owners(db, list(angles))
+    photos = {
+        int(p.id): p for p in db.query(TPhoto).filter(TPhoto.id.in_(list(owners))).all()
+    }
+    base_urls = {
+        int(server.id): str(server.url) if server.url else ""
+        for server in db.query(Server)
+        .filter(Server.id.in_({int(p.server_id) for p in photos.values()}))
+        .all()
+    }
+    for photo_id in angles:
+        if photo_id not in photos:
+            failed.append(
+                TPhotoRotateFailure(
+                    photo_id=photo_id, status_code=404, detail="Photo not found"
+                )
+            )
 
-    logger.info(
-        f"Successfully rotated photo {photo_id}: {existing_photo.filename} -> {photo_key}"
-    )
+    def render(photo: TPhoto) -> Union[RenderedRotation, PhotoRotationError]:
+        try:
+            return render_rotation(
+                int(photo.id),
+                int(photo.server_id),
+                join_url(base_urls.get(int(photo.server_id), ""), str(photo.filename)),
+                str(photo.filename),
+                str(photo.icon_filename),
+                angles[int(photo.id)],
+            )
+        except PhotoRotationError as e:
+            return e
 
-    # Get updated server URL for response (fetch after update since server_id was updated)
-    updated_server: Server | None = (
-        db.query(Server).filter(Server.id == updated_photo.server_id).first()
-    )
-    base_url = str(updated_server.url) if updated_server and updated_server.url else ""
+    rotated = []
+    with ThreadPoolExecutor(max_workers=settings.PHOTO_ROTATE_BATCH_WORKERS) as pool:
+        for photo, result in zip(
+            photos.values(), pool.map(render, list(photos.values()))
+        ):
+            try:
+                if isinstance(result, PhotoRotationError):
+                    raise result
+                updated = apply_rotation(db, result)
+            except PhotoRotationError as e:
+                failed.append(
+                    TPhotoRotateFailure(
+                        photo_id=int(photo.id),
+                        status_code=e.status_code,
+                        detail=e.detail,
+                    )
+                )
+                continue
+            rotated.append(
+                TPhotoResponse.model_validate(
+                    _rotated_photo_response(db, updated, owners[int(updated.id)])
+                )
+            )
 
-    # Return response with updated photo
-    return {
-        "id": updated_photo.id,
-        "log_id": updated_photo.tlog_id,
-        "user_id": int(tlog.user_id),
-        "type": str(updated_photo.type),
-        "filesize": int(updated_photo.filesize),
-        "height": int(updated_photo.height),
-        "width": int(updated_photo.width),
-        "icon_filesize": int(updated_photo.icon_filesize),
-        "icon_height": int(updated_photo.icon_height),
-        "icon_width": int(updated_photo.icon_width),
-        "caption": str(updated_photo.name),
-        "text_desc": str(updated_photo.text_desc),
-        "license": str(updated_photo.public_ind),
-        "photo_url": join_url(base_url, str(updated_photo.filename)),
-        "icon_url": join_url(base_url, str(updated_photo.icon_filename)),
-    }
+    logger.info(f"Batch rotate: {len(rotated)} rotated, {len(failed)} failed")
+    return TPhotoBatchRotateResponse(rotated=rotated, failed=failed)
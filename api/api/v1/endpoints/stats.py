@@ -3,79 +3,25 @@ Site-wide statistics endpoint with Redis caching.
 """
 
 import json
-import ssl
 from datetime import datetime, timedelta
-from typing import Optional
-from urllib.parse import urlparse
 
-import redis
 from fastapi import APIRouter, Depends
 from redis.exceptions import RedisError
 from sqlalchemy.orm import Session
 
 from api.api.deps import get_db
 from api.api.lifecycle import openapi_lifecycle
-from api.core.config import settings
 from api.core.logging import get_logger
+from api.core.redis_client import get_redis_client
 from api.models.tphoto import TPhoto
 from api.models.trig import Trig
 from api.models.user import TLog, User
+from api.services.orientation_prescreen import prescreen_stats
+from api.services.photo_cache import photo_cache
 
 logger = get_logger(__name__)
 router = APIRouter()
 
-# Redis client singleton
-_redis_client: Optional[redis.Redis] = None
-
-
-def get_redis_client() -> Optional[redis.Redis]:
-    """Get or create Redis client singleton."""
-    global _redis_client
-
-    if _redis_client is not None:
-        return _redis_client
-
-    if not settings.REDIS_URL:
-        logger.debug("Redis not configured, caching disabled")
-        return None
-
-    try:
-        redis_url = settings.REDIS_URL
-        # Convert redis:// to rediss:// for serverless endpoints
-        if "serverless" in redis_url and redis_url.startswith("redis://"):
-            redis_url = redis_url.replace("redis://", "rediss://", 1)
-
-        parsed = urlparse(redis_url)
-
-        if parsed.scheme == "rediss":
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-
-            _redis_client = redis.from_url(
-                redis_url,
-                decode_responses=True,
-                socket_connect_timeout=10,
-                socket_timeout=10,
-                retry_on_timeout=True,
-                ssl=True,
-                ssl_context=ssl_context,
-            )
-        else:
-            _redis_client = redis.from_url(
-                redis_url,
-                decode_responses=True,
-                socket_connect_timeout=10,
-                socket_timeout=10,
-                retry_on_timeout=True,
-            )
-
-        logger.info(f"Redis client initialized for stats caching: {parsed.hostname}")
-        return _redis_client
-    except Exception as e:
-        logger.warning(f"Failed to initialize Redis client: {e}")
-        return None
-
 
 @router.get("/site", openapi_extra=openapi_lifecycle("beta"))
 def get_site_stats(db: Session = Depends(get_db)):
@@ -142,3 +88,30 @@ def get_site_stats(db: Session = Depends(get_db)):
             logger.warning(f"Redis cache write failed: {e}")
 
     return result
+
+
+@router.get("/rekognition", openapi_extra=openapi_lifecycle("alpha"))
+def get_rekognition_stats():
+    """
+    Orientation analyses run by this process since it started.
+
+    Returns:
+    - analyses: orientation analyses requested
+    - prescreened: analyses answered by the local pre-screen alone
+    - rekognition_calls_avoided: paid Rekognition calls those saved
+    """
+    return prescreen_stats.snapshot()
+
+
+@router.get("/photo-cache", openapi_extra=openapi_lifecycle("alpha"))
+def get_photo_cache_stats():
+    """
+    Local photo cache activity in this process since it started.
+
+    Returns:
+    - hits: photos served from the on-disk cache
+    - misses: photos downloaded from their server
+    - stores: photos written to the cache
+    - evictions: least recently used photos removed to stay within the limit
+    """
+    return photo_cache.stats.snapshot()
@@ -0,0 +1,84 @@
+"""
+Streaming endpoints under /v1/stream (Server-Sent Events).
+"""
+
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from api.api.lifecycle import openapi_lifecycle
+from api.core.config import settings
+from api.services.activity import (
+    ActivityBroadcaster,
+    ActivitySubscription,
+    activity_broadcaster,
+)
+
+router = APIRouter()
+
+# Ask browsers to wait this long before reconnecting after a dropped stream
+SSE_RETRY_MS = 5000
+
+
+async def activity_event_stream(
+    request: Request,
+    broadcaster: ActivityBroadcaster,
+    subscription: ActivitySubscription,
+    heartbeat_seconds: float,
+) -> AsyncIterator[str]:
+    """Yield SSE frames for each activity event until the client disconnects."""
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while True:
+            if await request.is_disconnected():
+                break
+            try:
+                event_type, payload = await asyncio.wait_for(
+                    subscription.get(), timeout=heartbeat_seconds
+                )
+            except asyncio.TimeoutError:
+                # Comment frame keeps proxies and load balancers from idling out
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event_type}\ndata: {payload}\n\n"
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get(
+    "/activity",
+    openapi_extra=openapi_lifecycle(
+        "alpha", note="Server-Sent Events stream of new logs and photos"
+    ),
+    response_class=StreamingResponse,
+)
+async def stream_activity(request: Request) -> StreamingResponse:
+    """
+    Stream new logs and photos as they are committed (Server-Sent Events).
+
+    Each event has an `event:` of `log.created`, `log.updated`, `log.deleted`
+    or `photo.created` and a JSON `data:` payload of the form
+    `{"type", "data", "published_at"}`, where `data` matches the item shape of
+    `/v1/logs` or `/v1/photos` (only `id` for deletions). Idle connections
+    receive a keep-alive comment every few seconds.
+
+    No database work is done per connection: events are fanned out from a
+    single in-process broadcaster fed by Redis pub/sub.
+    """
+    subscription = activity_broadcaster.subscribe()
+    return StreamingResponse(
+        activity_event_stream(
+            request,
+            activity_broadcaster,
+            subscription,
+            settings.ACTIVITY_HEARTBEAT_SECONDS,
+        ),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Disable response buffering in nginx so events flush immediately
+            "X-Accel-Buffering": "no",
+        },
+    )
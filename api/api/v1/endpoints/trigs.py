@@ -9,20 +9,25 @@ from math import cos, radians, sqrt
 from typing import Optional
 
 import numpy as np
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from PIL import Image, ImageDraw
 from sqlalchemy.orm import Session
 
 from api.api.deps import get_db
 from api.api.lifecycle import lifecycle, openapi_lifecycle
+from api.crud import read_model
 from api.crud import status as status_crud
 from api.crud import tlog as tlog_crud
 from api.crud import tphoto as tphoto_crud
 from api.crud import trig as trig_crud
 from api.crud import trigstats as trigstats_crud
 from api.models.server import Server
-from api.schemas.tphoto import TPhotoResponse
+from api.schemas.tphoto import (
+    TPhotoRenditionResponse,
+    TPhotoResponse,
+    TPhotoSpriteIndex,
+)
 from api.schemas.trig import (
     TrigDetails,
     TrigMinimal,
@@ -31,6 +36,12 @@ from api.schemas.trig import TrigStats as TrigStatsSchema
 from api.schemas.trig import (
     TrigWithIncludes,
 )
+from api.services.photo_sprite import (
+    sprite_index_response,
+    sprite_response,
+    sprite_service,
+    sprite_sources,
+)
 from api.utils.geocalibrate import CalibrationResult
 from api.utils.url import join_url
 
@@ -362,6 +373,7 @@ def list_logs_for_trig(
         if "photos" in tokens:
             for out, orig in zip(items_serialized, items):
                 photos = tphoto_crud.list_all_photos_for_log(db, log_id=int(orig.id))
+                renditions = read_model.get_renditions(db, [int(p.id) for p in photos])
                 out["photos"] = []
                 for p in photos:
                     server: Server | None = (
@@ -387,6 +399,10 @@ def list_logs_for_trig(
                             public_ind=str(p.public_ind),
                             photo_url=join_url(base_url, str(p.filename)),
                             icon_url=join_url(base_url, str(p.icon_filename)),
+                            renditions=[
+                                TPhotoRenditionResponse.model_validate(r)
+                                for r in renditions.get(int(p.id), [])
+                            ],
                         ).model_dump()
                     )
     has_more = (skip + len(items)) < total
@@ -431,6 +447,7 @@ def list_photos_for_trig(
         )
         .count()
     )
+    renditions = read_model.get_renditions(db, [int(p.id) for p in items])
     result_items = []
     for p in items:
         # Defer URLs; provide minimal fields consistent with collection shape
@@ -459,6 +476,10 @@ def list_photos_for_trig(
                 public_ind=str(p.public_ind),
                 photo_url=join_url(base_url, str(p.filename)),
                 icon_url=join_url(base_url, str(p.icon_filename)),
+                renditions=[
+                    TPhotoRenditionResponse.model_validate(r)
+                    for r in renditions.get(int(p.id), [])
+                ],
             ).model_dump()
         )
 
@@ -478,3 +499,42 @@ def list_photos_for_trig(
         },
         "links": {"self": self_link, "next": next_link, "prev": prev_link},
     }
+
+
+@router.get(
+    "/{trig_id}/photos/sprite/index",
+    response_model=TPhotoSpriteIndex,
+    openapi_extra=openapi_lifecycle("alpha", note="Trig photo sprite index"),
+)
+def get_trig_photo_sprite_index(trig_id: int, db: Session = Depends(get_db)):
+    """
+    Offsets of the trig's newest photo thumbnails on its sprite image.
+
+    Fetch `sprite_url` once and crop each tile out of it, instead of one
+    request per thumbnail. The URL carries the sprite version, which changes
+    whenever the trig's photo set does.
+    """
+    return sprite_index_response("trig", trig_id, sprite_sources(db, trig_id=trig_id))
+
+
+@router.get(
+    "/{trig_id}/photos/sprite",
+    responses={200: {"content": {"image/jpeg": {}}, "description": "Thumbnail sprite"}},
+    openapi_extra=openapi_lifecycle("alpha", note="Trig photo sprite"),
+)
+def get_trig_photo_sprite(
+    trig_id: int,
+    v: Optional[str] = Query(None, description="Sprite version from the index"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    The trig's newest photo thumbnails composited into one JPEG.
+
+    See `/photos/sprite/index` for the tile offsets.
+    """
+    sources = sprite_sources(db, trig_id=trig_id)
+    if not sources:
+        raise HTTPException(status_code=404, detail="No photos")
+    sprite = sprite_service.get_sprite("trig", trig_id, sources)
+    return sprite_response(sprite, v, if_none_match)
@@ -8,7 +8,7 @@ import os
 from typing import Dict, Optional, Union
 
 import numpy as np
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
 from PIL import Image, ImageChops, ImageDraw, ImageFilter
@@ -21,6 +21,7 @@ from api.api.deps import (
     verify_m2m_token,
 )
 from api.api.lifecycle import openapi_lifecycle
+from api.crud import read_model
 from api.crud import tlog as tlog_crud
 from api.crud import tphoto as tphoto_crud
 from api.crud import user as user_crud
@@ -28,7 +29,11 @@ from api.models.server import Server
 from api.models.tphoto import TPhoto
 from api.models.trig import Trig
 from api.models.user import User
-from api.schemas.tphoto import TPhotoResponse
+from api.schemas.tphoto import (
+    TPhotoRenditionResponse,
+    TPhotoResponse,
+    TPhotoSpriteIndex,
+)
 from api.schemas.user import (
     UserBreakdown,
     UserCreate,
@@ -40,6 +45,12 @@ from api.schemas.user import (
     UserWithIncludes,
 )
 from api.services.badge_service import BadgeService
+from api.services.photo_sprite import (
+    sprite_index_response,
+    sprite_response,
+    sprite_service,
+    sprite_sources,
+)
 from api.utils.condition_mapping import get_condition_counts_by_description
 from api.utils.geocalibrate import CalibrationResult
 from api.utils.url import join_url
@@ -893,6 +904,7 @@ def list_logs_for_user(
             # Attach photos list for each log item
             for out, orig in zip(items_serialized, items):
                 photos = tphoto_crud.list_all_photos_for_log(db, log_id=int(orig.id))
+                renditions = read_model.get_renditions(db, [int(p.id) for p in photos])
                 # Build base URLs per photo server
                 out["photos"] = []
                 for p in photos:
@@ -919,6 +931,10 @@ def list_logs_for_user(
                             public_ind=str(p.public_ind),
                             photo_url=join_url(base_url, str(p.filename)),
                             icon_url=join_url(base_url, str(p.icon_filename)),
+                            renditions=[
+                                TPhotoRenditionResponse.model_validate(r)
+                                for r in renditions.get(int(p.id), [])
+                            ],
                         ).model_dump()
                     )
 
@@ -958,6 +974,7 @@ def list_photos_for_user(
         )
         .count()
     )
+    renditions = read_model.get_renditions(db, [int(p.id) for p in items])
     result_items = []
     for p in items:
         server: Server | None = (
@@ -983,6 +1000,10 @@ def list_photos_for_user(
                 public_ind=str(p.public_ind),
                 photo_url=join_url(base_url, str(p.filename)),
                 icon_url=join_url(base_url, str(p.icon_filename)),
+                renditions=[
+                    TPhotoRenditionResponse.model_validate(r)
+                    for r in renditions.get(int(p.id), [])
+                ],
             ).model_dump()
         )
     has_more = (skip + len(items)) < total
@@ -1003,6 +1024,45 @@ def list_photos_for_user(
     }
 
 
+@router.get(
+    "/{user_id}/photos/sprite/index",
+    response_model=TPhotoSpriteIndex,
+    openapi_extra=openapi_lifecycle("alpha", note="User photo sprite index"),
+)
+def get_user_photo_sprite_index(user_id: int, db: Session = Depends(get_db)):
+    """
+    Offsets of the user's newest photo thumbnails on its sprite image.
+
+    Fetch `sprite_url` once and crop each tile out of it, instead of one
+    request per thumbnail. The URL carries the sprite version, which changes
+    whenever the user's photo set does.
+    """
+    return sprite_index_response("user", user_id, sprite_sources(db, user_id=user_id))
+
+
+@router.get(
+    "/{user_id}/photos/sprite",
+    responses={200: {"content": {"image/jpeg": {}}, "description": "Thumbnail sprite"}},
+    openapi_extra=openapi_lifecycle("alpha", note="User photo sprite"),
+)
+def get_user_photo_sprite(
+    user_id: int,
+    v: Optional[str] = Query(None, description="Sprite version from the index"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    The user's newest photo thumbnails composited into one JPEG.
+
+    See `/photos/sprite/index` for the tile offsets.
+    """
+    sources = sprite_sources(db, user_id=user_id)
+    if not sources:
+        raise HTTPException(status_code=404, detail="No photos")
+    sprite = sprite_service.get_sprite("user", user_id, sources)
+    return sprite_response(sprite, v, if_none_match)
+
+
 @router.get(
     "/{user_id}/map",
     responses={
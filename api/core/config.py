@@ -76,6 +76,16 @@ class Settings(BaseSettings):
     ORIENTATION_MODEL_ENABLED: bool = False
     ORIENTATION_MODEL_PATH: Optional[str] = None
     ORIENTATION_MODEL_THRESHOLD: float = 0.65
+    ORIENTATION_BATCH_SIZE: int = 32  # Images per session.run
+    ORIENTATION_INTRA_OP_THREADS: int = 0  # 0 = onnxruntime default (all cores)
+    ORIENTATION_INTER_OP_THREADS: int = 1  # Sequential graph; parallelism is intra-op
+    ORIENTATION_BACKFILL_FETCH_WORKERS: int = 16  # Concurrent thumbnail downloads
+    # Skip Rekognition when the model is this sure (and the sky agrees)
+    ORIENTATION_PRESCREEN_THRESHOLD: float = 0.9
+    ORIENTATION_PRESCREEN_MIN_SKY: float = 0.05  # Icon share before sky counts
+    # Without the model, skip Rekognition when this share of the sky lies in
+    # one half of the icon; above 1 never skips
+    ORIENTATION_PRESCREEN_SKY_THRESHOLD: float = 0.9
 
     # Photo upload configuration
     PHOTOS_SERVER_ID: int = 1  # Default to S3 server (server.id = 1)
@@ -83,10 +93,119 @@ class Settings(BaseSettings):
     MAX_IMAGE_SIZE: int = 20 * 1024 * 1024  # 20MB
     MAX_IMAGE_DIMENSION: int = 4000
     THUMBNAIL_SIZE: int = 120
+    # Longest-side sizes of the extra renditions made at upload (empty disables)
+    PHOTO_RENDITION_SIZES: List[int] = [1600, 800, 320]
+    # Extra formats stored next to JPEG thumbnails and renditions (AVIF only
+    # where Pillow can encode it), each encoded to a byte budget
+    PHOTO_VARIANT_FORMATS: List[str] = ["webp", "avif"]
+    THUMBNAIL_BYTE_BUDGET: int = 4000
+    RENDITION_BITS_PER_PIXEL: float = 1.0
+    PHOTO_VARIANT_MIN_QUALITY: int = 30
+    PHOTO_VARIANT_MAX_QUALITY: int = 90
+    PHOTO_VARIANT_MAX_ENCODES: int = 4  # Quality search steps per variant
+
+    # AWS clients (shared per process) and S3 uploads
+    AWS_MAX_POOL_CONNECTIONS: int = 32
+    S3_UPLOAD_CONCURRENCY: int = 8  # Objects uploaded in parallel per process
+    S3_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024  # Multipart at/above this size
+    S3_MULTIPART_CHUNKSIZE: int = 8 * 1024 * 1024
+    HTTP_POOL_MAXSIZE: int = 20  # Keep-alive connections per photo server
+
+    # Rekognition: calls in flight per process, per-call timeout, result cache
+    REKOGNITION_CONCURRENCY: int = 8
+    REKOGNITION_CALL_TIMEOUT_SECONDS: float = 10.0
+    ANALYSIS_CACHE_TTL_SECONDS: int = 30 * 24 * 60 * 60  # Keyed by image SHA-256
+    ANALYSIS_CACHE_LOCAL_CAPACITY: int = 1000  # Results kept when Redis is absent
+
+    # Originals fetched for evaluate/rotate/moderation, cached on local disk
+    PHOTO_CACHE_ENABLED: bool = True
+    PHOTO_CACHE_DIR: Optional[str] = None  # Defaults to <tmp>/photo-cache
+    PHOTO_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024  # Shared by host workers
+
+    # Thumbnail sprites for galleries (/v1/trigs/{id}/photos/sprite)
+    PHOTO_SPRITE_MAX_PHOTOS: int = 100  # Newest photos on a sprite
+    PHOTO_SPRITE_COLUMNS: int = 10
+    PHOTO_SPRITE_FETCH_WORKERS: int = 8  # Thumbnails downloaded in parallel
+    PHOTO_SPRITE_CACHE_DIR: Optional[str] = None  # Defaults to <tmp>/photo-sprites
+    PHOTO_SPRITE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # On-demand resized photos (/v1/photos/{id}/image)
+    PHOTO_RESIZE_SIZES: List[int] = [
+        64,
+        96,
+        120,
+        160,
+        240,
+        320,
+        480,
+        640,
+        800,
+        960,
+        1200,
+        1600,
+        2048,
+    ]
+    PHOTO_RESIZE_QUALITY: int = 85
+    PHOTO_RESIZE_CACHE_DIR: Optional[str] = None  # Defaults to <tmp>/photo-resized
+    PHOTO_RESIZE_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
+
+    # Near-duplicate detection on upload (64-bit dHash of the thumbnail)
+    PHOTO_DUPLICATE_MAX_DISTANCE: int = 6  # Differing bits still counted a match
+    PHOTO_REJECT_DUPLICATES: bool = False  # 409 instead of reporting the matches
+    PHOTO_HASH_CATCHUP_SECONDS: int = 60  # Index hashes stored by other workers
+
+    # POST /v1/photos:rotate renders this many photos in parallel
+    PHOTO_ROTATE_BATCH_WORKERS: int = 4
+
+    # /v1/photos/{id}/evaluate: overall budget for downloads plus analysis
+    PHOTO_EVALUATE_DEADLINE_SECONDS: float = 25.0
+
+    # Dimension audit (scripts/audit_photo_dimensions.py): bytes read from the
+    # start of each object, enough for the JPEG frame header in most files
+    PHOTO_AUDIT_RANGE_BYTES: int = 16 * 1024
+
+    # Background photo ingestion (POST /v1/photos with Prefer: respond-async)
+    PHOTO_INGEST_WORKERS: int = 2
+    PHOTO_INGEST_SPOOL_DIR: Optional[str] = None  # Defaults to <tmp>/photo-ingest
+    PHOTO_INGEST_JOB_TTL_SECONDS: int = 24 * 60 * 60
+    # Spooled uploads untouched this long are from a crashed worker
+    PHOTO_INGEST_STALE_SECONDS: int = 60 * 60
+
+    # Direct-to-S3 uploads (/v1/photos/upload-url); expire this prefix in a
+    # bucket lifecycle rule so abandoned uploads are cleared
+    PHOTO_UPLOAD_STAGING_PREFIX: str = "staging/"
+    PHOTO_UPLOAD_URL_EXPIRY_SECONDS: int = 15 * 60
+
+    # S3 objects of photos deleted (or moderated) longer ago are removed
+    PHOTO_PURGE_RETENTION_DAYS: int = 30
+
+    # Background content moderation of uploads (durable local queue)
+    MODERATION_QUEUE_PATH: Optional[str] = None  # Defaults to <tmp>/moderation.db
+    MODERATION_WORKERS: int = 4  # Rekognition calls in flight per process
+    MODERATION_BATCH_SIZE: int = 16  # Jobs claimed, and verdicts written, at once
+    MODERATION_MAX_ATTEMPTS: int = 5  # Then the photo is hidden pending review
+    MODERATION_RETRY_BACKOFF_SECONDS: float = 30.0  # Doubles on each attempt
+    MODERATION_LEASE_SECONDS: int = 300  # Unfinished claims are retried after this
 
     # Redis/ElastiCache Configuration
     REDIS_URL: Optional[str] = None  # e.g., redis://host:6379
 
+    # Live activity stream (Server-Sent Events)
+    ACTIVITY_CHANNEL: str = "activity:v1"  # Redis pub/sub channel
+    ACTIVITY_SUBSCRIBER_QUEUE_SIZE: int = 100  # Per-connection buffer
+    ACTIVITY_HEARTBEAT_SECONDS: int = 15  # Keep-alive comment interval
+
+    # Recent logs ring buffer (serves unfiltered /v1/logs first pages)
+    RECENT_LOGS_ENABLED: bool = True
+    RECENT_LOGS_CAPACITY: int = 500
+    RECENT_LOGS_RESEED_SECONDS: int = 300  # Resync with writes made elsewhere
+
+    # Full-text search over log comments (/v1/logs/search)
+    LOG_SEARCH_ENABLED: bool = True
+    LOG_SEARCH_CATCHUP_SECONDS: int = 60  # Index logs written elsewhere
+    LOG_SEARCH_REBUILD_SECONDS: int = 60 * 60  # Full rebuild for outside edits
+    LOG_SEARCH_COMPACT_THRESHOLD: int = 1000  # Edits/deletes before re-encoding
+
     @field_validator("BACKEND_CORS_ORIGINS", mode="before")
     @classmethod
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
@@ -0,0 +1,70 @@
+"""
+Shared Redis/ElastiCache client used for caching and pub/sub.
+"""
+
+import logging
+import ssl
+from typing import Optional
+from urllib.parse import urlparse
+
+import redis
+
+from api.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis client singleton
+_redis_client: Optional[redis.Redis] = None
+
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """Get or create Redis client singleton.
+
+    Returns None when REDIS_URL is not configured or the client cannot be built,
+    so callers can fall back to in-process behaviour.
+    """
+    global _redis_client
+
+    if _redis_client is not None:
+        return _redis_client
+
+    if not settings.REDIS_URL:
+        logger.debug("Redis not configured, caching disabled")
+        return None
+
+    try:
+        redis_url = settings.REDIS_URL
+        # Convert redis:// to rediss:// for serverless endpoints
+        if "serverless" in redis_url and redis_url.startswith("redis://"):
+            redis_url = redis_url.replace("redis://", "rediss://", 1)
+
+        parsed = urlparse(redis_url)
+
+        if parsed.scheme == "rediss":
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+
+            _redis_client = redis.from_url(
+                redis_url,
+                decode_responses=True,
+                socket_connect_timeout=10,
+                socket_timeout=10,
+                retry_on_timeout=True,
+                ssl=True,
+                ssl_context=ssl_context,
+            )
+        else:
+            _redis_client = redis.from_url(
+                redis_url,
+                decode_responses=True,
+                socket_connect_timeout=10,
+                socket_timeout=10,
+                retry_on_timeout=True,
+            )
+
+        logger.info(f"Redis client initialized: {parsed.hostname}")
+        return _redis_client
+    except Exception as e:
+        logger.warning(f"Failed to initialize Redis client: {e}")
+        return None
@@ -0,0 +1,138 @@
+"""
+Early limits on photo upload request bodies.
+
+Starlette parses a multipart form completely (spooling files to disk past
+1MB) before the endpoint runs, so a size or format check in the endpoint
+only happens after the whole body has been received. UploadLimitMiddleware
+checks the body while it streams in instead:
+
+- a declared Content-Length over the limit is refused with 413 before any
+  of the body is read;
+- otherwise bytes are counted as they arrive, and parsing stops with 413 as
+  soon as the limit is passed (chunked uploads included);
+- the first bytes of the file part are checked for the JPEG start-of-image
+  marker, so a PNG or junk upload fails with 400 on its first chunk.
+
+This is a plain ASGI middleware rather than a BaseHTTPMiddleware, since it
+has to wrap `receive` to see the body as it arrives.
+"""
+
+import logging
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# SOI marker followed by the first marker's 0xFF
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+
+# Allowance for the multipart framing and form fields around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Give up looking for the file part after this many bytes
+_SNIFF_LIMIT = 64 * 1024
+
+NOT_JPEG_DETAIL = "Only JPEG images are supported"
+
+
+def has_jpeg_signature(data: bytes) -> bool:
+    return data.startswith(JPEG_SIGNATURE)
+
+
+def too_large_detail(max_bytes: int) -> str:
+    return f"File too large (max {max_bytes} bytes)"
+
+
+class FilePartSniffer:
+    """
+    Finds the leading bytes of the first file in a streamed multipart body.
+
+    Fed the body chunk by chunk; `feed` returns the first bytes of the file
+    part once they have arrived, and None until then (or if there is none
+    within the first _SNIFF_LIMIT bytes).
+    """
+
+    def __init__(self) -> None:
+        self.buffer = b""
+        self.done = False
+
+    def feed(self, chunk: bytes) -> Optional[bytes]:
+        if self.done:
+            return None
+        self.buffer += chunk
+        start = self.buffer.find(b"filename=")
+        if start >= 0:
+            headers_end = self.buffer.find(b"\r\n\r\n", start)
+            data_start = headers_end + 4
+            if headers_end >= 0 and len(self.buffer) >= data_start + 3:
+                self.done = True
+                return self.buffer[data_start : data_start + 3]
+        if len(self.buffer) > _SNIFF_LIMIT:
+            self.done = True
+            self.buffer = b""
+        return None
+
+
+class UploadLimitMiddleware:
+    """Enforce a body size limit and JPEG uploads on multipart POSTs."""
+
+    def __init__(self, app: ASGIApp, *, paths: Iterable[str], max_bytes: int):
+        self.app = app
+        self.paths = {path.rstrip("/") for path in paths}
+        self.max_bytes = max_bytes
+
+    def _applies(self, scope: Scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return False
+        if scope["path"].rstrip("/") not in self.paths:
+            return False
+        headers = dict(scope["headers"])
+        content_type = headers.get(b"content-type", b"").lower()
+        return content_type.startswith(b"multipart/form-data")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self._applies(scope):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.max_bytes + MULTIPART_OVERHEAD
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                declared = 0
+            if declared > limit:
+                logger.info(f"Refused {declared} byte upload to {scope['path']}")
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": too_large_detail(self.max_bytes)},
+                )
+                await response(scope, receive, send)
+                return
+
+        received = 0
+        sniffer = FilePartSniffer()
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            chunk = message.get("body", b"")
+            received += len(chunk)
+            if received > limit:
+                raise HTTPException(
+                    status_code=413, detail=too_large_detail(self.max_bytes)
+                )
+            head = sniffer.feed(chunk)
+            # An empty file part is followed straight by the next boundary
+            if head is not None and not head.startswith(b"\r\n-"):
+                if not has_jpeg_signature(head):
+                    raise HTTPException(status_code=400, detail=NOT_JPEG_DETAIL)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,183 @@
+"""
+Read model for the list endpoints.
+
+The list endpoints used to hydrate full ORM objects (every column of TLog,
+TPhoto and User), look up names and server URLs per row, then round-trip
+each object through a Pydantic model just to get a dict back. These queries
+select only the columns a response needs, join the names and server URLs in
+the same statement, and build the response dicts straight from the rows.
+
+The dicts match what the ORM path produced (`TLogResponse` plus trig_name and
+user_name for logs; the serialised `TPhotoResponse` shape for photos).
+"""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from api.crud.tlog import log_order_by
+from api.models.server import Server
+from api.models.tphoto import TPhoto, TPhotoRendition
+from api.models.trig import Trig
+from api.models.user import TLog, User
+from api.utils.url import join_url
+
+# Columns of TLogResponse, in its field order
+_LOG_COLUMNS = (
+    TLog.id,
+    TLog.trig_id,
+    TLog.user_id,
+    TLog.date,
+    TLog.time,
+    TLog.osgb_eastings,
+    TLog.osgb_northings,
+    TLog.osgb_gridref,
+    TLog.fb_number,
+    TLog.condition,
+    TLog.comment,
+    TLog.score,
+    TLog.source,
+    Trig.name.label("trig_name"),
+    User.name.label("user_name"),
+)
+
+
+def _log_select():
+    return (
+        select(*_LOG_COLUMNS)
+        .select_from(TLog)
+        .outerjoin(Trig, Trig.id == TLog.trig_id)
+        .outerjoin(User, User.id == TLog.user_id)
+    )
+
+
+def list_logs(
+    db: Session,
+    *,
+    trig_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    order: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """Page of log dicts with trig_name and user_name, newest first by default."""
+    stmt = _log_select()
+    if trig_id is not None:
+        stmt = stmt.where(TLog.trig_id == trig_id)
+    if user_id is not None:
+        stmt = stmt.where(TLog.user_id == user_id)
+    stmt = stmt.order_by(*log_order_by(order)).offset(skip).limit(limit)
+    return [row._asdict() for row in db.execute(stmt)]
+
+
+def get_logs_by_ids(db: Session, log_ids: List[int]) -> List[Dict[str, Any]]:
+    """Log dicts for the given ids, in the same order, skipping missing ones."""
+    if not log_ids:
+        return []
+    rows = db.execute(_log_select().where(TLog.id.in_(log_ids)))
+    logs = {row.id: row._asdict() for row in rows}
+    return [logs[log_id] for log_id in log_ids if log_id in logs]
+
+
+def list_photos(
+    db: Session,
+    *,
+    trig_id: Optional[int] = None,
+    log_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """Page of non-deleted photo dicts with absolute URLs, newest first."""
+    stmt = (
+        select(
+            TPhoto.id,
+            TPhoto.tlog_id,
+            func.coalesce(TLog.user_id, 0).label("user_id"),
+            TPhoto.type,
+            TPhoto.filename,
+            TPhoto.filesize,
+            TPhoto.height,
+            TPhoto.width,
+            TPhoto.icon_filename,
+            TPhoto.icon_filesize,
+            TPhoto.icon_height,
+            TPhoto.icon_width,
+            TPhoto.name,
+            TPhoto.text_desc,
+            TPhoto.public_ind,
+            Server.url.label("server_url"),
+        )
+        .select_from(TPhoto)
+        .outerjoin(TLog, TLog.id == TPhoto.tlog_id)
+        .outerjoin(Server, Server.id == TPhoto.server_id)
+        .where(TPhoto.deleted_ind != "Y")
+    )
+    if log_id is not None:
+        stmt = stmt.where(TPhoto.tlog_id == log_id)
+    if user_id is not None:
+        stmt = stmt.where(TLog.user_id == user_id)
+    if trig_id is not None:
+        stmt = stmt.where(TLog.trig_id == trig_id)
+    stmt = stmt.order_by(TPhoto.id.desc()).offset(skip).limit(limit)
+
+    rows = db.execute(stmt).all()
+    renditions = get_renditions(db, [row.id for row in rows])
+    return [
+        {
+            "id": row.id,
+            "log_id": row.tlog_id,
+            "user_id": row.user_id,
+            "type": row.type,
+            "filesize": row.filesize,
+            "height": row.height,
+            "width": row.width,
+            "icon_filesize": row.icon_filesize,
+            "icon_height": row.icon_height,
+            "icon_width": row.icon_width,
+            "caption": row.name,
+            "text_desc": row.text_desc,
+            "license": row.public_ind,
+            "photo_url": join_url(row.server_url or "", row.filename),
+            "icon_url": join_url(row.server_url or "", row.icon_filename),
+            "renditions": renditions.get(row.id, []),
+        }
+        for row in rows
+    ]
+
+
+def get_renditions(
+    db: Session, photo_ids: List[int]
+) -> Dict[int, List[Dict[str, Any]]]:
+    """Rendition dicts (size, width, height, filesize, url) per photo, largest first."""
+    if not photo_ids:
+        return {}
+    stmt = (
+        select(
+            TPhotoRendition.photo_id,
+            TPhotoRendition.size,
+            TPhotoRendition.width,
+            TPhotoRendition.height,
+            TPhotoRendition.filesize,
+            TPhotoRendition.filename,
+            Server.url.label("server_url"),
+        )
+        .select_from(TPhotoRendition)
+        .join(TPhoto, TPhoto.id == TPhotoRendition.photo_id)
+        .outerjoin(Server, Server.id == TPhoto.server_id)
+        .where(TPhotoRendition.photo_id.in_(photo_ids))
+        .order_by(TPhotoRendition.photo_id, TPhotoRendition.size.desc())
+    )
+    result: Dict[int, List[Dict[str, Any]]] = {}
+    for row in db.execute(stmt):
+        result.setdefault(row.photo_id, []).append(
+            {
+                "size": row.size,
+                "width": row.width,
+                "height": row.height,
+                "filesize": row.filesize,
+                "url": join_url(row.server_url or "", row.filename),
+            }
+        )
+    return result
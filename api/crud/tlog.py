@@ -2,7 +2,7 @@
 CRUD operations for tlog table.
 """
 
-from typing import Iterable, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import asc, desc, func
 from sqlalchemy.orm import Session
@@ -15,6 +15,27 @@ def get_log_by_id(db: Session, log_id: int) -> Optional[TLog]:
     return db.query(TLog).filter(TLog.id == log_id).first()
 
 
+def log_order_by(order: Optional[str] = None) -> List[Any]:
+    """ORDER BY clauses for an `order` query parameter like "-date,id"."""
+    # Default ordering newest first by (date, time, id)
+    if not order:
+        return [desc(TLog.date), desc(TLog.time), desc(TLog.id)]
+
+    # support order fields with optional '-' prefix
+    clauses: List[Any] = []
+    for token in order.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        desc_ind = token.startswith("-")
+        field = token[1:] if desc_ind else token
+        col = getattr(TLog, field, None)
+        if col is None:
+            continue
+        clauses.append(desc(col) if desc_ind else asc(col))
+    return clauses
+
+
 def list_logs_filtered(
     db: Session,
     *,
@@ -30,26 +51,7 @@ def list_logs_filtered(
     if user_id is not None:
         q = q.filter(TLog.user_id == user_id)
 
-    # Default ordering newest first by (date, time, id)
-    if order:
-        # support order fields with optional '-' prefix
-        directives: List[Tuple[str, bool]] = []
-        for token in order.split(","):
-            token = token.strip()
-            if not token:
-                continue
-            desc_ind = token.startswith("-")
-            field = token[1:] if desc_ind else token
-            directives.append((field, desc_ind))
-
-        for field, is_desc in directives:
-            col = getattr(TLog, field, None)
-            if col is None:
-                continue
-            q = q.order_by(desc(col) if is_desc else asc(col))
-    else:
-        q = q.order_by(desc(TLog.date), desc(TLog.time), desc(TLog.id))
-
+    q = q.order_by(*log_order_by(order))
     return q.offset(skip).limit(limit).all()
 
 
@@ -102,18 +104,47 @@ def delete_log_hard(db: Session, *, log_id: int) -> bool:
 
 def soft_delete_photos_for_log(db: Session, *, log_id: int) -> int:
     """Soft delete all photos for a given tlog by setting deleted_ind='Y'. Returns count."""
-    photos: Iterable[TPhoto] = (
+    count = (
         db.query(TPhoto)
         .filter(TPhoto.tlog_id == log_id, TPhoto.deleted_ind != "Y")
-        .all()
+        .update({TPhoto.deleted_ind: "Y"}, synchronize_session=False)
     )
-    count = 0
-    for p in photos:
-        setattr(p, "deleted_ind", "Y")
-        db.add(p)
-        count += 1
     db.commit()
-    return count
+    return int(count)
+
+
+def get_log_owners(db: Session, log_ids: List[int]) -> Dict[int, int]:
+    """Map each existing log id to its user_id."""
+    if not log_ids:
+        return {}
+    rows = db.query(TLog.id, TLog.user_id).filter(TLog.id.in_(log_ids)).all()
+    return {int(row.id): int(row.user_id) for row in rows}
+
+
+def delete_logs_bulk(db: Session, *, log_ids: List[int]) -> Tuple[int, int]:
+    """
+    Hard-delete logs and soft-delete their photos in one transaction.
+
+    Returns (logs deleted, photos soft-deleted).
+    """
+    if not log_ids:
+        return 0, 0
+    try:
+        photos_deleted = (
+            db.query(TPhoto)
+            .filter(TPhoto.tlog_id.in_(log_ids), TPhoto.deleted_ind != "Y")
+            .update({TPhoto.deleted_ind: "Y"}, synchronize_session=False)
+        )
+        logs_deleted = (
+            db.query(TLog)
+            .filter(TLog.id.in_(log_ids))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return int(logs_deleted), int(photos_deleted)
 
 
 def get_trig_count(db: Session, trig_id: int) -> int:
@@ -2,11 +2,22 @@
 CRUD operations for tphoto table.
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
+from sqlalchemy import Row, delete, insert, literal, or_, select
 from sqlalchemy.orm import Session
 
-from api.models.tphoto import TPhoto
+from api.models.server import Server
+from api.models.tphoto import (
+    TPhoto,
+    TPhotoDimensionAudit,
+    TPhotoHash,
+    TPhotoOrientation,
+    TPhotoPurge,
+    TPhotoRendition,
+    TPhotoVariant,
+)
 from api.models.user import TLog
 
 
@@ -52,6 +63,41 @@ def delete_photo(db: Session, photo_id: int, soft: bool = True) -> bool:
     return True
 
 
+def get_photo_owners(db: Session, photo_ids: List[int]) -> Dict[int, int]:
+    """Map each existing, non-deleted photo id to the user_id of its log."""
+    if not photo_ids:
+        return {}
+    rows = (
+        db.query(TPhoto.id, TLog.user_id)
+        .join(TLog, TLog.id == TPhoto.tlog_id)
+        .filter(TPhoto.id.in_(photo_ids), TPhoto.deleted_ind != "Y")
+        .all()
+    )
+    return {int(row.id): int(row.user_id) for row in rows}
+
+
+def update_photos_bulk(db: Session, *, photo_ids: List[int], updates: dict) -> int:
+    """Apply the same field updates to many photos in one statement."""
+    if not photo_ids or not updates:
+        return 0
+    values = {
+        getattr(TPhoto, key): value
+        for key, value in updates.items()
+        if hasattr(TPhoto, key)
+    }
+    try:
+        count = (
+            db.query(TPhoto)
+            .filter(TPhoto.id.in_(photo_ids), TPhoto.deleted_ind != "Y")
+            .update(values, synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return int(count)
+
+
 def list_photos_filtered(
     db: Session,
     *,
@@ -74,6 +120,32 @@ def list_photos_filtered(
     return q.offset(skip).limit(limit).all()
 
 
+def list_photo_icons(
+    db: Session,
+    *,
+    trig_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    limit: int = 100,
+) -> List[Row]:
+    """Thumbnail id, server, filename and server URL of the newest photos."""
+    q = (
+        db.query(
+            TPhoto.id,
+            TPhoto.server_id,
+            TPhoto.icon_filename,
+            Server.url.label("server_url"),
+        )
+        .join(TLog, TLog.id == TPhoto.tlog_id)
+        .outerjoin(Server, Server.id == TPhoto.server_id)
+        .filter(TPhoto.deleted_ind != "Y")
+    )
+    if trig_id is not None:
+        q = q.filter(TLog.trig_id == trig_id)
+    if user_id is not None:
+        q = q.filter(TLog.user_id == user_id)
+    return q.order_by(TPhoto.id.desc()).limit(limit).all()
+
+
 def list_all_photos_for_log(db: Session, *, log_id: int) -> List[TPhoto]:
     """Return all non-deleted photos for a given tlog without pagination."""
     return (
@@ -95,3 +167,240 @@ def create_photo(
     db.commit()
     db.refresh(photo)
     return photo
+
+
+def set_photo_renditions(db: Session, *, photo_id: int, renditions: List[dict]) -> None:
+    """Replace a photo's rendition rows; the caller commits with its own update."""
+    db.query(TPhotoRendition).filter(TPhotoRendition.photo_id == photo_id).delete(
+        synchronize_session=False
+    )
+    db.add_all(TPhotoRendition(photo_id=photo_id, **values) for values in renditions)
+
+
+def set_photo_variants(db: Session, *, photo_id: int, variants: List[dict]) -> None:
+    """Replace a photo's variant rows; the caller commits with its own update."""
+    db.query(TPhotoVariant).filter(TPhotoVariant.photo_id == photo_id).delete(
+        synchronize_session=False
+    )
+    db.add_all(TPhotoVariant(photo_id=photo_id, **values) for values in variants)
+
+
+def get_photo_variants(db: Session, *, photo_id: int, size: int) -> Dict[str, str]:
+    """Variant filenames of one thumbnail (size 0) or rendition, by format."""
+    rows = (
+        db.query(TPhotoVariant.format, TPhotoVariant.filename)
+        .filter(TPhotoVariant.photo_id == photo_id, TPhotoVariant.size == size)
+        .all()
+    )
+    return {str(row.format): str(row.filename) for row in rows}
+
+
+def set_photo_hash(db: Session, *, photo_id: int, dhash: str) -> None:
+    """Store a photo's thumbnail hash; the caller commits with its own update."""
+    db.merge(TPhotoHash(photo_id=photo_id, dhash=dhash))
+
+
+def set_photo_hashes(db: Session, *, hashes: Dict[int, str]) -> None:
+    """Replace the thumbnail hashes for a batch of photos and commit."""
+    if not hashes:
+        return
+    try:
+        db.query(TPhotoHash).filter(TPhotoHash.photo_id.in_(list(hashes))).delete(
+            synchronize_session=False
+        )
+        db.add_all(
+            TPhotoHash(photo_id=photo_id, dhash=value)
+            for photo_id, value in hashes.items()
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def set_photo_orientations(db: Session, *, orientations: List[dict]) -> None:
+    """Replace the orientation rows for a batch of photos and commit."""
+    if not orientations:
+        return
+    photo_ids = [values["photo_id"] for values in orientations]
+    try:
+        db.query(TPhotoOrientation).filter(
+            TPhotoOrientation.photo_id.in_(photo_ids)
+        ).delete(synchronize_session=False)
+        db.add_all(TPhotoOrientation(**values) for values in orientations)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def set_dimension_audits(
+    db: Session, *, photo_ids: List[int], audits: List[dict]
+) -> None:
+    """
+    Record the dimension audit of a batch of photos and commit.
+
+    Earlier findings for every photo in `photo_ids` are cleared, so photos
+    that now match drop out of the report.
+    """
+    if not photo_ids:
+        return
+    try:
+        db.query(TPhotoDimensionAudit).filter(
+            TPhotoDimensionAudit.photo_id.in_(photo_ids)
+        ).delete(synchronize_session=False)
+        db.add_all(TPhotoDimensionAudit(**values) for values in audits)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def list_suspected_rotations(
+    db: Session, *, min_confidence: float, limit: int = 100
+) -> List[TPhotoOrientation]:
+    """Scored photos the model thinks are not upright, most confident first."""
+    return (
+        db.query(TPhotoOrientation)
+        .join(TPhoto, TPhoto.id == TPhotoOrientation.photo_id)
+        .filter(
+            TPhotoOrientation.angle != 0,
+            TPhotoOrientation.confidence >= min_confidence,
+            TPhoto.deleted_ind != "Y",
+        )
+        .order_by(TPhotoOrientation.confidence.desc(), TPhotoOrientation.photo_id)
+        .limit(limit)
+        .all()
+    )
+
+
+# deleted_ind values whose S3 objects are eventually removed
+PURGEABLE_DELETED_INDS = ("Y", "M")
+
+
+def mark_deleted_photos(db: Session, *, server_id: int, seen_at: datetime) -> int:
+    """
+    Start the retention clock for newly deleted photos and commit.
+
+    Photos restored before being purged lose their mark, so deleting them
+    again starts a fresh window. Returns the number of photos marked.
+    """
+    try:
+        # Ids first: MySQL rejects a DELETE whose subquery reads its own table
+        restored = db.scalars(
+            select(TPhotoPurge.photo_id)
+            .join(TPhoto, TPhoto.id == TPhotoPurge.photo_id)
+            .where(
+                TPhotoPurge.purged_timestamp.is_(None),
+                TPhoto.deleted_ind.notin_(PURGEABLE_DELETED_INDS),
+            )
+        ).all()
+        if restored:
+            db.execute(delete(TPhotoPurge).where(TPhotoPurge.photo_id.in_(restored)))
+
+        unmarked = (
+            select(TPhoto.id, literal(seen_at))
+            .outerjoin(TPhotoPurge, TPhotoPurge.photo_id == TPhoto.id)
+            .where(
+                TPhoto.server_id == server_id,
+                TPhoto.deleted_ind.in_(PURGEABLE_DELETED_INDS),
+                TPhotoPurge.photo_id.is_(None),
+            )
+        )
+        result = db.execute(
+            insert(TPhotoPurge).from_select(["photo_id", "seen_timestamp"], unmarked)
+        )
+        db.commit()
+        return int(getattr(result, "rowcount", 0) or 0)
+    except Exception:
+        db.rollback()
+        raise
+
+
+def purgeable_photo_keys(
+    db: Session, *, server_id: int, cutoff: datetime, after_id: int, limit: int
+) -> Dict[int, List[str]]:
+    """
+    Next page of photos due for purging, after `after_id` in id order.
+
+    Due means still deleted and marked at or before `cutoff`. Maps each
+    photo id to all its stored keys: photo, thumbnail, renditions and
+    variants.
+    """
+    rows = db.execute(
+        select(TPhoto.id, TPhoto.filename, TPhoto.icon_filename)
+        .join(TPhotoPurge, TPhotoPurge.photo_id == TPhoto.id)
+        .where(
+            TPhoto.id > after_id,
+            TPhoto.server_id == server_id,
+            TPhoto.deleted_ind.in_(PURGEABLE_DELETED_INDS),
+            TPhotoPurge.purged_timestamp.is_(None),
+            TPhotoPurge.seen_timestamp <= cutoff,
+        )
+        .order_by(TPhoto.id)
+        .limit(limit)
+    ).all()
+    keys: Dict[int, List[str]] = {
+        int(row.id): [str(name) for name in (row.filename, row.icon_filename) if name]
+        for row in rows
+    }
+    if not keys:
+        return keys
+    for model in (TPhotoRendition, TPhotoVariant):
+        extra = db.execute(
+            select(model.photo_id, model.filename).where(model.photo_id.in_(keys))
+        )
+        for photo_id, filename in extra:
+            keys[int(photo_id)].append(str(filename))
+    return keys
+
+
+def set_photos_purged(
+    db: Session, *, photo_ids: List[int], purged_at: datetime
+) -> None:
+    """Record that these photos' S3 objects are gone and commit."""
+    if not photo_ids:
+        return
+    try:
+        db.query(TPhotoPurge).filter(TPhotoPurge.photo_id.in_(photo_ids)).update(
+            {TPhotoPurge.purged_timestamp: purged_at}, synchronize_session=False
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def stored_keys_with_prefix(
+    db: Session, *, server_id: int, prefix: str
+) -> List[Tuple[str, int, bool]]:
+    """
+    Every key under `prefix` that a photo row refers to.
+
+    Covers photos, thumbnails, renditions and variants of photos on the
+    server, except those already purged. Returns (key, photo id, live)
+    tuples, where live means the photo is not deleted and so the object
+    must exist.
+    """
+    not_purged = or_(
+        TPhotoPurge.photo_id.is_(None), TPhotoPurge.purged_timestamp.is_(None)
+    )
+    live = TPhoto.deleted_ind.notin_(PURGEABLE_DELETED_INDS)
+    keys: List[Tuple[str, int, bool]] = []
+    for column, model in (
+        (TPhoto.filename, None),
+        (TPhoto.icon_filename, None),
+        (TPhotoRendition.filename, TPhotoRendition),
+        (TPhotoVariant.filename, TPhotoVariant),
+    ):
+        stmt = select(column, TPhoto.id, live)
+        if model is not None:
+            stmt = stmt.select_from(model).join(TPhoto, TPhoto.id == model.photo_id)
+        stmt = stmt.outerjoin(TPhotoPurge, TPhotoPurge.photo_id == TPhoto.id).where(
+            TPhoto.server_id == server_id, column.startswith(prefix), not_purged
+        )
+        keys.extend(
+            (str(key), int(photo_id), bool(is_live))
+            for key, photo_id, is_live in db.execute(stmt)
+        )
+    return keys
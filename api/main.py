@@ -3,7 +3,9 @@ Main FastAPI application entry point
 """
 
 import logging
+from contextlib import asynccontextmanager
 
+import anyio
 from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
@@ -16,14 +18,39 @@ from api.api.v1.api import api_router
 from api.core.config import settings
 from api.core.logging import setup_logging
 from api.core.profiling import ProfilingMiddleware, should_enable_profiling
+from api.core.uploads import UploadLimitMiddleware
 from api.db.database import get_db
+from api.services.log_search import log_search_refresher
+from api.services.moderation_queue import moderation_queue_service
+from api.services.photo_hash import photo_hash_refresher
+from api.services.photo_ingest import photo_ingest_service
+from api.services.recent_logs import recent_logs_refresher
 
 logger = logging.getLogger(__name__)
 
 # Configure logging first
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build in-memory indexes in the background so no request waits for them
+    if settings.LOG_SEARCH_ENABLED:
+        log_search_refresher.trigger()
+    if settings.RECENT_LOGS_ENABLED:
+        recent_logs_refresher.trigger()
+    photo_hash_refresher.trigger()
+    await anyio.to_thread.run_sync(photo_ingest_service.recover)
+    # Resume moderation jobs left by a previous run without waiting for an upload
+    moderation_queue_service.start()
+    yield
+    # Let queued photo uploads finish rather than strand them
+    await anyio.to_thread.run_sync(photo_ingest_service.shutdown)
+    await anyio.to_thread.run_sync(moderation_queue_service.shutdown)
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     debug=settings.DEBUG,
@@ -108,9 +135,11 @@ def custom_openapi():
         f"{settings.API_V1_STR}/users/{{user_id}}/map",
         f"{settings.API_V1_STR}/users/{{user_id}}/photos",
         f"{settings.API_V1_STR}/logs",
+        f"{settings.API_V1_STR}/logs/search",
         f"{settings.API_V1_STR}/logs/{{log_id}}",
         f"{settings.API_V1_STR}/logs/{{log_id}}/photos",
         f"{settings.API_V1_STR}/stats/site",
+        f"{settings.API_V1_STR}/stream/activity",
     }
 
     # Define endpoints that are public regardless of HTTP method
@@ -191,6 +220,14 @@ class HealthCheckLoggingFilter(BaseHTTPMiddleware):
 # Add health check logging filter first
 app.add_middleware(HealthCheckLoggingFilter)
 
+# Refuse oversized or non-JPEG photo uploads while the body streams in
+# (inside CORS, so early 413s still carry CORS headers)
+app.add_middleware(
+    UploadLimitMiddleware,
+    paths=[f"{settings.API_V1_STR}/photos"],
+    max_bytes=settings.MAX_IMAGE_SIZE,
+)
+
 # Set up CORS
 if settings.BACKEND_CORS_ORIGINS:
     cors_origins = []
@@ -1,6 +1,26 @@
 from .server import Server
-from .tphoto import TPhoto
+from .tphoto import (
+    TPhoto,
+    TPhotoDimensionAudit,
+    TPhotoHash,
+    TPhotoOrientation,
+    TPhotoPurge,
+    TPhotoRendition,
+    TPhotoVariant,
+)
 from .trig import Trig
 from .user import TLog, User
 
-__all__ = ["User", "TLog", "Trig", "TPhoto", "Server"]
+__all__ = [
+    "User",
+    "TLog",
+    "Trig",
+    "TPhoto",
+    "TPhotoRendition",
+    "TPhotoVariant",
+    "TPhotoOrientation",
+    "TPhotoHash",
+    "TPhotoPurge",
+    "TPhotoDimensionAudit",
+    "Server",
+]
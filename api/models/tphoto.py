@@ -4,7 +4,7 @@ SQLAlchemy model for the tphoto table - trigpoint photos and thumbnails.
 
 from datetime import datetime
 
-from sqlalchemy import CHAR, TIMESTAMP, Column, Integer, String, Text
+from sqlalchemy import CHAR, TIMESTAMP, Column, Float, Integer, String, Text
 
 from api.db.database import Base
 
@@ -47,3 +47,132 @@ class TPhoto(Base):
 
     def __repr__(self) -> str:
         return f"<TPhoto(id={self.id}, tlog_id={self.tlog_id}, name='{self.name}')>"
+
+
+class TPhotoRendition(Base):
+    """Resized copy of a photo stored next to it in S3 (e.g. P00001_800.jpg).
+
+    Sidecar to the legacy tphoto table, one row per photo and rendition size.
+    """
+
+    __tablename__ = "tphoto_rendition"
+
+    photo_id = Column(Integer, primary_key=True)
+    # Configured longest-side size the rendition was made for
+    size = Column(Integer, primary_key=True)
+
+    # Relative to the photo's server base URL, like tphoto.filename
+    filename = Column(String(255), nullable=False)
+    filesize = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    width = Column(Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<TPhotoRendition(photo_id={self.photo_id}, size={self.size})>"
+
+
+class TPhotoOrientation(Base):
+    """Orientation model verdict for a photo, written by the backfill command.
+
+    Sidecar to the legacy tphoto table, one row per scored photo, so photos
+    that look sideways can be listed without calling Rekognition.
+    """
+
+    __tablename__ = "tphoto_orientation"
+
+    photo_id = Column(Integer, primary_key=True)
+    # Predicted rotation of the stored image: 0, 90, 180 or 270
+    angle = Column(Integer, nullable=False, index=True)
+    confidence = Column(Float, nullable=False)
+    scored_at = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return (
+            f"<TPhotoOrientation(photo_id={self.photo_id}, angle={self.angle}, "
+            f"confidence={self.confidence:.2f})>"
+        )
+
+
+class TPhotoHash(Base):
+    """Perceptual hash (dHash) of a photo's thumbnail.
+
+    Sidecar to the legacy tphoto table, one row per hashed photo. Stored as
+    16 hex digits so the unsigned 64-bit value fits every backend.
+    """
+
+    __tablename__ = "tphoto_hash"
+
+    photo_id = Column(Integer, primary_key=True)
+    dhash = Column(CHAR(16), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<TPhotoHash(photo_id={self.photo_id}, dhash={self.dhash})>"
+
+
+class TPhotoVariant(Base):
+    """WebP/AVIF copy of a thumbnail or rendition, stored next to its JPEG.
+
+    Sidecar to the legacy tphoto table, one row per photo, size and format.
+    """
+
+    __tablename__ = "tphoto_variant"
+
+    photo_id = Column(Integer, primary_key=True)
+    # Rendition size it was made from, or 0 for the thumbnail
+    size = Column(Integer, primary_key=True)
+    # Key in image_formats.FORMATS, e.g. "webp"
+    format = Column(String(8), primary_key=True)
+
+    filename = Column(String(255), nullable=False)
+    filesize = Column(Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<TPhotoVariant(photo_id={self.photo_id}, size={self.size}, "
+            f"format={self.format})>"
+        )
+
+
+class TPhotoPurge(Base):
+    """Storage cleanup state of a soft-deleted or moderated photo.
+
+    Sidecar to the legacy tphoto table, which records no deletion time. A
+    row is added when the cleanup job first sees the photo deleted, and
+    purged_timestamp is set once its S3 objects have been removed.
+    """
+
+    __tablename__ = "tphoto_purge"
+
+    photo_id = Column(Integer, primary_key=True)
+    seen_timestamp = Column(TIMESTAMP, nullable=False)
+    purged_timestamp = Column(TIMESTAMP, nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<TPhotoPurge(photo_id={self.photo_id}, "
+            f"purged_timestamp={self.purged_timestamp})>"
+        )
+
+
+class TPhotoDimensionAudit(Base):
+    """Photo whose stored objects disagree with its recorded dimensions.
+
+    Sidecar to the legacy tphoto table, written by the dimension audit job:
+    one row per photo found mismatched or unreadable on its last audit. The
+    actual sizes are NULL where the object could not be read.
+    """
+
+    __tablename__ = "tphoto_dimension_audit"
+
+    photo_id = Column(Integer, primary_key=True)
+    audited_timestamp = Column(TIMESTAMP, nullable=False)
+    photo_width_actual = Column(Integer, nullable=True)
+    photo_height_actual = Column(Integer, nullable=True)
+    icon_width_actual = Column(Integer, nullable=True)
+    icon_height_actual = Column(Integer, nullable=True)
+    error = Column(String(255), nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<TPhotoDimensionAudit(photo_id={self.photo_id}, " f"error={self.error})>"
+        )
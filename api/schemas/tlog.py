@@ -3,7 +3,7 @@ Pydantic schemas for TLog (logs) endpoints.
 """
 
 from datetime import date, time
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -66,3 +66,13 @@ class TLogUpdate(BaseModel):
     comment: Optional[str] = None
     score: Optional[int] = None
     source: Optional[str] = Field(None, min_length=1, max_length=1)
+
+
+class TLogBulkDeleteRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class TLogBulkDeleteResponse(BaseModel):
+    deleted: int
+    photos_deleted: int
+    not_found: List[int] = []
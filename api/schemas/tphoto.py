@@ -3,11 +3,19 @@ Pydantic schemas for tphoto endpoints.
 """
 
 # from datetime import datetime  # Not currently used
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import AliasChoices, BaseModel, Field, field_validator
 
 
+class TPhotoRenditionResponse(BaseModel):
+    size: int
+    width: int
+    height: int
+    filesize: int
+    url: str
+
+
 class TPhotoBase(BaseModel):
     id: int
     log_id: int
@@ -34,6 +42,8 @@ class TPhotoBase(BaseModel):
     # Derived fields
     photo_url: str
     icon_url: str
+    # Resized copies for smaller views, largest first (empty for older photos)
+    renditions: List[TPhotoRenditionResponse] = []
 
     class Config:
         from_attributes = True
@@ -43,6 +53,11 @@ class TPhotoResponse(TPhotoBase):
     pass
 
 
+class TPhotoCreateResponse(TPhotoResponse):
+    # The uploader's existing photos that look like this one, closest first
+    similar_photo_ids: List[int] = []
+
+
 class TPhotoUpdate(BaseModel):
     # Allow updating metadata fields only (no IDs or sizes)
     type: Optional[str] = Field(
@@ -65,6 +80,16 @@ class TPhotoUpdate(BaseModel):
     )
 
 
+class TPhotoBulkUpdateRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+    updates: TPhotoUpdate
+
+
+class TPhotoBulkUpdateResponse(BaseModel):
+    updated: int
+    not_found: List[int] = []
+
+
 class TPhotoCreate(BaseModel):
     # Creation fields (server and filenames are required for now; upload is out of scope)
     server_id: int
@@ -133,6 +158,77 @@ class TPhotoRotateRequest(BaseModel):
         return v
 
 
+class TPhotoBatchRotateItem(TPhotoRotateRequest):
+    photo_id: int
+
+
+class TPhotoBatchRotateRequest(BaseModel):
+    items: List[TPhotoBatchRotateItem] = Field(..., min_length=1, max_length=500)
+
+
+class TPhotoRotateFailure(BaseModel):
+    photo_id: int
+    status_code: int
+    detail: str
+
+
+class TPhotoBatchRotateResponse(BaseModel):
+    rotated: List[TPhotoResponse] = []
+    failed: List[TPhotoRotateFailure] = []
+
+
+class TPhotoSpriteTile(BaseModel):
+    photo_id: int
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+class TPhotoSpriteIndex(BaseModel):
+    """Where each photo's thumbnail sits on a gallery sprite."""
+
+    version: Optional[str] = None
+    sprite_url: Optional[str] = Field(
+        default=None,
+        description="Versioned sprite image URL (null when there are no photos)",
+    )
+    tile_size: int
+    width: int = 0
+    height: int = 0
+    tiles: List[TPhotoSpriteTile] = []
+
+
+class TPhotoIngestJobResponse(BaseModel):
+    """Background photo upload job (POST /v1/photos with Prefer: respond-async)."""
+
+    job_id: str
+    status: str = Field(
+        ...,
+        description="One of: awaiting_upload, queued, processing, succeeded, failed",
+    )
+    log_id: int
+    photo_id: Optional[int] = None
+    photo: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+
+class TPhotoUploadUrlResponse(BaseModel):
+    """Presigned POST for uploading a photo straight to storage."""
+
+    job_id: str
+    upload_url: str = Field(..., description="POST the file here as multipart")
+    fields: Dict[str, str] = Field(
+        ..., description="Form fields to send before the file, unchanged"
+    )
+    expires_at: str
+    complete_url: str = Field(
+        ..., description="POST here once the upload has succeeded"
+    )
+
+
 class TPhotoEvaluationResponse(BaseModel):
     photo_id: int
     photo_accessible: bool
@@ -0,0 +1,219 @@
+"""
+In-process broadcaster for live site activity (logs and photos).
+
+One broadcaster exists per worker process. Events are published after the
+database commit and fanned out to every connected Server-Sent Events client.
+When REDIS_URL is configured, events travel over Redis pub/sub so that every
+worker (and every container) sees writes made elsewhere; otherwise the
+broadcaster dispatches locally, which is sufficient for a single worker and
+for tests.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from redis.exceptions import RedisError
+
+from api.core.config import settings
+from api.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Event types pushed to clients
+LOG_CREATED = "log.created"
+LOG_UPDATED = "log.updated"
+LOG_DELETED = "log.deleted"
+PHOTO_CREATED = "photo.created"
+
+ActivityListener = Callable[[str, Dict[str, Any]], None]
+
+
+class ActivitySubscription:
+    """A single client's view of the activity feed, backed by a bounded queue."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self._loop = loop
+        self._queue: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event_type: str, payload: str) -> None:
+        """Queue an event from any thread without blocking the publisher."""
+        try:
+            self._loop.call_soon_threadsafe(self._put, event_type, payload)
+        except RuntimeError:
+            # Event loop already closed; the client has gone away
+            pass
+
+    def _put(self, event_type: str, payload: str) -> None:
+        if self._queue.full():
+            # Slow consumer: drop the oldest event so the feed stays current
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait((event_type, payload))
+
+    async def get(self) -> Tuple[str, str]:
+        """Wait for the next (event_type, json_payload) pair."""
+        return await self._queue.get()
+
+
+class ActivityBroadcaster:
+    """Fan out activity events to SSE subscribers and in-process listeners."""
+
+    def __init__(self, channel: str, queue_size: int):
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: Set[ActivitySubscription] = set()
+        self._listeners: List[ActivityListener] = []
+        self._lock = threading.Lock()
+        self._redis_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Publish an event to every worker. Never raises."""
+        try:
+            payload = json.dumps(
+                {
+                    "type": event_type,
+                    "data": data,
+                    "published_at": datetime.now(timezone.utc).isoformat(),
+                },
+                default=str,
+            )
+        except (TypeError, ValueError) as e:
+            logger.error(f"Failed to serialise activity event {event_type}: {e}")
+            return
+
+        redis_client = get_redis_client()
+        if redis_client is not None:
+            try:
+                self._ensure_redis_listener()
+                redis_client.publish(self.channel, payload)
+                # Our own listener thread receives the message and dispatches it
+                return
+            except RedisError as e:
+                logger.warning(f"Redis publish failed, dispatching locally: {e}")
+
+        self._dispatch(payload)
+
+    def _dispatch(self, payload: str) -> None:
+        """Deliver a serialised event to local subscribers and listeners."""
+        try:
+            event = json.loads(payload)
+            event_type = str(event["type"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed activity event: {e}")
+            return
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+            listeners = list(self._listeners)
+
+        for subscription in subscribers:
+            subscription.offer(event_type, payload)
+
+        for listener in listeners:
+            try:
+                listener(event_type, event.get("data") or {})
+            except Exception as e:
+                logger.error(f"Activity listener failed for {event_type}: {e}")
+
+    # ------------------------------------------------------------------
+    # Subscribing
+    # ------------------------------------------------------------------
+
+    def subscribe(self) -> ActivitySubscription:
+        """Register an SSE client. Must be called from within the event loop."""
+        subscription = ActivitySubscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        if get_redis_client() is not None:
+            self._ensure_redis_listener()
+        return subscription
+
+    def unsubscribe(self, subscription: ActivitySubscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def add_listener(self, listener: ActivityListener) -> None:
+        """Register a synchronous in-process callback for every event."""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def remove_listener(self, listener: ActivityListener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    # ------------------------------------------------------------------
+    # Redis pub/sub
+    # ------------------------------------------------------------------
+
+    def _ensure_redis_listener(self) -> None:
+        with self._lock:
+            if self._redis_thread is not None and self._redis_thread.is_alive():
+                return
+            self._stop.clear()
+            self._redis_thread = threading.Thread(
+                target=self._redis_loop, name="activity-pubsub", daemon=True
+            )
+            self._redis_thread.start()
+
+    def _redis_loop(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            redis_client = get_redis_client()
+            if redis_client is None:
+                return
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                logger.info(f"Subscribed to activity channel {self.channel}")
+                backoff = 1.0
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._dispatch(str(message["data"]))
+            except Exception as e:
+                logger.warning(
+                    f"Activity pub/sub connection lost, retrying in {backoff:.0f}s: {e}"
+                )
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:  # pragma: no cover - best effort
+                    pass
+
+    def stop(self) -> None:
+        """Stop the Redis listener thread (used on shutdown and in tests)."""
+        self._stop.set()
+        thread = self._redis_thread
+        if thread is not None:
+            thread.join(timeout=2.0)
+        self._redis_thread = None
+
+
+activity_broadcaster = ActivityBroadcaster(
+    channel=settings.ACTIVITY_CHANNEL,
+    queue_size=settings.ACTIVITY_SUBSCRIBER_QUEUE_SIZE,
+)
+
+
+def publish_activity(event_type: str, data: Dict[str, Any]) -> None:
+    """Publish an activity event on the process-wide broadcaster."""
+    activity_broadcaster.publish(event_type, data)
@@ -0,0 +1,87 @@
+"""
+Rekognition results cached by the SHA-256 of the analysed image bytes.
+
+The same photo is analysed again and again: admins re-run /evaluate, and
+moderation checks the bytes an upload already produced. Identical bytes
+always give the same answer, so orientation and moderation results are kept
+in Redis (shared by all workers) with a bounded in-process fallback.
+Failed analyses are never cached.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from api.core.config import settings
+from api.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "rekognition:v1:"
+
+
+def image_digest(image_bytes: bytes) -> str:
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+class AnalysisCache:
+    """Analysis results by kind and image digest, in Redis or local memory."""
+
+    def __init__(self, ttl_seconds: int, local_capacity: int):
+        self.ttl_seconds = ttl_seconds
+        self.local_capacity = local_capacity
+        self._local: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(kind: str, digest: str) -> str:
+        return f"{_KEY_PREFIX}{kind}:{digest}"
+
+    def get(self, kind: str, digest: str) -> Optional[Dict[str, Any]]:
+        key = self._key(kind, digest)
+        redis_client = get_redis_client()
+        if redis_client:
+            try:
+                raw = redis_client.get(key)
+                if raw and isinstance(raw, str):
+                    return json.loads(raw)
+            except RedisError as e:
+                logger.warning(f"Redis analysis cache read failed: {e}")
+        with self._lock:
+            result = self._local.get(key)
+            if result is not None:
+                self._local.move_to_end(key)
+        return result
+
+    def set(self, kind: str, digest: str, result: Dict[str, Any]) -> None:
+        if not result or "error" in result:
+            return
+        key = self._key(kind, digest)
+        redis_client = get_redis_client()
+        if redis_client:
+            try:
+                redis_client.setex(key, self.ttl_seconds, json.dumps(result))
+                return
+            except (RedisError, TypeError, ValueError) as e:
+                logger.warning(f"Redis analysis cache write failed: {e}")
+        with self._lock:
+            self._local[key] = result
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_capacity:
+                self._local.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop locally cached results (Redis entries expire on their own)."""
+        with self._lock:
+            self._local.clear()
+
+
+analysis_cache = AnalysisCache(
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+    local_capacity=settings.ANALYSIS_CACHE_LOCAL_CAPACITY,
+)
@@ -0,0 +1,53 @@
+"""
+Process-wide, pooled boto3 clients.
+
+boto3 clients are thread-safe and each owns a urllib3 connection pool, so
+building one per request throws away warm TLS connections and pays the
+client construction cost (endpoint and model loading) every time. Services
+fetch their client from here instead; there is one per service and region
+for the whole process, with a larger pool and TCP keep-alive.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+from api.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_lock = threading.Lock()
+
+
+def get_aws_client(service_name: str, region_name: Optional[str] = None) -> Any:
+    """Return the shared client for a service, creating it on first use."""
+    key = (service_name, region_name)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        # boto3's default session is not thread-safe, so build under the lock
+        client = _clients.get(key)
+        if client is None:
+            client = boto3.client(
+                service_name,
+                region_name=region_name,
+                config=Config(
+                    max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+                    tcp_keepalive=True,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                ),
+            )
+            _clients[key] = client
+            logger.info(f"Created shared AWS client: {service_name} ({region_name})")
+    return client
+
+
+def reset_aws_clients() -> None:
+    """Drop all shared clients (tests, or after credentials change)."""
+    with _lock:
+        _clients.clear()
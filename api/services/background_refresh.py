@@ -0,0 +1,56 @@
+"""
+Refreshing in-memory indexes off the request path.
+
+Indexes built from the database (log search, photo hashes, recent logs) are
+refreshed by a `BackgroundRefresh` on a daemon thread with its own session.
+Requests never wait for a build: they use the index as it stands and trigger
+a refresh when one is due. At most one refresh per index runs at a time.
+"""
+
+import logging
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from api.db.database import get_session_local
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRefresh:
+    """Runs `refresh(db)` on a background thread, one run at a time."""
+
+    def __init__(self, name: str, refresh: Callable[[Session], None]):
+        self.name = name
+        self.refresh = refresh
+        # The refresh outlives any request, so it opens its own session
+        self.session_factory: Callable[[], Session] = lambda: get_session_local()()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def trigger(self) -> None:
+        """Start a refresh unless one is already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name=f"{self.name}-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until the running refresh, if any, finishes."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        db = self.session_factory()
+        try:
+            self.refresh(db)
+        except Exception as e:
+            logger.warning(f"Failed to refresh {self.name}: {e}")
+        finally:
+            db.close()
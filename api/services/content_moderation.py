@@ -5,17 +5,19 @@ Content moderation service for photos.
 from __future__ import annotations
 
 import logging
+from functools import cached_property
 from typing import Optional
 
 from sqlalchemy.orm import Session
 
 from api.crud import tphoto as tphoto_crud
+from api.services.photo_cache import photo_cache
 from api.services.rekognition import RekognitionService
 
 logger = logging.getLogger(__name__)
 
 
-def download_photo_bytes(url: str) -> Optional[bytes]:
+def download_photo_bytes(url: str) -> bytes:
     """Download photo bytes from the given URL."""
     import requests
 
@@ -24,20 +26,71 @@ def download_photo_bytes(url: str) -> Optional[bytes]:
     return response.content
 
 
+class ModerationUnavailable(Exception):
+    """Rekognition returned no verdict; worth trying again later."""
+
+
 class ContentModerationService:
     """Service for content moderation of uploaded photos."""
 
-    def __init__(self):
-        """Initialise the content moderation service."""
-        self.rekognition = RekognitionService()
+    @cached_property
+    def rekognition(self) -> RekognitionService:
+        """Rekognition wrapper, built on first use rather than at import."""
+        return RekognitionService()
 
     def _get_server_for_photo(self, db: Session, server_id: int):
         from api.models.server import Server
 
         return db.query(Server).filter(Server.id == server_id).first()
 
-    def moderate_photo(self, db: Session, photo_id: int) -> bool:
-        """Moderate a photo for inappropriate content."""
+    def photo_url(self, db: Session, photo) -> Optional[str]:
+        """Public URL of a stored photo, or None if its server is unknown."""
+        server = self._get_server_for_photo(db, int(photo.server_id))
+        if not server or not server.url:
+            logger.error(f"Server {photo.server_id} not found or has no URL")
+            return None
+        return f"{server.url.rstrip('/')}/{photo.filename}"
+
+    def review(self, photo_id: int, photo_bytes: bytes) -> Optional[str]:
+        """Why the photo should be hidden, or None if it passed.
+
+        Raises ModerationUnavailable when Rekognition gives no verdict,
+        including when the call was throttled, failed or timed out.
+        """
+        moderation_result = self.rekognition.moderate_content(photo_bytes)
+
+        if not moderation_result:
+            logger.warning(f"Content moderation failed for photo {photo_id}")
+            raise ModerationUnavailable("Moderation service unavailable")
+        if "error" in moderation_result:
+            logger.warning(
+                f"Content moderation failed for photo {photo_id}: "
+                f"{moderation_result['error']}"
+            )
+            raise ModerationUnavailable(
+                f"Moderation service error: {moderation_result['error']}"
+            )
+
+        if moderation_result.get("is_inappropriate", False):
+            logger.warning(f"Inappropriate content detected in photo {photo_id}")
+            findings = moderation_result.get("findings", [])
+            reasons = [
+                f"{finding.get('label', 'Unknown')} ({finding.get('confidence', 0):.1f}%)"
+                for finding in findings[:3]
+            ]
+            return "Inappropriate content detected: " + ", ".join(reasons)
+
+        logger.info(f"Photo {photo_id} passed content moderation")
+        return None
+
+    def moderate_photo(
+        self, db: Session, photo_id: int, photo_bytes: Optional[bytes] = None
+    ) -> bool:
+        """Moderate a photo for inappropriate content.
+
+        Pass `photo_bytes` when the caller already holds the image; otherwise
+        it is downloaded from the photo's server.
+        """
         try:
             photo = tphoto_crud.get_photo_by_id(db, photo_id=photo_id)
             if not photo:
@@ -48,45 +101,35 @@ class ContentModerationService:
                 logger.info(f"Photo {photo_id} is already moderated")
                 return True
 
-            server = self._get_server_for_photo(db, int(photo.server_id))
-            if not server or not server.url:
-                logger.error(f"Server {photo.server_id} not found or has no URL")
-                return False
-
-            photo_url = f"{server.url.rstrip('/')}/{photo.filename}"
+            if photo_bytes is None:
+                photo_url = self.photo_url(db, photo)
+                if photo_url is None:
+                    return False
+
+                try:
+                    photo_bytes = photo_cache.get_or_fetch(
+                        int(photo.server_id),
+                        str(photo.filename),
+                        lambda: download_photo_bytes(photo_url),
+                    )
+                except Exception as exc:
+                    logger.error(
+                        "Failed to download photo %s from %s: %s",
+                        photo_id,
+                        photo_url,
+                        exc,
+                    )
+                    return False
 
             try:
-                photo_bytes = download_photo_bytes(photo_url)
-            except Exception as exc:
-                logger.error(
-                    "Failed to download photo %s from %s: %s",
-                    photo_id,
-                    photo_url,
-                    exc,
-                )
-                return False
-
-            moderation_result = self.rekognition.moderate_content(photo_bytes)
-
-            if not moderation_result:
-                logger.warning(f"Content moderation failed for photo {photo_id}")
-                self._mark_photo_moderated(
-                    db, photo_id, "Moderation service unavailable"
-                )
+                reason = self.review(photo_id, photo_bytes)
+            except ModerationUnavailable as exc:
+                self._mark_photo_moderated(db, photo_id, str(exc))
                 return False
 
-            if moderation_result.get("is_inappropriate", False):
-                logger.warning(f"Inappropriate content detected in photo {photo_id}")
-                findings = moderation_result.get("findings", [])
-                reasons = [
-                    f"{finding.get('label', 'Unknown')} ({finding.get('confidence', 0):.1f}%)"
-                    for finding in findings[:3]
-                ]
-                reason = "Inappropriate content detected: " + ", ".join(reasons)
+            if reason:
                 self._mark_photo_moderated(db, photo_id, reason)
                 return False
-
-            logger.info(f"Photo {photo_id} passed content moderation")
             return True
 
         except Exception as exc:
@@ -112,6 +155,13 @@ class ContentModerationService:
 content_moderation_service = ContentModerationService()
 
 
-def moderate_photo_async(photo_id: int) -> None:
-    logger.info(f"Starting async moderation for photo {photo_id}")
-    logger.info(f"Photo {photo_id} moderation would run asynchronously")
+def moderate_photo_async(photo_id: int, photo_bytes: Optional[bytes] = None) -> None:
+    """Queue a photo for background moderation.
+
+    Uploads pass the processed bytes so the worker need not download them.
+    """
+    # Import here to avoid circular imports
+    from api.services.moderation_queue import moderation_queue_service
+
+    logger.info(f"Queueing content moderation for photo {photo_id}")
+    moderation_queue_service.enqueue(photo_id, photo_bytes)
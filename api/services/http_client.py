@@ -0,0 +1,34 @@
+"""
+Shared HTTP session for fetching objects from the photo servers.
+
+A `requests.Session` keeps connections alive between requests, so repeated
+downloads from the same host reuse warm TLS connections instead of opening a
+new one per call. The session's connection pool is thread-safe for GETs and
+shared by the whole process.
+"""
+
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from api.core.config import settings
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4, pool_maxsize=settings.HTTP_POOL_MAXSIZE
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
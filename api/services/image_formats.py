@@ -0,0 +1,166 @@
+"""
+Modern image formats for thumbnails and renditions, and Accept negotiation.
+
+Alongside each JPEG thumbnail and rendition, WebP (and AVIF, when Pillow has
+an AVIF encoder) variants are stored next to it in S3 under the same key
+with a different extension. Rather than a fixed quality, each variant is
+encoded at the highest quality that fits a byte budget, found by a short
+binary search. A variant that saves nothing over the JPEG is dropped.
+
+At serve time `negotiate` picks the smallest format the client explicitly
+accepts. Wildcards alone get JPEG, since older clients send `*/*` without
+being able to decode WebP.
+"""
+
+import io
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from api.core.config import settings
+
+
+@dataclass(frozen=True)
+class ImageFormat:
+    name: str  # Pillow format name
+    mime_type: str
+    extension: str
+
+
+JPEG = ImageFormat("JPEG", "image/jpeg", ".jpg")
+WEBP = ImageFormat("WEBP", "image/webp", ".webp")
+AVIF = ImageFormat("AVIF", "image/avif", ".avif")
+
+# Preferred first: the smallest for a given visual quality
+FORMATS: Dict[str, ImageFormat] = {f.name.lower(): f for f in (AVIF, WEBP, JPEG)}
+
+_BY_EXTENSION = {f.extension: f for f in FORMATS.values()}
+_BY_EXTENSION[".jpeg"] = JPEG
+
+
+def can_encode(image_format: ImageFormat) -> bool:
+    """Whether this Pillow build has an encoder for the format."""
+    Image.init()
+    return image_format.name in Image.SAVE
+
+
+def variant_formats() -> List[ImageFormat]:
+    """Configured extra formats that can be encoded here, preferred first."""
+    wanted = {name.lower() for name in settings.PHOTO_VARIANT_FORMATS}
+    return [
+        image_format
+        for key, image_format in FORMATS.items()
+        if key in wanted and image_format is not JPEG and can_encode(image_format)
+    ]
+
+
+def format_for_key(key: str) -> ImageFormat:
+    """Format of a stored object by its extension (JPEG if unknown)."""
+    return _BY_EXTENSION.get(os.path.splitext(key)[1].lower(), JPEG)
+
+
+def variant_key(key: str, image_format: ImageFormat) -> str:
+    """
+    Key of a variant stored next to a JPEG.
+
+    Examples:
+        '002/I02001.jpg', WEBP -> '002/I02001.webp'
+        '002/P02001_800.jpg', AVIF -> '002/P02001_800.avif'
+    """
+    return os.path.splitext(key)[0] + image_format.extension
+
+
+def encode(img: Image.Image, image_format: ImageFormat, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    if image_format is JPEG:
+        img.save(buffer, format="JPEG", quality=quality, optimize=True)
+    elif image_format is WEBP:
+        img.save(buffer, format="WEBP", quality=quality, method=4)
+    else:
+        img.save(buffer, format=image_format.name, quality=quality)
+    return buffer.getvalue()
+
+
+def encode_to_budget(
+    img: Image.Image, image_format: ImageFormat, budget: int
+) -> Tuple[bytes, int]:
+    """
+    Encode at the highest quality whose output fits `budget` bytes.
+
+    Binary search between PHOTO_VARIANT_MIN_QUALITY and _MAX_QUALITY, with
+    at most PHOTO_VARIANT_MAX_ENCODES attempts. If even the lowest quality
+    is over budget, that encoding is returned. Returns (bytes, quality).
+    """
+    minimum = settings.PHOTO_VARIANT_MIN_QUALITY
+    low, high = minimum, settings.PHOTO_VARIANT_MAX_QUALITY
+    best: Optional[Tuple[bytes, int]] = None
+    for _ in range(settings.PHOTO_VARIANT_MAX_ENCODES):
+        if low > high:
+            break
+        quality = (low + high + 1) // 2
+        data = encode(img, image_format, quality)
+        if len(data) <= budget:
+            best = (data, quality)
+            low = quality + 1
+        elif quality == minimum:
+            return data, quality
+        else:
+            high = quality - 1
+    if best is None:
+        best = (encode(img, image_format, minimum), minimum)
+    return best
+
+
+def byte_budget(dimensions: Tuple[int, int], *, thumbnail: bool) -> int:
+    """Target size of a variant: fixed for thumbnails, per pixel otherwise."""
+    if thumbnail:
+        return settings.THUMBNAIL_BYTE_BUDGET
+    width, height = dimensions
+    return int(width * height * settings.RENDITION_BITS_PER_PIXEL / 8)
+
+
+def encode_variants(img: Image.Image, jpeg_size: int, budget: int) -> Dict[str, bytes]:
+    """Variants of an image by format key, keeping only those under the JPEG."""
+    variants = {}
+    for image_format in variant_formats():
+        data, _ = encode_to_budget(img, image_format, budget)
+        if len(data) < jpeg_size:
+            variants[image_format.name.lower()] = data
+    return variants
+
+
+def _accepted(accept: str) -> Dict[str, float]:
+    """Explicitly listed media types and their q-values."""
+    accepted = {}
+    for part in accept.split(","):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type:
+            accepted[media_type.lower()] = quality
+    return accepted
+
+
+def negotiate(accept: Optional[str], available: Iterable[str]) -> str:
+    """
+    Pick the format key to serve from those `available` (JPEG always is).
+
+    The first preferred format the client names with a non-zero q-value
+    wins; otherwise JPEG.
+    """
+    accepted = _accepted(accept or "")
+    available = set(available)
+    for key, image_format in FORMATS.items():
+        if image_format is JPEG:
+            break
+        if key in available and accepted.get(image_format.mime_type, 0.0) > 0:
+            return key
+    return "jpeg"
@@ -4,14 +4,70 @@ Image processing service for photo uploads.
 
 import io
 import logging
-from typing import Optional, Tuple
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from PIL import Image, ImageOps
 
 from api.core.config import settings
+from api.core.uploads import NOT_JPEG_DETAIL
+from api.services.image_formats import byte_budget, encode_variants
 
 logger = logging.getLogger(__name__)
 
+# EXIF orientations that swap width and height (90°/270° rotations)
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+# Let LANCZOS shrink with a cheap box reduce first once the ratio exceeds this
+_REDUCING_GAP = 3.0
+
+
+@dataclass
+class Rendition:
+    """An extra resized copy of the photo, e.g. for 800px lightbox views."""
+
+    size: int
+    image_bytes: bytes
+    dimensions: Tuple[int, int]
+    # WebP/AVIF encodings by format key, when smaller than the JPEG
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+
+@dataclass
+class ProcessedImage:
+    """Encoded photo and thumbnail, plus per-stage timings in milliseconds."""
+
+    photo_bytes: bytes
+    thumbnail_bytes: bytes
+    photo_size: Tuple[int, int]
+    thumbnail_size: Tuple[int, int]
+    original_size: Tuple[int, int]
+    decoded_size: Tuple[int, int]
+    renditions: List[Rendition] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Perceptual hash of the thumbnail, for near-duplicate detection
+    dhash: Optional[int] = None
+    # WebP/AVIF encodings of the thumbnail by format key
+    thumbnail_variants: Dict[str, bytes] = field(default_factory=dict)
+
+
+class ImageValidationError(ValueError):
+    """An upload that is not an acceptable image; the message is user-facing."""
+
+
+def dhash(img: Image.Image) -> int:
+    """64-bit difference hash: horizontal brightness gradients on a 9x8 grid.
+
+    Near-identical images (recompressed, resized, lightly edited) differ in
+    only a few bits, so Hamming distance measures similarity.
+    """
+    small = img.convert("L").resize((9, 8), Image.Resampling.BOX)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
 
 class ImageProcessor:
     """Service for processing uploaded images."""
@@ -20,6 +76,151 @@ class ImageProcessor:
         """Initialise the image processor."""
         pass
 
+    def process(self, image_bytes: bytes) -> ProcessedImage:
+        """
+        Decode, orient, resize and encode an upload into photo and thumbnail.
+
+        The header is parsed once. For JPEGs the decoder is put into draft
+        mode so the DCT is scaled down (by 1/2, 1/4 or 1/8) to the smallest
+        size that is still at least the target, instead of decoding the full
+        resolution and throwing most of it away.
+
+        Renditions (settings.PHOTO_RENDITION_SIZES) and the thumbnail are made
+        in one cascade, largest first, each resized from the previous step
+        rather than from the full-size photo. Sizes no smaller than the photo
+        itself are skipped.
+
+        Raises ImageValidationError for input over MAX_IMAGE_SIZE, not a
+        JPEG or undecodable, checked on the same parse of the header;
+        `process_image` returns Nones instead.
+        """
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        if len(image_bytes) > settings.MAX_IMAGE_SIZE:
+            raise ImageValidationError(
+                f"File size exceeds maximum of "
+                f"{settings.MAX_IMAGE_SIZE // (1024 * 1024)}MB"
+            )
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                if img.format != "JPEG":
+                    raise ImageValidationError(NOT_JPEG_DETAIL)
+                original_size = self._oriented_size(img)
+                photo_size = self._calculate_dimensions(
+                    *original_size, settings.MAX_IMAGE_DIMENSION
+                )
+                decoded = self._decode(img, photo_size)
+        except ImageValidationError:
+            raise
+        except Exception as e:
+            raise ImageValidationError(f"Invalid image file: {str(e)}") from e
+        timings["decode"] = self._elapsed_ms(started)
+
+        return self._render(decoded, original_size, timings, started)
+
+    def process_decoded(self, img: Image.Image) -> ProcessedImage:
+        """
+        Resize and encode an image that is already decoded and oriented.
+
+        For callers that transform pixels in memory first (e.g. rotation), so
+        the image does not go through an extra JPEG encode and decode.
+        """
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        return self._render(img, img.size, {}, time.perf_counter())
+
+    def _render(
+        self,
+        decoded: Image.Image,
+        original_size: Tuple[int, int],
+        timings: Dict[str, float],
+        started: float,
+    ) -> ProcessedImage:
+        """Resize cascade and encode stages shared by every entry point."""
+        photo_size = self._calculate_dimensions(
+            *original_size, settings.MAX_IMAGE_DIMENSION
+        )
+        thumbnail_size = self._calculate_dimensions(
+            *original_size, settings.THUMBNAIL_SIZE
+        )
+
+        stage = time.perf_counter()
+        photo = decoded
+        if photo.size != photo_size:
+            photo = photo.resize(
+                photo_size, Image.Resampling.LANCZOS, reducing_gap=_REDUCING_GAP
+            )
+        # Each step shrinks the smallest intermediate that still covers it
+        previous = photo
+        rendition_images = []
+        for size in sorted(set(settings.PHOTO_RENDITION_SIZES), reverse=True):
+            if size >= max(photo_size) or size <= settings.THUMBNAIL_SIZE:
+                continue
+            dimensions = self._calculate_dimensions(*original_size, size)
+            previous = previous.resize(
+                dimensions, Image.Resampling.LANCZOS, reducing_gap=_REDUCING_GAP
+            )
+            rendition_images.append((size, previous))
+        if thumbnail_size != previous.size:
+            thumbnail = previous.resize(
+                thumbnail_size, Image.Resampling.LANCZOS, reducing_gap=_REDUCING_GAP
+            )
+        else:
+            thumbnail = previous.copy()
+        timings["resize"] = self._elapsed_ms(stage)
+
+        stage = time.perf_counter()
+        photo_bytes = self._encode_jpeg(photo, quality=95)
+        renditions = [
+            Rendition(
+                size=size,
+                image_bytes=self._encode_jpeg(image, quality=90),
+                dimensions=image.size,
+            )
+            for size, image in rendition_images
+        ]
+        thumbnail_bytes = self._encode_jpeg(thumbnail, quality=85)
+        timings["encode"] = self._elapsed_ms(stage)
+
+        # Smaller formats for clients that accept them, each to a byte budget
+        stage = time.perf_counter()
+        thumbnail_variants = encode_variants(
+            thumbnail,
+            len(thumbnail_bytes),
+            byte_budget(thumbnail.size, thumbnail=True),
+        )
+        for rendition, (_, image) in zip(renditions, rendition_images):
+            rendition.variants = encode_variants(
+                image,
+                len(rendition.image_bytes),
+                byte_budget(image.size, thumbnail=False),
+            )
+        timings["variants"] = self._elapsed_ms(stage)
+        thumbnail_hash = dhash(thumbnail)
+        timings["total"] = self._elapsed_ms(started)
+
+        logger.info(
+            f"Processed image: {original_size[0]}x{original_size[1]} "
+            f"(decoded at {decoded.size[0]}x{decoded.size[1]}) -> "
+            f"{photo_size[0]}x{photo_size[1]}, "
+            f"thumbnail: {thumbnail_size[0]}x{thumbnail_size[1]}, "
+            f"renditions: {[r.size for r in renditions]}; "
+            + ", ".join(f"{k}={v:.1f}ms" for k, v in timings.items())
+        )
+        return ProcessedImage(
+            photo_bytes=photo_bytes,
+            thumbnail_bytes=thumbnail_bytes,
+            photo_size=photo_size,
+            thumbnail_size=thumbnail_size,
+            original_size=original_size,
+            decoded_size=decoded.size,
+            renditions=renditions,
+            timings=timings,
+            dhash=thumbnail_hash,
+            thumbnail_variants=thumbnail_variants,
+        )
+
     def process_image(self, image_bytes: bytes) -> Tuple[
         Optional[bytes],
         Optional[bytes],
@@ -36,70 +237,53 @@ class ImageProcessor:
             Tuple of (processed_image_bytes, thumbnail_bytes, image_dimensions, thumbnail_dimensions)
         """
         try:
-            # Open image and apply EXIF orientation
-            with Image.open(io.BytesIO(image_bytes)) as img:
-                # Apply EXIF orientation
-                img = ImageOps.exif_transpose(img)
-                if img is None:
-                    return None, None, None, None
-
-                # Get original dimensions
-                original_width, original_height = img.size
-
-                # Calculate new dimensions for main image (max 4000x4000, preserve aspect ratio)
-                image_dimensions = self._calculate_dimensions(
-                    original_width, original_height, settings.MAX_IMAGE_DIMENSION
-                )
-
-                # Resize main image
-                if image_dimensions != (original_width, original_height):
-                    img = img.resize(image_dimensions, Image.Resampling.LANCZOS)
-
-                # Convert to RGB if necessary (strip EXIF and ensure compatibility)
-                if img.mode != "RGB":
-                    img = img.convert("RGB")
-
-                # Save processed image
-                output = io.BytesIO()
-                img.save(output, format="JPEG", quality=95, optimize=True)
-                processed_image_bytes = output.getvalue()
+            result = self.process(image_bytes)
+        except Exception as e:
+            logger.error(f"Failed to process image: {e}")
+            return None, None, None, None
+        return (
+            result.photo_bytes,
+            result.thumbnail_bytes,
+            result.photo_size,
+            result.thumbnail_size,
+        )
 
-                # Calculate thumbnail dimensions (max 120x120, preserve aspect ratio)
-                thumbnail_dimensions = self._calculate_dimensions(
-                    original_width, original_height, settings.THUMBNAIL_SIZE
-                )
+    def _oriented_size(self, img: Image.Image) -> Tuple[int, int]:
+        """Image size after EXIF orientation, read from the header only."""
+        width, height = img.size
+        orientation = img.getexif().get(0x0112)
+        if orientation in _TRANSPOSED_ORIENTATIONS:
+            return height, width
+        return width, height
 
-                # Create thumbnail
-                if thumbnail_dimensions != (original_width, original_height):
-                    thumbnail = img.resize(
-                        thumbnail_dimensions, Image.Resampling.LANCZOS
-                    )
-                else:
-                    thumbnail = img.copy()
-
-                # Save thumbnail
-                thumbnail_output = io.BytesIO()
-                thumbnail.save(
-                    thumbnail_output, format="JPEG", quality=85, optimize=True
-                )
-                thumbnail_bytes = thumbnail_output.getvalue()
+    def _decode(self, img: Image.Image, target_size: Tuple[int, int]) -> Image.Image:
+        """Decode (scaled down where possible), apply orientation and force RGB."""
+        if img.format == "JPEG":
+            # Draft sizes are in stored orientation, before EXIF rotation
+            width, height = target_size
+            orientation = img.getexif().get(0x0112)
+            if orientation in _TRANSPOSED_ORIENTATIONS:
+                width, height = height, width
+            img.draft(None, (width, height))
 
-                logger.info(
-                    f"Processed image: {original_width}x{original_height} -> "
-                    f"{image_dimensions[0]}x{image_dimensions[1]}, "
-                    f"thumbnail: {thumbnail_dimensions[0]}x{thumbnail_dimensions[1]}"
-                )
+        img.load()
+        transposed = ImageOps.exif_transpose(img)
+        oriented = transposed if transposed is not None else img
+        if oriented.mode != "RGB":
+            oriented = oriented.convert("RGB")
+        elif oriented is img:
+            # Detach from the file-backed image before it is closed
+            oriented = img.copy()
+        return oriented
 
-                return (
-                    processed_image_bytes,
-                    thumbnail_bytes,
-                    image_dimensions,
-                    thumbnail_dimensions,
-                )
+    def _encode_jpeg(self, img: Image.Image, quality: int) -> bytes:
+        output = io.BytesIO()
+        img.save(output, format="JPEG", quality=quality, optimize=True)
+        return output.getvalue()
 
-        except Exception as e:
-            logger.error(f"Failed to process image: {e}")
-            return None, None, None, None
+    @staticmethod
+    def _elapsed_ms(since: float) -> float:
+        return round((time.perf_counter() - since) * 1000, 2)
 
     def _calculate_dimensions(
         self, width: int, height: int, max_size: int
@@ -122,27 +306,3 @@ class ImageProcessor:
         new_height = min(new_height, max_size)
 
         return new_width, new_height
-
-    def validate_image(self, image_bytes: bytes) -> Tuple[bool, str]:
-        """Validate uploaded image file."""
-        try:
-            with Image.open(io.BytesIO(image_bytes)) as img:
-                # Check file size
-                if len(image_bytes) > settings.MAX_IMAGE_SIZE:
-                    return (
-                        False,
-                        f"File size exceeds maximum of {settings.MAX_IMAGE_SIZE // (1024 * 1024)}MB",
-                    )
-
-                # Check format
-                if img.format not in ["JPEG", "JPG"]:
-                    return False, "Only JPEG images are supported"
-
-                # Check if image is valid
-                img.verify()
-
-                return True, "Image is valid"
-
-        except Exception as e:
-            logger.error(f"Image validation failed: {e}")
-            return False, f"Invalid image file: {str(e)}"
@@ -0,0 +1,440 @@
+"""
+In-memory full-text index over log comments (/v1/logs/search).
+
+A LIKE scan of ~1M tlog comments is far too slow for interactive search, so
+comments are tokenised into a positional inverted index: token -> posting
+list of (log id, token positions). Posting lists are stored compressed as
+delta-encoded varints, which keeps the whole index to a small multiple of
+the raw comment text.
+
+Maintenance is incremental:
+
+- New logs have ids above everything indexed, so they are appended to the
+  compressed posting lists in place.
+- Edits and deletes tombstone the old postings; an edited log's new text goes
+  into a small uncompressed delta segment. Once enough tombstones build up the
+  index is compacted, re-encoding posting lists without them.
+
+The index is built in the background (at startup, or when a search finds
+it missing) and then follows log events from the activity broadcaster.
+Searches never touch the database for it: every LOG_SEARCH_CATCHUP_SECONDS
+a search triggers a background catch-up that indexes logs with ids above
+the highest one seen (logs written by the legacy site), and every
+LOG_SEARCH_REBUILD_SECONDS the catch-up is a full rebuild instead, which
+picks up edits and deletes made where no event reaches this worker. Events
+that arrive while a build is reading the table are replayed on the new
+index once it is swapped in.
+
+Search results are checked against the database only for the page shown,
+so a log deleted elsewhere stays in the total until the next rebuild.
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.models.user import TLog
+from api.services.activity import (
+    LOG_CREATED,
+    LOG_DELETED,
+    LOG_UPDATED,
+    activity_broadcaster,
+)
+from api.services.background_refresh import BackgroundRefresh
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# Rows fetched per round trip while building the index
+BUILD_BATCH_SIZE = 5000
+
+Positions = Dict[str, List[int]]
+PostingIterator = Iterator[Tuple[int, Optional[List[int]]]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case alphanumeric tokens in order of appearance."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """
+    Split a query into AND-ed clauses, each a list of tokens.
+
+    `"quoted text"` is a phrase. A bare word that tokenises to several tokens
+    (e.g. `trig-pillar`) is also treated as a phrase.
+    """
+    clauses = []
+    for phrase, word in _QUERY_RE.findall(query):
+        tokens = tokenize(phrase or word)
+        if tokens:
+            clauses.append(tokens)
+    return clauses
+
+
+def _token_positions(text: str) -> Positions:
+    positions: Positions = {}
+    for position, token in enumerate(tokenize(text)):
+        positions.setdefault(token, []).append(position)
+    return positions
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _encode_posting(out: bytearray, gap: int, positions: List[int]) -> None:
+    """Append one (doc gap, count, position gaps...) entry to a posting list."""
+    _write_varint(out, gap)
+    _write_varint(out, len(positions))
+    previous = 0
+    for position in positions:
+        _write_varint(out, position - previous)
+        previous = position
+
+
+def _iter_postings(data: bytes, with_positions: bool = True) -> PostingIterator:
+    """Decode a posting list into (log id, positions or None) pairs."""
+    offset = 0
+    doc_id = 0
+    end = len(data)
+    while offset < end:
+        gap, offset = _read_varint(data, offset)
+        doc_id += gap
+        count, offset = _read_varint(data, offset)
+        if with_positions:
+            positions = []
+            position = 0
+            for _ in range(count):
+                delta, offset = _read_varint(data, offset)
+                position += delta
+                positions.append(position)
+            yield doc_id, positions
+        else:
+            for _ in range(count):
+                while data[offset] & 0x80:
+                    offset += 1
+                offset += 1
+            yield doc_id, None
+
+
+def _match_clause(
+    clause: List[str], lookup: Callable[[str, bool], PostingIterator]
+) -> Set[int]:
+    """Log ids containing every token of the clause at consecutive positions."""
+    if len(clause) == 1:
+        return {doc_id for doc_id, _ in lookup(clause[0], False)}
+
+    # Map of candidate log id -> start positions of a partial phrase match
+    candidates: Dict[int, Set[int]] = {
+        doc_id: set(positions or []) for doc_id, positions in lookup(clause[0], True)
+    }
+    for offset, token in enumerate(clause[1:], start=1):
+        if not candidates:
+            break
+        narrowed: Dict[int, Set[int]] = {}
+        for doc_id, positions in lookup(token, True):
+            starts = candidates.get(doc_id)
+            if not starts:
+                continue
+            following = set(positions or [])
+            matched = {start for start in starts if start + offset in following}
+            if matched:
+                narrowed[doc_id] = matched
+        candidates = narrowed
+    return set(candidates)
+
+
+class LogSearchIndex:
+    """Compressed positional inverted index of log comments."""
+
+    def __init__(self, compact_threshold: int = 1000):
+        self.compact_threshold = compact_threshold
+        self._postings: Dict[str, bytearray] = {}
+        # Last log id appended to each posting list (base for the next gap)
+        self._last_doc: Dict[str, int] = {}
+        self._max_doc_id = 0
+        # Log ids whose compressed postings are stale (deleted or edited)
+        self._tombstones: Set[int] = set()
+        # Current text of edited logs, uncompressed until the next compaction
+        self._delta: Dict[int, Positions] = {}
+        self._built_at: Optional[float] = None
+        # When the last full build finished (catch-ups only add new logs)
+        self._full_built_at: Optional[float] = None
+        # Events seen while a build reads the table, replayed once it is in
+        self._pending: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    @property
+    def is_built(self) -> bool:
+        return self._built_at is not None
+
+    @property
+    def max_doc_id(self) -> int:
+        return self._max_doc_id
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the compressed posting lists."""
+        with self._lock:
+            return sum(len(data) for data in self._postings.values())
+
+    def build(self, db: Session) -> None:
+        """Index every log comment, replacing the current contents."""
+        fresh = LogSearchIndex(compact_threshold=self.compact_threshold)
+        with self._lock:
+            self._pending = []
+        try:
+            rows = db.execute(
+                select(TLog.id, TLog.comment)
+                .order_by(TLog.id)
+                .execution_options(yield_per=BUILD_BATCH_SIZE)
+            )
+            count = 0
+            for log_id, comment in rows:
+                fresh._append(int(log_id), _token_positions(comment or ""))
+                count += 1
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            self._postings = fresh._postings
+            self._last_doc = fresh._last_doc
+            self._max_doc_id = fresh._max_doc_id
+            self._tombstones = set()
+            self._delta = {}
+            self._built_at = self._full_built_at = time.monotonic()
+            # Edits and deletes the build may have read too early
+            pending, self._pending = self._pending or [], None
+            for event_type, data in pending:
+                self._apply_event(event_type, data)
+        logger.info(
+            f"Built log search index: {count} logs, {len(self._postings)} tokens, "
+            f"{self.size_bytes} bytes"
+        )
+
+    def invalidate(self) -> None:
+        """Drop the contents; the next search rebuilds from the database."""
+        with self._lock:
+            self._postings = {}
+            self._last_doc = {}
+            self._max_doc_id = 0
+            self._tombstones = set()
+            self._delta = {}
+            self._built_at = None
+            self._full_built_at = None
+
+    def catch_up(self, db: Session) -> int:
+        """Index logs created since the last build or catch-up. Returns count."""
+        rows = db.execute(
+            select(TLog.id, TLog.comment)
+            .where(TLog.id > self._max_doc_id)
+            .order_by(TLog.id)
+            .execution_options(yield_per=BUILD_BATCH_SIZE)
+        )
+        count = 0
+        for log_id, comment in rows:
+            self.add(int(log_id), comment or "")
+            count += 1
+        with self._lock:
+            self._built_at = time.monotonic()
+        return count
+
+    def seconds_since_refresh(self) -> float:
+        if self._built_at is None:
+            return float("inf")
+        return time.monotonic() - self._built_at
+
+    def seconds_since_build(self) -> float:
+        if self._full_built_at is None:
+            return float("inf")
+        return time.monotonic() - self._full_built_at
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def add(self, log_id: int, text: str) -> None:
+        """Index a new or edited log comment."""
+        positions = _token_positions(text)
+        with self._lock:
+            if self._built_at is None:
+                return
+            if log_id > self._max_doc_id and log_id not in self._tombstones:
+                self._append(log_id, positions)
+                return
+            # Already indexed (an edit): shadow the old postings
+            self._tombstones.add(log_id)
+            self._delta[log_id] = positions
+            self._maybe_compact()
+
+    def remove(self, log_id: int) -> None:
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._tombstones.add(log_id)
+            self._delta.pop(log_id, None)
+            self._maybe_compact()
+
+    def _append(self, log_id: int, positions: Positions) -> None:
+        for token, token_positions in positions.items():
+            data = self._postings.get(token)
+            if data is None:
+                data = self._postings[token] = bytearray()
+            _encode_posting(
+                data, log_id - self._last_doc.get(token, 0), token_positions
+            )
+            self._last_doc[token] = log_id
+        self._max_doc_id = max(self._max_doc_id, log_id)
+
+    def _maybe_compact(self) -> None:
+        if len(self._tombstones) >= self.compact_threshold:
+            self.compact()
+
+    def compact(self) -> None:
+        """Re-encode posting lists without tombstones, folding in the delta."""
+        with self._lock:
+            delta_by_token: Dict[str, List[Tuple[int, List[int]]]] = {}
+            for log_id, doc_positions in self._delta.items():
+                for token, token_positions in doc_positions.items():
+                    delta_by_token.setdefault(token, []).append(
+                        (log_id, token_positions)
+                    )
+
+            postings: Dict[str, bytearray] = {}
+            last_doc: Dict[str, int] = {}
+            for token in set(self._postings) | set(delta_by_token):
+                entries = [
+                    (log_id, token_positions or [])
+                    for log_id, token_positions in _iter_postings(
+                        self._postings.get(token, b"")
+                    )
+                    if log_id not in self._tombstones
+                ]
+                entries.extend(delta_by_token.get(token, []))
+                if not entries:
+                    continue
+                entries.sort()
+                data = bytearray()
+                previous = 0
+                for log_id, token_positions in entries:
+                    _encode_posting(data, log_id - previous, token_positions)
+                    previous = log_id
+                postings[token] = data
+                last_doc[token] = previous
+
+            self._postings = postings
+            self._last_doc = last_doc
+            self._tombstones = set()
+            self._delta = {}
+
+    def handle_event(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Activity broadcaster listener."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((event_type, dict(data)))
+            self._apply_event(event_type, data)
+
+    def _apply_event(self, event_type: str, data: Dict[str, Any]) -> None:
+        if event_type in (LOG_CREATED, LOG_UPDATED):
+            self.add(int(data["id"]), str(data.get("comment") or ""))
+        elif event_type == LOG_DELETED:
+            self.remove(int(data["id"]))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(self, query: str) -> List[int]:
+        """Ids of logs matching every clause of the query, newest first."""
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+
+        with self._lock:
+            # Rarest clause first so intersections shrink quickly
+            clauses.sort(
+                key=lambda clause: min(
+                    len(self._postings.get(token, b"")) for token in clause
+                )
+            )
+            matches: Optional[Set[int]] = None
+            for clause in clauses:
+                found = _match_clause(clause, self._lookup_main) - self._tombstones
+                found |= _match_clause(clause, self._lookup_delta)
+                matches = found if matches is None else matches & found
+                if not matches:
+                    return []
+        return sorted(matches or (), reverse=True)
+
+    def _lookup_main(self, token: str, with_positions: bool) -> PostingIterator:
+        return _iter_postings(self._postings.get(token, b""), with_positions)
+
+    def _lookup_delta(self, token: str, with_positions: bool) -> PostingIterator:
+        for log_id, positions in self._delta.items():
+            if token in positions:
+                yield log_id, positions[token]
+
+
+log_search_index = LogSearchIndex(
+    compact_threshold=settings.LOG_SEARCH_COMPACT_THRESHOLD
+)
+activity_broadcaster.add_listener(log_search_index.handle_event)
+
+
+def refresh_log_search_index(db: Session) -> None:
+    """Build the index if missing or due a rebuild, otherwise catch it up."""
+    index = log_search_index
+    if index.seconds_since_build() >= settings.LOG_SEARCH_REBUILD_SECONDS:
+        index.build(db)
+        return
+    added = index.catch_up(db)
+    if added:
+        logger.info(f"Log search index caught up with {added} new logs")
+
+
+log_search_refresher = BackgroundRefresh("log-search", refresh_log_search_index)
+
+
+def get_log_search_index() -> Optional[LogSearchIndex]:
+    """
+    The search index, or None until its first build has finished.
+
+    Never queries the database itself; a due catch-up or rebuild is started
+    in the background and the index is used as it stands meanwhile.
+    """
+    if not settings.LOG_SEARCH_ENABLED:
+        return None
+    index = log_search_index
+    if index.seconds_since_refresh() >= settings.LOG_SEARCH_CATCHUP_SECONDS:
+        log_search_refresher.trigger()
+    return index if index.is_built else None
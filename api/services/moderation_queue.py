@@ -0,0 +1,334 @@
+"""
+Durable background queue for photo content moderation.
+
+Uploads hand their processed photo bytes to `moderation_queue_service`, so
+the worker sends them straight to Rekognition instead of downloading the
+photo again. Jobs, bytes included, are kept in a local SQLite file: they
+survive restarts and are shared by every worker process on the instance,
+while the multi-megabyte payloads stay on the machine that already holds
+them rather than passing through Redis.
+
+A dispatcher thread claims due jobs in batches under a lease and checks them
+on a small worker pool, then hides every flagged photo in the batch with one
+UPDATE. When Rekognition gives no verdict the job is retried with exponential
+backoff; after the last attempt the photo is hidden, as the synchronous path
+does. A job whose lease runs out (say the process died mid-batch) is claimed
+again.
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.crud import tphoto as tphoto_crud
+from api.db.database import get_session_local
+from api.services.content_moderation import (
+    ContentModerationService,
+    ModerationUnavailable,
+    content_moderation_service,
+    download_photo_bytes,
+)
+from api.services.photo_cache import photo_cache
+
+logger = logging.getLogger(__name__)
+
+# Idle dispatcher re-checks for due retries this often
+_POLL_SECONDS = 5.0
+_MAX_BACKOFF_SECONDS = 60 * 60
+
+# Job outcomes
+PASSED = "passed"
+HIDE = "hide"
+RETRY = "retry"
+DROP = "drop"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS moderation_job (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    photo_id INTEGER NOT NULL,
+    image BLOB,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    leased_until REAL NOT NULL DEFAULT 0
+)
+"""
+
+
+@dataclass
+class ModerationJob:
+    """A queued photo, with the bytes to check if the uploader supplied them."""
+
+    id: int
+    photo_id: int
+    image_bytes: Optional[bytes]
+    attempts: int
+
+
+class ModerationQueue:
+    """Moderation jobs in a SQLite file, claimed under a lease."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialised = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialised:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Autocommit; claims open their own write transaction
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._initialised:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            self._initialised = True
+        return conn
+
+    def put(
+        self,
+        photo_id: int,
+        image_bytes: Optional[bytes] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO moderation_job (photo_id, image, available_at) "
+                "VALUES (?, ?, ?)",
+                (photo_id, image_bytes, time.time() if now is None else now),
+            )
+
+    def claim(
+        self, limit: int, lease_seconds: float, now: Optional[float] = None
+    ) -> List[ModerationJob]:
+        """Lease up to `limit` due jobs, oldest first."""
+        now = time.time() if now is None else now
+        with closing(self._connect()) as conn:
+            # IMMEDIATE takes the write lock up front, so two processes
+            # cannot select the same rows
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT id, photo_id, image, attempts FROM moderation_job "
+                    "WHERE available_at <= ? AND leased_until <= ? "
+                    "ORDER BY available_at, id LIMIT ?",
+                    (now, now, limit),
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE moderation_job SET leased_until = ? WHERE id = ?",
+                    [(now + lease_seconds, row[0]) for row in rows],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return [
+            ModerationJob(
+                id=row[0], photo_id=row[1], image_bytes=row[2], attempts=row[3]
+            )
+            for row in rows
+        ]
+
+    def complete(self, job_ids: List[int]) -> None:
+        if not job_ids:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "DELETE FROM moderation_job WHERE id IN "
+                f"({', '.join('?' for _ in job_ids)})",
+                job_ids,
+            )
+
+    def retry(self, job_id: int, delay: float, now: Optional[float] = None) -> None:
+        """Release a job to be tried again after `delay` seconds."""
+        now = time.time() if now is None else now
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE moderation_job SET attempts = attempts + 1, "
+                "available_at = ?, leased_until = 0 WHERE id = ?",
+                (now + delay, job_id),
+            )
+
+    def pending(self) -> int:
+        with closing(self._connect()) as conn:
+            return int(
+                conn.execute("SELECT COUNT(*) FROM moderation_job").fetchone()[0]
+            )
+
+
+class ModerationQueueService:
+    """Runs queued moderation jobs on a worker pool behind a dispatcher thread."""
+
+    def __init__(
+        self,
+        path: Optional[str],
+        max_workers: int,
+        batch_size: int,
+        max_attempts: int,
+        backoff_seconds: float,
+        lease_seconds: float,
+        moderation: ContentModerationService,
+    ):
+        self.queue = ModerationQueue(
+            path or os.path.join(tempfile.gettempdir(), "moderation.db")
+        )
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.moderation = moderation
+        # Workers open their own sessions; the upload's session is long gone
+        self.session_factory: Callable[[], Session] = lambda: get_session_local()()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def enqueue(self, photo_id: int, image_bytes: Optional[bytes] = None) -> None:
+        self.queue.put(photo_id, image_bytes)
+        self.start()
+        self._wake.set()
+
+    def start(self) -> None:
+        """Start the dispatcher; it also resumes jobs left by a previous run."""
+        with self._lock:
+            if self._dispatcher is not None and self._dispatcher.is_alive():
+                return
+            self._stopping.clear()
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, name="moderation-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._stopping.set()
+        self._wake.set()
+        with self._lock:
+            dispatcher, self._dispatcher = self._dispatcher, None
+            executor, self._executor = self._executor, None
+        if dispatcher is not None and wait:
+            dispatcher.join()
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _dispatch(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                handled = self.run_once()
+            except Exception as e:
+                logger.error(f"Moderation dispatcher error: {e}")
+                handled = 0
+            if not handled:
+                self._wake.wait(_POLL_SECONDS)
+                self._wake.clear()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="moderation"
+                )
+            return self._executor
+
+    def run_once(self) -> int:
+        """Check one batch of due jobs and record the verdicts. Returns its size."""
+        jobs = self.queue.claim(self.batch_size, self.lease_seconds)
+        if not jobs:
+            return 0
+
+        outcomes = list(self._get_executor().map(self.check, jobs))
+
+        done: List[int] = []
+        hidden: Dict[int, Tuple[ModerationJob, str]] = {}
+        for job, (outcome, reason) in zip(jobs, outcomes):
+            if outcome == RETRY and job.attempts + 1 < self.max_attempts:
+                delay = min(
+                    self.backoff_seconds * 2**job.attempts, _MAX_BACKOFF_SECONDS
+                )
+                logger.warning(
+                    f"Moderation of photo {job.photo_id} failed ({reason}), "
+                    f"retrying in {delay:g}s"
+                )
+                self.queue.retry(job.id, delay)
+            elif outcome in (HIDE, RETRY):
+                hidden[job.id] = (job, reason or "Moderation failed")
+            else:
+                done.append(job.id)
+
+        if hidden:
+            photo_ids = sorted({job.photo_id for job, _ in hidden.values()})
+            db = self.session_factory()
+            try:
+                tphoto_crud.update_photos_bulk(
+                    db, photo_ids=photo_ids, updates={"deleted_ind": "M"}
+                )
+            except Exception as e:
+                # Leave the batch leased; it is claimed again when that expires
+                logger.error(f"Failed to mark photos {photo_ids} as moderated: {e}")
+                self.queue.complete(done)
+                return len(jobs)
+            finally:
+                db.close()
+            for job, reason in hidden.values():
+                logger.info(f"Marked photo {job.photo_id} as moderated: {reason}")
+            done.extend(hidden)
+
+        self.queue.complete(done)
+        return len(jobs)
+
+    def check(self, job: ModerationJob) -> Tuple[str, Optional[str]]:
+        """Moderate one job's photo; returns the outcome and any reason."""
+        try:
+            photo_bytes = job.image_bytes
+            if photo_bytes is None:
+                source = self._photo_source(job.photo_id)
+                if source is None:
+                    return DROP, None
+                server_id, filename, photo_url = source
+                photo_bytes = photo_cache.get_or_fetch(
+                    server_id, filename, lambda: download_photo_bytes(photo_url)
+                )
+            reason = self.moderation.review(job.photo_id, photo_bytes)
+        except ModerationUnavailable as e:
+            return RETRY, str(e)
+        except Exception as e:
+            logger.error(f"Content moderation failed for photo {job.photo_id}: {e}")
+            return RETRY, f"Moderation error: {e}"
+        return (HIDE, reason) if reason else (PASSED, None)
+
+    def _photo_source(self, photo_id: int) -> Optional[Tuple[int, str, str]]:
+        """Server id, filename and URL of a photo queued without bytes.
+
+        None if there is nothing to check.
+        """
+        db = self.session_factory()
+        try:
+            photo = tphoto_crud.get_photo_by_id(db, photo_id=photo_id)
+            if not photo or photo.deleted_ind == "M":
+                return None
+            photo_url = self.moderation.photo_url(db, photo)
+            if photo_url is None:
+                return None
+            return int(photo.server_id), str(photo.filename), photo_url
+        finally:
+            db.close()
+
+
+moderation_queue_service = ModerationQueueService(
+    path=settings.MODERATION_QUEUE_PATH,
+    max_workers=settings.MODERATION_WORKERS,
+    batch_size=settings.MODERATION_BATCH_SIZE,
+    max_attempts=settings.MODERATION_MAX_ATTEMPTS,
+    backoff_seconds=settings.MODERATION_RETRY_BACKOFF_SECONDS,
+    lease_seconds=settings.MODERATION_LEASE_SECONDS,
+    moderation=content_moderation_service,
+)
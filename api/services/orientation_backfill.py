@@ -0,0 +1,143 @@
+"""
+Score every stored photo's orientation with the ONNX model.
+
+Walks tphoto in id order, one page per model batch. Each page's thumbnails
+are downloaded concurrently over the shared keep-alive session, and the next
+page is already downloading while the current one is scored, so the network
+and the model overlap. Verdicts land in tphoto_orientation, where
+`tphoto_crud.list_suspected_rotations` finds sideways photos without calling
+Rekognition per request.
+
+Run it via scripts/backfill_orientation.py.
+"""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.crud import tphoto as tphoto_crud
+from api.models.server import Server
+from api.models.tphoto import TPhoto, TPhotoOrientation
+from api.services.orientation_model import OrientationClassifier
+from api.services.photo_evaluation import download_bytes
+from api.utils.url import join_url
+
+logger = logging.getLogger(__name__)
+
+_DOWNLOAD_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass
+class BackfillStats:
+    scanned: int = 0
+    scored: int = 0
+    failed: int = 0
+    last_photo_id: int = 0
+
+
+def photo_page(
+    db: Session, *, after_id: int, limit: int, rescore: bool
+) -> List[Tuple[int, str]]:
+    """Next (photo id, thumbnail URL) pairs after `after_id`."""
+    stmt = (
+        select(TPhoto.id, TPhoto.icon_filename, Server.url.label("server_url"))
+        .select_from(TPhoto)
+        .outerjoin(Server, Server.id == TPhoto.server_id)
+        .where(TPhoto.id > after_id, TPhoto.deleted_ind != "Y")
+        .order_by(TPhoto.id)
+        .limit(limit)
+    )
+    if not rescore:
+        stmt = stmt.outerjoin(
+            TPhotoOrientation, TPhotoOrientation.photo_id == TPhoto.id
+        ).where(TPhotoOrientation.photo_id.is_(None))
+    return [
+        (int(row.id), join_url(row.server_url or "", row.icon_filename))
+        for row in db.execute(stmt)
+    ]
+
+
+def backfill_orientations(
+    db: Session,
+    classifier: OrientationClassifier,
+    *,
+    batch_size: int,
+    fetch_workers: int,
+    after_id: int = 0,
+    limit: Optional[int] = None,
+    rescore: bool = False,
+    fetch: Callable[[str, float], bytes] = download_bytes,
+) -> BackfillStats:
+    """Score photos after `after_id` (at most `limit`) and store the results."""
+    stats = BackfillStats(last_photo_id=after_id)
+
+    def fetch_or_none(url: str) -> Optional[bytes]:
+        try:
+            return fetch(url, _DOWNLOAD_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to download thumbnail {url}: {e}")
+            return None
+
+    def next_page() -> List[Tuple[int, str]]:
+        remaining = batch_size
+        if limit is not None:
+            remaining = min(remaining, limit - stats.scanned)
+        if remaining <= 0:
+            return []
+        page = photo_page(
+            db, after_id=stats.last_photo_id, limit=remaining, rescore=rescore
+        )
+        if page:
+            stats.scanned += len(page)
+            stats.last_photo_id = page[-1][0]
+        return page
+
+    with ThreadPoolExecutor(
+        max_workers=fetch_workers, thread_name_prefix="orientation-fetch"
+    ) as pool:
+
+        def start(page: List[Tuple[int, str]]) -> List[Future]:
+            return [pool.submit(fetch_or_none, url) for _, url in page]
+
+        page = next_page()
+        downloads = start(page)
+        while page:
+            # Queue the next page's downloads before scoring this one
+            following = next_page()
+            following_downloads = start(following)
+
+            images = [future.result() for future in downloads]
+            scorable = [i for i, image in enumerate(images) if image]
+            predictions = classifier.predict_batch(
+                [images[i] or b"" for i in scorable], batch_size=batch_size
+            )
+            now = datetime.utcnow()
+            rows = []
+            for i, prediction in zip(scorable, predictions):
+                if prediction is None:
+                    continue
+                angle, confidence = prediction
+                rows.append(
+                    {
+                        "photo_id": page[i][0],
+                        "angle": int(angle),
+                        "confidence": confidence,
+                        "scored_at": now,
+                    }
+                )
+            tphoto_crud.set_photo_orientations(db, orientations=rows)
+            stats.scored += len(rows)
+            stats.failed += len(page) - len(rows)
+            logger.info(
+                f"Scored {stats.scored} photos ({stats.failed} failed), "
+                f"up to id {page[-1][0]}"
+            )
+
+            page, downloads = following, following_downloads
+
+    return stats
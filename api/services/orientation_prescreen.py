@@ -0,0 +1,199 @@
+"""
+Local orientation pre-screen run before paying for Rekognition.
+
+Pixel heuristics work on the 120px icon as NumPy array operations, and the
+ONNX model (when enabled) scores the same icon. When the model is confident
+and the sky heuristic does not contradict it, `RekognitionService` returns
+the local verdict and skips its detect_text, detect_faces and detect_labels
+calls. Without the model, the sky alone decides when at least
+ORIENTATION_PRESCREEN_SKY_THRESHOLD of it lies in one half of the icon (and
+in no other half). Otherwise the heuristics still feed into the Rekognition
+scoring.
+
+`prescreen_stats` counts how many Rekognition calls were avoided.
+"""
+
+import io
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from api.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rekognition calls a full orientation analysis makes
+REKOGNITION_CALLS_PER_ANALYSIS = 3
+
+# Sky side -> rotation it implies (sky belongs at the top)
+_SKY_SIDE_ANGLES = ("0", "180", "90", "270")  # top, bottom, left, right
+
+
+@dataclass
+class Prescreen:
+    """What the local checks make of an image."""
+
+    # Sky-like pixel counts in the (top, bottom, left, right) halves
+    sky_bias: Optional[Tuple[float, float, float, float]]
+    # Share of icon pixels that look like sky
+    sky_coverage: float
+    model_prediction: Optional[Tuple[str, float]]
+
+    @property
+    def sky_angle(self) -> Optional[str]:
+        """Rotation implied by where the sky is, if there is enough of it."""
+        if (
+            self.sky_bias is None
+            or self.sky_coverage < settings.ORIENTATION_PRESCREEN_MIN_SKY
+        ):
+            return None
+        return _SKY_SIDE_ANGLES[int(np.argmax(self.sky_bias))]
+
+    @property
+    def sky_verdict(self) -> Optional[Tuple[str, float]]:
+        """(angle, share of the sky) when the sky sits clearly on one side."""
+        if self.sky_angle is None or self.sky_bias is None:
+            return None
+        total = self.sky_bias[0] + self.sky_bias[1]
+        if not total:
+            return None
+        shares = [count / total for count in self.sky_bias]
+        strong = [
+            side
+            for side, share in enumerate(shares)
+            if share >= settings.ORIENTATION_PRESCREEN_SKY_THRESHOLD
+        ]
+        # Sky filling a corner is strong on two sides and settles nothing
+        if len(strong) != 1:
+            return None
+        return _SKY_SIDE_ANGLES[strong[0]], shares[strong[0]]
+
+    @property
+    def verdict(self) -> Optional[Tuple[str, float]]:
+        """(angle, probability) to report without Rekognition, if any."""
+        if self.model_prediction is None:
+            return self.sky_verdict
+        angle, probability = self.model_prediction
+        if probability < settings.ORIENTATION_PRESCREEN_THRESHOLD:
+            return None
+        sky_angle = self.sky_angle
+        if sky_angle is not None and sky_angle != angle:
+            return None
+        return self.model_prediction
+
+    @property
+    def confident(self) -> bool:
+        """True when Rekognition would add nothing worth paying for."""
+        return self.verdict is not None
+
+    def analysis(self) -> Dict:
+        """The local verdict, shaped like `RekognitionService.analyse_orientation`."""
+        verdict = self.verdict
+        if verdict is None:
+            raise ValueError("No local verdict to report")
+        angle, probability = verdict
+        others = (1.0 - probability) / 3 * 100
+        confidence_scores = {a: others for a in _SKY_SIDE_ANGLES}
+        confidence_scores[angle] = probability * 100
+        return {
+            "orientation_confidence": confidence_scores,
+            "likely_incorrect": angle != "0",
+            "suggested_rotation": angle,
+            "debug_info": {
+                "source": "local_prescreen",
+                "decided_by": "sky" if self.model_prediction is None else "model",
+                "model_prediction": (
+                    None
+                    if self.model_prediction is None
+                    else {"angle": angle, "probability": probability}
+                ),
+                "sky_bias": self.sky_bias,
+                "sky_coverage": self.sky_coverage,
+                "rekognition_calls_avoided": REKOGNITION_CALLS_PER_ANALYSIS,
+            },
+        }
+
+
+class PrescreenStats:
+    """Process-wide counts of analyses and the Rekognition calls they skipped."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.analyses = 0
+        self.prescreened = 0
+
+    def record(self, prescreened: bool) -> None:
+        with self._lock:
+            self.analyses += 1
+            if prescreened:
+                self.prescreened += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "analyses": self.analyses,
+                "prescreened": self.prescreened,
+                "rekognition_calls_avoided": self.prescreened
+                * REKOGNITION_CALLS_PER_ANALYSIS,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.analyses = 0
+            self.prescreened = 0
+
+
+prescreen_stats = PrescreenStats()
+
+
+def icon_pixels(image_bytes: bytes) -> Optional[np.ndarray]:
+    """Decode to at most THUMBNAIL_SIZE on the long side, as HxWx3 uint8."""
+    size = (settings.THUMBNAIL_SIZE, settings.THUMBNAIL_SIZE)
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            # Icons are already this size; full photos decode at reduced scale
+            img.draft("RGB", size)
+            rgb = img.convert("RGB")
+            rgb.thumbnail(size)
+            return np.asarray(rgb, dtype=np.uint8)
+    except Exception as e:
+        logger.debug(f"Could not decode image for orientation heuristics: {e}")
+        return None
+
+
+def sky_bias(pixels: np.ndarray) -> Tuple[float, float, float, float]:
+    """Count sky-like pixels in the top, bottom, left and right halves.
+
+    Sky heuristic: strong blue channel and not too dark.
+    """
+    height, width = pixels.shape[:2]
+    rgb = pixels.astype(np.int16)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    sky = (b > 130) & (b > r + 25) & (b > g + 25)
+    rows = sky.sum(axis=1)
+    columns = sky.sum(axis=0)
+    return (
+        float(rows[: height // 2].sum()),
+        float(rows[height // 2 :].sum()),
+        float(columns[: width // 2].sum()),
+        float(columns[width // 2 :].sum()),
+    )
+
+
+def prescreen(image_bytes: bytes, orientation_model=None) -> Prescreen:
+    """Run the pixel heuristics, and the model if given, on an icon."""
+    pixels = icon_pixels(image_bytes)
+    bias: Optional[Tuple[float, float, float, float]] = None
+    coverage = 0.0
+    if pixels is not None and pixels.size:
+        bias = sky_bias(pixels)
+        coverage = (bias[0] + bias[1]) / (pixels.shape[0] * pixels.shape[1])
+
+    prediction = None
+    if orientation_model is not None:
+        prediction = orientation_model.predict(image_bytes)
+    return Prescreen(sky_bias=bias, sky_coverage=coverage, model_prediction=prediction)
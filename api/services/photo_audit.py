@@ -0,0 +1,233 @@
+"""
+Batch audit of stored photo dimensions against tphoto.
+
+`evaluate_photo` downloads a whole photo and thumbnail to check one photo's
+dimensions. For the whole table this job instead fetches only the start of
+each object with an HTTP Range request (PHOTO_AUDIT_RANGE_BYTES, widened
+once if the header runs past it) and reads the width and height from the
+JPEG frame header (SOF marker) without decoding any pixels. Photos are
+paged in id order and their objects fetched across a bounded thread pool.
+
+Photos whose photo or thumbnail disagrees with the recorded size, or could
+not be read, are written to tphoto_dimension_audit; a photo that matches
+has any earlier finding cleared.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.crud import tphoto as tphoto_crud
+from api.models.server import Server
+from api.models.tphoto import TPhoto
+from api.services.http_client import get_http_session
+from api.utils.url import join_url
+
+logger = logging.getLogger(__name__)
+
+# Second, wider read for files with large EXIF or ICC segments before SOF
+_MAX_HEADER_BYTES = 256 * 1024
+
+_DOWNLOAD_TIMEOUT_SECONDS = 10.0
+
+# SOF0-SOF15 carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) do not
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field
+_STANDALONE_MARKERS = frozenset([0x01, *range(0xD0, 0xD9)])
+
+
+def jpeg_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    (width, height) from a JPEG's frame header, or None.
+
+    Only the segment headers are walked, so `data` may be just the start of
+    the file. None means it is not a JPEG or the frame header lies beyond
+    the bytes given.
+    """
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker in _STANDALONE_MARKERS:
+            i += 2
+            continue
+        if marker in (0xD9, 0xDA):  # End of image or start of scan
+            return None
+        length = int.from_bytes(data[i + 2 : i + 4], "big")
+        if marker in _SOF_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height = int.from_bytes(data[i + 5 : i + 7], "big")
+            width = int.from_bytes(data[i + 7 : i + 9], "big")
+            return (width, height) if width and height else None
+        i += 2 + length
+    return None
+
+
+def fetch_head(url: str, length: int, timeout: float) -> bytes:
+    """
+    The first `length` bytes of a URL, via a Range request.
+
+    Servers that ignore Range send the whole object; only `length` bytes of
+    it are read before the connection is dropped.
+    """
+    with get_http_session().get(
+        url, headers={"Range": f"bytes=0-{length - 1}"}, timeout=timeout, stream=True
+    ) as response:
+        response.raise_for_status()
+        head = bytearray()
+        for chunk in response.iter_content(chunk_size=8192):
+            head.extend(chunk)
+            if len(head) >= length:
+                break
+        return bytes(head[:length])
+
+
+def read_dimensions(
+    url: str, fetch: Callable[[str, int, float], bytes] = fetch_head
+) -> Optional[Tuple[int, int]]:
+    """Dimensions of the JPEG at `url`, reading as little of it as possible."""
+    length = settings.PHOTO_AUDIT_RANGE_BYTES
+    head = fetch(url, length, _DOWNLOAD_TIMEOUT_SECONDS)
+    size = jpeg_dimensions(head)
+    if size is None and len(head) >= length and length < _MAX_HEADER_BYTES:
+        # Truncated before the frame header, e.g. behind a large EXIF block
+        size = jpeg_dimensions(fetch(url, _MAX_HEADER_BYTES, _DOWNLOAD_TIMEOUT_SECONDS))
+    return size
+
+
+@dataclass
+class AuditPhoto:
+    photo_id: int
+    photo_url: str
+    photo_size: Tuple[int, int]
+    icon_url: str
+    icon_size: Tuple[int, int]
+
+
+@dataclass
+class AuditStats:
+    scanned: int = 0
+    mismatched: int = 0
+    failed: int = 0
+    last_photo_id: int = 0
+
+
+def audit_photo_page(db: Session, *, after_id: int, limit: int) -> List[AuditPhoto]:
+    """The next live photos after `after_id` with their object URLs."""
+    stmt = (
+        select(TPhoto, Server.url.label("server_url"))
+        .outerjoin(Server, Server.id == TPhoto.server_id)
+        .where(
+            TPhoto.id > after_id,
+            TPhoto.deleted_ind.notin_(tphoto_crud.PURGEABLE_DELETED_INDS),
+        )
+        .order_by(TPhoto.id)
+        .limit(limit)
+    )
+    return [
+        AuditPhoto(
+            photo_id=int(photo.id),
+            photo_url=join_url(server_url or "", photo.filename),
+            photo_size=(int(photo.width), int(photo.height)),
+            icon_url=join_url(server_url or "", photo.icon_filename),
+            icon_size=(int(photo.icon_width), int(photo.icon_height)),
+        )
+        for photo, server_url in db.execute(stmt)
+    ]
+
+
+def audit_photo(
+    photo: AuditPhoto,
+    *,
+    audited_at: datetime,
+    fetch: Callable[[str, int, float], bytes] = fetch_head,
+) -> Optional[dict]:
+    """The tphoto_dimension_audit row for a photo, or None if it matches."""
+    actual = {}
+    errors = []
+    for label, url, expected in (
+        ("photo", photo.photo_url, photo.photo_size),
+        ("icon", photo.icon_url, photo.icon_size),
+    ):
+        try:
+            size = read_dimensions(url, fetch)
+        except Exception as e:
+            logger.warning(f"Failed to read {label} {url}: {e}")
+            errors.append(f"{label.capitalize()} download failed: {e}")
+            continue
+        if size is None:
+            errors.append(f"Could not determine {label} dimensions")
+            continue
+        actual[f"{label}_width_actual"], actual[f"{label}_height_actual"] = size
+        if size != expected:
+            errors.append(
+                f"{label.capitalize()} dimensions mismatch: "
+                f"DB({expected[0]}x{expected[1]}) vs Actual({size[0]}x{size[1]})"
+            )
+    if not errors:
+        return None
+    return {
+        "photo_id": photo.photo_id,
+        "audited_timestamp": audited_at,
+        "error": "; ".join(errors)[:255],
+        **actual,
+    }
+
+
+def audit_photo_dimensions(
+    db: Session,
+    *,
+    batch_size: int = 2000,
+    workers: int = 64,
+    after_id: int = 0,
+    limit: Optional[int] = None,
+    fetch: Callable[[str, int, float], bytes] = fetch_head,
+    now: Optional[datetime] = None,
+) -> AuditStats:
+    """Audit live photos after `after_id`, recording the mismatches."""
+    audited_at = now or datetime.utcnow()
+    stats = AuditStats(last_photo_id=after_id)
+
+    def audit(photo: AuditPhoto) -> Optional[dict]:
+        return audit_photo(photo, audited_at=audited_at, fetch=fetch)
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="photo-audit"
+    ) as pool:
+        while limit is None or stats.scanned < limit:
+            page_size = batch_size
+            if limit is not None:
+                page_size = min(page_size, limit - stats.scanned)
+            page = audit_photo_page(db, after_id=stats.last_photo_id, limit=page_size)
+            if not page:
+                break
+            stats.scanned += len(page)
+            stats.last_photo_id = page[-1].photo_id
+
+            audits = [row for row in pool.map(audit, page) if row is not None]
+            tphoto_crud.set_dimension_audits(
+                db, photo_ids=[photo.photo_id for photo in page], audits=audits
+            )
+            for row in audits:
+                if "photo_width_actual" in row and "icon_width_actual" in row:
+                    stats.mismatched += 1
+                else:
+                    stats.failed += 1
+            logger.info(
+                f"Audited {stats.scanned} photos ({stats.mismatched} mismatched, "
+                f"{stats.failed} unreadable), up to id {stats.last_photo_id}"
+            )
+    return stats
@@ -0,0 +1,198 @@
+"""
+Size-bounded on-disk LRU cache of original photo bytes.
+
+Evaluating, rotating and moderating a photo each download the full original
+from its public server, and admins tend to repeat these on the same photos.
+Stored objects never change under a given filename (rotation writes a new
+revision), so bytes are cached by server id and filename in a directory
+shared by every worker on the host.
+
+Entries are written to a temporary file and renamed into place, so readers
+never see a partial photo, and are read through mmap. A hit touches the
+file's mtime, which makes mtime the recency order: once the cache outgrows
+PHOTO_CACHE_MAX_BYTES the oldest entries are removed until it is back under
+90% of the limit. Each process keeps an estimate of the total size and only
+rescans the directory when that estimate crosses the limit.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from api.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TMP_PREFIX = ".tmp-"
+# Temporary files older than this were left by a crashed writer
+_STALE_TMP_SECONDS = 3600
+# Eviction stops once the cache is this fraction of its limit
+_LOW_WATER = 0.9
+
+
+class PhotoCacheStats:
+    """Process-wide counts of cache lookups, writes and evictions."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def record(self, **counts: int) -> None:
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.stores = 0
+            self.evictions = 0
+
+
+class PhotoCache:
+    """Photo bytes by (server id, filename) under one directory."""
+
+    def __init__(self, directory: Optional[str], max_bytes: int):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "photo-cache")
+        self.max_bytes = max_bytes
+        self.stats = PhotoCacheStats()
+        # Estimated bytes on disk; None until the directory is first scanned
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, server_id: int, filename: str) -> str:
+        digest = hashlib.sha256(f"{server_id}/{filename}".encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, server_id: int, filename: str) -> Optional[bytes]:
+        path = self._path(server_id, filename)
+        try:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    data = mapped[:]
+            os.utime(path)
+        except (OSError, ValueError):
+            # Missing, evicted by another worker, or empty (cannot be mapped)
+            self.stats.record(misses=1)
+            return None
+        self.stats.record(hits=1)
+        return data
+
+    def put(self, server_id: int, filename: str, data: bytes) -> None:
+        if not data or len(data) > self.max_bytes:
+            return
+        path = self._path(server_id, filename)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=_TMP_PREFIX, dir=os.path.dirname(path)
+            )
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to cache photo {server_id}/{filename}: {e}")
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return
+        self.stats.record(stores=1)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += len(data)
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def get_or_fetch(
+        self, server_id: int, filename: str, fetch: Callable[[], bytes]
+    ) -> bytes:
+        """Cached bytes for a photo, calling `fetch` and caching on a miss."""
+        if not settings.PHOTO_CACHE_ENABLED:
+            return fetch()
+        data = self.get(server_id, filename)
+        if data is None:
+            data = fetch()
+            self.put(server_id, filename, data)
+        return data
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every entry, removing stale temporary files."""
+        entries = []
+        now = time.time()
+        try:
+            shards = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return []
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                    if entry.name.startswith(_TMP_PREFIX):
+                        if now - stat.st_mtime > _STALE_TMP_SECONDS:
+                            os.remove(entry.path)
+                        continue
+                except OSError:
+                    continue  # Removed by another worker meanwhile
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _disk_usage(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """Remove least recently used entries until under the low-water mark."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * _LOW_WATER)
+            removed = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass  # Another worker evicted it first
+                except OSError as e:
+                    logger.warning(f"Failed to evict cached photo {path}: {e}")
+                    continue
+                total -= size
+            self._size = total
+        if removed:
+            self.stats.record(evictions=removed)
+            logger.info(f"Evicted {removed} cached photos")
+        return removed
+
+
+photo_cache = PhotoCache(
+    directory=settings.PHOTO_CACHE_DIR,
+    max_bytes=settings.PHOTO_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,170 @@
+"""
+Removal of S3 objects belonging to soft-deleted and moderated photos.
+
+Photos with deleted_ind 'Y' or 'M' keep their rows, but after
+PHOTO_PURGE_RETENTION_DAYS their stored objects (photo, thumbnail,
+renditions and variants) are deleted. tphoto records no deletion time, so
+each run first marks newly deleted photos in tphoto_purge; the retention
+window runs from that mark, and a photo restored in the meantime is never
+touched.
+
+Due photos are streamed in id order a page at a time. Their keys are
+grouped into DeleteObjects requests of up to 1000 keys, sent concurrently,
+and photos whose keys all went are recorded as purged. A checkpoint file
+holds the last fully processed photo id so an interrupted run resumes where
+it stopped; it is cleared when a run completes, so photos whose deletes
+failed are retried by the next run.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.crud import tphoto as tphoto_crud
+from api.services.s3_service import S3Service
+
+logger = logging.getLogger(__name__)
+
+# S3 DeleteObjects accepts at most this many keys per request
+MAX_KEYS_PER_DELETE = 1000
+
+
+@dataclass
+class CleanupStats:
+    marked: int = 0
+    scanned: int = 0
+    purged: int = 0
+    keys_deleted: int = 0
+    keys_failed: int = 0
+    last_photo_id: int = 0
+
+
+class CleanupCheckpoint:
+    """The last fully processed photo id, kept in a small JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> int:
+        try:
+            with open(self.path) as f:
+                return int(json.load(f)["last_photo_id"])
+        except FileNotFoundError:
+            return 0
+
+    def save(self, last_photo_id: int) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"last_photo_id": last_photo_id}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def key_batches(
+    keys_by_photo: Dict[int, List[str]], max_keys: int = MAX_KEYS_PER_DELETE
+) -> List[List[str]]:
+    """Split keys into delete requests, keeping each photo's keys together."""
+    batches: List[List[str]] = []
+    current: List[str] = []
+    for keys in keys_by_photo.values():
+        if current and len(current) + len(keys) > max_keys:
+            batches.append(current)
+            current = []
+        current.extend(keys)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def cleanup_deleted_photos(
+    db: Session,
+    *,
+    s3_service: S3Service,
+    retention_days: int,
+    batch_size: int = 2000,
+    workers: int = 4,
+    dry_run: bool = False,
+    checkpoint: Optional[CleanupCheckpoint] = None,
+    now: Optional[datetime] = None,
+) -> CleanupStats:
+    """
+    Delete the stored objects of photos deleted for over `retention_days`.
+
+    A dry run writes nothing (no marks, purges or checkpoint) and counts
+    the keys that would be deleted from photos already due.
+    """
+    now = now or datetime.utcnow()
+    server_id = settings.PHOTOS_SERVER_ID
+    stats = CleanupStats(last_photo_id=checkpoint.load() if checkpoint else 0)
+    if stats.last_photo_id:
+        logger.info(f"Resuming cleanup after photo {stats.last_photo_id}")
+
+    if not dry_run:
+        stats.marked = tphoto_crud.mark_deleted_photos(
+            db, server_id=server_id, seen_at=now
+        )
+        logger.info(f"Marked {stats.marked} newly deleted photos")
+
+    cutoff = now - timedelta(days=retention_days)
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="photo-cleanup"
+    ) as pool:
+        while True:
+            keys_by_photo = tphoto_crud.purgeable_photo_keys(
+                db,
+                server_id=server_id,
+                cutoff=cutoff,
+                after_id=stats.last_photo_id,
+                limit=batch_size,
+            )
+            if not keys_by_photo:
+                break
+            stats.scanned += len(keys_by_photo)
+            stats.last_photo_id = max(keys_by_photo)
+            batches = key_batches(keys_by_photo)
+            key_count = sum(len(batch) for batch in batches)
+
+            if dry_run:
+                stats.keys_deleted += key_count
+                logger.info(
+                    f"Dry run: would delete {key_count} keys of "
+                    f"{len(keys_by_photo)} photos up to id {stats.last_photo_id}"
+                )
+                continue
+
+            failed = set()
+            for failed_keys in pool.map(s3_service.delete_objects, batches):
+                failed.update(failed_keys)
+            purged = [
+                photo_id
+                for photo_id, keys in keys_by_photo.items()
+                if failed.isdisjoint(keys)
+            ]
+            tphoto_crud.set_photos_purged(db, photo_ids=purged, purged_at=now)
+            stats.purged += len(purged)
+            stats.keys_deleted += key_count - len(failed)
+            stats.keys_failed += len(failed)
+            if checkpoint:
+                checkpoint.save(stats.last_photo_id)
+            logger.info(
+                f"Purged {stats.purged} photos ({stats.keys_deleted} keys, "
+                f"{stats.keys_failed} failed), up to id {stats.last_photo_id}"
+            )
+
+    if checkpoint and not dry_run:
+        checkpoint.clear()
+    return stats
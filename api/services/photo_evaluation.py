@@ -0,0 +1,172 @@
+"""
+Photo evaluation for /v1/photos/{id}/evaluate.
+
+The photo and icon are fetched concurrently over the shared keep-alive
+session. Once they arrive, the orientation analysis (pre-screened locally on
+the icon) and the moderation Rekognition call run in parallel. The whole
+evaluation runs under one deadline, so worst-case latency is roughly the
+slowest step rather than the sum of all of them. Anything that has not
+finished by the deadline is reported in `errors`, with the checks that did
+finish left in place.
+"""
+
+import asyncio
+import logging
+from typing import Optional, Tuple
+
+import requests
+
+from api.models.tphoto import TPhoto
+from api.schemas.tphoto import TPhotoEvaluationResponse
+from api.services.http_client import get_http_session
+from api.services.photo_cache import photo_cache
+from api.services.rekognition import RekognitionService, get_image_dimensions
+
+logger = logging.getLogger(__name__)
+
+# Per-download cap; the overall deadline usually bites first
+_DOWNLOAD_TIMEOUT_SECONDS = 30.0
+
+
+def download_bytes(url: str, timeout: float) -> bytes:
+    """GET a URL over the shared session and return the body."""
+    response = get_http_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+async def evaluate_photo(
+    photo: TPhoto,
+    photo_url: str,
+    icon_url: str,
+    *,
+    rekognition: RekognitionService,
+    deadline_seconds: float,
+) -> TPhotoEvaluationResponse:
+    """Run every check for a photo within `deadline_seconds`."""
+    response = TPhotoEvaluationResponse(
+        photo_id=int(photo.id),
+        photo_accessible=False,
+        icon_accessible=False,
+        photo_dimension_match=False,
+        icon_dimension_match=False,
+        errors=[],
+    )
+    timeout = min(_DOWNLOAD_TIMEOUT_SECONDS, deadline_seconds)
+
+    def download(label: str, url: str) -> bytes:
+        logger.info(f"Downloading {label} from: {url}")
+        return download_bytes(url, timeout)
+
+    async def fetch(label: str, filename: str, url: str) -> Optional[bytes]:
+        try:
+            return await asyncio.to_thread(
+                photo_cache.get_or_fetch,
+                int(photo.server_id),
+                filename,
+                lambda: download(label, url),
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to download {label} {url}: {e}")
+            response.errors.append(f"{label.capitalize()} download failed: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error processing {label} {url}: {e}")
+            response.errors.append(f"{label.capitalize()} processing error: {str(e)}")
+        return None
+
+    def check_dimensions(
+        label: str, image_bytes: bytes, expected: Tuple[int, int]
+    ) -> Tuple[Optional[int], Optional[int], bool]:
+        """Actual width and height, and whether they match the database."""
+        actual_width, actual_height = get_image_dimensions(image_bytes)
+        if actual_width is None or actual_height is None:
+            response.errors.append(f"Could not determine {label} dimensions")
+            return None, None, False
+        if (actual_width, actual_height) != expected:
+            response.errors.append(
+                f"{label.capitalize()} dimensions mismatch: "
+                f"DB({expected[0]}x{expected[1]}) "
+                f"vs Actual({actual_width}x{actual_height})"
+            )
+            return actual_width, actual_height, False
+        return actual_width, actual_height, True
+
+    icon_download = asyncio.ensure_future(
+        fetch("icon", str(photo.icon_filename), icon_url)
+    )
+
+    async def check_photo() -> None:
+        photo_bytes = await fetch("photo", str(photo.filename), photo_url)
+        if photo_bytes is None:
+            response.errors.append("No photo data available for AWS analysis")
+            return
+        response.photo_accessible = True
+        try:
+            (
+                response.photo_width_actual,
+                response.photo_height_actual,
+                response.photo_dimension_match,
+            ) = check_dimensions(
+                "photo", photo_bytes, (int(photo.width), int(photo.height))
+            )
+        except Exception as e:
+            logger.error(f"Error processing photo {photo_url}: {e}")
+            response.errors.append(f"Photo processing error: {str(e)}")
+
+        # The orientation pre-screen works on the icon
+        icon_bytes = await icon_download
+        try:
+            orientation_result, moderation_result = await asyncio.gather(
+                asyncio.to_thread(
+                    rekognition.analyse_orientation, photo_bytes, icon_bytes
+                ),
+                asyncio.to_thread(rekognition.moderate_content, photo_bytes),
+            )
+        except Exception as e:
+            logger.error(f"AWS Rekognition analysis failed: {e}")
+            response.errors.append(f"AWS analysis error: {str(e)}")
+            return
+        if orientation_result:
+            response.orientation_analysis = orientation_result
+        else:
+            response.errors.append(
+                "Orientation analysis unavailable (AWS configuration issue)"
+            )
+        if moderation_result:
+            response.content_moderation = moderation_result
+        else:
+            response.errors.append(
+                "Content moderation unavailable (AWS configuration issue)"
+            )
+
+    async def check_icon() -> None:
+        icon_bytes = await icon_download
+        if icon_bytes is None:
+            return
+        response.icon_accessible = True
+        try:
+            (
+                response.icon_width_actual,
+                response.icon_height_actual,
+                response.icon_dimension_match,
+            ) = check_dimensions(
+                "icon", icon_bytes, (int(photo.icon_width), int(photo.icon_height))
+            )
+        except Exception as e:
+            logger.error(f"Error processing icon {icon_url}: {e}")
+            response.errors.append(f"Icon processing error: {str(e)}")
+
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(check_photo(), check_icon()), timeout=deadline_seconds
+        )
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"Evaluation of photo {photo.id} exceeded {deadline_seconds}s deadline"
+        )
+        response.errors.append(
+            f"Evaluation incomplete: exceeded {deadline_seconds:g}s deadline"
+        )
+        icon_download.cancel()
+
+    return response
@@ -0,0 +1,347 @@
+"""
+Near-duplicate photo detection with perceptual hashes.
+
+Every photo's thumbnail has a 64-bit dHash (see `image_processor.dhash`),
+stored in tphoto_hash. All hashes are held in memory in a BK-tree, a metric
+tree over Hamming distance: each child edge is labelled with its distance to
+the parent, so by the triangle inequality a search within distance d of a
+node at distance k only needs the children labelled k-d..k+d. Looking up an
+upload against a million photos visits a few hundred nodes, well under a
+millisecond.
+
+The tree is built from the database on a background thread at startup,
+and every PHOTO_HASH_CATCHUP_SECONDS it picks up hashes with photo ids
+above the highest one loaded (uploads handled by other workers). Uploads
+never wait for either: until the first build finishes they are not checked
+for duplicates. Photos are never removed from the tree; deleted ones are
+filtered out when results are resolved against the database, and a rotated
+photo is indexed under its new hash while the old one lingers until the
+next build.
+
+`backfill_photo_hashes` hashes existing thumbnails; run it via
+scripts/backfill_photo_hashes.py.
+"""
+
+import io
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.crud import tphoto as tphoto_crud
+from api.models.server import Server
+from api.models.tphoto import TPhoto, TPhotoHash
+from api.services.background_refresh import BackgroundRefresh
+from api.services.image_processor import dhash
+from api.services.photo_evaluation import download_bytes
+from api.utils.url import join_url
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip while building the index
+BUILD_BATCH_SIZE = 5000
+
+_DOWNLOAD_TIMEOUT_SECONDS = 10.0
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def hash_to_hex(value: int) -> str:
+    return f"{value:016x}"
+
+
+def image_dhash(image_bytes: bytes) -> Optional[int]:
+    """dHash of encoded image bytes, or None if they can't be decoded."""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            img.draft("RGB", (settings.THUMBNAIL_SIZE, settings.THUMBNAIL_SIZE))
+            return dhash(img)
+    except Exception as e:
+        logger.warning(f"Could not hash image: {e}")
+        return None
+
+
+class _Node:
+    __slots__ = ("value", "photo_ids", "children")
+
+    def __init__(self, value: int, photo_id: int):
+        self.value = value
+        self.photo_ids = [photo_id]
+        self.children: Dict[int, "_Node"] = {}
+
+
+class BKTree:
+    """Burkhard-Keller tree of 64-bit hashes under Hamming distance."""
+
+    def __init__(self) -> None:
+        self._root: Optional[_Node] = None
+        self.size = 0
+
+    def add(self, value: int, photo_id: int) -> None:
+        self.size += 1
+        if self._root is None:
+            self._root = _Node(value, photo_id)
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node.value)
+            if distance == 0:
+                node.photo_ids.append(photo_id)
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _Node(value, photo_id)
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, int]]:
+        """(photo id, distance) for every hash within `max_distance`."""
+        matches: List[Tuple[int, int]] = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node.value)
+            if distance <= max_distance:
+                matches.extend((photo_id, distance) for photo_id in node.photo_ids)
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(
+                child for edge, child in node.children.items() if low <= edge <= high
+            )
+        return matches
+
+
+class PhotoHashIndex:
+    """Thread-safe BK-tree over every stored photo hash."""
+
+    def __init__(self) -> None:
+        self._tree = BKTree()
+        # Highest photo id loaded from the database
+        self._max_photo_id = 0
+        # Hashes indexed by `add` that a later load will return again
+        self._added: Dict[int, int] = {}
+        self._built_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    @property
+    def is_built(self) -> bool:
+        return self._built_at is not None
+
+    @property
+    def size(self) -> int:
+        return self._tree.size
+
+    def _load(self, db: Session, after_id: int) -> List[Tuple[int, int]]:
+        rows = db.execute(
+            select(TPhotoHash.photo_id, TPhotoHash.dhash)
+            .where(TPhotoHash.photo_id > after_id)
+            .order_by(TPhotoHash.photo_id)
+            .execution_options(yield_per=BUILD_BATCH_SIZE)
+        )
+        return [(int(photo_id), int(value, 16)) for photo_id, value in rows]
+
+    def build(self, db: Session) -> None:
+        """Load every hash, replacing the current tree."""
+        rows = self._load(db, 0)
+        tree = BKTree()
+        for photo_id, value in rows:
+            tree.add(value, photo_id)
+        max_photo_id = rows[-1][0] if rows else 0
+        with self._lock:
+            # Uploads indexed while the build was loading
+            for photo_id, value in self._added.items():
+                if photo_id > max_photo_id:
+                    tree.add(value, photo_id)
+            self._tree = tree
+            self._max_photo_id = max_photo_id
+            self._added = {k: v for k, v in self._added.items() if k > max_photo_id}
+            self._built_at = time.monotonic()
+        logger.info(f"Built photo hash index: {tree.size} photos")
+
+    def catch_up(self, db: Session) -> int:
+        """Add hashes stored since the last build or catch-up. Returns count."""
+        with self._lock:
+            after_id = self._max_photo_id
+        # Query without the lock so searches carry on meanwhile
+        rows = self._load(db, after_id)
+        with self._lock:
+            if self._built_at is None:
+                # Invalidated meanwhile; the next refresh rebuilds
+                return 0
+            added = 0
+            for photo_id, value in rows:
+                if self._added.pop(photo_id, None) is None:
+                    self._tree.add(value, photo_id)
+                    added += 1
+            if rows:
+                self._max_photo_id = max(self._max_photo_id, rows[-1][0])
+            self._built_at = time.monotonic()
+            return added
+
+    def invalidate(self) -> None:
+        """Drop the contents; the next refresh rebuilds from the database."""
+        with self._lock:
+            self._tree = BKTree()
+            self._max_photo_id = 0
+            self._added = {}
+            self._built_at = None
+
+    def seconds_since_refresh(self) -> float:
+        if self._built_at is None:
+            return float("inf")
+        return time.monotonic() - self._built_at
+
+    def add(self, photo_id: int, value: int) -> None:
+        """Index a newly stored photo."""
+        with self._lock:
+            self._tree.add(value, photo_id)
+            if photo_id > self._max_photo_id:
+                self._added[photo_id] = value
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, int]]:
+        with self._lock:
+            return self._tree.search(value, max_distance)
+
+
+photo_hash_index = PhotoHashIndex()
+
+
+def refresh_photo_hash_index(db: Session) -> None:
+    """Build the index if missing, otherwise catch it up."""
+    index = photo_hash_index
+    if not index.is_built:
+        index.build(db)
+        return
+    added = index.catch_up(db)
+    if added:
+        logger.info(f"Photo hash index caught up with {added} photos")
+
+
+photo_hash_refresher = BackgroundRefresh("photo-hash", refresh_photo_hash_index)
+
+
+def get_photo_hash_index() -> Optional[PhotoHashIndex]:
+    """
+    The hash index, or None until its first build has finished.
+
+    Never queries the database itself; a due build or catch-up is started
+    in the background and the index is used as it stands meanwhile.
+    """
+    index = photo_hash_index
+    if index.seconds_since_refresh() >= settings.PHOTO_HASH_CATCHUP_SECONDS:
+        photo_hash_refresher.trigger()
+    return index if index.is_built else None
+
+
+def find_similar_photos(
+    db: Session,
+    value: int,
+    *,
+    max_distance: int,
+    user_id: Optional[int] = None,
+) -> List[int]:
+    """Live photos within `max_distance` of a hash, closest first.
+
+    With `user_id`, only that user's photos are returned.
+    """
+    index = get_photo_hash_index()
+    if index is None:
+        return []
+    matches = index.search(value, max_distance)
+    if not matches:
+        return []
+    owners = tphoto_crud.get_photo_owners(db, [photo_id for photo_id, _ in matches])
+    return [
+        photo_id
+        for photo_id, _ in sorted(matches, key=lambda m: (m[1], m[0]))
+        if photo_id in owners and (user_id is None or owners[photo_id] == user_id)
+    ]
+
+
+@dataclass
+class BackfillStats:
+    scanned: int = 0
+    hashed: int = 0
+    failed: int = 0
+    last_photo_id: int = 0
+
+
+def unhashed_photo_page(
+    db: Session, *, after_id: int, limit: int
+) -> List[Tuple[int, str]]:
+    """Next (photo id, thumbnail URL) pairs without a hash after `after_id`."""
+    stmt = (
+        select(TPhoto.id, TPhoto.icon_filename, Server.url.label("server_url"))
+        .select_from(TPhoto)
+        .outerjoin(Server, Server.id == TPhoto.server_id)
+        .outerjoin(TPhotoHash, TPhotoHash.photo_id == TPhoto.id)
+        .where(
+            TPhoto.id > after_id,
+            TPhoto.deleted_ind != "Y",
+            TPhotoHash.photo_id.is_(None),
+        )
+        .order_by(TPhoto.id)
+        .limit(limit)
+    )
+    return [
+        (int(row.id), join_url(row.server_url or "", row.icon_filename))
+        for row in db.execute(stmt)
+    ]
+
+
+def backfill_photo_hashes(
+    db: Session,
+    *,
+    batch_size: int,
+    workers: int,
+    after_id: int = 0,
+    limit: Optional[int] = None,
+    fetch: Callable[[str, float], bytes] = download_bytes,
+) -> BackfillStats:
+    """Hash the thumbnails of photos without a hash, in parallel."""
+    stats = BackfillStats(last_photo_id=after_id)
+
+    def fetch_and_hash(url: str) -> Optional[int]:
+        try:
+            return image_dhash(fetch(url, _DOWNLOAD_TIMEOUT_SECONDS))
+        except Exception as e:
+            logger.warning(f"Failed to download thumbnail {url}: {e}")
+            return None
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="photo-hash"
+    ) as pool:
+        while limit is None or stats.scanned < limit:
+            page_size = batch_size
+            if limit is not None:
+                page_size = min(page_size, limit - stats.scanned)
+            page = unhashed_photo_page(
+                db, after_id=stats.last_photo_id, limit=page_size
+            )
+            if not page:
+                break
+            stats.scanned += len(page)
+            stats.last_photo_id = page[-1][0]
+
+            hashes = pool.map(fetch_and_hash, [url for _, url in page])
+            rows = {
+                photo_id: hash_to_hex(value)
+                for (photo_id, _), value in zip(page, hashes)
+                if value is not None
+            }
+            tphoto_crud.set_photo_hashes(db, hashes=rows)
+            stats.hashed += len(rows)
+            stats.failed += len(page) - len(rows)
+            logger.info(
+                f"Hashed {stats.hashed} photos ({stats.failed} failed), "
+                f"up to id {stats.last_photo_id}"
+            )
+    return stats
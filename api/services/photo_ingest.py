@@ -0,0 +1,700 @@
+"""
+Photo ingestion pipeline: processing, storage and background jobs.
+
+`ingest_photo` turns an uploaded file into a stored photo: validate, resize
+and encode, create the tphoto row, upload both objects to S3 and record the
+keys. POST /v1/photos runs it inline by default.
+
+Clients that send `Prefer: respond-async` get `202 Accepted` instead. The raw
+upload is spooled to local disk and a job record is created, then the same
+pipeline runs on a small worker pool. Job status is kept in Redis (shared by
+all workers) with an in-process fallback, and is polled via
+/v1/photos/jobs/{job_id}. Without Redis a poll may reach a worker that has
+never seen the job, so the preference is ignored and uploads run inline.
+
+Direct uploads skip the API for the bytes entirely: /v1/photos/upload-url
+records a job awaiting upload and returns a presigned POST for a private
+staging key. The client uploads to S3, then completes the job, which queues
+it like any other; the worker reads the staged object instead of a spool
+file and deletes it when done.
+
+The worker pool's queue lives in memory, so a crash loses it. At startup
+`recover` fails the jobs whose spool files have sat untouched for
+PHOTO_INGEST_STALE_SECONDS and removes the files; they are not re-run, as a
+crash part way through may already have created the photo. Interrupted
+direct uploads are left to expire: their job records after the job TTL and
+their staging objects through the bucket lifecycle rule.
+
+Each upload's thumbnail hash is checked against the uploader's existing
+photos (see photo_hash); near-duplicates are reported in the response, or
+rejected with 409 when PHOTO_REJECT_DUPLICATES is set.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from redis.exceptions import RedisError, WatchError
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.core.redis_client import get_redis_client
+from api.core.uploads import NOT_JPEG_DETAIL, has_jpeg_signature, too_large_detail
+from api.crud import read_model
+from api.crud import tphoto as tphoto_crud
+from api.db.database import get_session_local
+from api.models.server import Server
+from api.models.user import TLog
+from api.services.activity import PHOTO_CREATED, publish_activity
+from api.services.image_formats import FORMATS, variant_key
+from api.services.image_processor import (
+    ImageProcessor,
+    ImageValidationError,
+    Rendition,
+)
+from api.services.photo_hash import find_similar_photos, hash_to_hex, photo_hash_index
+from api.services.s3_service import S3Service
+from api.utils.url import join_url
+
+logger = logging.getLogger(__name__)
+
+JOB_AWAITING_UPLOAD = "awaiting_upload"
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+_JOB_KEY_PREFIX = "photo_ingest:job:"
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class PhotoIngestError(Exception):
+    """A photo could not be ingested; carries the HTTP status to report."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def rendition_rows(
+    renditions: List[Rendition], rendition_keys: Dict[int, str]
+) -> List[Dict[str, Any]]:
+    """tphoto_rendition values for the renditions that reached S3."""
+    return [
+        {
+            "size": r.size,
+            "filename": rendition_keys[r.size],
+            "filesize": len(r.image_bytes),
+            "width": r.dimensions[0],
+            "height": r.dimensions[1],
+        }
+        for r in renditions
+        if r.size in rendition_keys
+    ]
+
+
+def variant_uploads(
+    thumbnail_key: str,
+    thumbnail_variants: Dict[str, bytes],
+    renditions: List[Rendition],
+    rendition_keys: Dict[int, str],
+) -> List[Tuple[Dict[str, Any], bytes]]:
+    """tphoto_variant values, with the bytes to upload, for every variant.
+
+    Variants sit next to their JPEG (see `image_formats.variant_key`); those
+    of renditions that did not reach S3 are left out.
+    """
+    sources = [(0, thumbnail_key, thumbnail_variants)] + [
+        (r.size, rendition_keys[r.size], r.variants)
+        for r in renditions
+        if r.size in rendition_keys
+    ]
+    return [
+        (
+            {
+                "size": size,
+                "format": format_key,
+                "filename": variant_key(jpeg_key, FORMATS[format_key]),
+                "filesize": len(data),
+            },
+            data,
+        )
+        for size, jpeg_key, variants in sources
+        for format_key, data in variants.items()
+    ]
+
+
+def upload_variants(
+    s3_service: S3Service, uploads: List[Tuple[Dict[str, Any], bytes]]
+) -> List[Dict[str, Any]]:
+    """Store variants in S3; returns the rows to record (none on failure)."""
+    if not uploads:
+        return []
+    objects = [(row["filename"], data) for row, data in uploads]
+    if not s3_service.upload_variants(objects):
+        return []
+    return [row for row, _ in uploads]
+
+
+def upload_chunks(source: IO[bytes], max_bytes: int) -> Iterator[bytes]:
+    """
+    Read an upload in chunks, failing as early as possible.
+
+    The first chunk must start with the JPEG signature (400), and reading
+    stops with 413 as soon as more than `max_bytes` have been read, so a
+    bad upload is never held in memory whole.
+    """
+    size = 0
+    while True:
+        chunk = source.read(_COPY_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise PhotoIngestError(413, too_large_detail(max_bytes))
+        if size == len(chunk) and not has_jpeg_signature(chunk):
+            raise PhotoIngestError(400, NOT_JPEG_DETAIL)
+        yield chunk
+    if size == 0:
+        raise PhotoIngestError(400, "Empty file")
+
+
+def read_upload(source: IO[bytes], max_bytes: Optional[int] = None) -> bytes:
+    """An upload's bytes, checked by `upload_chunks` as they are read."""
+    if max_bytes is None:
+        max_bytes = settings.MAX_IMAGE_SIZE
+    return b"".join(upload_chunks(source, max_bytes))
+
+
+def ingest_photo(
+    db: Session,
+    *,
+    tlog: TLog,
+    file_contents: bytes,
+    fields: Dict[str, Any],
+    client_ip: str,
+) -> Dict[str, Any]:
+    """
+    Process and store an uploaded photo for a log.
+
+    `fields` holds the form metadata (type, name, text_desc, public_ind).
+    Returns the photo response dict; raises PhotoIngestError on failure after
+    removing any partially created row.
+    """
+    # Validate and process the image on one parse of its header (renditions
+    # are made in the same resize cascade)
+    try:
+        processed = ImageProcessor().process(file_contents)
+    except ImageValidationError as e:
+        logger.error(f"Image validation failed: {e}")
+        raise PhotoIngestError(400, str(e))
+    except Exception as e:
+        logger.error(f"Failed to process image: {e}")
+        raise PhotoIngestError(500, "Failed to process image")
+    renditions = processed.renditions
+
+    # Near-duplicates of the uploader's existing photos
+    thumbnail_hash = processed.dhash
+    similar_photo_ids: List[int] = []
+    if thumbnail_hash is not None:
+        similar_photo_ids = find_similar_photos(
+            db,
+            thumbnail_hash,
+            max_distance=settings.PHOTO_DUPLICATE_MAX_DISTANCE,
+            user_id=int(tlog.user_id),
+        )
+        if similar_photo_ids and settings.PHOTO_REJECT_DUPLICATES:
+            raise PhotoIngestError(
+                409,
+                "Photo duplicates existing photo(s): "
+                + ", ".join(str(i) for i in similar_photo_ids),
+            )
+
+    # Create optimistic database record
+    try:
+        created = tphoto_crud.create_photo(
+            db,
+            log_id=int(tlog.id),
+            values={
+                "server_id": settings.PHOTOS_SERVER_ID,
+                "type": fields["type"],
+                "filename": "",  # Will be updated after S3 upload
+                "filesize": len(processed.photo_bytes),
+                "height": processed.photo_size[1],
+                "width": processed.photo_size[0],
+                "icon_filename": "",  # Will be updated after S3 upload
+                "icon_filesize": len(processed.thumbnail_bytes),
+                "icon_height": processed.thumbnail_size[1],
+                "icon_width": processed.thumbnail_size[0],
+                "name": fields["name"],
+                "text_desc": fields["text_desc"],
+                "ip_addr": client_ip,
+                "public_ind": fields["public_ind"],
+                "deleted_ind": "N",
+                "source": "F",
+            },
+        )
+    except Exception as e:
+        logger.error(f"Failed to create photo record: {e}")
+        raise PhotoIngestError(500, "Failed to create photo record")
+
+    # Upload to S3
+    s3_service = S3Service()
+    photo_key, thumbnail_key = s3_service.upload_photo_and_thumbnail(
+        int(created.id), processed.photo_bytes, processed.thumbnail_bytes
+    )
+
+    if not photo_key or not thumbnail_key:
+        # Rollback: delete the database record
+        try:
+            db.delete(created)
+            db.commit()
+        except Exception as rollback_error:
+            logger.error(f"Failed to rollback database record: {rollback_error}")
+
+        raise PhotoIngestError(500, "Failed to upload files")
+
+    # Renditions and format variants are optional extras: without them
+    # clients use the photo and JPEGs
+    rendition_keys = s3_service.upload_renditions(photo_key, renditions) or {}
+    variants = upload_variants(
+        s3_service,
+        variant_uploads(
+            thumbnail_key,
+            processed.thumbnail_variants,
+            renditions,
+            rendition_keys,
+        ),
+    )
+
+    # Update database record with S3 paths
+    try:
+        setattr(created, "filename", photo_key)
+        setattr(created, "icon_filename", thumbnail_key)
+        db.add(created)
+        tphoto_crud.set_photo_renditions(
+            db,
+            photo_id=int(created.id),
+            renditions=rendition_rows(renditions, rendition_keys),
+        )
+        tphoto_crud.set_photo_variants(db, photo_id=int(created.id), variants=variants)
+        if thumbnail_hash is not None:
+            tphoto_crud.set_photo_hash(
+                db, photo_id=int(created.id), dhash=hash_to_hex(thumbnail_hash)
+            )
+        db.commit()
+        db.refresh(created)
+    except Exception as e:
+        logger.error(f"Failed to update photo record: {e}")
+        db.rollback()
+        # Clean up S3 files
+        s3_service.delete_photo_and_thumbnail(
+            int(created.id),
+            rendition_keys=list(rendition_keys.values())
+            + [row["filename"] for row in variants],
+        )
+        # Delete database record
+        try:
+            db.delete(created)
+            db.commit()
+        except Exception as cleanup_error:
+            logger.error(f"Failed to cleanup database record: {cleanup_error}")
+
+        raise PhotoIngestError(500, "Failed to update photo record")
+
+    if thumbnail_hash is not None:
+        photo_hash_index.add(int(created.id), thumbnail_hash)
+
+    # Trigger async content moderation
+    try:
+        # Import here to avoid circular imports
+        from api.services.content_moderation import moderate_photo_async
+
+        moderate_photo_async(int(created.id), processed.photo_bytes)
+    except Exception as e:
+        logger.warning(f"Failed to trigger content moderation: {e}")
+        # Don't fail the upload, just log the warning
+
+    # Build response
+    server: Server | None = (
+        db.query(Server).filter(Server.id == created.server_id).first()
+    )
+    base_url = str(server.url) if server and server.url else ""
+    response = {
+        "id": created.id,
+        "log_id": created.tlog_id,
+        "user_id": int(tlog.user_id),
+        "type": str(created.type),
+        "filesize": int(created.filesize),
+        "height": int(created.height),
+        "width": int(created.width),
+        "icon_filesize": int(created.icon_filesize),
+        "icon_height": int(created.icon_height),
+        "icon_width": int(created.icon_width),
+        "caption": str(created.name),
+        "text_desc": str(created.text_desc),
+        "license": str(created.public_ind),
+        "photo_url": join_url(base_url, str(created.filename)),
+        "icon_url": join_url(base_url, str(created.icon_filename)),
+        "renditions": read_model.get_renditions(db, [int(created.id)]).get(
+            int(created.id), []
+        ),
+        "similar_photo_ids": similar_photo_ids,
+    }
+
+    # Push to live activity subscribers (SSE) now the row is committed
+    publish_activity(PHOTO_CREATED, response)
+
+    return response
+
+
+class PhotoJobStore:
+    """Job records in Redis (shared across workers) or, failing that, memory."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        # job id -> (monotonic expiry, job)
+        self._local: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def is_shared(self) -> bool:
+        """Whether every worker process sees the same jobs (Redis is set up)."""
+        return get_redis_client() is not None
+
+    def save(self, job: Dict[str, Any]) -> None:
+        job["updated_at"] = datetime.now(timezone.utc).isoformat()
+        redis_client = get_redis_client()
+        if redis_client:
+            try:
+                redis_client.setex(
+                    _JOB_KEY_PREFIX + job["id"], self.ttl_seconds, json.dumps(job)
+                )
+                return
+            except RedisError as e:
+                logger.warning(f"Redis job write failed, keeping job locally: {e}")
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (expiry, _) in self._local.items() if expiry <= now]
+            for key in expired:
+                del self._local[key]
+            self._local[job["id"]] = (now + self.ttl_seconds, dict(job))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        redis_client = get_redis_client()
+        if redis_client:
+            try:
+                raw = redis_client.get(_JOB_KEY_PREFIX + job_id)
+                if raw and isinstance(raw, str):
+                    return json.loads(raw)
+            except RedisError as e:
+                logger.warning(f"Redis job read failed: {e}")
+        with self._lock:
+            entry = self._local.get(job_id)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return dict(entry[1])
+
+    def update(self, job_id: str, **changes: Any) -> Optional[Dict[str, Any]]:
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.update(changes)
+        self.save(job)
+        return job
+
+    def transition(
+        self, job_id: str, from_status: str, **changes: Any
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Apply `changes` only if the job is still in `from_status`.
+
+        Atomic across workers (WATCH/MULTI in Redis) and threads: of two
+        concurrent callers only one gets the updated job, the other None.
+        """
+        redis_client = get_redis_client()
+        if redis_client:
+            key = _JOB_KEY_PREFIX + job_id
+            try:
+                with redis_client.pipeline() as pipe:
+                    while True:
+                        try:
+                            pipe.watch(key)
+                            raw = pipe.get(key)
+                            if not raw or not isinstance(raw, str):
+                                pipe.unwatch()
+                                break
+                            job = json.loads(raw)
+                            if job["status"] != from_status:
+                                return None
+                            job.update(changes)
+                            job["updated_at"] = datetime.now(timezone.utc).isoformat()
+                            pipe.multi()
+                            pipe.setex(key, self.ttl_seconds, json.dumps(job))
+                            pipe.execute()
+                            return job
+                        except WatchError:
+                            continue  # Changed under us; look again
+            except RedisError as e:
+                logger.warning(f"Redis job transition failed: {e}")
+        with self._lock:
+            entry = self._local.get(job_id)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            job = entry[1]
+            if job["status"] != from_status:
+                return None
+            job.update(changes)
+            job["updated_at"] = datetime.now(timezone.utc).isoformat()
+            return dict(job)
+
+
+class PhotoIngestService:
+    """Accepts spooled uploads and processes them on a worker pool."""
+
+    def __init__(
+        self,
+        spool_dir: Optional[str],
+        max_workers: int,
+        job_ttl_seconds: int,
+    ):
+        self.spool_dir = spool_dir or os.path.join(
+            tempfile.gettempdir(), "photo-ingest"
+        )
+        self.max_workers = max_workers
+        self.jobs = PhotoJobStore(ttl_seconds=job_ttl_seconds)
+        # Workers open their own sessions; the request session is long gone
+        self.session_factory: Callable[[], Session] = lambda: get_session_local()()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _spool_path(self, job_id: str) -> str:
+        return os.path.join(self.spool_dir, f"{job_id}.upload")
+
+    def spool_upload(self, job_id: str, source: IO[bytes], max_bytes: int) -> int:
+        """Copy an upload to the spool directory in chunks. Returns its size."""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = self._spool_path(job_id)
+        size = 0
+        try:
+            with open(path, "wb") as out:
+                for chunk in upload_chunks(source, max_bytes):
+                    size += len(chunk)
+                    out.write(chunk)
+        except BaseException:
+            self._discard_spool(job_id)
+            raise
+        return size
+
+    def _discard_spool(self, job_id: str) -> None:
+        try:
+            os.remove(self._spool_path(job_id))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove spooled upload for job {job_id}: {e}")
+
+    def submit(
+        self,
+        *,
+        source: IO[bytes],
+        tlog: TLog,
+        fields: Dict[str, Any],
+        client_ip: str,
+    ) -> Dict[str, Any]:
+        """Spool an upload, record a queued job and hand it to the pool."""
+        job_id = uuid.uuid4().hex
+        self.spool_upload(job_id, source, settings.MAX_IMAGE_SIZE)
+        job = {
+            "id": job_id,
+            "status": JOB_QUEUED,
+            "log_id": int(tlog.id),
+            "user_id": int(tlog.user_id),
+            "fields": fields,
+            "client_ip": client_ip,
+            "photo_id": None,
+            "photo": None,
+            "error": None,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self.jobs.save(job)
+        self.enqueue(job_id)
+        return job
+
+    def create_upload(
+        self,
+        *,
+        tlog: TLog,
+        fields: Dict[str, Any],
+        client_ip: str,
+        s3_service: S3Service,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Record a job awaiting a direct upload and presign its staging key.
+
+        Returns the job and the presigned POST ({"url", "fields"}).
+        """
+        job_id = uuid.uuid4().hex
+        staging_key = s3_service.staging_key(job_id)
+        presigned = s3_service.presigned_upload(
+            staging_key,
+            settings.MAX_IMAGE_SIZE,
+            settings.PHOTO_UPLOAD_URL_EXPIRY_SECONDS,
+        )
+        if presigned is None:
+            raise PhotoIngestError(503, "Photo storage unavailable")
+        job = {
+            "id": job_id,
+            "status": JOB_AWAITING_UPLOAD,
+            "log_id": int(tlog.id),
+            "user_id": int(tlog.user_id),
+            "fields": fields,
+            "client_ip": client_ip,
+            "staging_key": staging_key,
+            "photo_id": None,
+            "photo": None,
+            "error": None,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self.jobs.save(job)
+        return job, presigned
+
+    def complete_upload(self, job_id: str, s3_service: S3Service) -> Dict[str, Any]:
+        """Queue a job once its direct upload has landed in staging."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise PhotoIngestError(404, "Job not found")
+        if job["status"] != JOB_AWAITING_UPLOAD:
+            raise PhotoIngestError(409, f"Job is already {job['status']}")
+        size = s3_service.object_size(job["staging_key"])
+        if not size:
+            raise PhotoIngestError(400, "Upload not found; POST the file first")
+        if size > settings.MAX_IMAGE_SIZE:
+            s3_service.delete_object(job["staging_key"])
+            raise PhotoIngestError(413, too_large_detail(settings.MAX_IMAGE_SIZE))
+        # Concurrent or retried completions: only the one that moves the job
+        # out of awaiting_upload queues it
+        queued = self.jobs.transition(job_id, JOB_AWAITING_UPLOAD, status=JOB_QUEUED)
+        if queued is None:
+            current = self.jobs.get(job_id) or job
+            raise PhotoIngestError(409, f"Job is already {current['status']}")
+        self.enqueue(job_id)
+        return queued
+
+    def _read_source(self, job: Dict[str, Any]) -> bytes:
+        """The uploaded bytes: a staged S3 object or a local spool file."""
+        if job.get("staging_key"):
+            body = S3Service().open_object(job["staging_key"])
+            if body is None:
+                raise PhotoIngestError(400, "Upload not found")
+            return read_upload(body)
+        with open(self._spool_path(job["id"]), "rb") as f:
+            return f.read()
+
+    def _discard_source(self, job: Dict[str, Any]) -> None:
+        if job.get("staging_key"):
+            S3Service().delete_object(job["staging_key"])
+        else:
+            self._discard_spool(job["id"])
+
+    def enqueue(self, job_id: str) -> Future:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="photo-ingest"
+                )
+        return self._executor.submit(self.process_job, job_id)
+
+    def process_job(self, job_id: str) -> None:
+        """Run the ingestion pipeline for a queued job and record the outcome."""
+        job = self.jobs.transition(job_id, JOB_QUEUED, status=JOB_PROCESSING)
+        if job is None:
+            logger.error(f"Photo ingest job {job_id} not found or not queued")
+            self._discard_spool(job_id)
+            return
+
+        db = self.session_factory()
+        try:
+            tlog = db.query(TLog).filter(TLog.id == job["log_id"]).first()
+            if not tlog:
+                raise PhotoIngestError(404, "Log not found")
+            file_contents = self._read_source(job)
+            photo = ingest_photo(
+                db,
+                tlog=tlog,
+                file_contents=file_contents,
+                fields=job["fields"],
+                client_ip=job["client_ip"],
+            )
+            self.jobs.update(
+                job_id,
+                status=JOB_SUCCEEDED,
+                photo_id=int(photo["id"]),
+                photo=photo,
+            )
+            logger.info(f"Photo ingest job {job_id} created photo {photo['id']}")
+        except PhotoIngestError as e:
+            logger.warning(f"Photo ingest job {job_id} failed: {e.detail}")
+            self.jobs.update(job_id, status=JOB_FAILED, error=e.detail)
+        except Exception as e:
+            logger.error(f"Photo ingest job {job_id} crashed: {e}")
+            self.jobs.update(job_id, status=JOB_FAILED, error="Internal error")
+        finally:
+            db.close()
+            self._discard_source(job)
+
+    def recover(self) -> int:
+        """
+        Fail the jobs of spool files left behind by a crashed worker.
+
+        Files younger than PHOTO_INGEST_STALE_SECONDS may belong to another
+        worker on this host and are kept. Returns the number removed.
+        """
+        try:
+            names = os.listdir(self.spool_dir)
+        except FileNotFoundError:
+            return 0
+        cutoff = time.time() - settings.PHOTO_INGEST_STALE_SECONDS
+        removed = 0
+        for name in names:
+            job_id, ext = os.path.splitext(name)
+            if ext != ".upload":
+                continue
+            try:
+                if os.path.getmtime(self._spool_path(job_id)) > cutoff:
+                    continue
+            except OSError:
+                continue
+            job = self.jobs.get(job_id)
+            if job is not None and job["status"] in (JOB_QUEUED, JOB_PROCESSING):
+                self.jobs.transition(
+                    job_id,
+                    job["status"],
+                    status=JOB_FAILED,
+                    error="Interrupted by a restart; please upload again",
+                )
+            self._discard_spool(job_id)
+            removed += 1
+        if removed:
+            logger.warning(f"Removed {removed} orphaned uploads from {self.spool_dir}")
+        return removed
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+photo_ingest_service = PhotoIngestService(
+    spool_dir=settings.PHOTO_INGEST_SPOOL_DIR,
+    max_workers=settings.PHOTO_INGEST_WORKERS,
+    job_ttl_seconds=settings.PHOTO_INGEST_JOB_TTL_SECONDS,
+)
@@ -0,0 +1,201 @@
+"""
+Reconciliation of the photo bucket against the tphoto tables.
+
+Finds two kinds of difference:
+
+- orphans: objects no photo row refers to, e.g. uploads whose database
+  transaction rolled back, superseded `_rN` rotation revisions, or objects
+  of purged photos that survived the purge;
+- missing: keys a live photo (or its renditions and variants) refers to
+  that are not in the bucket.
+
+Photo keys live in top-level folders ("000/", "001/", ...); other prefixes
+such as the upload staging area are left alone. Folders are listed
+concurrently with paginated list_objects_v2, which returns keys in binary
+order. Each folder's expected keys are sorted the same way in Python (not
+by the database, whose collation may differ) and merge-joined against the
+listing as it streams, so at most a few folders are held at once rather
+than the whole bucket or table.
+
+With fix, orphans older than a grace period are deleted; the grace period
+keeps in-flight uploads, whose rows are written after their objects, safe.
+Missing keys are only reported.
+"""
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.crud import tphoto as tphoto_crud
+from api.services.photo_cleanup import MAX_KEYS_PER_DELETE
+from api.services.s3_service import S3Service
+
+logger = logging.getLogger(__name__)
+
+ORPHAN = "orphan"
+MISSING = "missing"
+
+PHOTO_FOLDER = re.compile(r"^\d+/$")
+
+ExpectedKey = Tuple[str, int, bool]
+
+
+@dataclass
+class Difference:
+    kind: str
+    key: str
+    photo_id: Optional[int] = None
+    size: Optional[int] = None
+    last_modified: Optional[datetime] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "key": self.key,
+            "photo_id": self.photo_id,
+            "size": self.size,
+            "last_modified": (
+                self.last_modified.isoformat() if self.last_modified else None
+            ),
+        }
+
+
+@dataclass
+class ReconcileStats:
+    prefixes: int = 0
+    objects: int = 0
+    expected: int = 0
+    orphans: int = 0
+    orphan_bytes: int = 0
+    missing: int = 0
+    deleted: int = 0
+    delete_failed: int = 0
+
+
+def merge_join(
+    expected: List[ExpectedKey], objects: Iterable[Dict[str, Any]]
+) -> Iterator[Difference]:
+    """
+    Compare sorted expected keys with a key-ordered object listing.
+
+    `expected` must be sorted by key; duplicate keys are allowed. Keys of
+    deleted (not live) photos are tolerated in either direction.
+    """
+    position = 0
+    for obj in objects:
+        key = obj["Key"]
+        while position < len(expected) and expected[position][0] < key:
+            missing_key, photo_id, live = expected[position]
+            if live:
+                yield Difference(MISSING, missing_key, photo_id=photo_id)
+            position += 1
+        if position < len(expected) and expected[position][0] == key:
+            while position < len(expected) and expected[position][0] == key:
+                position += 1
+        else:
+            yield Difference(
+                ORPHAN, key, size=obj.get("Size"), last_modified=obj.get("LastModified")
+            )
+    for missing_key, photo_id, live in expected[position:]:
+        if live:
+            yield Difference(MISSING, missing_key, photo_id=photo_id)
+
+
+def _diff_prefix(
+    s3_service: S3Service, prefix: str, expected: List[ExpectedKey]
+) -> Tuple[int, List[Difference]]:
+    count = 0
+
+    def counted(objects: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        nonlocal count
+        for obj in objects:
+            count += 1
+            yield obj
+
+    differences = list(merge_join(expected, counted(s3_service.iter_objects(prefix))))
+    return count, differences
+
+
+def reconcile_photo_storage(
+    db: Session,
+    *,
+    s3_service: S3Service,
+    workers: int = 4,
+    prefixes: Optional[List[str]] = None,
+    fix: bool = False,
+    min_age: timedelta = timedelta(days=1),
+    report: Optional[Callable[[Difference], None]] = None,
+    now: Optional[datetime] = None,
+) -> ReconcileStats:
+    """
+    Compare the bucket with the photo tables and optionally delete orphans.
+
+    `prefixes` restricts the run to the given folders; by default every
+    photo folder in the bucket is checked. Each difference is passed to
+    `report` as it is found.
+    """
+    now = now or datetime.now(timezone.utc)
+    server_id = settings.PHOTOS_SERVER_ID
+    if prefixes is None:
+        prefixes = [p for p in s3_service.list_prefixes() if PHOTO_FOLDER.match(p)]
+    stats = ReconcileStats()
+    cutoff = now - min_age
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="photo-reconcile"
+    ) as pool:
+        # A window of folders at a time bounds memory to `workers` folders
+        for start in range(0, len(prefixes), workers):
+            window = prefixes[start : start + workers]
+            futures = []
+            for prefix in window:
+                expected = sorted(
+                    tphoto_crud.stored_keys_with_prefix(
+                        db, server_id=server_id, prefix=prefix
+                    )
+                )
+                stats.expected += len(expected)
+                futures.append(pool.submit(_diff_prefix, s3_service, prefix, expected))
+
+            removable: List[str] = []
+            for future in futures:
+                count, differences = future.result()
+                stats.objects += count
+                for difference in differences:
+                    if difference.kind == ORPHAN:
+                        stats.orphans += 1
+                        stats.orphan_bytes += difference.size or 0
+                        if (
+                            difference.last_modified is not None
+                            and difference.last_modified < cutoff
+                        ):
+                            removable.append(difference.key)
+                    else:
+                        stats.missing += 1
+                    if report:
+                        report(difference)
+            stats.prefixes += len(window)
+
+            if fix and removable:
+                batches = [
+                    removable[i : i + MAX_KEYS_PER_DELETE]
+                    for i in range(0, len(removable), MAX_KEYS_PER_DELETE)
+                ]
+                failed = sum(
+                    len(keys) for keys in pool.map(s3_service.delete_objects, batches)
+                )
+                stats.deleted += len(removable) - failed
+                stats.delete_failed += failed
+            logger.info(
+                f"Checked {stats.prefixes}/{len(prefixes)} folders: "
+                f"{stats.orphans} orphans, {stats.missing} missing, "
+                f"{stats.deleted} deleted"
+            )
+
+    return stats
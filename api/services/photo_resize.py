@@ -0,0 +1,250 @@
+"""
+On-demand resized copies of photos: /v1/photos/{id}/image?w=&h=&fit=.
+
+Map popups, social cards and retina thumbnails need sizes between the
+120px thumbnail and the full photo. Each requested size is cut from the
+smallest stored image that covers it (thumbnail, rendition or original),
+fetched through the photo cache, decoded in JPEG draft mode at the nearest
+scale above the target, then resized and encoded. Results are kept in an
+on-disk LRU (the same cache as the photo cache, in its own directory).
+
+Widths and heights must come from PHOTO_RESIZE_SIZES, which bounds how many
+copies of a photo the cache can hold. The version in a resized image's URL
+is a hash of the photo's stored filename, so it changes when the photo is
+rotated; versioned responses can be cached forever.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from api.core.config import settings
+from api.models.tphoto import TPhoto, TPhotoRendition
+from api.services.image_formats import JPEG, ImageFormat, encode
+from api.services.photo_cache import PhotoCache, photo_cache
+from api.services.photo_evaluation import download_bytes
+from api.utils.url import join_url
+
+logger = logging.getLogger(__name__)
+
+FITS = ("contain", "cover")
+
+_DOWNLOAD_TIMEOUT_SECONDS = 30.0
+
+# EXIF orientations that swap width and height
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+# Resized images are cached under this pseudo server id
+_RESIZED_SERVER_ID = 0
+
+
+class PhotoResizeError(Exception):
+    """A resized photo could not be served; carries the HTTP status to report."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass(frozen=True)
+class ResizeSpec:
+    """A requested box and how to fit the photo into it."""
+
+    width: Optional[int]
+    height: Optional[int]
+    fit: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.width or ''}x{self.height or ''}-{self.fit}"
+
+
+@dataclass
+class ResizeSource:
+    """A stored image of a photo that a resized copy can be cut from."""
+
+    server_id: int
+    filename: str
+    url: str
+    size: Tuple[int, int]
+
+
+@dataclass
+class ResizedImage:
+    name: str  # Cache key: photo, version, size, fit and format
+    image_bytes: bytes
+    image_format: ImageFormat
+
+    @property
+    def etag(self) -> str:
+        return f'"{hashlib.sha256(self.name.encode()).hexdigest()[:16]}"'
+
+
+def resize_spec(width: Optional[int], height: Optional[int], fit: str) -> ResizeSpec:
+    """Check a request against the size whitelist."""
+    if width is None and height is None:
+        raise PhotoResizeError(400, "Give a width (w), a height (h) or both")
+    if fit not in FITS:
+        raise PhotoResizeError(400, f"fit must be one of: {', '.join(FITS)}")
+    if fit == "cover" and (width is None or height is None):
+        raise PhotoResizeError(400, "fit=cover needs both a width and a height")
+    allowed = settings.PHOTO_RESIZE_SIZES
+    for value in (width, height):
+        if value is not None and value not in allowed:
+            raise PhotoResizeError(
+                400,
+                f"Size {value} not allowed; use one of "
+                f"{', '.join(str(s) for s in sorted(allowed))}",
+            )
+    return ResizeSpec(width, height, fit)
+
+
+def resize_version(photo: TPhoto) -> str:
+    """Changes whenever the photo gets a new stored revision."""
+    key = f"{photo.id}:{photo.server_id}:{photo.filename}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def scaled_size(original: Tuple[int, int], spec: ResizeSpec) -> Tuple[int, int]:
+    """
+    Size to scale the photo to (before any crop), never larger than it is.
+
+    `contain` fits inside the box; `cover` fills it, overflowing on one side.
+    """
+    width, height = original
+    scales = []
+    if spec.width is not None:
+        scales.append(spec.width / width)
+    if spec.height is not None:
+        scales.append(spec.height / height)
+    scale = max(scales) if spec.fit == "cover" else min(scales)
+    scale = min(scale, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def output_size(original: Tuple[int, int], spec: ResizeSpec) -> Tuple[int, int]:
+    """Final size of the resized image."""
+    width, height = scaled_size(original, spec)
+    if spec.fit == "cover":
+        return min(width, spec.width or width), min(height, spec.height or height)
+    return width, height
+
+
+def choose_source(
+    photo: TPhoto,
+    renditions: List[TPhotoRendition],
+    base_url: str,
+    spec: ResizeSpec,
+) -> ResizeSource:
+    """The smallest stored image at least as big as the scaled photo."""
+    original = (int(photo.width), int(photo.height))
+    needed_width, needed_height = scaled_size(original, spec)
+    candidates = [
+        (
+            str(photo.icon_filename),
+            (int(photo.icon_width), int(photo.icon_height)),
+        ),
+        *((str(r.filename), (int(r.width), int(r.height))) for r in renditions),
+    ]
+    covering = [
+        (filename, size)
+        for filename, size in candidates
+        if filename and size[0] >= needed_width and size[1] >= needed_height
+    ]
+    filename, size = min(
+        covering,
+        key=lambda c: c[1][0] * c[1][1],
+        default=(str(photo.filename), original),
+    )
+    return ResizeSource(
+        server_id=int(photo.server_id),
+        filename=filename,
+        url=join_url(base_url, filename),
+        size=size,
+    )
+
+
+def resize_image(
+    image_bytes: bytes, spec: ResizeSpec, image_format: ImageFormat
+) -> bytes:
+    """Decode at the smallest draft scale that covers the target and resize."""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        # Draft sizes are in stored orientation, before EXIF rotation
+        transposed_exif = img.getexif().get(0x0112) in _TRANSPOSED_ORIENTATIONS
+        if transposed_exif:
+            height, width = scaled_size(img.size[::-1], spec)
+        else:
+            width, height = scaled_size(img.size, spec)
+        img.draft("RGB", (width, height))
+        img.load()
+        transposed = ImageOps.exif_transpose(img)
+        oriented = (transposed if transposed is not None else img).convert("RGB")
+
+    target = scaled_size(oriented.size, spec)
+    resized = oriented.resize(target, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    if spec.fit == "cover":
+        width, height = output_size(oriented.size, spec)
+        left = (resized.width - width) // 2
+        top = (resized.height - height) // 2
+        resized = resized.crop((left, top, left + width, top + height))
+    return encode(resized, image_format, settings.PHOTO_RESIZE_QUALITY)
+
+
+class PhotoResizeService:
+    """Serves resized photos from its cache, rendering them on a miss."""
+
+    def __init__(self, cache: PhotoCache):
+        self.cache = cache
+
+    def get(
+        self,
+        photo: TPhoto,
+        renditions: List[TPhotoRendition],
+        base_url: str,
+        spec: ResizeSpec,
+        image_format: ImageFormat = JPEG,
+    ) -> ResizedImage:
+        version = resize_version(photo)
+        name = f"resized/{photo.id}/{version}/{spec.name}{image_format.extension}"
+        cached = self.cache.get(_RESIZED_SERVER_ID, name)
+        if cached is not None:
+            return ResizedImage(name, cached, image_format)
+
+        source = choose_source(photo, renditions, base_url, spec)
+        try:
+            source_bytes = photo_cache.get_or_fetch(
+                source.server_id,
+                source.filename,
+                lambda: download_bytes(source.url, _DOWNLOAD_TIMEOUT_SECONDS),
+            )
+        except Exception as e:
+            logger.error(f"Failed to fetch {source.url} to resize: {e}")
+            raise PhotoResizeError(502, "Failed to fetch photo")
+        try:
+            image_bytes = resize_image(source_bytes, spec, image_format)
+        except Exception as e:
+            logger.error(f"Failed to resize photo {photo.id}: {e}")
+            raise PhotoResizeError(500, "Failed to resize photo")
+
+        self.cache.put(_RESIZED_SERVER_ID, name, image_bytes)
+        logger.info(
+            f"Resized photo {photo.id} to {spec.name} from {source.filename} "
+            f"({len(image_bytes)} bytes)"
+        )
+        return ResizedImage(name, image_bytes, image_format)
+
+
+photo_resize_service = PhotoResizeService(
+    PhotoCache(
+        directory=settings.PHOTO_RESIZE_CACHE_DIR
+        or os.path.join(tempfile.gettempdir(), "photo-resized"),
+        max_bytes=settings.PHOTO_RESIZE_CACHE_MAX_BYTES,
+    )
+)
@@ -0,0 +1,184 @@
+"""
+Photo rotation: fetch the stored photo, turn it and store a new revision.
+
+The rotated pixels go straight into the image processor's resize and encode
+stages, so a rotation costs one decode and one encode per output rather than
+an extra JPEG generation in between. Quarter turns use `transpose`, which is
+a lossless pixel shuffle with no resampling.
+
+Rendering (download, rotate, resize, encode, upload) touches no database
+state, so batches can render on a thread pool and then apply the row updates
+one by one in the request's session.
+"""
+
+import io
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import requests
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.crud import tphoto as tphoto_crud
+from api.models.tphoto import TPhoto
+from api.services.image_processor import ImageProcessor
+from api.services.photo_cache import photo_cache
+from api.services.photo_evaluation import download_bytes
+from api.services.photo_hash import hash_to_hex, photo_hash_index
+from api.services.photo_ingest import (
+    rendition_rows,
+    upload_variants,
+    variant_uploads,
+)
+from api.services.s3_service import S3Service
+
+logger = logging.getLogger(__name__)
+
+_DOWNLOAD_TIMEOUT_SECONDS = 30.0
+
+# Clockwise angle -> lossless transpose
+_TRANSPOSE = {
+    90: Image.Transpose.ROTATE_270,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_90,
+}
+
+
+class PhotoRotationError(Exception):
+    """A photo could not be rotated; carries the HTTP status to report."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class RenderedRotation:
+    """A rotated revision uploaded to S3 but not yet recorded in the database."""
+
+    photo_id: int
+    updates: Dict[str, Any]
+    renditions: List[Dict[str, Any]]
+    variants: List[Dict[str, Any]] = field(default_factory=list)
+    # Hash of the rotated thumbnail, for duplicate detection
+    dhash: Optional[int] = None
+
+
+def render_rotation(
+    photo_id: int,
+    server_id: int,
+    photo_url: str,
+    filename: str,
+    icon_filename: str,
+    angle: int,
+) -> RenderedRotation:
+    """Download, rotate and upload a new revision of a photo (no DB access)."""
+
+    def download() -> bytes:
+        logger.info(f"Downloading photo from: {photo_url}")
+        return download_bytes(photo_url, _DOWNLOAD_TIMEOUT_SECONDS)
+
+    # Fetch the existing photo (locally cached after the first time)
+    try:
+        photo_bytes = photo_cache.get_or_fetch(server_id, filename, download)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to download photo {photo_url}: {e}")
+        raise PhotoRotationError(500, f"Failed to download photo: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error downloading photo {photo_url}: {e}")
+        raise PhotoRotationError(500, f"Error downloading photo: {str(e)}")
+
+    if not photo_bytes:
+        raise PhotoRotationError(500, "Failed to download photo")
+
+    # Rotate in memory and hand the pixels straight to resize/encode
+    try:
+        with Image.open(io.BytesIO(photo_bytes)) as image:
+            rotated = image.convert("RGB").transpose(_TRANSPOSE[angle])
+
+        processed = ImageProcessor().process_decoded(rotated)
+    except Exception as e:
+        logger.error(f"Failed to rotate image: {e}")
+        raise PhotoRotationError(500, f"Failed to rotate image: {str(e)}")
+
+    # Upload rotated images to S3 with new revision filenames
+    s3_service = S3Service()
+    photo_key, thumbnail_key = s3_service.upload_photo_and_thumbnail_with_keys(
+        processed.photo_bytes,
+        processed.thumbnail_bytes,
+        s3_service.generate_revision_filename(filename),
+        s3_service.generate_revision_filename(icon_filename),
+    )
+    if not photo_key or not thumbnail_key:
+        raise PhotoRotationError(500, "Failed to upload rotated files")
+
+    rendition_keys = s3_service.upload_renditions(photo_key, processed.renditions) or {}
+    variants = upload_variants(
+        s3_service,
+        variant_uploads(
+            thumbnail_key,
+            processed.thumbnail_variants,
+            processed.renditions,
+            rendition_keys,
+        ),
+    )
+
+    return RenderedRotation(
+        photo_id=photo_id,
+        updates={
+            "server_id": settings.PHOTOS_SERVER_ID,
+            "filename": photo_key,
+            "icon_filename": thumbnail_key,
+            "filesize": len(processed.photo_bytes),
+            "icon_filesize": len(processed.thumbnail_bytes),
+            "height": processed.photo_size[1],
+            "width": processed.photo_size[0],
+            "icon_height": processed.thumbnail_size[1],
+            "icon_width": processed.thumbnail_size[0],
+            "source": "R",  # R for revised/rotated
+        },
+        renditions=rendition_rows(processed.renditions, rendition_keys),
+        variants=variants,
+        dhash=processed.dhash,
+    )
+
+
+def apply_rotation(db: Session, rendered: RenderedRotation) -> TPhoto:
+    """Point the photo row (and its renditions) at the rotated revision."""
+    try:
+        # Staged here, committed by update_photo below
+        tphoto_crud.set_photo_renditions(
+            db, photo_id=rendered.photo_id, renditions=rendered.renditions
+        )
+        tphoto_crud.set_photo_variants(
+            db, photo_id=rendered.photo_id, variants=rendered.variants
+        )
+        if rendered.dhash is not None:
+            tphoto_crud.set_photo_hash(
+                db, photo_id=rendered.photo_id, dhash=hash_to_hex(rendered.dhash)
+            )
+        updated: Optional[TPhoto] = tphoto_crud.update_photo(
+            db, photo_id=rendered.photo_id, updates=rendered.updates
+        )
+    except Exception as e:
+        logger.error(f"Failed to update photo record: {e}")
+        db.rollback()
+        raise PhotoRotationError(500, "Failed to update photo record")
+
+    if not updated:
+        # The new revision stays in S3; it is harmless next to the original
+        logger.error("Failed to update photo record in database")
+        db.rollback()
+        raise PhotoRotationError(500, "Failed to update photo record")
+
+    if rendered.dhash is not None:
+        photo_hash_index.add(rendered.photo_id, rendered.dhash)
+
+    logger.info(
+        f"Photo {updated.id} rotated to {updated.filename} "
+        f"(server_id {updated.server_id})"
+    )
+    return updated
@@ -0,0 +1,236 @@
+"""
+Contact-sheet sprites of photo thumbnails for gallery views.
+
+A trig page with 60 photos would otherwise fetch 60 thumbnails. Instead the
+thumbnails of a trig's (or user's) newest photos are composited into one
+JPEG on a grid of THUMBNAIL_SIZE cells, with a JSON index giving each
+photo's offset and size so clients can crop tiles out with CSS.
+
+The sprite's version is a hash of the photo ids and thumbnail filenames it
+shows. Adding, deleting or rotating a photo changes the set and so the
+version; anything else is served from the sprite cache (the same on-disk LRU
+as the photo cache, in its own directory) without rebuilding. Thumbnails are
+fetched concurrently through the photo cache.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import math
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Response
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.crud import tphoto as tphoto_crud
+from api.schemas.tphoto import TPhotoSpriteIndex
+from api.services.photo_cache import PhotoCache, photo_cache
+from api.services.photo_evaluation import download_bytes
+from api.utils.url import join_url
+
+logger = logging.getLogger(__name__)
+
+_DOWNLOAD_TIMEOUT_SECONDS = 10.0
+_BACKGROUND = (255, 255, 255)
+
+# Sprites are cached under this pseudo server id
+_SPRITE_SERVER_ID = 0
+
+
+@dataclass
+class SpriteSource:
+    """A photo thumbnail to place on a sprite."""
+
+    photo_id: int
+    server_id: int
+    icon_filename: str
+    icon_url: str
+
+
+@dataclass
+class Sprite:
+    version: str
+    image_bytes: bytes
+    index: Dict[str, Any]
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    def cache_control(self, requested_version: Optional[str]) -> str:
+        """Versioned URLs never change; unversioned ones are revalidated."""
+        if requested_version == self.version:
+            return "public, max-age=31536000, immutable"
+        return "public, max-age=300"
+
+
+def sprite_sources(
+    db: Session, *, trig_id: Optional[int] = None, user_id: Optional[int] = None
+) -> List[SpriteSource]:
+    """Thumbnails of the newest photos for a trig or user, newest first."""
+    rows = tphoto_crud.list_photo_icons(
+        db,
+        trig_id=trig_id,
+        user_id=user_id,
+        limit=settings.PHOTO_SPRITE_MAX_PHOTOS,
+    )
+    return [
+        SpriteSource(
+            photo_id=int(row.id),
+            server_id=int(row.server_id),
+            icon_filename=str(row.icon_filename),
+            icon_url=join_url(row.server_url or "", str(row.icon_filename)),
+        )
+        for row in rows
+    ]
+
+
+def sprite_version(sources: List[SpriteSource]) -> str:
+    """Changes whenever a photo is added, removed or gets a new thumbnail."""
+    # The layout is part of the version too
+    digest = hashlib.sha256(
+        f"{settings.THUMBNAIL_SIZE}x{settings.PHOTO_SPRITE_COLUMNS}\n".encode()
+    )
+    for source in sources:
+        digest.update(
+            f"{source.photo_id}:{source.server_id}:{source.icon_filename}\n".encode()
+        )
+    return digest.hexdigest()[:16]
+
+
+def render_sprite(
+    sources: List[SpriteSource],
+    *,
+    fetch: Callable[[str, float], bytes] = download_bytes,
+) -> Tuple[bytes, Dict[str, Any]]:
+    """Composite the thumbnails into one JPEG; returns it and its layout.
+
+    Thumbnails that cannot be fetched or decoded are left out of the index.
+    """
+    cell = settings.THUMBNAIL_SIZE
+    columns = max(1, min(settings.PHOTO_SPRITE_COLUMNS, len(sources)))
+    rows = max(1, math.ceil(len(sources) / columns))
+
+    def load(source: SpriteSource) -> Optional[Image.Image]:
+        try:
+            icon_bytes = photo_cache.get_or_fetch(
+                source.server_id,
+                source.icon_filename,
+                lambda: fetch(source.icon_url, _DOWNLOAD_TIMEOUT_SECONDS),
+            )
+            with Image.open(io.BytesIO(icon_bytes)) as img:
+                img.draft("RGB", (cell, cell))
+                icon = img.convert("RGB")
+            icon.thumbnail((cell, cell))
+            return icon
+        except Exception as e:
+            logger.warning(f"Skipping thumbnail of photo {source.photo_id}: {e}")
+            return None
+
+    with ThreadPoolExecutor(
+        max_workers=settings.PHOTO_SPRITE_FETCH_WORKERS,
+        thread_name_prefix="photo-sprite",
+    ) as pool:
+        icons = list(pool.map(load, sources))
+
+    sheet = Image.new("RGB", (columns * cell, rows * cell), _BACKGROUND)
+    tiles = []
+    for position, (source, icon) in enumerate(zip(sources, icons)):
+        if icon is None:
+            continue
+        row, column = divmod(position, columns)
+        # Centred in its cell
+        x = column * cell + (cell - icon.width) // 2
+        y = row * cell + (cell - icon.height) // 2
+        sheet.paste(icon, (x, y))
+        tiles.append(
+            {
+                "photo_id": source.photo_id,
+                "x": x,
+                "y": y,
+                "width": icon.width,
+                "height": icon.height,
+            }
+        )
+
+    buffer = io.BytesIO()
+    sheet.save(buffer, format="JPEG", quality=85, optimize=True)
+    layout = {
+        "tile_size": cell,
+        "width": sheet.width,
+        "height": sheet.height,
+        "tiles": tiles,
+    }
+    return buffer.getvalue(), layout
+
+
+class SpriteService:
+    """Builds sprites and caches them by scope, owner and version."""
+
+    def __init__(self, cache: PhotoCache):
+        self.cache = cache
+
+    def get_sprite(
+        self, scope: str, owner_id: int, sources: List[SpriteSource]
+    ) -> Sprite:
+        """The current sprite for `sources`, rendering it if not cached."""
+        version = sprite_version(sources)
+        name = f"sprites/{scope}/{owner_id}/{version}"
+        image_bytes = self.cache.get(_SPRITE_SERVER_ID, f"{name}.jpg")
+        raw_index = self.cache.get(_SPRITE_SERVER_ID, f"{name}.json")
+        if image_bytes is not None and raw_index is not None:
+            return Sprite(version, image_bytes, json.loads(raw_index))
+
+        image_bytes, layout = render_sprite(sources)
+        index = {"version": version, **layout}
+        # A sprite with missing thumbnails is served but built again next time
+        if len(layout["tiles"]) == len(sources):
+            self.cache.put(_SPRITE_SERVER_ID, f"{name}.jpg", image_bytes)
+            self.cache.put(
+                _SPRITE_SERVER_ID, f"{name}.json", json.dumps(index).encode()
+            )
+        logger.info(
+            f"Built {scope} {owner_id} sprite {version}: "
+            f"{len(layout['tiles'])} tiles"
+        )
+        return Sprite(version, image_bytes, index)
+
+
+sprite_service = SpriteService(
+    PhotoCache(
+        directory=settings.PHOTO_SPRITE_CACHE_DIR
+        or os.path.join(tempfile.gettempdir(), "photo-sprites"),
+        max_bytes=settings.PHOTO_SPRITE_CACHE_MAX_BYTES,
+    )
+)
+
+
+def sprite_index_response(
+    scope: str, owner_id: int, sources: List[SpriteSource]
+) -> TPhotoSpriteIndex:
+    """The `/photos/sprite/index` body for a trig's or user's photos."""
+    if not sources:
+        return TPhotoSpriteIndex(tile_size=settings.THUMBNAIL_SIZE)
+    sprite = sprite_service.get_sprite(scope, owner_id, sources)
+    return TPhotoSpriteIndex(
+        sprite_url=f"{settings.API_V1_STR}/{scope}s/{owner_id}/photos/sprite"
+        f"?v={sprite.version}",
+        **sprite.index,
+    )
+
+
+def sprite_response(
+    sprite: Sprite, v: Optional[str], if_none_match: Optional[str]
+) -> Response:
+    """The sprite JPEG, or 304 when the client already has this version."""
+    headers = {"ETag": sprite.etag, "Cache-Control": sprite.cache_control(v)}
+    if if_none_match == sprite.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(sprite.image_bytes, media_type="image/jpeg", headers=headers)
@@ -0,0 +1,218 @@
+"""
+In-memory ring buffer of the newest logs for the default /v1/logs feed.
+
+The unfiltered, newest-first first pages of /v1/logs are by far the most
+requested pages on the site. Serving them from the database means sorting and
+counting the whole tlog table on every hit. This buffer keeps the latest N
+logs (already enriched with trig and user names) plus a running total, so
+those pages need no database query at all.
+
+The buffer is seeded on a background thread at startup and re-seeded there
+every RECENT_LOGS_RESEED_SECONDS to pick up writes made outside this API
+(e.g. the legacy site); requests never wait for a seed and fall back to the
+database until the first one finishes. Between seeds the buffer is kept
+current by log events from the activity broadcaster, which reach every
+worker when Redis is configured. Events that arrive while a seed is reading
+the database are replayed on its result.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.crud import read_model
+from api.crud import tlog as tlog_crud
+from api.services.activity import (
+    LOG_CREATED,
+    LOG_DELETED,
+    LOG_UPDATED,
+    activity_broadcaster,
+)
+from api.services.background_refresh import BackgroundRefresh
+
+logger = logging.getLogger(__name__)
+
+SortKey = Tuple[str, str, int]
+
+
+def _sort_key(item: Dict[str, Any]) -> SortKey:
+    """Key matching ORDER BY date, time, id (dates may be objects or ISO strings)."""
+    return (str(item["date"]), str(item["time"]), int(item["id"]))
+
+
+class RecentLogsBuffer:
+    """Bounded, sorted buffer of the newest enriched log dicts."""
+
+    def __init__(self, capacity: int, reseed_seconds: float):
+        self.capacity = capacity
+        self.reseed_seconds = reseed_seconds
+        # Ascending by sort key; the newest log is at the end
+        self._keys: List[SortKey] = []
+        self._items: List[Dict[str, Any]] = []
+        self._total: int = 0
+        self._seeded_at: Optional[float] = None
+        # Events received while a seed is reading, replayed once it is in
+        self._pending: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Seeding
+    # ------------------------------------------------------------------
+
+    def is_fresh(self) -> bool:
+        with self._lock:
+            return (
+                self._seeded_at is not None
+                and time.monotonic() - self._seeded_at < self.reseed_seconds
+            )
+
+    def seed(self, db: Session) -> None:
+        """Replace the buffer contents with the newest logs from the database."""
+        with self._lock:
+            self._pending = []
+        try:
+            items = read_model.list_logs(db, skip=0, limit=self.capacity)
+            total = tlog_crud.count_logs_filtered(db)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+
+        items.sort(key=_sort_key)
+        with self._lock:
+            self._items = items
+            self._keys = [_sort_key(item) for item in items]
+            self._total = total
+            self._seeded_at = time.monotonic()
+            pending, self._pending = self._pending or [], None
+            for event_type, data in pending:
+                self._apply_event(event_type, data, replay=True)
+        logger.info(f"Seeded recent logs buffer with {len(items)} of {total} logs")
+
+    def invalidate(self) -> None:
+        """Drop the contents; the next request starts a re-seed."""
+        with self._lock:
+            self._items = []
+            self._keys = []
+            self._total = 0
+            self._seeded_at = None
+            self._pending = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def page(self, skip: int, limit: int) -> Optional[Tuple[List[Dict], int]]:
+        """Return (items newest-first, total) or None if the page is not covered."""
+        with self._lock:
+            if self._seeded_at is None:
+                return None
+            count = len(self._items)
+            complete = count >= self._total
+            if skip + limit > count and not complete:
+                return None
+            end = max(count - skip, 0)
+            start = max(count - skip - limit, 0)
+            items = [dict(item) for item in reversed(self._items[start:end])]
+            return items, self._total
+
+    # ------------------------------------------------------------------
+    # Writes (driven by activity events)
+    # ------------------------------------------------------------------
+
+    def add(self, item: Dict[str, Any]) -> None:
+        self.handle_event(LOG_CREATED, item)
+
+    def update(self, item: Dict[str, Any]) -> None:
+        self.handle_event(LOG_UPDATED, item)
+
+    def remove(self, log_id: int) -> None:
+        self.handle_event(LOG_DELETED, {"id": log_id})
+
+    def _apply_event(
+        self, event_type: str, data: Dict[str, Any], replay: bool = False
+    ) -> None:
+        """Apply one event; `replay` events may already be in the seeded rows."""
+        if self._seeded_at is None:
+            return
+        log_id = int(data["id"])
+        # Every log is held, so nothing is missing below the oldest one
+        complete = len(self._items) >= self._total
+        if event_type == LOG_CREATED:
+            if replay and self._remove(log_id):
+                # Seeded and counted already; take the event's copy
+                self._insert(data, complete=True)
+                return
+            self._insert(data, complete)
+            self._total += 1
+        elif event_type == LOG_UPDATED:
+            self._remove(log_id)
+            self._insert(data, complete)
+        elif event_type == LOG_DELETED:
+            if not self._remove(log_id) and replay:
+                # Most likely gone before the seed read, so not counted
+                return
+            self._total = max(self._total - 1, 0)
+
+    def _insert(self, item: Dict[str, Any], complete: bool) -> None:
+        key = _sort_key(item)
+        if self._keys and key < self._keys[0] and not complete:
+            # Older than everything held while unbuffered logs exist in between
+            return
+        index = bisect.bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._items.insert(index, dict(item))
+        if len(self._items) > self.capacity:
+            del self._keys[0]
+            del self._items[0]
+
+    def _remove(self, log_id: int) -> bool:
+        for index, key in enumerate(self._keys):
+            if key[2] == log_id:
+                del self._keys[index]
+                del self._items[index]
+                return True
+        return False
+
+    def handle_event(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Activity broadcaster listener."""
+        if event_type not in (LOG_CREATED, LOG_UPDATED, LOG_DELETED):
+            return
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((event_type, dict(data)))
+            self._apply_event(event_type, data)
+
+
+recent_logs_buffer = RecentLogsBuffer(
+    capacity=settings.RECENT_LOGS_CAPACITY,
+    reseed_seconds=settings.RECENT_LOGS_RESEED_SECONDS,
+)
+activity_broadcaster.add_listener(recent_logs_buffer.handle_event)
+
+
+def refresh_recent_logs(db: Session) -> None:
+    recent_logs_buffer.seed(db)
+
+
+recent_logs_refresher = BackgroundRefresh("recent-logs", refresh_recent_logs)
+
+
+def get_recent_logs_page(skip: int, limit: int) -> Optional[Tuple[List[Dict], int]]:
+    """
+    Serve an unfiltered newest-first page from memory.
+
+    Never queries the database itself; a due re-seed is started in the
+    background. None until the first seed has finished, or when the page
+    reaches past the buffered logs.
+    """
+    if not settings.RECENT_LOGS_ENABLED:
+        return None
+    if not recent_logs_buffer.is_fresh():
+        recent_logs_refresher.trigger()
+    return recent_logs_buffer.page(skip, limit)
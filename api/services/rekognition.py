@@ -5,17 +5,47 @@ AWS Rekognition service for image analysis.
 import io
 import logging
 import math
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional
 
-import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 from PIL import Image
 
 from api.core.config import settings
+from api.services.analysis_cache import analysis_cache, image_digest
+from api.services.aws_clients import get_aws_client
 from api.services.orientation_model import OrientationClassifier
+from api.services.orientation_prescreen import prescreen, prescreen_stats
 
 logger = logging.getLogger(__name__)
 
+# Shared by every analysis so concurrent requests don't each spin up threads
+_call_executor: Optional[ThreadPoolExecutor] = None
+_call_executor_lock = threading.Lock()
+
+
+def _get_call_executor() -> ThreadPoolExecutor:
+    global _call_executor
+    with _call_executor_lock:
+        if _call_executor is None:
+            _call_executor = ThreadPoolExecutor(
+                max_workers=settings.REKOGNITION_CONCURRENCY,
+                thread_name_prefix="rekognition",
+            )
+        return _call_executor
+
+
+def _await_call(future: Future, api: str, deadline: float) -> Any:
+    """Result of a Rekognition call, or TimeoutError once `deadline` passes."""
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Rekognition {api} timed out")
+
 
 class RekognitionService:
     """Service for AWS Rekognition image analysis."""
@@ -23,7 +53,7 @@ class RekognitionService:
     def __init__(self, region_name: str = "eu-west-1"):
         """Initialise the Rekognition client."""
         try:
-            self.client = boto3.client("rekognition", region_name=region_name)
+            self.client = get_aws_client("rekognition", region_name=region_name)
         except Exception as e:
             logger.error(f"Failed to initialise Rekognition client: {e}")
             self.client = None
@@ -34,17 +64,48 @@ class RekognitionService:
             else None
         )
 
-    def analyse_orientation(self, image_bytes: bytes) -> Optional[Dict]:
+    def analyse_orientation(
+        self, image_bytes: bytes, icon_bytes: Optional[bytes] = None
+    ) -> Optional[Dict]:
         """
         Analyse image orientation using AWS Rekognition.
 
         Uses multiple approaches:
-        1. Text detection and rotation analysis
-        2. Face detection and orientation
-        3. Object detection patterns
+        1. Local pre-screen: pixel heuristics and the ONNX model on the icon
+        2. Text detection and rotation analysis
+        3. Face detection and orientation
+        4. Object detection patterns
+
+        When the pre-screen is confident the Rekognition calls are skipped.
+        Pass `icon_bytes` if available; otherwise the photo is decoded at
+        icon size for the local checks.
 
         Returns orientation confidence scores for 0°, 90°, 180°, 270° rotations.
+        Results are cached by image digest.
         """
+        digest = image_digest(image_bytes)
+        cached = analysis_cache.get("orientation", digest)
+        if cached is not None:
+            logger.info(f"Orientation analysis served from cache ({digest[:12]})")
+            return cached
+        result = self._analyse_orientation(image_bytes, icon_bytes)
+        # Failures (throttling, timeouts) are not cached, so a retry calls AWS
+        if result is not None and "error" not in result:
+            analysis_cache.set("orientation", digest, result)
+        return result
+
+    def _analyse_orientation(
+        self, image_bytes: bytes, icon_bytes: Optional[bytes]
+    ) -> Optional[Dict]:
+        local = prescreen(icon_bytes or image_bytes, self.orientation_model)
+        prescreen_stats.record(local.confident)
+        if local.confident:
+            logger.info(
+                f"Orientation pre-screen confident ({local.verdict}), "
+                "skipping Rekognition"
+            )
+            return local.analysis()
+
         if not self.client:
             logger.warning("Rekognition client not available for orientation analysis")
             return None
@@ -53,17 +114,33 @@ class RekognitionService:
             f"Starting orientation analysis for image ({len(image_bytes)} bytes)"
         )
 
+        # The three APIs are independent, so issue them together; each gets
+        # until the shared deadline to answer
+        client = self.client
+        executor = _get_call_executor()
+        deadline = time.monotonic() + settings.REKOGNITION_CALL_TIMEOUT_SECONDS
+        logger.debug("Calling Rekognition detect_text, detect_faces, detect_labels")
+        text_call = executor.submit(
+            client.detect_text,
+            Image={"Bytes": image_bytes},
+            Filters={
+                "WordFilter": {
+                    "MinConfidence": 30.0,  # Lower threshold for better detection
+                }
+            },
+        )
+        faces_call = executor.submit(
+            client.detect_faces, Image={"Bytes": image_bytes}, Attributes=["POSE"]
+        )
+        labels_call = executor.submit(
+            client.detect_labels,
+            Image={"Bytes": image_bytes},
+            MaxLabels=50,
+            MinConfidence=60.0,
+        )
+
         try:
-            # Try text detection first
-            logger.debug("Calling Rekognition detect_text API")
-            text_response = self.client.detect_text(
-                Image={"Bytes": image_bytes},
-                Filters={
-                    "WordFilter": {
-                        "MinConfidence": 30.0,  # Lower threshold for better detection
-                    }
-                },
-            )
+            text_response = _await_call(text_call, "detect_text", deadline)
 
             text_detections = text_response.get("TextDetections", [])
             logger.info(f"Found {len(text_detections)} text detections")
@@ -151,10 +228,7 @@ class RekognitionService:
             # Try face detection for additional orientation clues
             faces_count = 0
             try:
-                logger.debug("Calling Rekognition detect_faces API")
-                face_response = self.client.detect_faces(
-                    Image={"Bytes": image_bytes}, Attributes=["POSE"]
-                )
+                face_response = _await_call(faces_call, "detect_faces", deadline)
 
                 faces = face_response.get("FaceDetails", [])
                 faces_count = len(faces)
@@ -188,10 +262,7 @@ class RekognitionService:
             labels_count = 0
             label_samples: List[Dict[str, float | str]] = []
             try:
-                logger.debug("Calling Rekognition detect_labels API")
-                labels_response = self.client.detect_labels(
-                    Image={"Bytes": image_bytes}, MaxLabels=50, MinConfidence=60.0
-                )
+                labels_response = _await_call(labels_call, "detect_labels", deadline)
                 labels = labels_response.get("Labels", [])
                 labels_count = len(labels)
 
@@ -239,9 +310,8 @@ class RekognitionService:
                                 )
 
                 # Heuristic 2: sky should usually be at the top
-                sky_bias = self._estimate_sky_bias(image_bytes)
-                if sky_bias is not None:
-                    top, bottom, left, right = sky_bias
+                if local.sky_bias is not None:
+                    top, bottom, left, right = local.sky_bias
                     # Normalise weights to [0, 1]
                     s_total = max(1e-6, top + bottom + left + right)
                     top_w = top / s_total
@@ -262,7 +332,7 @@ class RekognitionService:
             total = sum(orientations.values())
             weak_signal = total < 0.8  # heuristic threshold
             if weak_signal and self.orientation_model is not None:
-                pred = self.orientation_model.predict(image_bytes)
+                pred = local.model_prediction
                 if pred is not None:
                     angle_str, prob = pred
                     if prob >= settings.ORIENTATION_MODEL_THRESHOLD:
@@ -345,8 +415,20 @@ class RekognitionService:
         """
         Analyse image for inappropriate content using AWS Rekognition.
 
-        Detects violence, pornography, advertisements, etc.
+        Detects violence, pornography, advertisements, etc. Results are cached
+        by image digest.
         """
+        digest = image_digest(image_bytes)
+        cached = analysis_cache.get("moderation", digest)
+        if cached is not None:
+            logger.info(f"Content moderation served from cache ({digest[:12]})")
+            return cached
+        result = self._moderate_content(image_bytes)
+        if result is not None and "error" not in result:
+            analysis_cache.set("moderation", digest, result)
+        return result
+
+    def _moderate_content(self, image_bytes: bytes) -> Optional[Dict]:
         if not self.client:
             logger.warning("Rekognition client not available for content moderation")
             return None
@@ -355,8 +437,14 @@ class RekognitionService:
 
         try:
             logger.debug("Calling Rekognition detect_moderation_labels API")
-            response = self.client.detect_moderation_labels(
-                Image={"Bytes": image_bytes}, MinConfidence=50.0
+            response = _await_call(
+                _get_call_executor().submit(
+                    self.client.detect_moderation_labels,
+                    Image={"Bytes": image_bytes},
+                    MinConfidence=50.0,
+                ),
+                "detect_moderation_labels",
+                time.monotonic() + settings.REKOGNITION_CALL_TIMEOUT_SECONDS,
             )
 
             moderation_labels = response.get("ModerationLabels", [])
@@ -463,43 +551,6 @@ class RekognitionService:
             logger.error(f"Content moderation failed: {e}")
             return {"error": str(e)}
 
-    def _estimate_sky_bias(
-        self, image_bytes: bytes
-    ) -> Optional[Tuple[float, float, float, float]]:
-        """Estimate distribution of sky-like pixels across top/bottom/left/right.
-
-        Returns tuple (top, bottom, left, right) counts or None on failure.
-        Uses a downscaled RGB heuristic to classify sky-like pixels.
-        """
-        try:
-            with Image.open(io.BytesIO(image_bytes)) as img:
-                img = img.convert("RGB")
-                # Downscale to reduce cost
-                img.thumbnail((64, 64))
-                width, height = img.size
-                if width == 0 or height == 0:
-                    return None
-                pixels = img.load()
-                top = bottom = left = right = 0
-
-                for y in range(height):
-                    for x in range(width):
-                        r, g, b = pixels[x, y]
-                        # Sky heuristic: strong blue channel and not too dark
-                        if b > 130 and b > r + 25 and b > g + 25:
-                            if y < height // 2:
-                                top += 1
-                            else:
-                                bottom += 1
-                            if x < width // 2:
-                                left += 1
-                            else:
-                                right += 1
-                return float(top), float(bottom), float(left), float(right)
-        except Exception as e:
-            logger.debug(f"Sky bias estimation failed: {e}")
-            return None
-
     # Removed EXIF orientation bias helper on request to avoid double-applying rotations.
 
 
@@ -1,18 +1,51 @@
 """
 S3 service for photo uploads with rollback support.
+
+The S3 client is the process-wide pooled one from `aws_clients`. The objects
+belonging to one photo (photo, thumbnail, renditions) are uploaded in
+parallel on a shared thread pool, and bodies at or above
+S3_MULTIPART_THRESHOLD go up as multipart uploads.
 """
 
+import io
 import logging
+import os
 import re
-from typing import List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
 
-import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import BotoCoreError, ClientError
 
 from api.core.config import settings
+from api.services.aws_clients import get_aws_client
+from api.services.image_formats import format_for_key
+from api.services.image_processor import Rendition
 
 logger = logging.getLogger(__name__)
 
+_UPLOAD_ARGS = {
+    "ContentType": "image/jpeg",
+    "CacheControl": "public, max-age=31536000",  # 1 year
+    "ACL": "public-read",
+}
+
+_upload_executor: Optional[ThreadPoolExecutor] = None
+_upload_executor_lock = threading.Lock()
+
+
+def _get_upload_executor() -> ThreadPoolExecutor:
+    global _upload_executor
+    with _upload_executor_lock:
+        if _upload_executor is None:
+            _upload_executor = ThreadPoolExecutor(
+                max_workers=settings.S3_UPLOAD_CONCURRENCY,
+                thread_name_prefix="s3-upload",
+            )
+        return _upload_executor
+
 
 class S3Service:
     """Service for S3 operations with rollback support."""
@@ -20,7 +53,7 @@ class S3Service:
     def __init__(self):
         """Initialise the S3 client."""
         try:
-            self.s3_client = boto3.client("s3")
+            self.s3_client = get_aws_client("s3")
             self.bucket = settings.PHOTOS_S3_BUCKET
         except Exception as e:
             logger.error(f"Failed to initialise S3 client: {e}")
@@ -48,40 +81,11 @@ class S3Service:
         photo_key = self._generate_photo_key(photo_id)
         thumbnail_key = self._generate_thumbnail_key(photo_id)
 
-        uploaded_keys = []
-
-        try:
-            # Upload photo
-            self.s3_client.put_object(
-                Bucket=self.bucket,
-                Key=photo_key,
-                Body=photo_bytes,
-                ContentType="image/jpeg",
-                CacheControl="public, max-age=31536000",  # 1 year
-                ACL="public-read",
-            )
-            uploaded_keys.append(photo_key)
-            logger.info(f"Uploaded photo to S3: {photo_key}")
-
-            # Upload thumbnail
-            self.s3_client.put_object(
-                Bucket=self.bucket,
-                Key=thumbnail_key,
-                Body=thumbnail_bytes,
-                ContentType="image/jpeg",
-                CacheControl="public, max-age=31536000",  # 1 year
-                ACL="public-read",
-            )
-            uploaded_keys.append(thumbnail_key)
-            logger.info(f"Uploaded thumbnail to S3: {thumbnail_key}")
-
-            return photo_key, thumbnail_key
-
-        except (ClientError, BotoCoreError) as e:
-            logger.error(f"S3 upload failed: {e}")
-            # Rollback any partial uploads
-            self._rollback_uploads(uploaded_keys)
+        if not self._upload_objects(
+            [(photo_key, photo_bytes), (thumbnail_key, thumbnail_bytes)]
+        ):
             return None, None
+        return photo_key, thumbnail_key
 
     def _generate_photo_key(self, photo_id: int) -> str:
         """Generate S3 key for photo using the required path pattern."""
@@ -93,6 +97,49 @@ class S3Service:
         folder = photo_id // 1000
         return f"{folder:03d}/I{photo_id:05d}.jpg"
 
+    def rendition_key(self, photo_key: str, size: int) -> str:
+        """
+        Key for a rendition, stored next to its photo.
+
+        Examples:
+            '002/P02001.jpg', 800 -> '002/P02001_800.jpg'
+            '002/P02001_r1.jpg', 320 -> '002/P02001_r1_320.jpg'
+        """
+        base, extension = os.path.splitext(photo_key)
+        return f"{base}_{size}{extension}"
+
+    def upload_renditions(
+        self, photo_key: str, renditions: List[Rendition]
+    ) -> Optional[Dict[int, str]]:
+        """
+        Upload renditions next to an already uploaded photo.
+
+        Returns:
+            Mapping of rendition size to S3 key on success, None on failure
+            (any renditions uploaded before the failure are removed)
+        """
+        if not self.s3_client:
+            logger.error("S3 client not available")
+            return None
+
+        keys = {r.size: self.rendition_key(photo_key, r.size) for r in renditions}
+        if not self._upload_objects(
+            [(keys[r.size], r.image_bytes) for r in renditions]
+        ):
+            return None
+        return keys
+
+    def upload_variants(self, objects: List[Tuple[str, bytes]]) -> bool:
+        """
+        Upload WebP/AVIF variants next to their already uploaded JPEGs.
+
+        Returns True if every variant was stored; on failure none are left.
+        """
+        if not self.s3_client:
+            logger.error("S3 client not available")
+            return False
+        return self._upload_objects(objects)
+
     def generate_revision_filename(self, current_filename: str) -> str:
         """
         Generate a new filename with an incremented revision suffix.
@@ -162,40 +209,62 @@ class S3Service:
             logger.error("S3 client not available")
             return None, None
 
-        uploaded_keys = []
+        if not self._upload_objects(
+            [(photo_key, photo_bytes), (thumbnail_key, thumbnail_bytes)]
+        ):
+            return None, None
+        return photo_key, thumbnail_key
 
-        try:
-            # Upload photo
-            self.s3_client.put_object(
-                Bucket=self.bucket,
-                Key=photo_key,
-                Body=photo_bytes,
-                ContentType="image/jpeg",
-                CacheControl="public, max-age=31536000",  # 1 year
-                ACL="public-read",
-            )
-            uploaded_keys.append(photo_key)
-            logger.info(f"Uploaded photo to S3: {photo_key}")
+    def _upload_objects(self, objects: List[Tuple[str, bytes]]) -> bool:
+        """
+        Upload (key, body) pairs concurrently.
 
-            # Upload thumbnail
-            self.s3_client.put_object(
-                Bucket=self.bucket,
-                Key=thumbnail_key,
-                Body=thumbnail_bytes,
-                ContentType="image/jpeg",
-                CacheControl="public, max-age=31536000",  # 1 year
-                ACL="public-read",
-            )
-            uploaded_keys.append(thumbnail_key)
-            logger.info(f"Uploaded thumbnail to S3: {thumbnail_key}")
+        Returns True if every object was stored. On any failure the objects
+        that did land are deleted again and False is returned.
+        """
+        if not objects:
+            return True
 
-            return photo_key, thumbnail_key
+        executor = _get_upload_executor()
+        futures = [
+            (key, executor.submit(self._put_object, key, body)) for key, body in objects
+        ]
 
-        except (ClientError, BotoCoreError) as e:
-            logger.error(f"S3 upload failed: {e}")
+        uploaded_keys = []
+        failed = False
+        for key, future in futures:
+            try:
+                future.result()
+                uploaded_keys.append(key)
+                logger.info(f"Uploaded to S3: {key}")
+            except (ClientError, BotoCoreError, S3UploadFailedError) as e:
+                logger.error(f"S3 upload of {key} failed: {e}")
+                failed = True
+
+        if failed:
             # Rollback any partial uploads
             self._rollback_uploads(uploaded_keys)
-            return None, None
+            return False
+        return True
+
+    def _put_object(self, key: str, body: bytes) -> None:
+        """Store one object, as a multipart upload if it is large."""
+        extra_args = {**_UPLOAD_ARGS, "ContentType": format_for_key(key).mime_type}
+        if len(body) >= settings.S3_MULTIPART_THRESHOLD:
+            self.s3_client.upload_fileobj(
+                io.BytesIO(body),
+                self.bucket,
+                key,
+                ExtraArgs=extra_args,
+                Config=TransferConfig(
+                    multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+                    multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE,
+                ),
+            )
+        else:
+            self.s3_client.put_object(
+                Bucket=self.bucket, Key=key, Body=body, **extra_args
+            )
 
     def _rollback_uploads(self, keys: List[str]) -> None:
         """Delete uploaded files in case of failure."""
@@ -209,8 +278,10 @@ class S3Service:
             except (ClientError, BotoCoreError) as e:
                 logger.error(f"Failed to rollback S3 upload {key}: {e}")
 
-    def delete_photo_and_thumbnail(self, photo_id: int) -> bool:
-        """Delete photo and thumbnail from S3."""
+    def delete_photo_and_thumbnail(
+        self, photo_id: int, rendition_keys: Optional[List[str]] = None
+    ) -> bool:
+        """Delete photo and thumbnail (and any given rendition keys) from S3."""
         if not self.s3_client:
             logger.error("S3 client not available")
             return False
@@ -220,7 +291,7 @@ class S3Service:
 
         try:
             # Delete both files
-            for key in [photo_key, thumbnail_key]:
+            for key in [photo_key, thumbnail_key, *(rendition_keys or [])]:
                 self.s3_client.delete_object(Bucket=self.bucket, Key=key)
 
             logger.info(
@@ -231,3 +302,128 @@ class S3Service:
         except (ClientError, BotoCoreError) as e:
             logger.error(f"Failed to delete S3 files for photo {photo_id}: {e}")
             return False
+
+    def staging_key(self, upload_id: str) -> str:
+        """Key a client uploads to directly, before the photo is processed."""
+        return f"{settings.PHOTO_UPLOAD_STAGING_PREFIX}{upload_id}.jpg"
+
+    def presigned_upload(
+        self, key: str, max_bytes: int, expires_in: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Presigned POST letting a client upload one JPEG straight to `key`.
+
+        The policy pins the key and content type and caps the size, so the
+        form cannot be reused for anything else. Staged objects stay private.
+
+        Returns:
+            {"url": ..., "fields": {...}} to send as a multipart form, or None
+        """
+        if not self.s3_client:
+            logger.error("S3 client not available")
+            return None
+
+        try:
+            return self.s3_client.generate_presigned_post(
+                Bucket=self.bucket,
+                Key=key,
+                Fields={"Content-Type": "image/jpeg"},
+                Conditions=[
+                    {"Content-Type": "image/jpeg"},
+                    ["content-length-range", 1, max_bytes],
+                ],
+                ExpiresIn=expires_in,
+            )
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"Failed to presign upload to {key}: {e}")
+            return None
+
+    def object_size(self, key: str) -> Optional[int]:
+        """Size of a stored object, or None if it is not there."""
+        if not self.s3_client:
+            logger.error("S3 client not available")
+            return None
+
+        try:
+            head = self.s3_client.head_object(Bucket=self.bucket, Key=key)
+        except (ClientError, BotoCoreError) as e:
+            logger.info(f"No S3 object at {key}: {e}")
+            return None
+        return int(head["ContentLength"])
+
+    def open_object(self, key: str) -> Optional[IO[bytes]]:
+        """Streaming body of a stored object, or None if it cannot be read."""
+        if not self.s3_client:
+            logger.error("S3 client not available")
+            return None
+
+        try:
+            return self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"Failed to read S3 object {key}: {e}")
+            return None
+
+    def delete_object(self, key: str) -> bool:
+        if not self.s3_client:
+            logger.error("S3 client not available")
+            return False
+
+        try:
+            self.s3_client.delete_object(Bucket=self.bucket, Key=key)
+            return True
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"Failed to delete S3 object {key}: {e}")
+            return False
+
+    def delete_objects(self, keys: List[str]) -> List[str]:
+        """
+        Delete up to 1000 keys in one DeleteObjects request.
+
+        Keys that do not exist count as deleted. Returns the keys that could
+        not be deleted (all of them if the request itself failed).
+        """
+        if not keys:
+            return []
+        if not self.s3_client:
+            logger.error("S3 client not available")
+            return list(keys)
+
+        try:
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            )
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"Failed to delete {len(keys)} S3 objects: {e}")
+            return list(keys)
+        errors = response.get("Errors", [])
+        for error in errors:
+            logger.error(
+                f"Failed to delete S3 object {error.get('Key')}: "
+                f"{error.get('Code')} {error.get('Message')}"
+            )
+        return [error["Key"] for error in errors]
+
+    def list_prefixes(self, prefix: str = "") -> List[str]:
+        """Prefixes one level below `prefix`, e.g. ["000/", "001/", ...]."""
+        if not self.s3_client:
+            logger.error("S3 client not available")
+            return []
+
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        prefixes: List[str] = []
+        for page in paginator.paginate(
+            Bucket=self.bucket, Prefix=prefix, Delimiter="/"
+        ):
+            prefixes.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+        return prefixes
+
+    def iter_objects(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        """Objects under `prefix` in key order, fetched a page at a time."""
+        if not self.s3_client:
+            logger.error("S3 client not available")
+            return
+
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            yield from page.get("Contents", [])
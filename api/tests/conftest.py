@@ -2,18 +2,35 @@
 Test configuration and fixtures.
 """
 
+import io
+import threading
 import warnings
+from unittest.mock import Mock, patch
 
+import boto3
 import pytest
 from fastapi.testclient import TestClient
+from moto import mock_aws
+from PIL import Image
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from api.core.config import settings
+
 # from api.core.security import get_password_hash  # No longer needed - using Unix crypt
 from api.db.database import Base, get_db
 from api.main import app
+from api.models.tphoto import TPhoto
 from api.models.user import TLog, User
+from api.services.analysis_cache import analysis_cache
+from api.services.aws_clients import get_aws_client, reset_aws_clients
+from api.services.image_processor import ProcessedImage
+from api.services.log_search import log_search_index, log_search_refresher
+from api.services.moderation_queue import ModerationQueue, moderation_queue_service
+from api.services.photo_cache import photo_cache
+from api.services.photo_hash import photo_hash_index, photo_hash_refresher
+from api.services.recent_logs import recent_logs_buffer, recent_logs_refresher
 
 # Legacy JWT tokens removed - Auth0 only
 
@@ -48,6 +65,185 @@ def override_get_db():
 app.dependency_overrides[get_db] = override_get_db
 
 
+def add_photo(db: Session, photo_id: int, **overrides) -> TPhoto:
+    """Add (without committing) a live photo row; `overrides` set any column."""
+    folder = f"{photo_id // 1000:03d}"
+    values = {
+        "id": photo_id,
+        "tlog_id": 1,
+        "server_id": 1,
+        "type": "T",
+        "filename": f"{folder}/P{photo_id:05d}.jpg",
+        "filesize": 1,
+        "height": 1,
+        "width": 1,
+        "icon_filename": f"{folder}/I{photo_id:05d}.jpg",
+        "icon_filesize": 1,
+        "icon_height": 1,
+        "icon_width": 1,
+        "name": "",
+        "text_desc": "",
+        "ip_addr": "127.0.0.1",
+        "public_ind": "Y",
+        "deleted_ind": "N",
+        "source": "W",
+    }
+    values.update(overrides)
+    photo = TPhoto(**values)
+    db.add(photo)
+    return photo
+
+
+def encode_jpeg(img: Image.Image, **save_args) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", **save_args)
+    return buffer.getvalue()
+
+
+def jpeg(size=(120, 90), colour="grey", **save_args) -> bytes:
+    """A plain-colour JPEG; `save_args` go to `Image.save` (quality, exif...)."""
+    return encode_jpeg(Image.new("RGB", size, colour), **save_args)
+
+
+@pytest.fixture(autouse=True)
+def reset_in_memory_log_caches(monkeypatch):
+    """Each test gets a fresh database, so drop any buffered or indexed logs."""
+    recent_logs_buffer.invalidate()
+    log_search_index.invalidate()
+    monkeypatch.setattr(log_search_refresher, "session_factory", TestingSessionLocal)
+    monkeypatch.setattr(log_search_refresher, "trigger", lambda: None)
+    monkeypatch.setattr(recent_logs_refresher, "session_factory", TestingSessionLocal)
+    monkeypatch.setattr(recent_logs_refresher, "trigger", lambda: None)
+    yield
+    log_search_refresher.wait()
+    recent_logs_refresher.wait()
+
+
+@pytest.fixture
+def background_refreshes(monkeypatch):
+    """Let in-memory indexes refresh on their background threads.
+
+    Off by default: a build started by app startup would share the test
+    session's connection while the test seeds the database. Refreshes are
+    held until the test sets the returned event, so it can see the index
+    as it stood before.
+    """
+    release = threading.Event()
+    for refresher in (
+        log_search_refresher,
+        photo_hash_refresher,
+        recent_logs_refresher,
+    ):
+        monkeypatch.delattr(refresher, "trigger")
+
+        def held(db, refresh=refresher.refresh):
+            release.wait(10)
+            refresh(db)
+
+        monkeypatch.setattr(refresher, "refresh", held)
+    yield release
+    release.set()
+
+
+@pytest.fixture(autouse=True)
+def reset_analysis_cache():
+    """Tests reuse the same image bytes with different mocked results."""
+    analysis_cache.invalidate()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_photo_hash_index(monkeypatch):
+    """Each test's database starts without the previous test's photo hashes."""
+    photo_hash_index.invalidate()
+    monkeypatch.setattr(photo_hash_refresher, "session_factory", TestingSessionLocal)
+    monkeypatch.setattr(photo_hash_refresher, "trigger", lambda: None)
+    yield
+    photo_hash_refresher.wait()
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_aws_clients():
+    """Tests patch boto3.client, so don't hand out a client cached by another."""
+    reset_aws_clients()
+    yield
+    reset_aws_clients()
+
+
+@pytest.fixture
+def s3_bucket(monkeypatch):
+    """The photos bucket in moto, and the shared S3 client pointed at it."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        boto3.client("s3").create_bucket(Bucket=settings.PHOTOS_S3_BUCKET)
+        yield get_aws_client("s3")
+
+
+@pytest.fixture
+def stored_keys(s3_bucket):
+    """Every key currently in the photos bucket."""
+
+    def keys() -> set:
+        listing = s3_bucket.list_objects_v2(Bucket=settings.PHOTOS_S3_BUCKET)
+        return {obj["Key"] for obj in listing.get("Contents", [])}
+
+    return keys
+
+
+@pytest.fixture
+def http(http_body):
+    """The shared HTTP session, answering each GET with `http_body(url)`.
+
+    Modules using it define an `http_body` fixture returning that function.
+    """
+    session = Mock()
+    session.get.side_effect = lambda url, timeout: Mock(content=http_body(url))
+    with patch("api.services.photo_evaluation.get_http_session", return_value=session):
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def isolate_moderation_queue(tmp_path_factory, monkeypatch):
+    """Queue moderation jobs in a per-test file and leave them for tests to run."""
+    monkeypatch.setattr(
+        moderation_queue_service,
+        "queue",
+        ModerationQueue(str(tmp_path_factory.mktemp("moderation") / "queue.db")),
+    )
+    monkeypatch.setattr(moderation_queue_service, "start", lambda: None)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def isolate_photo_cache(tmp_path_factory, monkeypatch):
+    """Cache photo bytes in a per-test directory, so no test sees another's."""
+    monkeypatch.setattr(
+        photo_cache, "directory", str(tmp_path_factory.mktemp("photo-cache"))
+    )
+    monkeypatch.setattr(photo_cache, "_size", None)
+    photo_cache.stats.reset()
+    yield
+
+
+@pytest.fixture
+def processed_image():
+    """Build the result a mocked `ImageProcessor.process` hands back."""
+
+    def build(photo_size=(100, 100), thumbnail_size=(50, 50)) -> ProcessedImage:
+        return ProcessedImage(
+            photo_bytes=b"processed_photo",
+            thumbnail_bytes=b"processed_thumbnail",
+            photo_size=photo_size,
+            thumbnail_size=thumbnail_size,
+            original_size=photo_size,
+            decoded_size=photo_size,
+        )
+
+    return build
+
+
 @pytest.fixture(scope="function")
 def db():
     """Create test database."""
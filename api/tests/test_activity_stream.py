@@ -0,0 +1,197 @@
+"""
+Tests for the live activity broadcaster and SSE stream.
+"""
+
+import asyncio
+import json
+from datetime import date, time
+from unittest.mock import Mock, patch
+
+from fastapi.testclient import TestClient
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from api.api.v1.endpoints.stream import activity_event_stream
+from api.core.config import settings
+from api.models.user import TLog, User
+from api.services.activity import (
+    LOG_CREATED,
+    PHOTO_CREATED,
+    ActivityBroadcaster,
+    activity_broadcaster,
+)
+
+
+class _FakeRequest:
+    """Minimal stand-in for starlette Request that disconnects after N polls."""
+
+    def __init__(self, polls_before_disconnect: int):
+        self._remaining = polls_before_disconnect
+
+    async def is_disconnected(self) -> bool:
+        self._remaining -= 1
+        return self._remaining < 0
+
+
+@patch("api.services.activity.get_redis_client", return_value=None)
+def test_local_publish_reaches_subscribers(_mock_redis):
+    broadcaster = ActivityBroadcaster(channel="test", queue_size=10)
+
+    async def scenario():
+        subscription = broadcaster.subscribe()
+        broadcaster.publish(LOG_CREATED, {"id": 1, "date": date(2024, 1, 2)})
+        return await asyncio.wait_for(subscription.get(), timeout=1)
+
+    event_type, payload = asyncio.run(scenario())
+    assert event_type == LOG_CREATED
+    body = json.loads(payload)
+    assert body["type"] == LOG_CREATED
+    assert body["data"] == {"id": 1, "date": "2024-01-02"}
+    assert "published_at" in body
+
+
+@patch("api.services.activity.get_redis_client", return_value=None)
+def test_slow_subscriber_drops_oldest(_mock_redis):
+    broadcaster = ActivityBroadcaster(channel="test", queue_size=2)
+
+    async def scenario():
+        subscription = broadcaster.subscribe()
+        for i in range(3):
+            broadcaster.publish(LOG_CREATED, {"id": i})
+        await asyncio.sleep(0)  # let call_soon_threadsafe callbacks run
+        ids = []
+        for _ in range(2):
+            _, payload = await asyncio.wait_for(subscription.get(), timeout=1)
+            ids.append(json.loads(payload)["data"]["id"])
+        return ids, subscription.dropped
+
+    assert asyncio.run(scenario()) == ([1, 2], 1)
+
+
+@patch("api.services.activity.get_redis_client", return_value=None)
+def test_listeners_are_isolated_from_each_other(_mock_redis):
+    broadcaster = ActivityBroadcaster(channel="test", queue_size=10)
+    received = []
+
+    def failing(event_type, data):
+        raise ValueError("boom")
+
+    broadcaster.add_listener(failing)
+    broadcaster.add_listener(lambda event_type, data: received.append(data["id"]))
+
+    broadcaster.publish(PHOTO_CREATED, {"id": 7})
+    assert received == [7]
+
+
+def test_publish_goes_via_redis_when_configured():
+    broadcaster = ActivityBroadcaster(channel="activity:test", queue_size=10)
+    redis_client = Mock()
+    received = []
+    broadcaster.add_listener(lambda event_type, data: received.append(data))
+
+    with patch(
+        "api.services.activity.get_redis_client", return_value=redis_client
+    ), patch.object(broadcaster, "_ensure_redis_listener"):
+        broadcaster.publish(LOG_CREATED, {"id": 3})
+
+    redis_client.publish.assert_called_once()
+    channel, payload = redis_client.publish.call_args.args
+    assert channel == "activity:test"
+    assert json.loads(payload)["data"] == {"id": 3}
+    # Local dispatch happens when the pub/sub message comes back, not directly
+    assert received == []
+
+
+def test_publish_falls_back_to_local_when_redis_fails():
+    broadcaster = ActivityBroadcaster(channel="activity:test", queue_size=10)
+    redis_client = Mock()
+    redis_client.publish.side_effect = RedisError("down")
+    received = []
+    broadcaster.add_listener(lambda event_type, data: received.append(data))
+
+    with patch(
+        "api.services.activity.get_redis_client", return_value=redis_client
+    ), patch.object(broadcaster, "_ensure_redis_listener"):
+        broadcaster.publish(LOG_CREATED, {"id": 4})
+
+    assert received == [{"id": 4}]
+
+
+@patch("api.services.activity.get_redis_client", return_value=None)
+def test_event_stream_emits_events_and_heartbeats(_mock_redis):
+    broadcaster = ActivityBroadcaster(channel="test", queue_size=10)
+
+    async def scenario():
+        subscription = broadcaster.subscribe()
+        broadcaster.publish(LOG_CREATED, {"id": 9})
+        stream = activity_event_stream(
+            _FakeRequest(polls_before_disconnect=2),  # type: ignore[arg-type]
+            broadcaster,
+            subscription,
+            heartbeat_seconds=0.01,
+        )
+        return [frame async for frame in stream]
+
+    frames = asyncio.run(scenario())
+
+    assert frames[0].startswith("retry:")
+    assert frames[1].startswith(f"event: {LOG_CREATED}\ndata: ")
+    assert frames[2] == ": keep-alive\n\n"
+    # Subscription is released once the client disconnects
+    assert broadcaster.subscriber_count == 0
+
+
+def test_create_log_publishes_activity(client: TestClient, db: Session):
+    user = User(
+        id=501, name="streamer", email="s@example.com", auth0_user_id="auth0|501"
+    )
+    log = TLog(
+        id=7001,
+        trig_id=1,
+        user_id=501,
+        date=date(2024, 5, 1),
+        time=time(12, 0),
+        osgb_eastings=1,
+        osgb_northings=1,
+        osgb_gridref="AA 00000 00000",
+        fb_number="",
+        condition="G",
+        comment="Live!",
+        score=0,
+        ip_addr="127.0.0.1",
+        source="W",
+    )
+    db.add_all([user, log])
+    db.commit()
+
+    received = []
+
+    def listener(event_type, data):
+        received.append((event_type, data))
+
+    activity_broadcaster.add_listener(listener)
+    try:
+        with patch("api.api.v1.endpoints.logs.tlog_crud.create_log", return_value=log):
+            resp = client.post(
+                f"{settings.API_V1_STR}/logs?trig_id=1",
+                json={
+                    "date": "2024-05-01",
+                    "time": "12:00:00",
+                    "osgb_eastings": 1,
+                    "osgb_northings": 1,
+                    "osgb_gridref": "AA 00000 00000",
+                    "condition": "G",
+                    "comment": "Live!",
+                },
+                headers={"Authorization": "Bearer auth0_user_501"},
+            )
+    finally:
+        activity_broadcaster.remove_listener(listener)
+
+    assert resp.status_code == 201
+    assert len(received) == 1
+    event_type, data = received[0]
+    assert event_type == LOG_CREATED
+    assert data["id"] == 7001
+    assert data["user_name"] == "streamer"
+    assert data["comment"] == "Live!"
@@ -0,0 +1,100 @@
+"""
+Tests for the digest-keyed Rekognition result cache and concurrent calls.
+"""
+
+import time
+from unittest.mock import Mock, patch
+
+from api.core.config import settings
+from api.services.analysis_cache import AnalysisCache, image_digest
+from api.services.rekognition import RekognitionService
+from api.tests.conftest import jpeg
+
+
+def slow(seconds: float, value):
+    def call(**_kwargs):
+        time.sleep(seconds)
+        return value
+
+    return call
+
+
+def mock_client() -> Mock:
+    client = Mock()
+    client.detect_text.return_value = {"TextDetections": []}
+    client.detect_faces.return_value = {"FaceDetails": []}
+    client.detect_labels.return_value = {"Labels": []}
+    client.detect_moderation_labels.return_value = {"ModerationLabels": []}
+    return client
+
+
+def test_local_cache_is_bounded_and_skips_errors():
+    cache = AnalysisCache(ttl_seconds=60, local_capacity=2)
+    cache.set("orientation", "a", {"x": 1})
+    cache.set("orientation", "b", {"x": 2})
+    cache.set("orientation", "err", {"error": "boom"})
+    assert cache.get("orientation", "a") == {"x": 1}  # now most recent
+    cache.set("orientation", "c", {"x": 3})
+
+    assert cache.get("orientation", "b") is None
+    assert cache.get("orientation", "a") == {"x": 1}
+    assert cache.get("orientation", "err") is None
+    assert cache.get("moderation", "a") is None
+
+
+@patch("boto3.client")
+def test_repeat_analyses_of_same_bytes_hit_cache(mock_boto_client):
+    client = mock_client()
+    mock_boto_client.return_value = client
+    service = RekognitionService()
+    photo = jpeg(colour="red")
+
+    first = service.analyse_orientation(photo)
+    assert service.analyse_orientation(photo) == first
+    assert service.moderate_content(photo) == service.moderate_content(photo)
+    assert client.detect_text.call_count == 1
+    assert client.detect_moderation_labels.call_count == 1
+
+    # Different bytes, different digest
+    assert image_digest(jpeg(colour="blue")) != image_digest(photo)
+    service.analyse_orientation(jpeg(colour="blue"))
+    assert client.detect_text.call_count == 2
+
+
+@patch("boto3.client")
+def test_orientation_calls_run_concurrently(mock_boto_client):
+    client = mock_client()
+    client.detect_text.side_effect = slow(0.3, {"TextDetections": []})
+    client.detect_faces.side_effect = slow(0.3, {"FaceDetails": []})
+    client.detect_labels.side_effect = slow(0.3, {"Labels": []})
+    mock_boto_client.return_value = client
+
+    started = time.perf_counter()
+    result = RekognitionService().analyse_orientation(jpeg(colour="red"))
+    elapsed = time.perf_counter() - started
+
+    assert result is not None and "orientation_confidence" in result
+    assert elapsed < 0.8  # serial would be at least 0.9s
+
+
+@patch("boto3.client")
+def test_slow_calls_time_out(mock_boto_client, monkeypatch):
+    monkeypatch.setattr(settings, "REKOGNITION_CALL_TIMEOUT_SECONDS", 0.2)
+    client = mock_client()
+    client.detect_labels.side_effect = slow(1.0, {"Labels": []})
+    mock_boto_client.return_value = client
+    service = RekognitionService()
+
+    # Labels are optional: the analysis completes without them
+    started = time.perf_counter()
+    result = service.analyse_orientation(jpeg(colour="red"))
+    assert time.perf_counter() - started < 0.8
+    assert result is not None and "orientation_confidence" in result
+
+    # Text is required: a timeout is reported and not cached
+    client.detect_text.side_effect = slow(1.0, {"TextDetections": []})
+    result = service.analyse_orientation(jpeg(colour="green"))
+    assert result == {"error": "Rekognition detect_text timed out"}
+    client.detect_text.side_effect = None
+    result = service.analyse_orientation(jpeg(colour="green"))
+    assert result is not None and "orientation_confidence" in result
@@ -1,11 +1,13 @@
 """
-Target coverage for app/api/deps.py require_scopes branches.
+Target coverage for app/api/deps.py require_scopes branches and owner checks.
 """
 
-from fastapi import APIRouter, Depends, FastAPI
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
 from fastapi.testclient import TestClient
 
-from api.api.deps import require_scopes
+from api.api.deps import ensure_admin, ensure_owner_or_admin, require_scopes
+from api.models.user import User
 
 
 def _build_app():
@@ -37,3 +39,30 @@ def test_require_scopes_auth0_missing_scope(monkeypatch):
     res = c.get("/scoped", headers={"Authorization": "Bearer t"})
     assert res.status_code == 403
     assert "Missing required scope" in res.json().get("detail", "")
+
+
+def _user(user_id: int, permissions: list) -> User:
+    user = User(id=user_id, name=f"user{user_id}")
+    payload = {"token_type": "auth0", "permissions": permissions}
+    setattr(user, "_token_payload", payload)
+    return user
+
+
+def test_ensure_owner_or_admin_needs_every_resource_owned():
+    owner = _user(1, ["api:write"])
+
+    ensure_owner_or_admin(owner, 1, 1)
+    # Nothing found, so nothing to refuse
+    ensure_owner_or_admin(owner)
+    with pytest.raises(HTTPException) as exc:
+        ensure_owner_or_admin(owner, 1, 2)
+    assert exc.value.status_code == 403
+    assert exc.value.detail == "Missing required scope: api:admin"
+
+    ensure_owner_or_admin(_user(3, ["api:admin"]), 1, 2)
+
+
+def test_ensure_admin_refuses_user_without_token():
+    with pytest.raises(HTTPException) as exc:
+        ensure_admin(User(id=1, name="user1"))
+    assert exc.value.detail == "Access denied"
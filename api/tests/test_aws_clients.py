@@ -0,0 +1,64 @@
+"""
+Tests for the shared AWS client registry and S3 uploads against moto.
+"""
+
+from unittest.mock import patch
+
+from api.core.config import settings
+from api.services.aws_clients import get_aws_client
+from api.services.image_processor import Rendition
+from api.services.s3_service import S3Service
+
+
+def test_clients_are_shared_per_service_and_region():
+    with patch("boto3.client", side_effect=lambda *a, **kw: object()) as factory:
+        first = get_aws_client("rekognition", region_name="eu-west-1")
+        again = get_aws_client("rekognition", region_name="eu-west-1")
+        other = get_aws_client("rekognition", region_name="us-east-1")
+
+    assert first is again
+    assert first is not other
+    assert factory.call_count == 2
+    config = factory.call_args.kwargs["config"]
+    assert config.max_pool_connections == settings.AWS_MAX_POOL_CONNECTIONS
+    assert config.tcp_keepalive is True
+
+
+def test_services_reuse_the_shared_client(s3_bucket):
+    assert S3Service().s3_client is s3_bucket
+    assert S3Service().s3_client is s3_bucket
+
+
+def test_upload_photo_thumbnail_and_renditions(s3_bucket):
+    service = S3Service()
+
+    photo_key, thumb_key = service.upload_photo_and_thumbnail(7, b"photo", b"thumb")
+    rendition_keys = service.upload_renditions(
+        photo_key,
+        [
+            Rendition(size=800, image_bytes=b"r800", dimensions=(800, 600)),
+            Rendition(size=320, image_bytes=b"r320", dimensions=(320, 240)),
+        ],
+    )
+
+    assert (photo_key, thumb_key) == ("000/P00007.jpg", "000/I00007.jpg")
+    assert rendition_keys == {800: "000/P00007_800.jpg", 320: "000/P00007_320.jpg"}
+    stored = s3_bucket.get_object(Bucket=service.bucket, Key="000/P00007_320.jpg")
+    assert stored["Body"].read() == b"r320"
+    assert stored["ContentType"] == "image/jpeg"
+
+
+def test_large_objects_use_multipart_upload(s3_bucket):
+    service = S3Service()
+    body = b"x" * (6 * 1024 * 1024)
+
+    with patch.object(
+        settings, "S3_MULTIPART_THRESHOLD", 5 * 1024 * 1024
+    ), patch.object(settings, "S3_MULTIPART_CHUNKSIZE", 5 * 1024 * 1024):
+        photo_key, _ = service.upload_photo_and_thumbnail(8, body, b"thumb")
+
+    head = s3_bucket.head_object(Bucket=service.bucket, Key=photo_key)
+    assert head["ContentLength"] == len(body)
+    # Multipart ETags carry the part count
+    assert head["ETag"].strip('"').endswith("-2")
+    assert head["ContentType"] == "image/jpeg"
@@ -0,0 +1,171 @@
+"""
+Tests for the set-based bulk endpoints (/v1/logs:bulkDelete, /v1/photos:bulkUpdate).
+"""
+
+from datetime import date, datetime, time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from api.crud import tlog as tlog_crud
+from api.models.tphoto import TPhoto
+from api.models.user import TLog, User
+from api.tests.conftest import add_photo
+
+
+def seed_logs_and_photos(db: Session) -> None:
+    db.add_all(
+        [
+            User(
+                id=801, name="owner", email="o@example.com", auth0_user_id="auth0|801"
+            ),
+            User(
+                id=802, name="other", email="x@example.com", auth0_user_id="auth0|802"
+            ),
+        ]
+    )
+    for log_id, user_id in [(9101, 801), (9102, 801), (9103, 802)]:
+        db.add(
+            TLog(
+                id=log_id,
+                trig_id=1,
+                user_id=user_id,
+                date=date(2024, 4, 1),
+                time=time(10, 0),
+                osgb_eastings=1,
+                osgb_northings=1,
+                osgb_gridref="AA 00000 00000",
+                fb_number="",
+                condition="G",
+                comment="",
+                score=0,
+                ip_addr="127.0.0.1",
+                source="W",
+            )
+        )
+    for photo_id, log_id in [(9201, 9101), (9202, 9101), (9203, 9102), (9204, 9103)]:
+        add_photo(
+            db,
+            photo_id,
+            tlog_id=log_id,
+            name="Photo",
+            crt_timestamp=datetime(2024, 4, 1),
+        )
+    db.commit()
+
+
+def _token(user_id: int, scope: str = "api:write") -> dict:
+    return {
+        "token_type": "auth0",
+        "auth0_user_id": f"auth0|{user_id}",
+        "sub": f"auth0|{user_id}",
+        "scope": scope,
+    }
+
+
+def test_bulk_delete_own_logs(client: TestClient, db: Session):
+    seed_logs_and_photos(db)
+
+    with patch("api.api.deps.auth0_validator.validate_auth0_token") as mock:
+        mock.return_value = _token(801)
+        resp = client.post(
+            "/v1/logs:bulkDelete",
+            json={"ids": [9101, 9102, 9999, 9101]},
+            headers={"Authorization": "Bearer mock_token"},
+        )
+
+    assert resp.status_code == 200
+    assert resp.json() == {"deleted": 2, "photos_deleted": 3, "not_found": [9999]}
+    assert db.query(TLog).filter(TLog.id.in_([9101, 9102])).count() == 0
+    deleted_flags = {p.id: p.deleted_ind for p in db.query(TPhoto).all()}
+    assert deleted_flags == {9201: "Y", 9202: "Y", 9203: "Y", 9204: "N"}
+
+
+def test_bulk_delete_others_logs_requires_admin(client: TestClient, db: Session):
+    seed_logs_and_photos(db)
+
+    with patch("api.api.deps.auth0_validator.validate_auth0_token") as mock:
+        mock.return_value = _token(801)
+        resp = client.post(
+            "/v1/logs:bulkDelete",
+            json={"ids": [9101, 9103]},
+            headers={"Authorization": "Bearer mock_token"},
+        )
+
+    assert resp.status_code == 403
+    assert "api:admin" in resp.json()["detail"]
+    # Nothing applied when any row fails authorisation
+    assert db.query(TLog).filter(TLog.id.in_([9101, 9103])).count() == 2
+
+
+def test_bulk_delete_as_admin(client: TestClient, db: Session):
+    seed_logs_and_photos(db)
+
+    with patch("api.api.deps.auth0_validator.validate_auth0_token") as mock:
+        mock.return_value = _token(802, scope="api:write api:admin")
+        resp = client.post(
+            "/v1/logs:bulkDelete",
+            json={"ids": [9101, 9103]},
+            headers={"Authorization": "Bearer mock_token"},
+        )
+
+    assert resp.status_code == 200
+    assert resp.json()["deleted"] == 2
+
+
+def test_bulk_delete_requires_auth(client: TestClient):
+    resp = client.post("/v1/logs:bulkDelete", json={"ids": [1]})
+    assert resp.status_code == 401
+
+
+def test_bulk_update_photos_licence(client: TestClient, db: Session):
+    seed_logs_and_photos(db)
+
+    with patch("api.api.deps.auth0_validator.validate_auth0_token") as mock:
+        mock.return_value = _token(801)
+        resp = client.post(
+            "/v1/photos:bulkUpdate",
+            json={"ids": [9201, 9203, 9999], "updates": {"license": "C"}},
+            headers={"Authorization": "Bearer mock_token"},
+        )
+
+    assert resp.status_code == 200
+    assert resp.json() == {"updated": 2, "not_found": [9999]}
+    licences = {p.id: p.public_ind for p in db.query(TPhoto).all()}
+    assert licences == {9201: "C", 9202: "Y", 9203: "C", 9204: "Y"}
+
+
+def test_bulk_update_others_photos_requires_admin(client: TestClient, db: Session):
+    seed_logs_and_photos(db)
+
+    with patch("api.api.deps.auth0_validator.validate_auth0_token") as mock:
+        mock.return_value = _token(801)
+        resp = client.post(
+            "/v1/photos:bulkUpdate",
+            json={"ids": [9201, 9204], "updates": {"license": "N"}},
+            headers={"Authorization": "Bearer mock_token"},
+        )
+
+    assert resp.status_code == 403
+
+
+def test_bulk_update_rejects_empty_updates(client: TestClient, db: Session):
+    seed_logs_and_photos(db)
+
+    with patch("api.api.deps.auth0_validator.validate_auth0_token") as mock:
+        mock.return_value = _token(801)
+        resp = client.post(
+            "/v1/photos:bulkUpdate",
+            json={"ids": [9201], "updates": {}},
+            headers={"Authorization": "Bearer mock_token"},
+        )
+
+    assert resp.status_code == 400
+
+
+def test_soft_delete_photos_for_log_is_set_based(db: Session):
+    seed_logs_and_photos(db)
+
+    assert tlog_crud.soft_delete_photos_for_log(db, log_id=9101) == 2
+    assert tlog_crud.soft_delete_photos_for_log(db, log_id=9101) == 0
@@ -0,0 +1,154 @@
+"""
+Tests for WebP/AVIF variants, byte-budget encoding and Accept negotiation.
+"""
+
+import io
+from datetime import date, time
+from unittest.mock import patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.models.tphoto import TPhotoVariant
+from api.models.user import TLog, User
+from api.services.image_formats import (
+    AVIF,
+    WEBP,
+    can_encode,
+    encode_to_budget,
+    negotiate,
+    variant_formats,
+)
+from api.services.image_processor import ImageProcessor
+from api.tests.conftest import encode_jpeg
+
+BROWSER_ACCEPT = "image/avif,image/webp,image/apng,image/*,*/*;q=0.8"
+
+
+def scene(size=(2000, 1500)) -> Image.Image:
+    """Smooth colour blocks with a little noise, like a real photo."""
+    rng = np.random.default_rng(3)
+    blocks = rng.integers(0, 256, (6, 8, 3), dtype=np.uint8)
+    img = Image.fromarray(blocks).resize(size, Image.Resampling.BICUBIC)
+    noise = rng.integers(-12, 12, (size[1], size[0], 3))
+    pixels = np.clip(np.asarray(img, dtype=np.int16) + noise, 0, 255)
+    return Image.fromarray(pixels.astype(np.uint8))
+
+
+def test_quality_search_fits_budget():
+    img = scene((400, 300))
+    data, quality = encode_to_budget(img, WEBP, 15000)
+    assert len(data) <= 15000
+    assert settings.PHOTO_VARIANT_MIN_QUALITY < quality
+    assert quality <= settings.PHOTO_VARIANT_MAX_QUALITY
+    with Image.open(io.BytesIO(data)) as decoded:
+        assert decoded.format == "WEBP" and decoded.size == (400, 300)
+
+    # An unreachable budget falls back to the lowest quality
+    _, quality = encode_to_budget(img, WEBP, 10)
+    assert quality == settings.PHOTO_VARIANT_MIN_QUALITY
+
+
+def test_negotiate_needs_explicit_media_type():
+    assert negotiate(BROWSER_ACCEPT, {"webp", "avif"}) == "avif"
+    assert negotiate(BROWSER_ACCEPT, {"webp"}) == "webp"
+    assert negotiate("image/webp;q=0, image/jpeg", {"webp"}) == "jpeg"
+    assert negotiate("*/*", {"webp", "avif"}) == "jpeg"
+    assert negotiate(None, {"webp"}) == "jpeg"
+    # AVIF only where this Pillow can encode it
+    expected = [AVIF, WEBP] if can_encode(AVIF) else [WEBP]
+    assert variant_formats() == expected
+
+
+def test_processor_emits_smaller_variants():
+    result = ImageProcessor().process(encode_jpeg(scene(), quality=95))
+
+    assert "webp" in result.thumbnail_variants
+    assert len(result.thumbnail_variants["webp"]) < len(result.thumbnail_bytes)
+    assert len(result.thumbnail_variants["webp"]) <= settings.THUMBNAIL_BYTE_BUDGET
+    for rendition in result.renditions:
+        webp = rendition.variants["webp"]
+        assert len(webp) < len(rendition.image_bytes)
+        with Image.open(io.BytesIO(webp)) as decoded:
+            assert decoded.size == rendition.dimensions
+
+
+@patch("api.services.s3_service.S3Service.upload_variants", return_value=True)
+@patch("api.services.s3_service.S3Service.upload_renditions")
+@patch("api.services.s3_service.S3Service.upload_photo_and_thumbnail")
+def test_upload_records_variants_and_thumbnail_negotiates(
+    mock_s3_upload,
+    mock_renditions,
+    mock_variants,
+    client: TestClient,
+    db: Session,
+):
+    mock_s3_upload.return_value = ("000/P1.jpg", "000/I1.jpg")
+    mock_renditions.side_effect = lambda key, renditions: {
+        r.size: f"000/P1_{r.size}.jpg" for r in renditions
+    }
+    db.add(
+        User(id=801, name="webp", email="webp@example.com", auth0_user_id="auth0|801")
+    )
+    db.add(
+        TLog(
+            id=8001,
+            trig_id=1,
+            user_id=801,
+            date=date(2024, 1, 1),
+            time=time(12, 0),
+            osgb_eastings=1,
+            osgb_northings=1,
+            osgb_gridref="AA 00000 00000",
+            fb_number="",
+            condition="G",
+            comment="",
+            score=0,
+            ip_addr="127.0.0.1",
+            source="W",
+        )
+    )
+    db.commit()
+
+    resp = client.post(
+        f"{settings.API_V1_STR}/photos?log_id=8001",
+        files={
+            "file": (
+                "p.jpg",
+                io.BytesIO(encode_jpeg(scene(), quality=95)),
+                "image/jpeg",
+            )
+        },
+        data={"caption": "c", "text_desc": "", "type": "T", "license": "Y"},
+        headers={"Authorization": "Bearer auth0_user_801"},
+    )
+    assert resp.status_code == 201, resp.text
+    photo_id = resp.json()["id"]
+
+    uploaded = [key for key, _ in mock_variants.call_args.args[0]]
+    assert "000/I1.webp" in uploaded and "000/P1_800.webp" in uploaded
+    stored = {
+        (int(v.size), str(v.format)): str(v.filename)
+        for v in db.query(TPhotoVariant).filter(TPhotoVariant.photo_id == photo_id)
+    }
+    assert stored[(0, "webp")] == "000/I1.webp"
+
+    url = f"{settings.API_V1_STR}/photos/{photo_id}/thumbnail"
+    modern = client.get(url, headers={"Accept": BROWSER_ACCEPT}, follow_redirects=False)
+    assert modern.status_code == 307
+    assert modern.headers["location"].endswith("000/I1.webp")
+    assert modern.headers["vary"] == "Accept"
+    legacy = client.get(url, headers={"Accept": "*/*"}, follow_redirects=False)
+    assert legacy.headers["location"].endswith("000/I1.jpg")
+
+    rendition = client.get(
+        f"{settings.API_V1_STR}/photos/{photo_id}/renditions/800",
+        headers={"Accept": "image/webp"},
+        follow_redirects=False,
+    )
+    assert rendition.headers["location"].endswith("000/P1_800.webp")
+    missing = client.get(f"{settings.API_V1_STR}/photos/{photo_id}/renditions/99")
+    assert missing.status_code == 404
@@ -0,0 +1,239 @@
+"""
+Tests for the log comment search index and /v1/logs/search.
+"""
+
+from datetime import date, time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.models.user import TLog, User
+from api.services.activity import LOG_CREATED, LOG_DELETED, LOG_UPDATED
+from api.services.log_search import (
+    LogSearchIndex,
+    _iter_postings,
+    log_search_index,
+    log_search_refresher,
+    parse_query,
+    refresh_log_search_index,
+)
+
+COMMENTS = {
+    9001: "Trig destroyed by the farmer, only rubble left.",
+    9002: "Flush bracket missing; pillar otherwise fine.",
+    9003: "The farmer said the trig was not destroyed.",
+    9004: "Lovely views. Flush bracket intact.",
+}
+
+
+def _built_index(comments: dict, compact_threshold: int = 1000) -> LogSearchIndex:
+    index = LogSearchIndex(compact_threshold=compact_threshold)
+    index._built_at = 0.0
+    for log_id, text in sorted(comments.items()):
+        index.add(log_id, text)
+    return index
+
+
+def seed_logs(db: Session) -> None:
+    db.add(User(id=701, name="searcher", email="q@example.com"))
+    for log_id, comment in COMMENTS.items():
+        db.add(
+            TLog(
+                id=log_id,
+                trig_id=1,
+                user_id=701,
+                date=date(2024, 3, 1),
+                time=time(10, 0),
+                osgb_eastings=1,
+                osgb_northings=1,
+                osgb_gridref="AA 00000 00000",
+                fb_number="",
+                condition="G",
+                comment=comment,
+                score=0,
+                ip_addr="127.0.0.1",
+                source="W",
+            )
+        )
+    db.commit()
+
+
+def test_parse_query_splits_phrases_and_words():
+    assert parse_query('"Flush bracket" missing trig-pillar') == [
+        ["flush", "bracket"],
+        ["missing"],
+        ["trig", "pillar"],
+    ]
+    assert parse_query('  "" ;; ') == []
+
+
+def test_postings_round_trip_compressed():
+    index = _built_index({1: "a b a", 300: "b", 100000: "a"})
+
+    assert list(_iter_postings(index._postings["a"])) == [
+        (1, [0, 2]),
+        (100000, [0]),
+    ]
+    # Gaps and positions fit in far fewer bytes than raw integers
+    assert len(index._postings["a"]) == 9
+
+
+def test_and_and_phrase_queries():
+    index = _built_index(COMMENTS)
+
+    assert index.search("trig destroyed") == [9003, 9001]
+    assert index.search('"trig destroyed"') == [9001]
+    assert index.search('"flush bracket" missing') == [9002]
+    assert index.search("FLUSH Bracket") == [9004, 9002]
+    assert index.search("unicorn trig") == []
+    assert index.search("") == []
+
+
+def test_edits_and_deletes_are_searchable_before_and_after_compaction():
+    index = _built_index(COMMENTS, compact_threshold=3)
+
+    index.handle_event(LOG_UPDATED, {"id": 9001, "comment": "Pillar repainted."})
+    index.handle_event(LOG_DELETED, {"id": 9004})
+    index.handle_event(LOG_CREATED, {"id": 9005, "comment": "Trig destroyed again"})
+
+    assert index.search('"trig destroyed"') == [9005]
+    assert index.search("pillar") == [9002, 9001]
+    assert index.search("flush") == [9002]
+    assert len(index._tombstones) == 2
+
+    index.handle_event(LOG_UPDATED, {"id": 9003, "comment": "farmer pillar"})
+
+    # Third tombstone triggered compaction
+    assert index._tombstones == set()
+    assert index._delta == {}
+    assert index.search("pillar") == [9003, 9002, 9001]
+    assert index.search("farmer") == [9003]
+    assert index.search('"trig destroyed"') == [9005]
+
+
+def test_search_index_is_built_in_the_background(
+    client: TestClient, db: Session, background_refreshes
+):
+    seed_logs(db)
+
+    warming = client.get(f"{settings.API_V1_STR}/logs/search?q=trig")
+    assert warming.status_code == 503
+    assert warming.headers["retry-after"] == "10"
+
+    background_refreshes.set()
+    log_search_refresher.wait(5)
+    resp = client.get(f"{settings.API_V1_STR}/logs/search?q=trig")
+    assert resp.status_code == 200
+    assert resp.json()["pagination"]["total"] == 2
+
+
+def test_search_endpoint_paginates_and_enriches(client: TestClient, db: Session):
+    seed_logs(db)
+    refresh_log_search_index(db)
+
+    resp = client.get(f"{settings.API_V1_STR}/logs/search?q=trig%20farmer&limit=1")
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [item["id"] for item in body["items"]] == [9003]
+    assert body["items"][0]["user_name"] == "searcher"
+    assert body["pagination"] == {
+        "total": 2,
+        "limit": 1,
+        "offset": 0,
+        "has_more": True,
+    }
+    assert body["links"]["next"] == "/v1/logs/search?q=trig%20farmer&limit=1&skip=1"
+
+
+def test_search_endpoint_catches_up_with_new_logs(
+    client: TestClient, db: Session, background_refreshes
+):
+    seed_logs(db)
+    refresh_log_search_index(db)
+    assert log_search_index.max_doc_id == 9004
+
+    db.add(
+        TLog(
+            id=9010,
+            trig_id=1,
+            user_id=701,
+            date=date(2024, 3, 2),
+            time=time(10, 0),
+            osgb_eastings=1,
+            osgb_northings=1,
+            osgb_gridref="AA 00000 00000",
+            fb_number="",
+            condition="G",
+            comment="Written on the legacy site",
+            score=0,
+            ip_addr="127.0.0.1",
+            source="W",
+        )
+    )
+    db.commit()
+    log_search_index._built_at = -1e9  # pretend the catch-up interval elapsed
+
+    # The due catch-up runs in the background; this search sees the old index
+    stale = client.get(f"{settings.API_V1_STR}/logs/search?q=legacy")
+    assert stale.json()["items"] == []
+    background_refreshes.set()
+    log_search_refresher.wait(5)
+    resp = client.get(f"{settings.API_V1_STR}/logs/search?q=legacy")
+
+    assert [item["id"] for item in resp.json()["items"]] == [9010]
+    assert log_search_index.seconds_since_build() > 0
+
+
+def test_search_rebuild_picks_up_changes_made_elsewhere(
+    client: TestClient, db: Session, background_refreshes
+):
+    seed_logs(db)
+    refresh_log_search_index(db)
+    # Edited and deleted by the legacy site: no events reach the index
+    db.query(TLog).filter(TLog.id == 9003).delete()
+    edited = db.get(TLog, 9001)
+    assert edited is not None
+    edited.comment = "Pillar repainted"  # type: ignore[assignment]
+    db.commit()
+
+    # The deleted log is still indexed: counted, but the page skips past it
+    resp = client.get(f"{settings.API_V1_STR}/logs/search?q=farmer&limit=1")
+    assert [item["id"] for item in resp.json()["items"]] == [9001]
+    assert resp.json()["pagination"]["total"] == 2
+
+    log_search_index._built_at = log_search_index._full_built_at = -1e9
+    client.get(f"{settings.API_V1_STR}/logs/search?q=farmer")
+    background_refreshes.set()
+    log_search_refresher.wait(5)
+
+    assert log_search_index.search("farmer") == []
+    assert log_search_index.search("repainted") == [9001]
+
+
+def test_events_during_a_build_are_replayed_after_it(db: Session):
+    seed_logs(db)
+    refresh_log_search_index(db)
+    index = log_search_index
+    read_rows = db.execute
+
+    def execute(statement, *args, **kwargs):
+        rows = list(read_rows(statement, *args, **kwargs))
+        # Edited and deleted after the build read the table
+        index.handle_event(LOG_UPDATED, {"id": 9001, "comment": "Pillar repainted"})
+        index.handle_event(LOG_DELETED, {"id": 9003})
+        return rows
+
+    with patch.object(db, "execute", side_effect=execute):
+        index.build(db)
+
+    assert index.search("farmer") == []
+    assert index.search("repainted") == [9001]
+    assert index.search("trig") == []
+
+
+def test_search_endpoint_requires_query(client: TestClient):
+    resp = client.get(f"{settings.API_V1_STR}/logs/search")
+    assert resp.status_code == 422
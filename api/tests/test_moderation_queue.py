@@ -0,0 +1,211 @@
+"""
+Tests for the background content-moderation queue.
+"""
+
+from datetime import date, time
+from unittest.mock import Mock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.crud import tphoto as tphoto_crud
+from api.main import app
+from api.models.tphoto import TPhoto
+from api.models.user import TLog
+from api.services.content_moderation import moderate_photo_async
+from api.services.moderation_queue import ModerationQueue, moderation_queue_service
+from api.tests.conftest import add_photo
+
+
+def seed_photos(db: Session, count: int) -> None:
+    db.add(
+        TLog(
+            id=1,
+            trig_id=1,
+            user_id=1,
+            date=date(2024, 6, 1),
+            time=time(9, 0),
+            osgb_eastings=1,
+            osgb_northings=1,
+            osgb_gridref="AA 00000 00000",
+            fb_number="",
+            condition="G",
+            comment="",
+            score=0,
+            ip_addr="127.0.0.1",
+            source="W",
+        )
+    )
+    for photo_id in range(1, count + 1):
+        add_photo(db, photo_id)
+    db.commit()
+
+
+@pytest.fixture
+def worker(db: Session):
+    """Run batches against the test database on a single worker."""
+    session_factory = sessionmaker(
+        autocommit=False, autoflush=False, bind=db.get_bind()
+    )
+    with patch.object(
+        moderation_queue_service, "session_factory", session_factory
+    ), patch.object(moderation_queue_service, "max_attempts", 3):
+        yield moderation_queue_service
+    moderation_queue_service.shutdown()
+
+
+def deleted_ind(db: Session, photo_id: int) -> str:
+    db.expire_all()
+    photo = db.get(TPhoto, photo_id)
+    assert photo is not None
+    return str(photo.deleted_ind)
+
+
+def test_claim_leases_jobs_until_retried_or_expired(tmp_path):
+    queue = ModerationQueue(str(tmp_path / "queue.db"))
+    queue.put(1, b"one", now=100)
+    queue.put(2, None, now=101)
+
+    jobs = queue.claim(10, lease_seconds=60, now=200)
+    assert [(j.photo_id, j.image_bytes, j.attempts) for j in jobs] == [
+        (1, b"one", 0),
+        (2, None, 0),
+    ]
+    # Leased jobs are not handed out twice
+    assert queue.claim(10, lease_seconds=60, now=201) == []
+
+    queue.retry(jobs[0].id, delay=30, now=210)
+    queue.complete([jobs[1].id])
+    assert queue.claim(10, lease_seconds=60, now=239) == []
+    (retried,) = queue.claim(10, lease_seconds=60, now=240)
+    assert (retried.photo_id, retried.attempts) == (1, 1)
+
+    # An abandoned lease makes the job claimable again
+    assert queue.claim(10, lease_seconds=60, now=299) == []
+    assert [j.photo_id for j in queue.claim(10, lease_seconds=60, now=300)] == [1]
+    assert queue.pending() == 1
+
+
+def test_async_moderation_queues_uploaded_bytes():
+    moderate_photo_async(42, b"processed")
+
+    (job,) = moderation_queue_service.queue.claim(10, lease_seconds=60)
+    assert (job.photo_id, job.image_bytes) == (42, b"processed")
+
+
+def test_batch_uses_queued_bytes_and_hides_flagged_photos(worker, db: Session):
+    seed_photos(db, 3)
+    for photo_id in (1, 2, 3):
+        moderate_photo_async(photo_id, f"photo-{photo_id}".encode())
+
+    def moderate(image_bytes):
+        flagged = image_bytes != b"photo-2"
+        return {
+            "is_inappropriate": flagged,
+            "findings": [{"label": "Violence", "confidence": 90.0}] if flagged else [],
+        }
+
+    with patch(
+        "api.services.moderation_queue.download_photo_bytes"
+    ) as download, patch.object(
+        worker.moderation.rekognition, "moderate_content", side_effect=moderate
+    ), patch.object(
+        tphoto_crud, "update_photos_bulk", wraps=tphoto_crud.update_photos_bulk
+    ) as bulk:
+        assert worker.run_once() == 3
+
+    download.assert_not_called()
+    bulk.assert_called_once()
+    assert bulk.call_args.kwargs["photo_ids"] == [1, 3]
+    assert [deleted_ind(db, i) for i in (1, 2, 3)] == ["M", "N", "M"]
+    assert worker.queue.pending() == 0
+
+
+def test_job_without_bytes_downloads_photo(worker, db: Session):
+    seed_photos(db, 1)
+    moderate_photo_async(1)
+
+    with patch.object(
+        worker.moderation, "photo_url", return_value="https://example.com/p.jpg"
+    ), patch(
+        "api.services.moderation_queue.download_photo_bytes", return_value=b"x"
+    ) as download, patch.object(
+        worker.moderation.rekognition,
+        "moderate_content",
+        return_value={"is_inappropriate": False, "findings": []},
+    ):
+        assert worker.run_once() == 1
+
+    download.assert_called_once_with("https://example.com/p.jpg")
+    assert deleted_ind(db, 1) == "N"
+    assert worker.queue.pending() == 0
+
+
+def test_unavailable_service_backs_off_then_hides(worker, db: Session):
+    seed_photos(db, 1)
+
+    with patch.object(
+        worker.moderation.rekognition, "moderate_content", return_value=None
+    ), patch("api.services.moderation_queue.time.time") as clock:
+        clock.return_value = 1000.0
+        moderate_photo_async(1, b"photo")
+        assert worker.run_once() == 1
+        # Backing off 30s: nothing due yet
+        assert worker.run_once() == 0
+        assert deleted_ind(db, 1) == "N"
+
+        # The second failure waits twice as long; the third is final
+        clock.return_value = 1030.0
+        assert worker.run_once() == 1
+        clock.return_value = 1089.0
+        assert worker.run_once() == 0
+        clock.return_value = 1090.0
+        assert worker.run_once() == 1
+
+    assert deleted_ind(db, 1) == "M"
+    assert worker.queue.pending() == 0
+
+
+def test_throttled_rekognition_call_is_retried(worker, db: Session):
+    seed_photos(db, 1)
+    throttled = ClientError(
+        {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
+        "DetectModerationLabels",
+    )
+    client = Mock()
+    client.detect_moderation_labels.side_effect = [
+        throttled,
+        {"ModerationLabels": []},
+    ]
+
+    # The real RekognitionService turns the error into {"error": ...}
+    with patch.object(worker.moderation.rekognition, "client", client), patch(
+        "api.services.moderation_queue.time.time"
+    ) as clock:
+        clock.return_value = 1000.0
+        moderate_photo_async(1, b"photo")
+        assert worker.run_once() == 1
+        assert worker.queue.pending() == 1
+        assert deleted_ind(db, 1) == "N"
+
+        # Not served the cached failure: the retry calls Rekognition again
+        clock.return_value = 1030.0
+        assert worker.run_once() == 1
+
+    assert client.detect_moderation_labels.call_count == 2
+    assert deleted_ind(db, 1) == "N"
+    assert worker.queue.pending() == 0
+
+
+def test_app_startup_resumes_queue_and_shutdown_stops_it(monkeypatch):
+    start, shutdown = Mock(), Mock()
+    monkeypatch.setattr(moderation_queue_service, "start", start)
+    monkeypatch.setattr(moderation_queue_service, "shutdown", shutdown)
+
+    with TestClient(app):
+        start.assert_called_once_with()
+        shutdown.assert_not_called()
+
+    shutdown.assert_called_once_with()
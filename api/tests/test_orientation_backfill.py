@@ -0,0 +1,145 @@
+"""
+Tests for batched orientation inference and the orientation backfill.
+"""
+
+from datetime import date, time
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from api.crud import tphoto as tphoto_crud
+from api.models.server import Server
+from api.models.tphoto import TPhotoOrientation
+from api.models.user import TLog
+from api.services.orientation_backfill import backfill_orientations
+from api.services.orientation_model import OrientationClassifier
+from api.tests.conftest import add_photo, jpeg
+
+
+class FakeSession:
+    """Stands in for onnxruntime: bright images are upright, dark ones at 90."""
+
+    def __init__(self, batch_dim="batch"):
+        self.batch_shapes: List[tuple] = []
+        self.batch_dim = batch_dim
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input", shape=[self.batch_dim, 3, 224, 224])]
+
+    def run(self, _outputs, feeds):
+        batch = feeds["input"]
+        self.batch_shapes.append(batch.shape)
+        if isinstance(self.batch_dim, int):
+            assert len(batch) == self.batch_dim
+        assert batch.dtype == np.float32 and batch.flags["C_CONTIGUOUS"]
+        brightness = batch.mean(axis=(1, 2, 3))
+        logits = np.zeros((len(batch), 4), dtype=np.float32)
+        logits[:, 0] = (brightness - 0.5) * 10
+        logits[:, 1] = (0.5 - brightness) * 10
+        return [logits]
+
+
+def classifier_with(session: FakeSession) -> OrientationClassifier:
+    classifier = OrientationClassifier(model_path="unused.onnx")
+    classifier._session = session  # type: ignore[assignment]
+    return classifier
+
+
+def seed_photos(db: Session, count: int) -> None:
+    db.add(Server(id=1, url="https://photos.example.com", path="/", name="S3"))
+    db.add(
+        TLog(
+            id=1,
+            trig_id=1,
+            user_id=1,
+            date=date(2024, 6, 1),
+            time=time(9, 0),
+            osgb_eastings=1,
+            osgb_northings=1,
+            osgb_gridref="AA 00000 00000",
+            fb_number="",
+            condition="G",
+            comment="",
+            score=0,
+            ip_addr="127.0.0.1",
+            source="W",
+        )
+    )
+    for photo_id in range(1, count + 1):
+        add_photo(db, photo_id, width=120, height=90, icon_width=12, icon_height=9)
+    db.commit()
+
+
+def test_predict_batch_scores_in_nchw_batches_and_skips_bad_images():
+    session = FakeSession()
+    classifier = classifier_with(session)
+    images = [
+        jpeg(colour="white"),
+        b"not an image",
+        jpeg(colour="black"),
+        jpeg(colour="white"),
+    ]
+
+    results = classifier.predict_batch(images, batch_size=2)
+
+    assert [r[0] if r else None for r in results] == ["0", None, "90", "0"]
+    assert all(r is None or 0.9 < r[1] <= 1.0 for r in results)
+    # The undecodable image is dropped from its batch rather than failing it
+    assert session.batch_shapes == [(1, 3, 224, 224), (2, 3, 224, 224)]
+    assert classifier.predict(jpeg(colour="black")) == results[2]
+
+
+def test_predict_batch_respects_fixed_batch_dimension():
+    session = FakeSession(batch_dim=1)
+    classifier = classifier_with(session)
+
+    classifier.predict_batch([jpeg(colour="white")] * 3, batch_size=32)
+
+    assert session.batch_shapes == [(1, 3, 224, 224)] * 3
+
+
+def test_predict_batch_pads_short_batches_for_fixed_batch_models():
+    session = FakeSession(batch_dim=2)
+    classifier = classifier_with(session)
+    images = [jpeg(colour="white"), b"not an image", jpeg(colour="black")]
+
+    results = classifier.predict_batch(images)
+
+    assert [r[0] if r else None for r in results] == ["0", None, "90"]
+    assert session.batch_shapes == [(2, 3, 224, 224)] * 2
+
+
+def test_backfill_writes_orientations_and_skips_scored_photos(db: Session):
+    seed_photos(db, 5)
+    fetched: List[str] = []
+
+    def fetch(url: str, _timeout: float) -> bytes:
+        fetched.append(url)
+        if url.endswith("I00003.jpg"):
+            raise OSError("gone")
+        return jpeg(colour="black" if url.endswith("I00002.jpg") else "white")
+
+    session = FakeSession()
+    stats = backfill_orientations(
+        db, classifier_with(session), batch_size=2, fetch_workers=4, fetch=fetch
+    )
+
+    assert (stats.scanned, stats.scored, stats.failed) == (5, 4, 1)
+    assert stats.last_photo_id == 5
+    assert "https://photos.example.com/000/I00001.jpg" in fetched
+    rows = {int(r.photo_id): r for r in db.query(TPhotoOrientation).all()}
+    assert sorted(rows) == [1, 2, 4, 5]
+    assert rows[2].angle == 90 and rows[1].angle == 0
+
+    suspected = tphoto_crud.list_suspected_rotations(db, min_confidence=0.65)
+    assert [r.photo_id for r in suspected] == [2]
+
+    # A second run only retries the photo that failed
+    fetched.clear()
+    stats = backfill_orientations(
+        db, classifier_with(FakeSession()), batch_size=2, fetch_workers=4, fetch=fetch
+    )
+    assert fetched == ["https://photos.example.com/000/I00003.jpg"]
+    assert (stats.scanned, stats.scored) == (1, 0)
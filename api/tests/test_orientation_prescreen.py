@@ -0,0 +1,155 @@
+"""
+Tests for the local orientation pre-screen in front of Rekognition.
+"""
+
+import io
+from unittest.mock import Mock, patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from api.core.config import settings
+from api.services import rekognition as rek
+from api.services.orientation_prescreen import (
+    icon_pixels,
+    prescreen,
+    prescreen_stats,
+    sky_bias,
+)
+from api.services.rekognition import RekognitionService
+
+
+class StubClassifier:
+    def __init__(self, prediction):
+        self.prediction = prediction
+        self.seen = []
+
+    def predict(self, image_bytes):
+        self.seen.append(image_bytes)
+        return self.prediction
+
+
+def sky_image(side: str, size=(400, 300)) -> bytes:
+    """White image with blue sky filling one half (or the top-left quarter)."""
+    width, height = size
+    img = Image.new("RGB", size, "white")
+    box = {
+        "top": (0, 0, width, height // 2),
+        "left": (0, 0, width // 2, height),
+        "corner": (0, 0, width // 2, height // 2),
+    }[side]
+    img.paste((50, 80, 200), box)
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def service_with(monkeypatch, prediction) -> RekognitionService:
+    monkeypatch.setattr(settings, "ORIENTATION_MODEL_ENABLED", True)
+    classifier = StubClassifier(prediction)
+    monkeypatch.setattr(rek, "OrientationClassifier", lambda *_a, **_kw: classifier)
+    return RekognitionService()
+
+
+def test_heuristics_run_on_icon_sized_arrays():
+    pixels = icon_pixels(sky_image("left"))
+    assert pixels is not None
+    assert max(pixels.shape[:2]) == settings.THUMBNAIL_SIZE
+
+    top, bottom, left, right = sky_bias(pixels)
+    assert left > 0 and right == 0
+    assert top == bottom and top + bottom == left
+
+    local = prescreen(sky_image("top"))
+    assert local.sky_angle == "0"
+    assert local.model_prediction is None
+    assert local.verdict == ("0", 1.0)
+
+
+def test_sky_alone_decides_only_when_on_one_side(monkeypatch):
+    assert prescreen(sky_image("left")).verdict == ("90", 1.0)
+    # Sky in the top-left corner is as much "left" as "top"
+    assert not prescreen(sky_image("corner")).confident
+
+    monkeypatch.setattr(settings, "ORIENTATION_PRESCREEN_SKY_THRESHOLD", 1.1)
+    assert not prescreen(sky_image("top")).confident
+
+
+@patch("boto3.client")
+def test_sky_prescreen_skips_rekognition_without_model(mock_boto_client):
+    mock_client = Mock()
+    mock_boto_client.return_value = mock_client
+    prescreen_stats.reset()
+    service = RekognitionService()
+    assert service.orientation_model is None
+
+    result = service.analyse_orientation(sky_image("left"))
+
+    assert result is not None
+    assert result["suggested_rotation"] == "90"
+    assert result["debug_info"]["decided_by"] == "sky"
+    mock_client.detect_text.assert_not_called()
+    assert prescreen_stats.snapshot()["rekognition_calls_avoided"] == 3
+
+
+@patch("boto3.client")
+def test_confident_prescreen_skips_rekognition(mock_boto_client, monkeypatch):
+    mock_client = Mock()
+    mock_boto_client.return_value = mock_client
+    prescreen_stats.reset()
+    service = service_with(monkeypatch, ("0", 0.97))
+    icon = sky_image("top", size=(120, 90))
+
+    result = service.analyse_orientation(sky_image("top"), icon_bytes=icon)
+
+    assert result is not None
+    assert result["suggested_rotation"] == "0"
+    assert result["likely_incorrect"] is False
+    assert result["debug_info"]["source"] == "local_prescreen"
+    mock_client.detect_text.assert_not_called()
+    mock_client.detect_faces.assert_not_called()
+    mock_client.detect_labels.assert_not_called()
+    # The model scored the icon, not the full photo
+    assert service.orientation_model.seen == [icon]  # type: ignore[union-attr]
+    assert prescreen_stats.snapshot() == {
+        "analyses": 1,
+        "prescreened": 1,
+        "rekognition_calls_avoided": 3,
+    }
+
+
+@patch("boto3.client")
+def test_sky_disagreeing_with_model_falls_back_to_rekognition(
+    mock_boto_client, monkeypatch
+):
+    mock_client = Mock()
+    mock_client.detect_text.return_value = {"TextDetections": []}
+    mock_client.detect_faces.return_value = {"FaceDetails": []}
+    mock_client.detect_labels.return_value = {"Labels": []}
+    mock_boto_client.return_value = mock_client
+    prescreen_stats.reset()
+    # Model says upright, but the sky is down the left-hand side
+    service = service_with(monkeypatch, ("0", 0.97))
+
+    result = service.analyse_orientation(sky_image("left"))
+
+    assert result is not None
+    assert "source" not in result["debug_info"]
+    mock_client.detect_text.assert_called_once()
+    assert result["orientation_confidence"]["90"] > 25.0
+    assert prescreen_stats.snapshot()["rekognition_calls_avoided"] == 0
+
+
+def test_rekognition_stats_endpoint(client: TestClient):
+    prescreen_stats.reset()
+    prescreen_stats.record(True)
+    prescreen_stats.record(False)
+
+    resp = client.get(f"{settings.API_V1_STR}/stats/rekognition")
+
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "analyses": 2,
+        "prescreened": 1,
+        "rekognition_calls_avoided": 3,
+    }
@@ -0,0 +1,97 @@
+"""
+Tests for the batch photo dimension audit.
+"""
+
+from datetime import datetime
+from typing import Dict, List
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.orm import Session
+
+from api.models.server import Server
+from api.models.tphoto import TPhotoDimensionAudit
+from api.services.photo_audit import (
+    audit_photo_dimensions,
+    fetch_head,
+    jpeg_dimensions,
+    read_dimensions,
+)
+from api.tests.conftest import add_photo, jpeg
+
+NOW = datetime(2025, 3, 1, 12, 0)
+# Stored dimensions of a photo and its thumbnail
+SIZES = {"width": 640, "height": 480, "icon_width": 120, "icon_height": 90}
+
+
+def test_dimensions_come_from_the_frame_header():
+    assert jpeg_dimensions(jpeg((640, 480))) == (640, 480)
+    assert jpeg_dimensions(jpeg((33, 17), progressive=True)) == (33, 17)
+    assert jpeg_dimensions(b"\x89PNG\r\n\x1a\n") is None
+
+    # The frame header follows a 40KB ICC profile, past the first read
+    icc = jpeg((300, 200), icc_profile=bytes(40 * 1024))
+    assert jpeg_dimensions(icc[:16384]) is None
+    reads: List[int] = []
+
+    def fetch(url: str, length: int, timeout: float) -> bytes:
+        reads.append(length)
+        return icc[:length]
+
+    assert read_dimensions("https://x/P.jpg", fetch) == (300, 200)
+    assert reads == [16384, 256 * 1024]
+
+
+def test_audit_records_only_mismatches(db: Session):
+    db.add(Server(id=1, url="https://photos.example.com", path="/", name="S3"))
+    add_photo(db, 1, **SIZES)
+    # Stored rotated, row never updated
+    add_photo(db, 2, **{**SIZES, "width": 480, "height": 640})
+    add_photo(db, 3, **SIZES)
+    add_photo(db, 4, **SIZES, deleted_ind="Y")
+    db.add(TPhotoDimensionAudit(photo_id=1, audited_timestamp=datetime(2025, 1, 1)))
+    db.commit()
+    objects: Dict[str, bytes] = {
+        "P00001.jpg": jpeg((640, 480)),
+        "I00001.jpg": jpeg((120, 90)),
+        "P00002.jpg": jpeg((640, 480)),
+        "I00002.jpg": jpeg((120, 90)),
+        "P00003.jpg": jpeg((640, 480)),
+    }
+    fetched: List[str] = []
+
+    def fetch(url: str, length: int, timeout: float) -> bytes:
+        name = url.rsplit("/", 1)[1]
+        fetched.append(name)
+        if name not in objects:
+            raise OSError("404")
+        return objects[name][:length]
+
+    stats = audit_photo_dimensions(db, batch_size=2, workers=4, fetch=fetch, now=NOW)
+
+    assert (stats.scanned, stats.mismatched, stats.failed) == (3, 1, 1)
+    assert stats.last_photo_id == 3
+    assert "P00004.jpg" not in fetched
+    rows = {int(row.photo_id): row for row in db.query(TPhotoDimensionAudit)}
+    # Photo 1 matches now, so its earlier finding is cleared
+    assert sorted(rows) == [2, 3]
+    assert (rows[2].photo_width_actual, rows[2].photo_height_actual) == (640, 480)
+    assert rows[2].icon_width_actual == 120
+    assert "Photo dimensions mismatch: DB(480x640)" in str(rows[2].error)
+    assert rows[3].icon_width_actual is None
+    assert "Icon download failed" in str(rows[3].error)
+    assert rows[3].audited_timestamp == NOW
+
+
+def test_fetch_head_sends_range_and_stops_reading():
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.return_value = iter([b"a" * 8192, b"b" * 8192, b"c"])
+    session = MagicMock()
+    session.get.return_value = response
+
+    with patch("api.services.photo_audit.get_http_session", return_value=session):
+        head = fetch_head("https://x/P.jpg", 10000, 5.0)
+
+    assert head == b"a" * 8192 + b"b" * 1808
+    assert session.get.call_args.kwargs["headers"] == {"Range": "bytes=0-9999"}
+    assert session.get.call_args.kwargs["stream"] is True
@@ -0,0 +1,83 @@
+"""
+Tests for the on-disk LRU cache of original photo bytes.
+"""
+
+import os
+from unittest.mock import Mock, patch
+
+from fastapi.testclient import TestClient
+
+from api.core.config import settings
+from api.services.content_moderation import ContentModerationService
+from api.services.photo_cache import PhotoCache, photo_cache
+
+
+def test_round_trip_counts_hits_and_misses(tmp_path):
+    cache = PhotoCache(str(tmp_path), max_bytes=1024)
+    fetch = Mock(return_value=b"jpeg bytes")
+
+    assert cache.get_or_fetch(1, "000/P1.jpg", fetch) == b"jpeg bytes"
+    assert cache.get_or_fetch(1, "000/P1.jpg", fetch) == b"jpeg bytes"
+    # Same filename on another server is a different photo
+    assert cache.get(2, "000/P1.jpg") is None
+
+    fetch.assert_called_once()
+    assert cache.stats.snapshot() == {
+        "hits": 1,
+        "misses": 2,
+        "stores": 1,
+        "evictions": 0,
+    }
+    # Written via a temporary file that is renamed into place
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert len(files) == 1 and not files[0].startswith(".tmp-")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = PhotoCache(str(tmp_path), max_bytes=300)
+    for index, name in enumerate(["a", "b", "c"]):
+        cache.put(1, name, bytes(100))
+        path = cache._path(1, name)
+        os.utime(path, (1000 + index, 1000 + index))
+    # Reading "a" makes it the most recently used
+    assert cache.get(1, "a") is not None
+
+    cache.put(1, "d", bytes(100))
+
+    assert cache.get(1, "b") is None
+    assert cache.get(1, "c") is None
+    assert cache.get(1, "a") is not None
+    assert cache.get(1, "d") is not None
+    assert cache.stats.evictions == 2
+
+
+def test_repeat_moderation_downloads_once(db):
+    service = ContentModerationService()
+    photo = Mock(id=1, server_id=1, deleted_ind="N", filename="000/P1.jpg")
+    server = Mock(url="https://example.com")
+
+    with patch("api.services.content_moderation.tphoto_crud") as mock_crud, patch(
+        "api.services.content_moderation.download_photo_bytes",
+        return_value=b"bytes",
+    ) as download, patch.object(
+        service, "_get_server_for_photo", return_value=server
+    ), patch.object(
+        service.rekognition,
+        "moderate_content",
+        return_value={"is_inappropriate": False, "findings": []},
+    ):
+        mock_crud.get_photo_by_id.return_value = photo
+        assert service.moderate_photo(db, 1) is True
+        assert service.moderate_photo(db, 1) is True
+
+    download.assert_called_once_with("https://example.com/000/P1.jpg")
+
+
+def test_photo_cache_stats_endpoint(client: TestClient):
+    photo_cache.get_or_fetch(1, "000/P9.jpg", lambda: b"x")
+    photo_cache.get_or_fetch(1, "000/P9.jpg", lambda: b"x")
+
+    resp = client.get(f"{settings.API_V1_STR}/stats/photo-cache")
+
+    assert resp.status_code == 200
+    assert resp.json() == {"hits": 1, "misses": 1, "stores": 1, "evictions": 0}
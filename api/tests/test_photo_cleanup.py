@@ -0,0 +1,175 @@
+"""
+Tests for removing the S3 objects of deleted and moderated photos.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.crud import tphoto as tphoto_crud
+from api.models.tphoto import TPhoto, TPhotoPurge, TPhotoRendition, TPhotoVariant
+from api.services.photo_cleanup import (
+    CleanupCheckpoint,
+    cleanup_deleted_photos,
+    key_batches,
+)
+from api.services.s3_service import S3Service
+from api.tests.conftest import add_photo
+
+T0 = datetime(2025, 1, 1)
+LATER = T0 + timedelta(days=31)
+
+
+def add_stored_photo(db: Session, s3, photo_id: int, deleted_ind: str, server_id=1):
+    photo = add_photo(db, photo_id, deleted_ind=deleted_ind, server_id=server_id)
+    for key in (photo.filename, photo.icon_filename):
+        s3.put_object(Bucket=settings.PHOTOS_S3_BUCKET, Key=key, Body=b"x")
+    db.commit()
+
+
+def run(db: Session, now: datetime, **kwargs):
+    return cleanup_deleted_photos(
+        db, s3_service=S3Service(), retention_days=30, now=now, **kwargs
+    )
+
+
+def test_objects_go_after_the_retention_window(s3_bucket, stored_keys, db: Session):
+    add_stored_photo(db, s3_bucket, 1, "N")
+    add_stored_photo(db, s3_bucket, 2, "Y")
+    add_stored_photo(db, s3_bucket, 3, "M")
+    add_stored_photo(db, s3_bucket, 4, "Y", server_id=2)
+    db.add(
+        TPhotoRendition(
+            photo_id=2,
+            size=800,
+            filename="000/P00002_800.jpg",
+            filesize=1,
+            height=1,
+            width=1,
+        )
+    )
+    db.add(
+        TPhotoVariant(
+            photo_id=2, size=0, format="webp", filename="000/I00002.webp", filesize=1
+        )
+    )
+    db.commit()
+    for key in ("000/P00002_800.jpg", "000/I00002.webp"):
+        s3_bucket.put_object(Bucket=settings.PHOTOS_S3_BUCKET, Key=key, Body=b"x")
+
+    first = run(db, T0)
+    assert (first.marked, first.purged) == (2, 0)
+
+    second = run(db, LATER)
+    assert (second.marked, second.purged, second.keys_deleted) == (0, 2, 6)
+    assert stored_keys() == {
+        "000/P00001.jpg",
+        "000/I00001.jpg",
+        "000/P00004.jpg",  # Photo 4 is on another server
+        "000/I00004.jpg",
+    }
+    purge = db.get(TPhotoPurge, 2)
+    assert purge is not None and purge.purged_timestamp == LATER
+    # Rows are kept
+    assert db.get(TPhoto, 2) is not None
+
+    assert run(db, LATER + timedelta(days=1)).scanned == 0
+
+
+def test_restored_photo_is_not_purged(s3_bucket, stored_keys, db: Session):
+    add_stored_photo(db, s3_bucket, 5, "Y")
+    run(db, T0)
+    photo = db.get(TPhoto, 5)
+    assert photo is not None
+    photo.deleted_ind = "N"  # type: ignore[assignment]
+    db.commit()
+    run(db, T0 + timedelta(days=1))
+
+    photo.deleted_ind = "Y"  # type: ignore[assignment]
+    db.commit()
+    stats = run(db, LATER)
+
+    # Deleted again on day 31, so the window starts over
+    assert stats.purged == 0
+    assert "000/P00005.jpg" in stored_keys()
+
+
+def test_unmarking_restored_photos_runs_on_mysql(s3_bucket, db: Session):
+    add_stored_photo(db, s3_bucket, 10, "Y")
+    run(db, T0)
+    photo = db.get(TPhoto, 10)
+    assert photo is not None
+    photo.deleted_ind = "N"  # type: ignore[assignment]
+    db.commit()
+    statements = []
+    execute = db.execute
+
+    def record(statement, *args, **kwargs):
+        statements.append(statement)
+        return execute(statement, *args, **kwargs)
+
+    with patch.object(db, "execute", side_effect=record):
+        tphoto_crud.mark_deleted_photos(db, server_id=1, seen_at=T0)
+
+    assert db.get(TPhotoPurge, 10) is None
+    compiled = [
+        str(s.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+        for s in statements
+    ]
+    # MySQL rejects a DELETE that reads its target table in a subquery (1093)
+    deletes = [sql for sql in compiled if sql.startswith("DELETE")]
+    assert deletes == ["DELETE FROM tphoto_purge WHERE tphoto_purge.photo_id IN (10)"]
+
+
+def test_dry_run_changes_nothing(s3_bucket, stored_keys, db: Session):
+    add_stored_photo(db, s3_bucket, 6, "Y")
+    run(db, T0)
+
+    stats = run(db, LATER, dry_run=True)
+
+    assert (stats.scanned, stats.keys_deleted, stats.purged) == (1, 2, 0)
+    assert "000/P00006.jpg" in stored_keys()
+    purge = db.get(TPhotoPurge, 6)
+    assert purge is not None and purge.purged_timestamp is None
+
+
+def test_checkpoint_resumes_and_failures_are_retried(
+    s3_bucket, stored_keys, db: Session, tmp_path, monkeypatch
+):
+    for photo_id in (7, 8, 9):
+        add_stored_photo(db, s3_bucket, photo_id, "Y")
+    run(db, T0)
+    checkpoint = CleanupCheckpoint(str(tmp_path / "cleanup.json"))
+    checkpoint.save(7)  # Photo 7 was done by an interrupted run
+    failing = S3Service()
+    real_delete = failing.delete_objects
+    monkeypatch.setattr(
+        failing,
+        "delete_objects",
+        lambda keys: real_delete([k for k in keys if "00009" not in k])
+        + [k for k in keys if "00009" in k],
+    )
+
+    stats = cleanup_deleted_photos(
+        db,
+        s3_service=failing,
+        retention_days=30,
+        now=LATER,
+        batch_size=1,
+        checkpoint=checkpoint,
+    )
+
+    assert (stats.scanned, stats.purged, stats.keys_failed) == (2, 1, 2)
+    assert "000/P00007.jpg" in stored_keys()
+    assert checkpoint.load() == 0  # Cleared after a complete run
+    # The next run picks up both the skipped and the failed photo
+    assert run(db, LATER).purged == 2
+
+
+def test_key_batches_keep_photos_together():
+    keys = {1: ["a", "b"], 2: ["c", "d", "e"], 3: ["f"]}
+    assert key_batches(keys, max_keys=4) == [["a", "b"], ["c", "d", "e", "f"]]
+    assert key_batches({}) == []
@@ -0,0 +1,167 @@
+"""
+Tests for direct-to-S3 photo uploads (presigned POST, then completion).
+"""
+
+import threading
+from datetime import date, time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.core.config import settings
+from api.models.tphoto import TPhoto
+from api.models.user import TLog, User
+from api.services.photo_ingest import (
+    JOB_AWAITING_UPLOAD,
+    JOB_QUEUED,
+    JOB_SUCCEEDED,
+    PhotoIngestError,
+    photo_ingest_service,
+)
+from api.tests.conftest import jpeg
+
+PAYLOAD = {"caption": "Direct", "text_desc": "", "type": "T", "license": "Y"}
+
+
+@pytest.fixture
+def ingest(db: Session):
+    """Run completed uploads inline against the test database."""
+    session_factory = sessionmaker(
+        autocommit=False, autoflush=False, bind=db.get_bind()
+    )
+    with patch.object(
+        photo_ingest_service, "session_factory", session_factory
+    ), patch.object(
+        photo_ingest_service, "enqueue", side_effect=photo_ingest_service.process_job
+    ) as enqueue:
+        yield enqueue
+
+
+def seed(db: Session) -> None:
+    db.add(
+        User(id=121, name="direct", email="d@example.com", auth0_user_id="auth0|121")
+    )
+    db.add(User(id=122, name="other", email="o@example.com", auth0_user_id="auth0|122"))
+    db.add(
+        TLog(
+            id=1211,
+            trig_id=1,
+            user_id=121,
+            date=date(2024, 6, 1),
+            time=time(9, 0),
+            osgb_eastings=1,
+            osgb_northings=1,
+            osgb_gridref="AA 00000 00000",
+            fb_number="",
+            condition="G",
+            comment="",
+            score=0,
+            ip_addr="127.0.0.1",
+            source="W",
+        )
+    )
+    db.commit()
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer auth0_user_{user_id}"}
+
+
+def test_direct_upload_is_processed_into_final_keys(
+    s3_bucket, stored_keys, ingest, client: TestClient, db: Session
+):
+    seed(db)
+
+    resp = client.post(
+        f"{settings.API_V1_STR}/photos/upload-url?log_id=1211",
+        json=PAYLOAD,
+        headers=auth(121),
+    )
+    assert resp.status_code == 200, resp.text
+    ticket = resp.json()
+    staging_key = ticket["fields"]["key"]
+    assert staging_key == f"staging/{ticket['job_id']}.jpg"
+
+    # The client talks to S3 directly
+    upload = requests.post(
+        ticket["upload_url"],
+        data=ticket["fields"],
+        files={"file": ("p.jpg", jpeg((640, 480)), "image/jpeg")},
+    )
+    assert upload.status_code == 204
+
+    done = client.post(ticket["complete_url"], headers=auth(121))
+    assert done.status_code == 202, done.text
+    assert done.headers["location"].endswith(f"/photos/jobs/{ticket['job_id']}")
+
+    job = client.get(done.headers["location"], headers=auth(121)).json()
+    assert job["status"] == JOB_SUCCEEDED
+    photo = db.get(TPhoto, job["photo_id"])
+    assert photo is not None and str(photo.name) == "Direct"
+    keys = stored_keys()
+    assert f"000/P{photo.id:05d}.jpg" in keys
+    assert f"000/I{photo.id:05d}.jpg" in keys
+    # The staged upload is gone once processed
+    assert staging_key not in keys
+
+    again = client.post(ticket["complete_url"], headers=auth(121))
+    assert again.status_code == 409
+
+
+def test_completion_needs_the_upload_and_the_owner(
+    s3_bucket, ingest, client: TestClient, db: Session
+):
+    seed(db)
+    ticket = client.post(
+        f"{settings.API_V1_STR}/photos/upload-url?log_id=1211",
+        json=PAYLOAD,
+        headers=auth(121),
+    ).json()
+
+    assert client.post(ticket["complete_url"], headers=auth(122)).status_code == 403
+    missing = client.post(ticket["complete_url"], headers=auth(121))
+    assert missing.status_code == 400
+    ingest.assert_not_called()
+
+
+def test_upload_url_requires_log_owner(s3_bucket, client: TestClient, db: Session):
+    seed(db)
+
+    resp = client.post(
+        f"{settings.API_V1_STR}/photos/upload-url?log_id=1211",
+        json=PAYLOAD,
+        headers=auth(122),
+    )
+
+    assert resp.status_code == 403
+
+
+def test_concurrent_completions_queue_the_job_once():
+    photo_ingest_service.jobs.save(
+        {"id": "race", "status": JOB_AWAITING_UPLOAD, "staging_key": "staging/r.jpg"}
+    )
+    # Both requests get past the status check before either queues the job
+    barrier = threading.Barrier(2)
+    s3_service = Mock()
+    s3_service.object_size.side_effect = lambda key: barrier.wait() or 100
+    outcomes = []
+
+    def complete():
+        try:
+            outcomes.append(photo_ingest_service.complete_upload("race", s3_service))
+        except PhotoIngestError as e:
+            outcomes.append(e.status_code)
+
+    with patch.object(photo_ingest_service, "enqueue") as enqueue:
+        threads = [threading.Thread(target=complete) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    enqueue.assert_called_once_with("race")
+    assert 409 in outcomes
+    assert [o["status"] for o in outcomes if isinstance(o, dict)] == [JOB_QUEUED]
@@ -0,0 +1,128 @@
+"""
+Tests for GET /v1/photos/{id}/evaluate (concurrent downloads with a deadline).
+"""
+
+import threading
+import time
+from datetime import date, datetime
+from datetime import time as dtime
+from unittest.mock import Mock, patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.models.server import Server
+from api.models.user import TLog, User
+from api.services.rekognition import RekognitionService
+from api.tests.conftest import add_photo, jpeg
+
+PHOTO_URL = "https://photos.example.com/000/P00501.jpg"
+ICON_URL = "https://photos.example.com/000/I00501.jpg"
+
+
+def seed_photo(db: Session) -> None:
+    db.add(User(id=501, name="evaluator", email="eval@example.com"))
+    db.add(Server(id=1, url="https://photos.example.com/", path="/", name="S3"))
+    db.add(
+        TLog(
+            id=5001,
+            trig_id=1,
+            user_id=501,
+            date=date(2024, 1, 1),
+            time=dtime(12, 0),
+            osgb_eastings=1,
+            osgb_northings=1,
+            osgb_gridref="AA 00000 00000",
+            fb_number="",
+            condition="G",
+            comment="",
+            score=0,
+            ip_addr="127.0.0.1",
+            source="W",
+        )
+    )
+    add_photo(
+        db,
+        501,
+        tlog_id=5001,
+        height=30,
+        width=40,
+        icon_height=9,
+        icon_width=12,
+        name="Pillar",
+        crt_timestamp=datetime(2024, 1, 1),
+    )
+    db.commit()
+
+
+def fake_session(delays: dict) -> Mock:
+    """Session whose GETs sleep per URL and record how many ran at once."""
+    bodies = {PHOTO_URL: jpeg((40, 30)), ICON_URL: jpeg((12, 9))}
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def get(url, timeout):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(delays.get(url, 0))
+        with lock:
+            state["running"] -= 1
+        return Mock(content=bodies[url], raise_for_status=Mock())
+
+    session = Mock(get=Mock(side_effect=get))
+    session.state = state
+    return session
+
+
+@patch.object(RekognitionService, "moderate_content", return_value={"ok": True})
+@patch.object(RekognitionService, "analyse_orientation", return_value={"ok": True})
+def test_evaluate_downloads_concurrently(
+    _orientation, _moderation, client: TestClient, db: Session
+):
+    seed_photo(db)
+    session = fake_session({PHOTO_URL: 0.3, ICON_URL: 0.3})
+
+    with patch("api.services.photo_evaluation.get_http_session", return_value=session):
+        started = time.perf_counter()
+        resp = client.get(f"{settings.API_V1_STR}/photos/501/evaluate")
+        elapsed = time.perf_counter() - started
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["photo_accessible"] and body["icon_accessible"]
+    assert body["photo_dimension_match"] and body["icon_dimension_match"]
+    assert body["orientation_analysis"] == {"ok": True}
+    assert body["content_moderation"] == {"ok": True}
+    assert body["errors"] == []
+    assert session.state["peak"] == 2
+    assert elapsed < 0.55
+
+
+@patch.object(RekognitionService, "moderate_content", return_value={"ok": True})
+@patch.object(RekognitionService, "analyse_orientation", return_value={"ok": True})
+def test_evaluate_reports_checks_missing_the_deadline(
+    _orientation, _moderation, client: TestClient, db: Session
+):
+    seed_photo(db)
+    session = fake_session({PHOTO_URL: 1.0})
+
+    with patch(
+        "api.services.photo_evaluation.get_http_session", return_value=session
+    ), patch.object(settings, "PHOTO_EVALUATE_DEADLINE_SECONDS", 0.2):
+        started = time.perf_counter()
+        resp = client.get(f"{settings.API_V1_STR}/photos/501/evaluate")
+        elapsed = time.perf_counter() - started
+
+    body = resp.json()
+    assert resp.status_code == 200
+    assert elapsed < 0.9
+    # The icon finished in time; the photo did not
+    assert body["icon_accessible"] is True
+    assert body["photo_accessible"] is False
+    assert body["errors"] == ["Evaluation incomplete: exceeded 0.2s deadline"]
+
+
+def test_evaluate_unknown_photo(client: TestClient, db: Session):
+    assert client.get(f"{settings.API_V1_STR}/photos/999/evaluate").status_code == 404
@@ -0,0 +1,204 @@
+"""
+Tests for perceptual hashing and near-duplicate detection on upload.
+"""
+
+import io
+import random
+from datetime import date, time
+from unittest.mock import patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.models.server import Server
+from api.models.tphoto import TPhoto, TPhotoHash
+from api.models.user import TLog, User
+from api.services.photo_hash import (
+    BKTree,
+    backfill_photo_hashes,
+    get_photo_hash_index,
+    hamming,
+    image_dhash,
+    photo_hash_index,
+    photo_hash_refresher,
+    refresh_photo_hash_index,
+)
+from api.tests.conftest import add_photo, encode_jpeg
+
+FORM = {"caption": "Dup", "text_desc": "", "type": "T", "license": "Y"}
+
+
+def scene(seed: int, size=(800, 600)) -> Image.Image:
+    """A random blocky picture, so gradients differ from seed to seed."""
+    blocks = np.random.default_rng(seed).integers(0, 256, (6, 8, 3), dtype=np.uint8)
+    return Image.fromarray(blocks).resize(size, Image.Resampling.BILINEAR)
+
+
+def seed_logs(db: Session) -> None:
+    db.add(Server(id=1, url="https://photos.example.com", path="/", name="S3"))
+    for user_id, log_id in ((201, 2001), (202, 2002)):
+        db.add(
+            User(
+                id=user_id,
+                name=f"hasher{user_id}",
+                email=f"hasher{user_id}@example.com",
+                auth0_user_id=f"auth0|{user_id}",
+            )
+        )
+        db.add(
+            TLog(
+                id=log_id,
+                trig_id=1,
+                user_id=user_id,
+                date=date(2024, 6, 1),
+                time=time(9, 0),
+                osgb_eastings=1,
+                osgb_northings=1,
+                osgb_gridref="AA 00000 00000",
+                fb_number="",
+                condition="G",
+                comment="",
+                score=0,
+                ip_addr="127.0.0.1",
+                source="W",
+            )
+        )
+    db.commit()
+
+
+def upload(client: TestClient, user_id: int, log_id: int, image_bytes: bytes):
+    return client.post(
+        f"{settings.API_V1_STR}/photos?log_id={log_id}",
+        files={"file": ("photo.jpg", io.BytesIO(image_bytes), "image/jpeg")},
+        data=FORM,
+        headers={"Authorization": f"Bearer auth0_user_{user_id}"},
+    )
+
+
+def test_dhash_tolerates_recompression_and_resizing():
+    original = image_dhash(encode_jpeg(scene(1)))
+    recompressed = image_dhash(encode_jpeg(scene(1).resize((400, 300)), quality=40))
+    different = image_dhash(encode_jpeg(scene(2)))
+    assert original is not None and recompressed is not None
+    assert different is not None
+
+    assert hamming(original, recompressed) <= settings.PHOTO_DUPLICATE_MAX_DISTANCE
+    assert hamming(original, different) > settings.PHOTO_DUPLICATE_MAX_DISTANCE
+    assert image_dhash(b"not an image") is None
+
+
+def test_bk_tree_matches_brute_force():
+    rng = random.Random(7)
+    hashes = [rng.getrandbits(64) for _ in range(2000)]
+    # Near neighbours of a few hashes, and an exact repeat
+    hashes += [h ^ (1 << rng.randrange(64)) for h in hashes[:50]]
+    hashes.append(hashes[0])
+    tree = BKTree()
+    for photo_id, value in enumerate(hashes):
+        tree.add(value, photo_id)
+
+    assert tree.size == len(hashes)
+    for query in hashes[:20] + [rng.getrandbits(64) for _ in range(20)]:
+        expected = sorted(
+            (photo_id, hamming(query, value))
+            for photo_id, value in enumerate(hashes)
+            if hamming(query, value) <= 6
+        )
+        assert sorted(tree.search(query, 6)) == expected
+
+
+@patch("api.services.s3_service.S3Service.upload_renditions", return_value={})
+@patch("api.services.s3_service.S3Service.upload_photo_and_thumbnail")
+def test_upload_reports_and_optionally_rejects_duplicates(
+    mock_s3_upload, _mock_renditions, client: TestClient, db: Session, monkeypatch
+):
+    mock_s3_upload.return_value = ("000/P.jpg", "000/I.jpg")
+    seed_logs(db)
+    refresh_photo_hash_index(db)
+
+    first = upload(client, 201, 2001, encode_jpeg(scene(3)))
+    assert first.status_code == 201, first.text
+    assert first.json()["similar_photo_ids"] == []
+    first_id = first.json()["id"]
+    assert db.get(TPhotoHash, first_id) is not None
+
+    # A recompressed copy from the same user is flagged
+    again = upload(client, 201, 2001, encode_jpeg(scene(3), quality=50))
+    assert again.status_code == 201
+    assert again.json()["similar_photo_ids"] == [first_id]
+
+    # Other users' photos and unrelated pictures are not
+    other_user = upload(client, 202, 2002, encode_jpeg(scene(3)))
+    assert other_user.json()["similar_photo_ids"] == []
+    unrelated = upload(client, 201, 2001, encode_jpeg(scene(4)))
+    assert unrelated.json()["similar_photo_ids"] == []
+
+    monkeypatch.setattr(settings, "PHOTO_REJECT_DUPLICATES", True)
+    rejected = upload(client, 201, 2001, encode_jpeg(scene(3)))
+    assert rejected.status_code == 409
+    assert str(first_id) in rejected.json()["detail"]
+    assert db.query(TPhoto).count() == 4
+
+
+def test_hash_index_is_built_in_the_background(db: Session, background_refreshes):
+    db.add(TPhotoHash(photo_id=1, dhash="00000000000000ff"))
+    db.commit()
+
+    # The lookup starts the build rather than running it
+    assert get_photo_hash_index() is None
+    background_refreshes.set()
+    photo_hash_refresher.wait(timeout=10)
+
+    index = get_photo_hash_index()
+    assert index is not None
+    assert index.search(0xFF, 0) == [(1, 0)]
+
+
+def test_catch_up_skips_hashes_already_added(db: Session):
+    refresh_photo_hash_index(db)
+    photo_hash_index.add(5, 0xF0)
+    db.add_all(
+        [
+            TPhotoHash(photo_id=5, dhash="00000000000000f0"),
+            TPhotoHash(photo_id=6, dhash="000000000000000f"),
+        ]
+    )
+    db.commit()
+
+    assert photo_hash_index.catch_up(db) == 1
+    assert photo_hash_index.size == 2
+    assert sorted(photo_hash_index.search(0xFF, 4)) == [(5, 4), (6, 4)]
+
+
+def test_backfill_hashes_unhashed_thumbnails(db: Session):
+    seed_logs(db)
+    for photo_id in range(1, 6):
+        add_photo(
+            db,
+            photo_id,
+            tlog_id=2001,
+            filename=f"P{photo_id}.jpg",
+            icon_filename=f"I{photo_id}.jpg",
+        )
+    db.add(TPhotoHash(photo_id=2, dhash="0" * 16))
+    db.commit()
+
+    fetched = []
+
+    def fetch(url: str, _timeout: float) -> bytes:
+        fetched.append(url)
+        if url.endswith("I4.jpg"):
+            raise OSError("404")
+        return encode_jpeg(scene(5).resize((120, 90)))
+
+    stats = backfill_photo_hashes(db, batch_size=2, workers=4, fetch=fetch)
+
+    assert (stats.scanned, stats.hashed, stats.failed) == (4, 3, 1)
+    assert stats.last_photo_id == 5
+    assert "https://photos.example.com/I2.jpg" not in fetched
+    stored = {int(r.photo_id): r.dhash for r in db.query(TPhotoHash)}
+    assert sorted(stored) == [1, 2, 3, 5]
+    assert stored[1] == stored[5] != "0" * 16
@@ -0,0 +1,251 @@
+"""
+Tests for background photo ingestion (POST /v1/photos with Prefer: respond-async).
+"""
+
+import io
+import os
+from datetime import date, time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.core.config import settings
+from api.models.tphoto import TPhoto
+from api.models.user import TLog, User
+from api.services.photo_ingest import (
+    JOB_FAILED,
+    JOB_PROCESSING,
+    JOB_QUEUED,
+    JOB_SUCCEEDED,
+    PhotoIngestError,
+    photo_ingest_service,
+)
+from api.tests.conftest import jpeg
+
+FORM = {"caption": "Async", "text_desc": "", "type": "T", "license": "Y"}
+
+
+def seed_user_and_tlog(db: Session) -> tuple[User, TLog]:
+    user = User(
+        id=111, name="asyncuser", email="async@example.com", auth0_user_id="auth0|111"
+    )
+    tlog = TLog(
+        id=1111,
+        trig_id=1,
+        user_id=111,
+        date=date(2024, 6, 1),
+        time=time(9, 0),
+        osgb_eastings=1,
+        osgb_northings=1,
+        osgb_gridref="AA 00000 00000",
+        fb_number="",
+        condition="G",
+        comment="",
+        score=0,
+        ip_addr="127.0.0.1",
+        source="W",
+    )
+    db.add_all([user, tlog])
+    db.commit()
+    return user, tlog
+
+
+@pytest.fixture
+def ingest(tmp_path, db: Session):
+    """Run jobs inline against the test database, spooling under tmp_path."""
+    session_factory = sessionmaker(
+        autocommit=False, autoflush=False, bind=db.get_bind()
+    )
+    with patch.object(photo_ingest_service, "spool_dir", str(tmp_path)), patch.object(
+        photo_ingest_service, "session_factory", session_factory
+    ), patch.object(
+        photo_ingest_service, "enqueue", side_effect=photo_ingest_service.process_job
+    ) as enqueue, patch.object(
+        photo_ingest_service.jobs, "is_shared", return_value=True
+    ):
+        yield enqueue
+
+
+def _post_async(client: TestClient, log_id: int, user_id: int):
+    return client.post(
+        f"{settings.API_V1_STR}/photos?log_id={log_id}",
+        files={"file": ("test.jpg", io.BytesIO(jpeg((16, 12))), "image/jpeg")},
+        data=FORM,
+        headers={
+            "Authorization": f"Bearer auth0_user_{user_id}",
+            "Prefer": "respond-async",
+        },
+    )
+
+
+@patch("api.services.image_processor.ImageProcessor.process")
+@patch("api.services.s3_service.S3Service.upload_photo_and_thumbnail")
+def test_async_upload_returns_202_and_job_succeeds(
+    mock_s3_upload,
+    mock_process,
+    ingest,
+    tmp_path,
+    processed_image,
+    client: TestClient,
+    db: Session,
+):
+    mock_process.return_value = processed_image((100, 80), (50, 40))
+    mock_s3_upload.return_value = ("000/P1.jpg", "000/I1.jpg")
+    user, tlog = seed_user_and_tlog(db)
+
+    with patch.object(photo_ingest_service, "enqueue") as enqueue:
+        resp = _post_async(client, int(tlog.id), int(user.id))
+    assert resp.status_code == 202
+    body = resp.json()
+    assert body["status"] == JOB_QUEUED
+    assert resp.headers["Location"] == f"/v1/photos/jobs/{body['job_id']}"
+    assert resp.headers["Preference-Applied"] == "respond-async"
+    # Raw upload is spooled; nothing processed within the request
+    assert os.path.exists(tmp_path / f"{body['job_id']}.upload")
+    mock_process.assert_not_called()
+
+    photo_ingest_service.process_job(enqueue.call_args.args[0])
+
+    status = client.get(
+        f"{settings.API_V1_STR}/photos/jobs/{body['job_id']}",
+        headers={"Authorization": f"Bearer auth0_user_{user.id}"},
+    )
+    assert status.status_code == 200
+    job = status.json()
+    assert job["status"] == JOB_SUCCEEDED
+    assert job["photo"]["caption"] == "Async"
+    assert job["photo"]["width"] == 100
+    assert db.query(TPhoto).filter(TPhoto.id == job["photo_id"]).count() == 1
+    assert not os.listdir(tmp_path)
+
+
+@patch("api.services.image_processor.ImageProcessor.process")
+def test_failed_job_records_error(
+    mock_process, ingest, tmp_path, client: TestClient, db: Session
+):
+    mock_process.side_effect = OSError("cannot identify image file")
+    user, tlog = seed_user_and_tlog(db)
+
+    resp = _post_async(client, int(tlog.id), int(user.id))
+
+    job = photo_ingest_service.jobs.get(resp.json()["job_id"])
+    assert job is not None
+    assert job["status"] == JOB_FAILED
+    assert job["error"] == "Failed to process image"
+    assert db.query(TPhoto).count() == 0
+    assert not os.listdir(tmp_path)
+
+
+@patch("api.services.image_processor.ImageProcessor.process")
+@patch("api.services.s3_service.S3Service.upload_photo_and_thumbnail")
+def test_async_preference_ignored_without_shared_jobs(
+    mock_s3_upload, mock_process, processed_image, client: TestClient, db: Session
+):
+    mock_process.return_value = processed_image((100, 80), (50, 40))
+    mock_s3_upload.return_value = ("000/P1.jpg", "000/I1.jpg")
+    user, tlog = seed_user_and_tlog(db)
+
+    # No Redis: a poll on another worker would not find the job
+    with patch.object(photo_ingest_service, "enqueue") as enqueue:
+        resp = _post_async(client, int(tlog.id), int(user.id))
+
+    assert resp.status_code == 201
+    assert "Preference-Applied" not in resp.headers
+    assert resp.json()["caption"] == "Async"
+    enqueue.assert_not_called()
+
+
+def test_job_status_hidden_from_other_users(ingest, client: TestClient, db: Session):
+    user, tlog = seed_user_and_tlog(db)
+    db.add(User(id=112, name="nosy", email="n@example.com", auth0_user_id="auth0|112"))
+    db.commit()
+    with patch.object(photo_ingest_service, "enqueue"):
+        resp = _post_async(client, int(tlog.id), int(user.id))
+
+    other = client.get(
+        f"{settings.API_V1_STR}/photos/jobs/{resp.json()['job_id']}",
+        headers={"Authorization": "Bearer auth0_user_112"},
+    )
+    missing = client.get(
+        f"{settings.API_V1_STR}/photos/jobs/nope",
+        headers={"Authorization": f"Bearer auth0_user_{user.id}"},
+    )
+
+    assert other.status_code == 403
+    assert missing.status_code == 404
+
+
+def test_restart_fails_jobs_left_in_the_spool(ingest, tmp_path):
+    def spooled(job_id: str, status: str, age: float) -> None:
+        photo_ingest_service.jobs.save({"id": job_id, "status": status})
+        path = tmp_path / f"{job_id}.upload"
+        path.write_bytes(b"\xff\xd8")
+        stamp = path.stat().st_mtime - age
+        os.utime(path, (stamp, stamp))
+
+    stale = settings.PHOTO_INGEST_STALE_SECONDS + 60
+    spooled("crashed", JOB_PROCESSING, stale)
+    spooled("stranded", JOB_QUEUED, stale)
+    spooled("finished", JOB_SUCCEEDED, stale)
+    spooled("in-flight", JOB_QUEUED, 0)  # Another worker's, still running
+    (tmp_path / "expired.upload").write_bytes(b"")
+    os.utime(tmp_path / "expired.upload", (0, 0))
+
+    assert photo_ingest_service.recover() == 4
+
+    assert os.listdir(tmp_path) == ["in-flight.upload"]
+    for job_id in ("crashed", "stranded"):
+        job = photo_ingest_service.jobs.get(job_id)
+        assert job is not None and job["status"] == JOB_FAILED
+        assert "Interrupted" in job["error"]
+    finished = photo_ingest_service.jobs.get("finished")
+    assert finished is not None and finished["status"] == JOB_SUCCEEDED
+
+    # A late run of a recovered job does nothing
+    with patch("api.services.photo_ingest.ingest_photo") as ingest_photo:
+        photo_ingest_service.process_job("stranded")
+    ingest_photo.assert_not_called()
+
+
+def test_spool_rejects_oversized_upload(tmp_path):
+    with patch.object(photo_ingest_service, "spool_dir", str(tmp_path)):
+        with pytest.raises(PhotoIngestError) as exc:
+            photo_ingest_service.spool_upload("big", io.BytesIO(b"x" * 11), 10)
+
+    assert exc.value.status_code == 413
+    assert not os.listdir(tmp_path)
+
+
+@patch("api.services.s3_service.S3Service.upload_renditions")
+@patch("api.services.s3_service.S3Service.upload_photo_and_thumbnail")
+def test_upload_stores_renditions(
+    mock_s3_upload, mock_renditions, client: TestClient, db: Session
+):
+    mock_s3_upload.return_value = ("000/P1.jpg", "000/I1.jpg")
+    mock_renditions.side_effect = lambda key, renditions: {
+        r.size: f"000/P1_{r.size}.jpg" for r in renditions
+    }
+    user, tlog = seed_user_and_tlog(db)
+    buffer = io.BytesIO(jpeg((2000, 1500)))
+
+    resp = client.post(
+        f"{settings.API_V1_STR}/photos?log_id={tlog.id}",
+        files={"file": ("big.jpg", buffer, "image/jpeg")},
+        data=FORM,
+        headers={"Authorization": f"Bearer auth0_user_{user.id}"},
+    )
+
+    assert resp.status_code == 201, resp.text
+    renditions = resp.json()["renditions"]
+    assert [(r["size"], r["width"], r["height"]) for r in renditions] == [
+        (1600, 1600, 1200),
+        (800, 800, 600),
+        (320, 320, 240),
+    ]
+    assert renditions[1]["url"] == "000/P1_800.jpg"
+    assert mock_renditions.call_args.args[0] == "000/P1.jpg"
+
+    fetched = client.get(f"{settings.API_V1_STR}/photos/{resp.json()['id']}")
+    assert fetched.json()["renditions"] == renditions
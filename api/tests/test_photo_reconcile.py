@@ -0,0 +1,129 @@
+"""
+Tests for reconciling the photo bucket against the tphoto tables.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.models.tphoto import TPhotoPurge, TPhotoRendition
+from api.services.photo_reconcile import (
+    MISSING,
+    ORPHAN,
+    Difference,
+    merge_join,
+    reconcile_photo_storage,
+)
+from api.services.s3_service import S3Service
+from api.tests.conftest import add_photo
+
+LATER = datetime.now(timezone.utc) + timedelta(days=2)
+
+
+def put(s3, *keys: str) -> None:
+    for key in keys:
+        s3.put_object(Bucket=settings.PHOTOS_S3_BUCKET, Key=key, Body=b"xy")
+
+
+def test_reports_orphans_and_missing_keys(s3_bucket, stored_keys, db: Session):
+    add_photo(db, 1)
+    add_photo(db, 2, deleted_ind="Y")
+    add_photo(db, 1001)
+    add_photo(db, 3, deleted_ind="Y")
+    db.add(
+        TPhotoPurge(
+            photo_id=3,
+            seen_timestamp=datetime(2025, 1, 1),
+            purged_timestamp=datetime(2025, 2, 1),
+        )
+    )
+    db.add(
+        TPhotoRendition(
+            photo_id=1,
+            size=800,
+            filename="000/P00001_800.jpg",
+            filesize=1,
+            height=1,
+            width=1,
+        )
+    )
+    db.commit()
+    put(
+        s3_bucket,
+        "000/P00001.jpg",
+        "000/I00001.jpg",
+        "000/P00001_800.jpg",
+        "000/P00001_r1.jpg",  # Superseded rotation revision
+        "000/I00002.jpg",  # Deleted photo, not purged yet
+        "000/P00003.jpg",  # Purged photo that survived its purge
+        "001/I01001.jpg",
+        "001/P09999.jpg",  # Upload whose row rolled back
+        "staging/abc.jpg",  # Not a photo folder
+    )
+    found: List[Difference] = []
+
+    stats = reconcile_photo_storage(
+        db, s3_service=S3Service(), workers=1, report=found.append
+    )
+
+    assert sorted((d.kind, d.key) for d in found) == [
+        (MISSING, "001/P01001.jpg"),
+        (ORPHAN, "000/P00001_r1.jpg"),
+        (ORPHAN, "000/P00003.jpg"),
+        (ORPHAN, "001/P09999.jpg"),
+    ]
+    assert (stats.prefixes, stats.objects, stats.orphans, stats.missing) == (
+        2,
+        8,
+        3,
+        1,
+    )
+    assert stats.orphan_bytes == 6
+    assert len(stored_keys()) == 9
+
+
+def test_fix_deletes_only_old_orphans(s3_bucket, stored_keys, db: Session):
+    add_photo(db, 1)
+    db.commit()
+    put(s3_bucket, "000/P00001.jpg", "000/I00001.jpg", "000/P00001_r1.jpg")
+
+    fresh = reconcile_photo_storage(db, s3_service=S3Service(), fix=True)
+    assert (fresh.orphans, fresh.deleted) == (1, 0)
+
+    stats = reconcile_photo_storage(
+        db, s3_service=S3Service(), fix=True, prefixes=["000/"], now=LATER
+    )
+
+    assert (stats.orphans, stats.deleted, stats.delete_failed) == (1, 1, 0)
+    assert stored_keys() == {"000/P00001.jpg", "000/I00001.jpg"}
+
+
+def test_listing_is_paginated(s3_bucket, db: Session):
+    keys = [f"000/P{n:05d}.jpg" for n in range(1, 1201)]
+    for key in keys:
+        put(s3_bucket, key)
+
+    objects = [obj["Key"] for obj in S3Service().iter_objects("000/")]
+
+    assert objects == sorted(keys)
+
+
+def test_merge_join_handles_duplicates_and_tails():
+    expected = [
+        ("a", 1, True),
+        ("b", 1, True),
+        ("b", 2, True),
+        ("d", 3, False),
+        ("e", 4, True),
+    ]
+    objects = [{"Key": "b", "Size": 1}, {"Key": "c", "Size": 2}]
+
+    differences = list(merge_join(expected, objects))
+
+    assert differences == [
+        Difference(MISSING, "a", photo_id=1),
+        Difference(ORPHAN, "c", size=2),
+        Difference(MISSING, "e", photo_id=4),
+    ]
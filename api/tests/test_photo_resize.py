@@ -0,0 +1,150 @@
+"""
+Tests for the on-demand photo resize endpoint.
+"""
+
+import io
+from datetime import date, time
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.models.server import Server
+from api.models.tphoto import TPhotoRendition
+from api.models.user import TLog, User
+from api.services.image_formats import JPEG
+from api.services.photo_resize import (
+    ResizeSpec,
+    photo_resize_service,
+    resize_image,
+    scaled_size,
+)
+from api.tests.conftest import add_photo, jpeg
+
+SIZES = {"000/P1.jpg": (1600, 1200), "000/P1_800.jpg": (800, 600)}
+URL = f"{settings.API_V1_STR}/photos/1/image"
+
+
+def seed(db: Session) -> None:
+    db.add(User(id=901, name="resizer", email="resize@example.com"))
+    db.add(Server(id=1, url="https://photos.example.com/", path="/", name="S3"))
+    db.add(
+        TLog(
+            id=9001,
+            trig_id=90,
+            user_id=901,
+            date=date(2024, 1, 1),
+            time=time(12, 0),
+            osgb_eastings=1,
+            osgb_northings=1,
+            osgb_gridref="AA 00000 00000",
+            fb_number="",
+            condition="G",
+            comment="",
+            score=0,
+            ip_addr="127.0.0.1",
+            source="W",
+        )
+    )
+    add_photo(
+        db,
+        1,
+        tlog_id=9001,
+        filename="000/P1.jpg",
+        height=1200,
+        width=1600,
+        icon_filename="000/I1.jpg",
+        icon_height=90,
+        icon_width=120,
+    )
+    db.add(
+        TPhotoRendition(
+            photo_id=1,
+            size=800,
+            filename="000/P1_800.jpg",
+            filesize=1,
+            height=600,
+            width=800,
+        )
+    )
+    db.commit()
+
+
+@pytest.fixture
+def http_body():
+    return lambda url: jpeg(SIZES[url.split(".com/", 1)[1]])
+
+
+@pytest.fixture(autouse=True)
+def isolate_resize_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(photo_resize_service.cache, "directory", str(tmp_path))
+    monkeypatch.setattr(photo_resize_service.cache, "_size", None)
+
+
+def test_resized_from_smallest_covering_rendition(
+    http, client: TestClient, db: Session
+):
+    seed(db)
+
+    redirect = client.get(f"{URL}?w=320", follow_redirects=False)
+    assert redirect.status_code == 307
+    versioned = redirect.headers["location"]
+    assert "w=320" in versioned and "v=" in versioned
+
+    resp = client.get(versioned)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/jpeg"
+    assert "immutable" in resp.headers["cache-control"]
+    with Image.open(io.BytesIO(resp.content)) as img:
+        assert img.size == (320, 240)
+    http.get.assert_called_once()
+    assert http.get.call_args.args[0].endswith("000/P1_800.jpg")
+
+    # Cached: no second fetch, and revalidation is a 304
+    again = client.get(versioned, headers={"If-None-Match": resp.headers["etag"]})
+    assert again.status_code == 304
+    http.get.assert_called_once()
+
+    # Larger than any rendition comes from the original
+    client.get(f"{URL}?w=1200")
+    assert http.get.call_args.args[0].endswith("000/P1.jpg")
+
+
+def test_cover_crops_and_negotiates_webp(http, client: TestClient, db: Session):
+    seed(db)
+
+    resp = client.get(
+        f"{URL}?w=160&h=160&fit=cover", headers={"Accept": "image/webp,*/*"}
+    )
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/webp"
+    assert resp.headers["vary"] == "Accept"
+    with Image.open(io.BytesIO(resp.content)) as img:
+        assert img.size == (160, 160)
+
+
+def test_sizes_outside_whitelist_are_rejected(client: TestClient, db: Session):
+    seed(db)
+
+    assert client.get(f"{URL}?w=333").status_code == 400
+    assert client.get(f"{URL}?w=320&fit=cover").status_code == 400
+    assert client.get(URL).status_code == 400
+    assert client.get(f"{URL}?w=320&fit=stretch").status_code == 422
+    assert client.get(f"{settings.API_V1_STR}/photos/99/image?w=320").status_code == 404
+
+
+def test_never_upscales_and_honours_exif_orientation():
+    assert scaled_size((100, 50), ResizeSpec(800, None, "contain")) == (100, 50)
+
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Stored landscape, displayed portrait
+    Image.new("RGB", (1600, 1200)).save(buffer, format="JPEG", exif=exif)
+
+    resized = resize_image(buffer.getvalue(), ResizeSpec(None, 800, "contain"), JPEG)
+
+    with Image.open(io.BytesIO(resized)) as img:
+        assert img.size == (600, 800)
@@ -3,6 +3,7 @@ Tests for photo rotation endpoint.
 """
 
 import io
+from dataclasses import replace
 from datetime import datetime
 from unittest.mock import Mock, patch
 
@@ -11,8 +12,10 @@ from PIL import Image
 from sqlalchemy.orm import Session
 
 from api.core.config import settings
-from api.models.tphoto import TPhoto
+from api.crud import tphoto as tphoto_crud
+from api.models.tphoto import TPhoto, TPhotoHash
 from api.models.user import TLog, User
+from api.services.photo_hash import hash_to_hex, photo_hash_index
 
 
 def seed_user_and_tlog(db: Session) -> tuple[User, TLog]:
@@ -87,15 +90,17 @@ def create_test_image() -> bytes:
 class TestPhotoRotate:
     """Test cases for photo rotation endpoint."""
 
-    def test_rotate_photo_success_90_degrees(self, client: TestClient, db: Session):
+    def test_rotate_photo_success_90_degrees(
+        self, client: TestClient, db: Session, processed_image
+    ):
         """Test successful photo rotation by 90 degrees."""
         user, tlog = seed_user_and_tlog(db)
         photo = create_sample_photo(db, tlog_id=tlog.id, photo_id=5001)  # type: ignore[arg-type]
 
         test_image_bytes = create_test_image()
 
-        with patch("requests.get") as mock_get, patch(
-            "api.services.image_processor.ImageProcessor.process_image"
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process_decoded"
         ) as mock_process, patch(
             "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
         ) as mock_s3_upload:
@@ -107,12 +112,7 @@ class TestPhotoRotate:
             mock_get.return_value = mock_response
 
             # Mock image processing
-            mock_process.return_value = (
-                b"processed_photo",
-                b"processed_thumbnail",
-                (150, 200),
-                (75, 100),
-            )
+            mock_process.return_value = processed_image((150, 200), (75, 100))
 
             # Mock S3 upload - return revision-suffixed filenames
             mock_s3_upload.return_value = ("000/P00001_r1.jpg", "000/I00001_r1.jpg")
@@ -145,15 +145,17 @@ class TestPhotoRotate:
             # Verify S3 operations
             mock_s3_upload.assert_called_once()
 
-    def test_rotate_photo_success_180_degrees(self, client: TestClient, db: Session):
+    def test_rotate_photo_success_180_degrees(
+        self, client: TestClient, db: Session, processed_image
+    ):
         """Test successful photo rotation by 180 degrees."""
         user, tlog = seed_user_and_tlog(db)
         photo = create_sample_photo(db, tlog_id=tlog.id, photo_id=5002)  # type: ignore[arg-type]
 
         test_image_bytes = create_test_image()
 
-        with patch("requests.get") as mock_get, patch(
-            "api.services.image_processor.ImageProcessor.process_image"
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process_decoded"
         ) as mock_process, patch(
             "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
         ) as mock_s3_upload:
@@ -163,12 +165,7 @@ class TestPhotoRotate:
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
 
-            mock_process.return_value = (
-                b"processed_photo",
-                b"processed_thumbnail",
-                (100, 100),
-                (50, 50),
-            )
+            mock_process.return_value = processed_image((100, 100), (50, 50))
             mock_s3_upload.return_value = ("000/P00001_r1.jpg", "000/I00001_r1.jpg")
 
             headers = {"Authorization": "Bearer auth0_user_301"}
@@ -182,15 +179,49 @@ class TestPhotoRotate:
             body = resp.json()
             assert body["id"] == photo.id  # Same ID
 
-    def test_rotate_photo_default_angle(self, client: TestClient, db: Session):
+    def test_rotate_photo_replaces_its_hash(
+        self, client: TestClient, db: Session, processed_image
+    ):
+        """The rotated thumbnail's hash replaces the old one, row and index."""
+        user, tlog = seed_user_and_tlog(db)
+        photo = create_sample_photo(db, tlog_id=tlog.id, photo_id=5004)  # type: ignore[arg-type]
+        tphoto_crud.set_photo_hash(db, photo_id=5004, dhash=hash_to_hex(0x0F))
+        db.commit()
+        photo_hash_index.build(db)
+
+        rotated = replace(processed_image((100, 100), (50, 50)), dhash=0xF0F0)
+
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process_decoded",
+            return_value=rotated,
+        ), patch(
+            "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys",
+            return_value=("000/P00001_r1.jpg", "000/I00001_r1.jpg"),
+        ):
+            mock_get.return_value = Mock(content=create_test_image())
+
+            resp = client.post(
+                f"{settings.API_V1_STR}/photos/{photo.id}/rotate",
+                json={"angle": 90},
+                headers={"Authorization": "Bearer auth0_user_301"},
+            )
+
+        assert resp.status_code == 200
+        row = db.query(TPhotoHash).filter(TPhotoHash.photo_id == 5004).one()
+        assert row.dhash == hash_to_hex(0xF0F0)
+        assert photo_hash_index.search(0xF0F0, 0) == [(5004, 0)]
+
+    def test_rotate_photo_default_angle(
+        self, client: TestClient, db: Session, processed_image
+    ):
         """Test photo rotation with default angle (90 degrees)."""
         user, tlog = seed_user_and_tlog(db)
         photo = create_sample_photo(db, tlog_id=tlog.id, photo_id=5003)  # type: ignore[arg-type]
 
         test_image_bytes = create_test_image()
 
-        with patch("requests.get") as mock_get, patch(
-            "api.services.image_processor.ImageProcessor.process_image"
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process_decoded"
         ) as mock_process, patch(
             "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
         ) as mock_s3_upload:
@@ -200,12 +231,7 @@ class TestPhotoRotate:
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
 
-            mock_process.return_value = (
-                b"processed_photo",
-                b"processed_thumbnail",
-                (150, 200),
-                (75, 100),
-            )
+            mock_process.return_value = processed_image((150, 200), (75, 100))
             mock_s3_upload.return_value = ("000/P00001_r1.jpg", "000/I00001_r1.jpg")
 
             headers = {"Authorization": "Bearer auth0_user_301"}
@@ -248,7 +274,9 @@ class TestPhotoRotate:
         assert resp.status_code == 404
         assert "Photo not found" in resp.json()["detail"]
 
-    def test_rotate_photo_by_non_owner_success(self, client: TestClient, db: Session):
+    def test_rotate_photo_by_non_owner_success(
+        self, client: TestClient, db: Session, processed_image
+    ):
         """Test rotation by user who doesn't own the photo - should succeed with new trust model."""
         user, tlog = seed_user_and_tlog(db)
         photo = create_sample_photo(db, tlog_id=tlog.id, photo_id=5005)  # type: ignore[arg-type]
@@ -267,8 +295,8 @@ class TestPhotoRotate:
 
         test_image_bytes = create_test_image()
 
-        with patch("requests.get") as mock_get, patch(
-            "api.services.image_processor.ImageProcessor.process_image"
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process_decoded"
         ) as mock_process, patch(
             "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
         ) as mock_s3_upload:
@@ -278,12 +306,7 @@ class TestPhotoRotate:
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
 
-            mock_process.return_value = (
-                b"processed_photo",
-                b"processed_thumbnail",
-                (150, 200),
-                (75, 100),
-            )
+            mock_process.return_value = processed_image((150, 200), (75, 100))
             mock_s3_upload.return_value = ("000/P00001_r1.jpg", "000/I00001_r1.jpg")
 
             # Try to rotate with different user - should now succeed
@@ -298,15 +321,17 @@ class TestPhotoRotate:
             assert resp.status_code == 200
             assert resp.json()["id"] == photo.id  # Same ID
 
-    def test_rotate_photo_no_auth(self, client: TestClient, db: Session):
+    def test_rotate_photo_no_auth(
+        self, client: TestClient, db: Session, processed_image
+    ):
         """Test rotation without authentication - no auth required now."""
         user, tlog = seed_user_and_tlog(db)
         photo = create_sample_photo(db, tlog_id=tlog.id, photo_id=5006)  # type: ignore[arg-type]
 
         test_image_bytes = create_test_image()
 
-        with patch("requests.get") as mock_get, patch(
-            "api.services.image_processor.ImageProcessor.process_image"
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process_decoded"
         ) as mock_process, patch(
             "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
         ) as mock_s3_upload:
@@ -316,12 +341,7 @@ class TestPhotoRotate:
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
 
-            mock_process.return_value = (
-                b"processed_photo",
-                b"processed_thumbnail",
-                (150, 200),
-                (75, 100),
-            )
+            mock_process.return_value = processed_image((150, 200), (75, 100))
             mock_s3_upload.return_value = ("000/P00001_r1.jpg", "000/I00001_r1.jpg")
 
             resp = client.post(
@@ -337,7 +357,7 @@ class TestPhotoRotate:
         user, tlog = seed_user_and_tlog(db)
         photo = create_sample_photo(db, tlog_id=tlog.id, photo_id=5007)  # type: ignore[arg-type]
 
-        with patch("requests.get") as mock_get:
+        with patch("requests.Session.get") as mock_get:
             # Mock download failure
             mock_get.side_effect = Exception("Download failed")
 
@@ -360,7 +380,7 @@ class TestPhotoRotate:
 
         test_image_bytes = create_test_image()
 
-        with patch("requests.get") as mock_get, patch(
+        with patch("requests.Session.get") as mock_get, patch(
             "PIL.Image.open"
         ) as mock_image_open:
 
@@ -383,7 +403,7 @@ class TestPhotoRotate:
             assert "Failed to rotate image" in resp.json()["detail"]
 
     def test_rotate_photo_s3_upload_failure_rollback(
-        self, client: TestClient, db: Session
+        self, client: TestClient, db: Session, processed_image
     ):
         """Test rollback when S3 upload fails."""
         user, tlog = seed_user_and_tlog(db)
@@ -393,8 +413,8 @@ class TestPhotoRotate:
         original_filename = photo.filename
         original_deleted_ind = photo.deleted_ind
 
-        with patch("requests.get") as mock_get, patch(
-            "api.services.image_processor.ImageProcessor.process_image"
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process_decoded"
         ) as mock_process, patch(
             "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
         ) as mock_s3_upload:
@@ -404,12 +424,7 @@ class TestPhotoRotate:
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
 
-            mock_process.return_value = (
-                b"processed_photo",
-                b"processed_thumbnail",
-                (150, 200),
-                (75, 100),
-            )
+            mock_process.return_value = processed_image((150, 200), (75, 100))
 
             # Mock S3 upload failure
             mock_s3_upload.return_value = (None, None)
@@ -430,7 +445,7 @@ class TestPhotoRotate:
             assert photo.filename == original_filename
 
     def test_rotate_photo_database_failure_rollback(
-        self, client: TestClient, db: Session
+        self, client: TestClient, db: Session, processed_image
     ):
         """Test rollback when database operations fail."""
         user, tlog = seed_user_and_tlog(db)
@@ -438,8 +453,8 @@ class TestPhotoRotate:
 
         test_image_bytes = create_test_image()
 
-        with patch("requests.get") as mock_get, patch(
-            "api.services.image_processor.ImageProcessor.process_image"
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process_decoded"
         ) as mock_process, patch(
             "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
         ) as mock_s3_upload, patch(
@@ -451,12 +466,7 @@ class TestPhotoRotate:
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
 
-            mock_process.return_value = (
-                b"processed_photo",
-                b"processed_thumbnail",
-                (150, 200),
-                (75, 100),
-            )
+            mock_process.return_value = processed_image((150, 200), (75, 100))
             mock_s3_upload.return_value = ("000/P00001_r1.jpg", "000/I00001_r1.jpg")
 
             # Mock database update failure
@@ -472,7 +482,9 @@ class TestPhotoRotate:
             assert resp.status_code == 500
             assert "Failed to update photo record" in resp.json()["detail"]
 
-    def test_rotate_photo_preserves_metadata(self, client: TestClient, db: Session):
+    def test_rotate_photo_preserves_metadata(
+        self, client: TestClient, db: Session, processed_image
+    ):
         """Test that rotation preserves original photo metadata."""
         user, tlog = seed_user_and_tlog(db)
         photo = create_sample_photo(db, tlog_id=tlog.id, photo_id=5011)  # type: ignore[arg-type]
@@ -487,8 +499,8 @@ class TestPhotoRotate:
 
         test_image_bytes = create_test_image()
 
-        with patch("requests.get") as mock_get, patch(
-            "api.services.image_processor.ImageProcessor.process_image"
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process_decoded"
         ) as mock_process, patch(
             "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
         ) as mock_s3_upload:
@@ -498,12 +510,7 @@ class TestPhotoRotate:
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
 
-            mock_process.return_value = (
-                b"processed_photo",
-                b"processed_thumbnail",
-                (150, 200),
-                (75, 100),
-            )
+            mock_process.return_value = processed_image((150, 200), (75, 100))
             mock_s3_upload.return_value = ("000/P00001_r1.jpg", "000/I00001_r1.jpg")
 
             headers = {"Authorization": "Bearer auth0_user_301"}
@@ -531,7 +538,9 @@ class TestPhotoRotate:
             assert photo.type == "L"
             assert photo.source == "R"
 
-    def test_rotate_photo_increment_revision(self, client: TestClient, db: Session):
+    def test_rotate_photo_increment_revision(
+        self, client: TestClient, db: Session, processed_image
+    ):
         """Test that rotating a photo with existing revision increments the revision number."""
         user, tlog = seed_user_and_tlog(db)
         photo = create_sample_photo(db, tlog_id=tlog.id, photo_id=5012)  # type: ignore[arg-type]
@@ -544,8 +553,8 @@ class TestPhotoRotate:
 
         test_image_bytes = create_test_image()
 
-        with patch("requests.get") as mock_get, patch(
-            "api.services.image_processor.ImageProcessor.process_image"
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process_decoded"
         ) as mock_process, patch(
             "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
         ) as mock_s3_upload:
@@ -555,12 +564,7 @@ class TestPhotoRotate:
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
 
-            mock_process.return_value = (
-                b"processed_photo",
-                b"processed_thumbnail",
-                (150, 200),
-                (75, 100),
-            )
+            mock_process.return_value = processed_image((150, 200), (75, 100))
             mock_s3_upload.return_value = ("000/P00001_r6.jpg", "000/I00001_r6.jpg")
 
             headers = {"Authorization": "Bearer auth0_user_301"}
@@ -583,7 +587,9 @@ class TestPhotoRotate:
             assert photo.filename == "000/P00001_r6.jpg"
             assert photo.icon_filename == "000/I00001_r6.jpg"
 
-    def test_rotate_photo_updates_server_id(self, client: TestClient, db: Session):
+    def test_rotate_photo_updates_server_id(
+        self, client: TestClient, db: Session, processed_image
+    ):
         """Test that rotating a photo updates server_id to PHOTOS_SERVER_ID."""
         user, tlog = seed_user_and_tlog(db)
         photo = create_sample_photo(db, tlog_id=tlog.id, photo_id=5013)  # type: ignore[arg-type]
@@ -596,8 +602,8 @@ class TestPhotoRotate:
 
         test_image_bytes = create_test_image()
 
-        with patch("requests.get") as mock_get, patch(
-            "api.services.image_processor.ImageProcessor.process_image"
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process_decoded"
         ) as mock_process, patch(
             "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
         ) as mock_s3_upload:
@@ -607,12 +613,7 @@ class TestPhotoRotate:
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
 
-            mock_process.return_value = (
-                b"processed_photo",
-                b"processed_thumbnail",
-                (150, 200),
-                (75, 100),
-            )
+            mock_process.return_value = processed_image((150, 200), (75, 100))
             mock_s3_upload.return_value = ("000/P00001_r1.jpg", "000/I00001_r1.jpg")
 
             headers = {"Authorization": "Bearer auth0_user_301"}
@@ -628,3 +629,100 @@ class TestPhotoRotate:
             db.refresh(photo)
             assert photo.server_id == settings.PHOTOS_SERVER_ID
             assert photo.server_id != original_server_id
+
+    def test_rotate_photo_transposes_pixels_without_reencoding(
+        self, client: TestClient, db: Session
+    ):
+        """The rotated image goes straight to resize/encode, turned clockwise."""
+        user, tlog = seed_user_and_tlog(db)
+        photo = create_sample_photo(db, tlog_id=tlog.id, photo_id=5014)  # type: ignore[arg-type]
+
+        # Left half red, right half blue; a clockwise turn puts red on top
+        image = Image.new("RGB", (120, 80), color="blue")
+        image.paste(Image.new("RGB", (60, 80), color="red"), (0, 0))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=95)
+
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.image_processor.ImageProcessor.process"
+        ) as mock_process_bytes, patch(
+            "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
+        ) as mock_s3_upload:
+            mock_get.return_value = Mock(
+                content=buffer.getvalue(), raise_for_status=Mock()
+            )
+            mock_s3_upload.return_value = ("000/P00001_r1.jpg", "000/I00001_r1.jpg")
+
+            resp = client.post(
+                f"{settings.API_V1_STR}/photos/{photo.id}/rotate",
+                json={"angle": 90},
+            )
+
+        assert resp.status_code == 200
+        assert (resp.json()["width"], resp.json()["height"]) == (80, 120)
+        mock_process_bytes.assert_not_called()
+        uploaded = Image.open(io.BytesIO(mock_s3_upload.call_args.args[0]))
+        assert uploaded.size == (80, 120)
+        top, bottom = uploaded.getpixel((40, 10)), uploaded.getpixel((40, 110))
+        assert top[0] > 200 and top[2] < 60  # type: ignore[index]
+        assert bottom[2] > 200 and bottom[0] < 60  # type: ignore[index]
+
+    def test_batch_rotate_requires_admin(self, client: TestClient, db: Session):
+        seed_user_and_tlog(db)
+
+        with patch("api.api.deps.auth0_validator.validate_auth0_token") as mock:
+            mock.return_value = {
+                "token_type": "auth0",
+                "auth0_user_id": "auth0|301",
+                "scope": "api:write",
+            }
+            resp = client.post(
+                f"{settings.API_V1_STR}/photos:rotate",
+                json={"items": [{"photo_id": 5001, "angle": 90}]},
+                headers={"Authorization": "Bearer mock_token"},
+            )
+
+        assert resp.status_code == 403
+        assert "api:admin" in resp.json()["detail"]
+
+    def test_batch_rotate_reports_each_photo(self, client: TestClient, db: Session):
+        user, tlog = seed_user_and_tlog(db)
+        for photo_id in (5021, 5022):
+            create_sample_photo(db, tlog_id=tlog.id, photo_id=photo_id)  # type: ignore[arg-type]
+
+        with patch("requests.Session.get") as mock_get, patch(
+            "api.services.s3_service.S3Service.upload_photo_and_thumbnail_with_keys"
+        ) as mock_s3_upload, patch(
+            "api.api.deps.auth0_validator.validate_auth0_token"
+        ) as mock_token:
+            mock_get.return_value = Mock(
+                content=create_test_image(), raise_for_status=Mock()
+            )
+            mock_s3_upload.return_value = ("000/P00001_r1.jpg", "000/I00001_r1.jpg")
+            mock_token.return_value = {
+                "token_type": "auth0",
+                "auth0_user_id": "auth0|301",
+                "scope": "api:write api:admin",
+            }
+            resp = client.post(
+                f"{settings.API_V1_STR}/photos:rotate",
+                json={
+                    "items": [
+                        {"photo_id": 5021, "angle": 90},
+                        {"photo_id": 5022, "angle": 270},
+                        {"photo_id": 5021, "angle": 180},
+                        {"photo_id": 99999, "angle": 90},
+                    ]
+                },
+                headers={"Authorization": "Bearer mock_token"},
+            )
+
+        assert resp.status_code == 200
+        body = resp.json()
+        assert sorted(p["id"] for p in body["rotated"]) == [5021, 5022]
+        assert all(p["user_id"] == user.id for p in body["rotated"])
+        assert sorted((f["photo_id"], f["status_code"]) for f in body["failed"]) == [
+            (5021, 400),
+            (99999, 404),
+        ]
+        assert mock_s3_upload.call_count == 2
@@ -0,0 +1,128 @@
+"""
+Tests for the trig and user thumbnail sprite endpoints.
+"""
+
+import io
+from datetime import date, time
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.models.server import Server
+from api.models.tphoto import TPhoto
+from api.models.user import TLog, User
+from api.services.photo_sprite import sprite_service
+from api.tests.conftest import add_photo, jpeg
+
+COLOURS = {1: "red", 2: "green", 3: "blue"}
+# Photos on the seeded log, with 120x90 thumbnails
+PHOTO = {"tlog_id": 7001, "icon_width": 120, "icon_height": 90}
+
+
+def seed(db: Session) -> None:
+    db.add(User(id=701, name="spriter", email="sprite@example.com"))
+    db.add(Server(id=1, url="https://photos.example.com/", path="/", name="S3"))
+    db.add(
+        TLog(
+            id=7001,
+            trig_id=70,
+            user_id=701,
+            date=date(2024, 1, 1),
+            time=time(12, 0),
+            osgb_eastings=1,
+            osgb_northings=1,
+            osgb_gridref="AA 00000 00000",
+            fb_number="",
+            condition="G",
+            comment="",
+            score=0,
+            ip_addr="127.0.0.1",
+            source="W",
+        )
+    )
+    db.commit()
+    for photo_id in COLOURS:
+        add_photo(db, photo_id, **PHOTO)
+    db.commit()
+
+
+@pytest.fixture
+def http_body():
+    """Serve each seeded photo's icon in its own colour."""
+
+    def body(url: str) -> bytes:
+        photo_id = int(url.rsplit("/I", 1)[1].split(".")[0])
+        return jpeg(colour=COLOURS.get(photo_id, "white"))
+
+    return body
+
+
+@pytest.fixture(autouse=True)
+def isolate_sprite_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(sprite_service.cache, "directory", str(tmp_path))
+    monkeypatch.setattr(sprite_service.cache, "_size", None)
+
+
+def test_trig_sprite_and_index(http, client: TestClient, db: Session):
+    seed(db)
+
+    resp = client.get(f"{settings.API_V1_STR}/trigs/70/photos/sprite/index")
+
+    assert resp.status_code == 200
+    index = resp.json()
+    assert (index["width"], index["height"]) == (360, 120)
+    # Newest first, each 120x90 icon centred in its 120px cell
+    assert [(t["photo_id"], t["x"], t["y"]) for t in index["tiles"]] == [
+        (3, 0, 15),
+        (2, 120, 15),
+        (1, 240, 15),
+    ]
+    assert index["sprite_url"].endswith(f"/trigs/70/photos/sprite?v={index['version']}")
+
+    sprite = client.get(index["sprite_url"])
+    assert sprite.status_code == 200
+    assert sprite.headers["content-type"] == "image/jpeg"
+    assert "immutable" in sprite.headers["cache-control"]
+    with Image.open(io.BytesIO(sprite.content)) as img:
+        r, g, b = img.convert("RGB").getpixel((300, 60))
+        assert r > 200 and g < 60 and b < 60  # photo 1 is red
+
+    # Served from the cache: no thumbnail fetched twice
+    assert http.get.call_count == 3
+    again = client.get(
+        f"{settings.API_V1_STR}/trigs/70/photos/sprite",
+        headers={"If-None-Match": sprite.headers["etag"]},
+    )
+    assert again.status_code == 304
+    assert http.get.call_count == 3
+
+
+def test_sprite_version_follows_photo_set(http, client: TestClient, db: Session):
+    seed(db)
+    url = f"{settings.API_V1_STR}/users/701/photos/sprite/index"
+    first = client.get(url).json()
+    assert client.get(url).json()["version"] == first["version"]
+
+    add_photo(db, 4, **PHOTO)
+    db.commit()
+    added = client.get(url).json()
+    assert added["version"] != first["version"]
+    assert [t["photo_id"] for t in added["tiles"]] == [4, 3, 2, 1]
+
+    photo = db.get(TPhoto, 4)
+    assert photo is not None
+    photo.deleted_ind = "Y"  # type: ignore[assignment]
+    db.commit()
+    assert client.get(url).json()["version"] == first["version"]
+
+
+def test_no_photos(client: TestClient, db: Session):
+    resp = client.get(f"{settings.API_V1_STR}/trigs/999/photos/sprite/index")
+    assert resp.status_code == 200
+    assert resp.json()["tiles"] == [] and resp.json()["sprite_url"] is None
+
+    resp = client.get(f"{settings.API_V1_STR}/trigs/999/photos/sprite")
+    assert resp.status_code == 404
@@ -223,22 +223,21 @@ def create_test_image() -> io.BytesIO:
     return io.BytesIO(jpeg_data)
 
 
-@patch("api.services.image_processor.ImageProcessor.process_image")
+@patch("api.services.image_processor.ImageProcessor.process")
 @patch("api.services.s3_service.S3Service.upload_photo_and_thumbnail")
 def test_create_photo_with_user_facing_names_works(
-    mock_s3_upload, mock_image_processor, client: TestClient, db: Session
+    mock_s3_upload,
+    mock_image_processor,
+    processed_image,
+    client: TestClient,
+    db: Session,
 ):
     """
     Test that user-facing parameter names work correctly.
     This test demonstrates that the fix allows users to send 'caption' and 'license'.
     """
     # Mock the image processing and S3 upload
-    mock_image_processor.return_value = (
-        (100, 100),
-        b"processed_image",
-        (50, 50),
-        b"thumbnail",
-    )
+    mock_image_processor.return_value = processed_image()
     mock_s3_upload.return_value = ("photo_key", "thumb_key")
 
     user, tlog = seed_user_and_tlog(db)
@@ -280,22 +279,21 @@ def test_create_photo_with_user_facing_names_works(
     assert body["license"] == "Y"
 
 
-@patch("api.services.image_processor.ImageProcessor.process_image")
+@patch("api.services.image_processor.ImageProcessor.process")
 @patch("api.services.s3_service.S3Service.upload_photo_and_thumbnail")
 def test_create_photo_comprehensive_validation(
-    mock_s3_upload, mock_image_processor, client: TestClient, db: Session
+    mock_s3_upload,
+    mock_image_processor,
+    processed_image,
+    client: TestClient,
+    db: Session,
 ):
     """
     Test comprehensive validation of the photo upload endpoint.
     This verifies all parameter validation works correctly.
     """
     # Mock the image processing and S3 upload
-    mock_image_processor.return_value = (
-        (100, 100),
-        b"processed_image",
-        (50, 50),
-        b"thumbnail",
-    )
+    mock_image_processor.return_value = processed_image()
     mock_s3_upload.return_value = ("photo_key", "thumb_key")
 
     user, tlog = seed_user_and_tlog(db)
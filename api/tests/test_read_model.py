@@ -0,0 +1,114 @@
+"""
+Tests for the column-only read model behind the list endpoints.
+"""
+
+from datetime import date, datetime, time
+
+from sqlalchemy.orm import Session
+
+from api.api.v1.endpoints.logs import enrich_logs_with_names
+from api.crud import read_model
+from api.crud import tlog as tlog_crud
+from api.models.server import Server
+from api.models.trig import Trig
+from api.models.user import TLog, User
+from api.tests.conftest import add_photo
+
+
+def seed(db: Session) -> None:
+    db.add(User(id=901, name="reader", email="rm@example.com"))
+    db.add(Server(id=1, url="https://photos.example.com/", path="/", name="S3"))
+    for i in range(3):
+        db.add(
+            TLog(
+                id=9301 + i,
+                trig_id=1,
+                user_id=901,
+                date=date(2024, 5, 1 + i),
+                time=time(8, 30),
+                osgb_eastings=100,
+                osgb_northings=200,
+                osgb_gridref="AA 00100 00200",
+                fb_number="S1234",
+                condition="G",
+                comment=f"Visit {i}",
+                score=7,
+                ip_addr="127.0.0.1",
+                source="W",
+            )
+        )
+        add_photo(
+            db,
+            9401 + i,
+            tlog_id=9301 + i,
+            filename=f"000/P0940{i}.jpg",
+            filesize=1000,
+            height=480,
+            width=640,
+            icon_filename=f"000/I0940{i}.jpg",
+            icon_filesize=100,
+            icon_height=90,
+            icon_width=120,
+            name="Pillar",
+            text_desc="Looking north",
+            deleted_ind="Y" if i == 2 else "N",
+            crt_timestamp=datetime(2024, 5, 1),
+        )
+    db.commit()
+
+
+def test_list_logs_matches_orm_path(db: Session):
+    seed(db)
+    trig = db.query(Trig).filter(Trig.id == 1).first()
+
+    rows = read_model.list_logs(db, user_id=901, skip=0, limit=10)
+    orm = enrich_logs_with_names(
+        db, tlog_crud.list_logs_filtered(db, user_id=901, skip=0, limit=10)
+    )
+
+    assert rows == orm
+    assert [row["id"] for row in rows] == [9303, 9302, 9301]
+    assert rows[0]["user_name"] == "reader"
+    assert rows[0]["trig_name"] == (trig.name if trig else None)
+
+
+def test_list_logs_honours_order(db: Session):
+    seed(db)
+
+    rows = read_model.list_logs(db, order="id", skip=1, limit=1)
+
+    assert [row["id"] for row in rows] == [9302]
+
+
+def test_get_logs_by_ids_keeps_requested_order(db: Session):
+    seed(db)
+
+    rows = read_model.get_logs_by_ids(db, [9302, 9999, 9301])
+
+    assert [row["id"] for row in rows] == [9302, 9301]
+
+
+def test_list_photos_builds_response_dicts(db: Session):
+    seed(db)
+
+    rows = read_model.list_photos(db, user_id=901, skip=0, limit=10)
+
+    assert [row["id"] for row in rows] == [9402, 9401]
+    assert rows[0] == {
+        "id": 9402,
+        "log_id": 9302,
+        "user_id": 901,
+        "type": "T",
+        "filesize": 1000,
+        "height": 480,
+        "width": 640,
+        "icon_filesize": 100,
+        "icon_height": 90,
+        "icon_width": 120,
+        "caption": "Pillar",
+        "text_desc": "Looking north",
+        "license": "Y",
+        "photo_url": "https://photos.example.com/000/P09401.jpg",
+        "icon_url": "https://photos.example.com/000/I09401.jpg",
+        "renditions": [],
+    }
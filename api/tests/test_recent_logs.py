@@ -0,0 +1,175 @@
+"""
+Tests for the in-memory recent logs buffer behind /v1/logs.
+"""
+
+from datetime import date, time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from api.core.config import settings
+from api.crud import read_model
+from api.models.user import TLog, User
+from api.services.activity import LOG_CREATED, LOG_DELETED, LOG_UPDATED
+from api.services.recent_logs import (
+    RecentLogsBuffer,
+    recent_logs_buffer,
+    recent_logs_refresher,
+)
+
+
+def _item(log_id: int, day: int) -> dict:
+    return {"id": log_id, "date": f"2024-01-{day:02d}", "time": "12:00:00"}
+
+
+def _seeded_buffer(items: list, total: int, capacity: int = 5) -> RecentLogsBuffer:
+    buffer = RecentLogsBuffer(capacity=capacity, reseed_seconds=60)
+    buffer._seeded_at = 0.0
+    buffer._total = total
+    for item in items:
+        buffer._keys.append((item["date"], item["time"], item["id"]))
+        buffer._items.append(item)
+    return buffer
+
+
+def seed_logs(db: Session, count: int) -> None:
+    db.add(User(id=601, name="recent", email="r@example.com"))
+    for i in range(count):
+        db.add(
+            TLog(
+                id=8000 + i,
+                trig_id=1,
+                user_id=601,
+                date=date(2024, 2, 1 + i),
+                time=time(9, 0),
+                osgb_eastings=1,
+                osgb_northings=1,
+                osgb_gridref="AA 00000 00000",
+                fb_number="",
+                condition="G",
+                comment=f"log {i}",
+                score=0,
+                ip_addr="127.0.0.1",
+                source="W",
+            )
+        )
+    db.commit()
+
+
+def test_page_is_newest_first_and_none_when_not_covered():
+    buffer = _seeded_buffer([_item(i, i) for i in range(1, 5)], total=10)
+
+    items, total = buffer.page(skip=0, limit=2)  # type: ignore[misc]
+    assert [i["id"] for i in items] == [4, 3]
+    assert total == 10
+    # Rows 5+ live only in the database
+    assert buffer.page(skip=3, limit=2) is None
+
+
+def test_complete_buffer_covers_every_page():
+    buffer = _seeded_buffer([_item(i, i) for i in range(1, 4)], total=3)
+
+    assert buffer.page(skip=2, limit=10) == ([_item(1, 1)], 3)
+    assert buffer.page(skip=5, limit=10) == ([], 3)
+
+
+def test_unseeded_buffer_ignores_events_and_pages():
+    buffer = RecentLogsBuffer(capacity=5, reseed_seconds=60)
+    buffer.handle_event(LOG_CREATED, _item(1, 1))
+
+    assert buffer.page(skip=0, limit=10) is None
+    assert buffer._items == []
+
+
+def test_events_keep_buffer_current():
+    buffer = _seeded_buffer([_item(i, i) for i in range(1, 4)], total=3, capacity=3)
+
+    buffer.handle_event(LOG_CREATED, _item(9, 20))
+    assert buffer.page(skip=0, limit=3) == (
+        [_item(9, 20), _item(3, 3), _item(2, 2)],
+        4,
+    )
+
+    # Re-dated log moves within the buffer
+    buffer.handle_event(LOG_UPDATED, _item(2, 25))
+    assert [i["id"] for i in buffer.page(skip=0, limit=3)[0]] == [2, 9, 3]  # type: ignore[index]
+
+    buffer.handle_event(LOG_DELETED, {"id": 9})
+    items, total = buffer.page(skip=0, limit=2)  # type: ignore[misc]
+    assert [i["id"] for i in items] == [2, 3]
+    assert total == 3
+
+
+def test_old_log_not_inserted_below_incomplete_buffer():
+    buffer = _seeded_buffer([_item(i, i + 10) for i in range(1, 4)], total=10)
+
+    buffer.handle_event(LOG_CREATED, _item(50, 1))
+
+    assert 50 not in [key[2] for key in buffer._keys]
+    assert buffer._total == 11
+
+
+def test_update_to_complete_buffer_keeps_re_dated_log():
+    buffer = _seeded_buffer([_item(i, i + 10) for i in range(1, 4)], total=3)
+
+    # Every log is held, so moving one below the oldest loses nothing
+    buffer.handle_event(LOG_UPDATED, _item(2, 1))
+
+    assert [i["id"] for i in buffer.page(skip=0, limit=5)[0]] == [3, 1, 2]  # type: ignore[index]
+    assert buffer._total == 3
+
+
+def test_events_during_a_seed_are_replayed_after_it(db: Session):
+    seed_logs(db, 3)
+    buffer = RecentLogsBuffer(capacity=5, reseed_seconds=60)
+    list_logs = read_model.list_logs
+
+    def read_then_edit(*args, **kwargs):
+        items = list_logs(*args, **kwargs)
+        # Written after the seed read the table
+        buffer.handle_event(
+            LOG_CREATED, {"id": 9000, "date": "2024-03-01", "time": "12:00:00"}
+        )
+        buffer.handle_event(LOG_DELETED, {"id": 8000})
+        # Already seeded; must not be counted twice
+        buffer.handle_event(LOG_CREATED, dict(items[0]))
+        return items
+
+    with patch.object(read_model, "list_logs", side_effect=read_then_edit):
+        buffer.seed(db)
+
+    items, total = buffer.page(skip=0, limit=5)  # type: ignore[misc]
+    assert [i["id"] for i in items] == [9000, 8002, 8001]
+    assert total == 3
+
+
+def test_list_logs_matches_database_path(
+    client: TestClient, db: Session, background_refreshes
+):
+    seed_logs(db, 4)
+    url = f"{settings.API_V1_STR}/logs?limit=2&skip=1"
+
+    with patch.object(settings, "RECENT_LOGS_ENABLED", False):
+        from_db = client.get(url).json()
+    # The first request is served by the database while the buffer seeds
+    assert client.get(url).json() == from_db
+    assert not recent_logs_buffer.is_fresh()
+
+    background_refreshes.set()
+    recent_logs_refresher.wait(5)
+    from_buffer = client.get(url).json()
+
+    assert recent_logs_buffer.is_fresh()
+    assert from_buffer == from_db
+    assert [i["id"] for i in from_buffer["items"]] == [8002, 8001]
+    assert from_buffer["pagination"]["total"] == 4
+
+
+def test_filtered_list_bypasses_buffer(client: TestClient, db: Session):
+    seed_logs(db, 2)
+
+    resp = client.get(f"{settings.API_V1_STR}/logs?user_id=601")
+
+    assert resp.status_code == 200
+    assert not recent_logs_buffer.is_fresh()
@@ -44,7 +44,9 @@ def test_rekognition_service_init_success(mock_boto_client):
     service = RekognitionService()
 
     assert service.client == mock_client
-    mock_boto_client.assert_called_once_with("rekognition", region_name="eu-west-1")
+    mock_boto_client.assert_called_once()
+    assert mock_boto_client.call_args.args == ("rekognition",)
+    assert mock_boto_client.call_args.kwargs["region_name"] == "eu-west-1"
 
 
 @patch("boto3.client")
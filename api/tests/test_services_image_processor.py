@@ -3,10 +3,13 @@ Tests for image processor service aligned with current implementation.
 """
 
 import io
+from unittest.mock import patch
 
+import pytest
 from PIL import Image
 
-from api.services.image_processor import ImageProcessor
+from api.core.config import settings
+from api.services.image_processor import ImageProcessor, ImageValidationError
 
 
 class TestImageProcessor:
@@ -76,17 +79,25 @@ class TestImageProcessor:
         _, _, photo_dims, _ = result
         assert photo_dims == (400, 300)
 
-    def test_process_image_with_alpha_channel(self):
+    def test_process_rejects_non_jpeg(self):
         processor = ImageProcessor()
         test_image = Image.new("RGBA", (300, 200), color=(255, 0, 0, 128))
         buffer = io.BytesIO()
         test_image.save(buffer, format="PNG")
         image_data = buffer.getvalue()
 
-        result = processor.process_image(image_data)
-        assert result is not None
-        _, _, photo_dims, _ = result
-        assert photo_dims == (300, 200)
+        with pytest.raises(ImageValidationError, match="Only JPEG"):
+            processor.process(image_data)
+        assert processor.process_image(image_data) == (None, None, None, None)
+
+    def test_process_rejects_oversized_and_undecodable_input(self):
+        processor = ImageProcessor()
+
+        with patch.object(settings, "MAX_IMAGE_SIZE", 4):
+            with pytest.raises(ImageValidationError, match="File size exceeds"):
+                processor.process(b"\xff\xd8\xff\xe0\x00")
+        with pytest.raises(ImageValidationError, match="Invalid image file"):
+            processor.process(b"not an image")
 
     def test_process_image_memory_error(self):
         processor = ImageProcessor()
@@ -111,3 +122,62 @@ class TestImageProcessor:
         assert len(processed_photo) > 0
         assert len(processed_thumbnail) > 0
         assert len(processed_thumbnail) < len(processed_photo)
+
+    def test_process_decodes_large_jpeg_in_draft_mode(self):
+        processor = ImageProcessor()
+        buffer = io.BytesIO()
+        Image.new("RGB", (4000, 3000), color="blue").save(buffer, format="JPEG")
+
+        with patch.object(settings, "MAX_IMAGE_DIMENSION", 1024):
+            result = processor.process(buffer.getvalue())
+
+        assert result.original_size == (4000, 3000)
+        # DCT scaling decodes well below full resolution but not below target
+        assert result.decoded_size[0] < 4000
+        assert result.decoded_size[0] >= result.photo_size[0]
+        assert max(result.photo_size) <= 1024
+        assert max(result.thumbnail_size) <= 120
+        assert set(result.timings) == {
+            "decode",
+            "resize",
+            "encode",
+            "variants",
+            "total",
+        }
+        with Image.open(io.BytesIO(result.photo_bytes)) as photo:
+            assert photo.size == result.photo_size
+
+    def test_process_applies_exif_orientation(self):
+        processor = ImageProcessor()
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotate 90° clockwise on display
+        buffer = io.BytesIO()
+        Image.new("RGB", (2400, 1200), color="green").save(
+            buffer, format="JPEG", exif=exif
+        )
+
+        result = processor.process(buffer.getvalue())
+
+        assert result.original_size == (1200, 2400)
+        assert result.photo_size[1] > result.photo_size[0]
+        with Image.open(io.BytesIO(result.thumbnail_bytes)) as thumb:
+            assert thumb.size == result.thumbnail_size
+            assert thumb.height > thumb.width
+
+    def test_process_makes_renditions_smaller_than_photo(self):
+        processor = ImageProcessor()
+        buffer = io.BytesIO()
+        Image.new("RGB", (1000, 500), color="red").save(buffer, format="JPEG")
+
+        with patch.object(settings, "PHOTO_RENDITION_SIZES", [320, 1600, 800]):
+            result = processor.process(buffer.getvalue())
+        renditions = result.renditions
+
+        assert result.photo_size == (1000, 500)
+        # 1600 is not smaller than the photo, so only 800 and 320 are made
+        assert [(r.size, r.dimensions) for r in renditions] == [
+            (800, (800, 400)),
+            (320, (320, 160)),
+        ]
+        with Image.open(io.BytesIO(renditions[1].image_bytes)) as img:
+            assert img.size == (320, 160)
@@ -6,6 +6,7 @@ from unittest.mock import Mock, patch
 
 from botocore.exceptions import ClientError
 
+from api.services.image_processor import Rendition
 from api.services.s3_service import S3Service
 
 
@@ -15,7 +16,7 @@ class TestS3Service:
         assert hasattr(service, "s3_client")
         assert hasattr(service, "bucket")
 
-    @patch("api.services.s3_service.boto3.client", side_effect=Exception("boom"))
+    @patch("boto3.client", side_effect=Exception("boom"))
     def test_init_handles_client_error(self, _mock_boto):
         service = S3Service()
         assert service.s3_client is None
@@ -26,7 +27,35 @@ class TestS3Service:
         assert service._generate_thumbnail_key(123) == "000/I00123.jpg"
         assert service._generate_photo_key(999999) == "999/P999999.jpg"
 
-    @patch("api.services.s3_service.boto3.client")
+    def test_rendition_key_sits_next_to_photo(self):
+        service = S3Service()
+        assert service.rendition_key("002/P02001.jpg", 800) == "002/P02001_800.jpg"
+        assert (
+            service.rendition_key("002/P02001_r1.jpg", 320) == "002/P02001_r1_320.jpg"
+        )
+
+    @patch("boto3.client")
+    def test_upload_renditions_rolls_back_on_failure(self, mock_boto_client):
+        mock_client = Mock()
+
+        def put_object(**kwargs):
+            if kwargs["Key"].endswith("_320.jpg"):
+                raise ClientError({"Error": {"Code": "500", "Message": "x"}}, "put")
+
+        mock_client.put_object.side_effect = put_object
+        mock_boto_client.return_value = mock_client
+        renditions = [
+            Rendition(size=800, image_bytes=b"a", dimensions=(800, 600)),
+            Rendition(size=320, image_bytes=b"b", dimensions=(320, 240)),
+        ]
+
+        service = S3Service()
+        assert service.upload_renditions("000/P00001.jpg", renditions) is None
+        mock_client.delete_object.assert_called_once_with(
+            Bucket=service.bucket, Key="000/P00001_800.jpg"
+        )
+
+    @patch("boto3.client")
     def test_upload_photo_and_thumbnail_success(self, mock_boto_client):
         mock_client = Mock()
         mock_boto_client.return_value = mock_client
@@ -49,7 +78,7 @@ class TestS3Service:
         assert photo_call.kwargs["ACL"] == "public-read"
         assert thumb_call.kwargs["ACL"] == "public-read"
 
-    @patch("api.services.s3_service.boto3.client")
+    @patch("boto3.client")
     def test_upload_failure_rolls_back(self, mock_boto_client):
         mock_client = Mock()
         mock_boto_client.return_value = mock_client
@@ -69,7 +98,7 @@ class TestS3Service:
         service.s3_client = None
         assert service.upload_photo_and_thumbnail(1, b"p", b"t") == (None, None)
 
-    @patch("api.services.s3_service.boto3.client")
+    @patch("boto3.client")
     def test_delete_photo_and_thumbnail_success(self, mock_boto_client):
         mock_client = Mock()
         mock_boto_client.return_value = mock_client
@@ -78,7 +107,7 @@ class TestS3Service:
         assert service.delete_photo_and_thumbnail(55) is True
         assert mock_client.delete_object.call_count == 2
 
-    @patch("api.services.s3_service.boto3.client")
+    @patch("boto3.client")
     def test_delete_photo_and_thumbnail_failure(self, mock_boto_client):
         mock_client = Mock()
         mock_client.delete_object.side_effect = ClientError(
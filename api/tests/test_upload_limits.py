@@ -0,0 +1,138 @@
+"""
+Tests for early rejection of oversized and non-JPEG photo uploads.
+"""
+
+import asyncio
+import io
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from api.core.config import settings
+from api.core.uploads import JPEG_SIGNATURE, UploadLimitMiddleware
+from api.services.photo_ingest import PhotoIngestError, read_upload
+
+BOUNDARY = "limit-test"
+
+
+def multipart(payload: bytes) -> bytes:
+    return (
+        (
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="p.jpg"\r\n'
+            "Content-Type: image/jpeg\r\n\r\n"
+        ).encode()
+        + payload
+        + f"\r\n--{BOUNDARY}--\r\n".encode()
+    )
+
+
+@pytest.fixture
+def limited():
+    """A one-route app behind a 100KB limit, recording what reached it."""
+    received = Mock()
+    app = FastAPI()
+
+    @app.post("/upload")
+    def upload(file: UploadFile = File(...)):
+        received(len(file.file.read()))
+        return {"ok": True}
+
+    app.add_middleware(UploadLimitMiddleware, paths=["/upload"], max_bytes=100_000)
+    return TestClient(app), received
+
+
+def test_declared_length_over_limit_is_refused_unread(limited):
+    client, received = limited
+    body = multipart(JPEG_SIGNATURE + bytes(400_000))
+    reads = []
+
+    def chunks():
+        reads.append(1)
+        yield body
+
+    resp = client.post(
+        "/upload",
+        content=chunks(),
+        headers={
+            "Content-Type": f"multipart/form-data; boundary={BOUNDARY}",
+            "Content-Length": str(len(body)),
+        },
+    )
+
+    assert resp.status_code == 413
+    assert resp.json()["detail"] == "File too large (max 100000 bytes)"
+    received.assert_not_called()
+
+
+def test_streamed_body_stops_at_limit():
+    chunks = [multipart(JPEG_SIGNATURE + bytes(100))[:-20]] + [bytes(64 * 1024)] * 50
+    sent = []
+
+    async def receive():
+        sent.append(1)
+        return {"type": "http.request", "body": chunks[len(sent) - 1]}
+
+    async def drain(scope, receive, send):
+        while True:
+            await receive()
+
+    middleware = UploadLimitMiddleware(drain, paths=["/upload"], max_bytes=100_000)
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/upload",
+        "headers": [
+            (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())
+        ],
+    }
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(middleware(scope, receive, Mock()))
+
+    assert exc.value.status_code == 413
+    # Stopped once the limit plus the framing allowance was passed
+    assert len(sent) == 4
+
+
+def test_non_jpeg_fails_on_first_chunk(limited):
+    client, received = limited
+    png = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(png, format="PNG")
+
+    resp = client.post("/upload", files={"file": ("p.png", png.getvalue())})
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Only JPEG images are supported"
+
+    ok = client.post("/upload", files={"file": ("p.jpg", JPEG_SIGNATURE + b"x")})
+    assert ok.status_code == 200
+    received.assert_called_once_with(4)
+
+
+def test_photo_endpoint_rejects_png(client: TestClient):
+    png = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(png, format="PNG")
+
+    resp = client.post(
+        f"{settings.API_V1_STR}/photos?log_id=1",
+        files={"file": ("p.png", png.getvalue(), "image/png")},
+        data={"caption": "c", "type": "T", "license": "Y"},
+    )
+
+    assert resp.status_code == 400
+
+
+def test_read_upload_stops_reading_early():
+    source = io.BytesIO(JPEG_SIGNATURE + bytes(5 * 1024 * 1024))
+    with pytest.raises(PhotoIngestError) as exc:
+        read_upload(source, max_bytes=1024 * 1024 + 1)
+    assert exc.value.status_code == 413
+    assert source.tell() == 2 * 1024 * 1024
+
+    with pytest.raises(PhotoIngestError) as exc:
+        read_upload(io.BytesIO(b"GIF89a"))
+    assert exc.value.status_code == 400
+
+    assert read_upload(io.BytesIO(JPEG_SIGNATURE)) == JPEG_SIGNATURE
@@ -0,0 +1,11 @@
+-- Photo renditions (resized copies stored next to tphoto.filename in S3)
+-- Sidecar to the legacy tphoto table; one row per photo and rendition size
+CREATE TABLE IF NOT EXISTS tphoto_rendition (
+    photo_id MEDIUMINT NOT NULL,
+    size SMALLINT NOT NULL,
+    filename VARCHAR(255) NOT NULL,
+    filesize INT NOT NULL,
+    height SMALLINT NOT NULL,
+    width SMALLINT NOT NULL,
+    PRIMARY KEY (photo_id, size)
+);
@@ -0,0 +1,10 @@
+-- Orientation model verdicts (scripts/backfill_orientation.py)
+-- Sidecar to the legacy tphoto table; one row per scored photo
+CREATE TABLE IF NOT EXISTS tphoto_orientation (
+    photo_id MEDIUMINT NOT NULL,
+    angle SMALLINT NOT NULL,
+    confidence FLOAT NOT NULL,
+    scored_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (photo_id),
+    KEY ix_tphoto_orientation_angle (angle)
+);
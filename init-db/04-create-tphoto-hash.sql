@@ -0,0 +1,7 @@
+-- Perceptual hashes of photo thumbnails (near-duplicate detection)
+-- Sidecar to the legacy tphoto table; one row per hashed photo
+CREATE TABLE IF NOT EXISTS tphoto_hash (
+    photo_id MEDIUMINT NOT NULL,
+    dhash CHAR(16) NOT NULL,
+    PRIMARY KEY (photo_id)
+);
@@ -0,0 +1,11 @@
+-- WebP/AVIF copies of photo thumbnails and renditions, next to their JPEGs
+-- Sidecar to the legacy tphoto table; size is the rendition size, 0 for the
+-- thumbnail
+CREATE TABLE IF NOT EXISTS tphoto_variant (
+    photo_id MEDIUMINT NOT NULL,
+    size SMALLINT NOT NULL,
+    format VARCHAR(8) NOT NULL,
+    filename VARCHAR(255) NOT NULL,
+    filesize INT NOT NULL,
+    PRIMARY KEY (photo_id, size, format)
+);
@@ -0,0 +1,8 @@
+-- S3 cleanup state of soft-deleted (deleted_ind 'Y') and moderated ('M')
+-- photos. Sidecar to the legacy tphoto table: seen_timestamp is when the
+-- cleanup job first saw the photo deleted, which starts the retention window
+CREATE TABLE IF NOT EXISTS tphoto_purge (
+    photo_id MEDIUMINT NOT NULL PRIMARY KEY,
+    seen_timestamp TIMESTAMP NOT NULL,
+    purged_timestamp TIMESTAMP NULL
+);
@@ -0,0 +1,12 @@
+-- Photos whose stored photo or thumbnail disagrees with the width/height
+-- recorded in tphoto (or could not be read), as found by the last run of
+-- scripts/audit_photo_dimensions.py. Sidecar to the legacy tphoto table
+CREATE TABLE IF NOT EXISTS tphoto_dimension_audit (
+    photo_id MEDIUMINT NOT NULL PRIMARY KEY,
+    audited_timestamp TIMESTAMP NOT NULL,
+    photo_width_actual INT NULL,
+    photo_height_actual INT NULL,
+    icon_width_actual INT NULL,
+    icon_height_actual INT NULL,
+    error VARCHAR(255) NULL
+);
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Check every live photo's stored dimensions against tphoto.
+
+Reads only the first few KB of each photo and thumbnail (HTTP Range) and
+takes the size from the JPEG frame header. Photos that disagree with the
+recorded width/height, or could not be read, are written to
+tphoto_dimension_audit (created if missing); photos that match have any
+earlier finding cleared. --after-id resumes from a known point.
+
+Usage:
+    python scripts/audit_photo_dimensions.py --workers 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ensure repository root is on sys.path when running this file directly
+REPO_ROOT = str(Path(__file__).resolve().parents[1])
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Import after sys.path manipulation
+from api.core.config import settings  # noqa: E402
+from api.db.database import get_engine, get_session_local  # noqa: E402
+from api.models.tphoto import TPhotoDimensionAudit  # noqa: E402
+from api.services.photo_audit import audit_photo_dimensions  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Audit photo dimensions into tphoto_dimension_audit"
+    )
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument(
+        "--workers", type=int, default=64, help="Concurrent ranged downloads"
+    )
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after id")
+    parser.add_argument("--limit", type=int, default=None, help="Photos to scan")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    # Keep a connection alive for every worker
+    settings.HTTP_POOL_MAXSIZE = max(settings.HTTP_POOL_MAXSIZE, args.workers)
+    TPhotoDimensionAudit.__table__.create(bind=get_engine(), checkfirst=True)
+
+    with get_session_local()() as db:
+        stats = audit_photo_dimensions(
+            db,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            after_id=args.after_id,
+            limit=args.limit,
+        )
+    print(
+        f"Scanned {stats.scanned}, mismatched {stats.mismatched}, "
+        f"unreadable {stats.failed}; last photo id {stats.last_photo_id}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Score the orientation of every stored photo with the ONNX model.
+
+Downloads thumbnails concurrently, scores them in batches and writes the
+verdicts to tphoto_orientation (created if missing). Photos already scored
+are skipped unless --rescore is given, so an interrupted run can simply be
+started again; --after-id resumes from a known point.
+
+Usage:
+    python scripts/backfill_orientation.py --model ./res/models/orientation_classifier.onnx
+    python scripts/backfill_orientation.py --report 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ensure repository root is on sys.path when running this file directly
+REPO_ROOT = str(Path(__file__).resolve().parents[1])
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Import after sys.path manipulation
+from api.core.config import settings  # noqa: E402
+from api.crud import tphoto as tphoto_crud  # noqa: E402
+from api.db.database import get_engine, get_session_local  # noqa: E402
+from api.models.tphoto import TPhotoOrientation  # noqa: E402
+from api.services.orientation_backfill import backfill_orientations  # noqa: E402
+from api.services.orientation_model import OrientationClassifier  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Score photo orientation in batches into tphoto_orientation"
+    )
+    parser.add_argument(
+        "--model",
+        default=settings.ORIENTATION_MODEL_PATH,
+        help="ONNX model path (default: ORIENTATION_MODEL_PATH)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.ORIENTATION_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.ORIENTATION_BACKFILL_FETCH_WORKERS,
+        help="Concurrent thumbnail downloads",
+    )
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after id")
+    parser.add_argument("--limit", type=int, default=None, help="Photos to scan")
+    parser.add_argument(
+        "--rescore", action="store_true", help="Score photos already scored"
+    )
+    parser.add_argument(
+        "--report",
+        type=int,
+        metavar="N",
+        help="Only list the N most confident non-upright photos",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    TPhotoOrientation.__table__.create(bind=get_engine(), checkfirst=True)
+
+    with get_session_local()() as db:
+        if args.report is None:
+            if not args.model:
+                parser.error("--model or ORIENTATION_MODEL_PATH is required")
+            stats = backfill_orientations(
+                db,
+                OrientationClassifier(model_path=args.model),
+                batch_size=args.batch_size,
+                fetch_workers=args.workers,
+                after_id=args.after_id,
+                limit=args.limit,
+                rescore=args.rescore,
+            )
+            print(
+                f"Scanned {stats.scanned}, scored {stats.scored}, "
+                f"failed {stats.failed}; last photo id {stats.last_photo_id}"
+            )
+            return
+
+        for row in tphoto_crud.list_suspected_rotations(
+            db, min_confidence=settings.ORIENTATION_MODEL_THRESHOLD, limit=args.report
+        ):
+            print(f"{row.photo_id}\t{row.angle}\t{row.confidence:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Compute the perceptual hash of every stored photo's thumbnail.
+
+Downloads thumbnails concurrently and writes their dHash to tphoto_hash
+(created if missing), which feeds near-duplicate detection on upload. Photos
+already hashed are skipped, so an interrupted run can simply be started
+again; --after-id resumes from a known point.
+
+Usage:
+    python scripts/backfill_photo_hashes.py --workers 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ensure repository root is on sys.path when running this file directly
+REPO_ROOT = str(Path(__file__).resolve().parents[1])
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Import after sys.path manipulation
+from api.db.database import get_engine, get_session_local  # noqa: E402
+from api.models.tphoto import TPhotoHash  # noqa: E402
+from api.services.photo_hash import backfill_photo_hashes  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Hash photo thumbnails into tphoto_hash"
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--workers", type=int, default=16, help="Concurrent thumbnail downloads"
+    )
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after id")
+    parser.add_argument("--limit", type=int, default=None, help="Photos to scan")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    TPhotoHash.__table__.create(bind=get_engine(), checkfirst=True)
+
+    with get_session_local()() as db:
+        stats = backfill_photo_hashes(
+            db,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            after_id=args.after_id,
+            limit=args.limit,
+        )
+    print(
+        f"Scanned {stats.scanned}, hashed {stats.hashed}, "
+        f"failed {stats.failed}; last photo id {stats.last_photo_id}"
+    )
+
+
+if __name__ == "__main__":
+    main()
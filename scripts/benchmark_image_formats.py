@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark WebP/AVIF variants against the JPEG thumbnails and renditions.
+
+Resizes each sample image to the thumbnail and rendition sizes, encodes the
+JPEG the way the image processor does, then encodes each variant format to
+its byte budget. Reports total bytes and encode CPU time per format, so the
+bytes saved can be weighed against the extra encode cost at upload.
+
+The sample corpus is a directory of JPEGs (--images), or synthetic photos.
+
+Usage:
+    python scripts/benchmark_image_formats.py --images ~/sample-photos
+    python scripts/benchmark_image_formats.py --synthetic 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Ensure repository root is on sys.path when running this file directly
+REPO_ROOT = str(Path(__file__).resolve().parents[1])
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Import after sys.path manipulation
+from api.core.config import settings  # noqa: E402
+from api.services.image_formats import (  # noqa: E402
+    AVIF,
+    JPEG,
+    WEBP,
+    ImageFormat,
+    byte_budget,
+    can_encode,
+    encode,
+    encode_to_budget,
+)
+
+
+def synthetic_photos(count: int) -> Iterator[Tuple[str, Image.Image]]:
+    """Smooth colour fields with sensor-like noise, roughly photo-like."""
+    rng = np.random.default_rng(0)
+    for index in range(count):
+        blocks = rng.integers(0, 256, (6, 8, 3), dtype=np.uint8)
+        img = Image.fromarray(blocks).resize((2000, 1500), Image.Resampling.BICUBIC)
+        noise = rng.integers(-10, 10, (1500, 2000, 3))
+        pixels = np.clip(np.asarray(img, dtype=np.int16) + noise, 0, 255)
+        yield f"synthetic-{index}", Image.fromarray(pixels.astype(np.uint8))
+
+
+def corpus_photos(directory: Path, limit: int) -> Iterator[Tuple[str, Image.Image]]:
+    paths = sorted(
+        p for p in directory.iterdir() if p.suffix.lower() in (".jpg", ".jpeg")
+    )
+    for path in paths[:limit]:
+        with Image.open(path) as img:
+            yield path.name, ImageOps.exif_transpose(img).convert("RGB")
+
+
+def targets(img: Image.Image) -> List[Tuple[bool, Image.Image]]:
+    """(is thumbnail, resized image) for each served size."""
+    sizes = [s for s in settings.PHOTO_RENDITION_SIZES if s < max(img.size)] + [
+        settings.THUMBNAIL_SIZE
+    ]
+    resized = []
+    for size in sizes:
+        copy = img.copy()
+        copy.thumbnail((size, size), Image.Resampling.LANCZOS)
+        resized.append((size == settings.THUMBNAIL_SIZE, copy))
+    return resized
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare variant format sizes and encode cost against JPEG"
+    )
+    parser.add_argument("--images", type=Path, help="Directory of sample JPEGs")
+    parser.add_argument("--limit", type=int, default=50, help="Max images to read")
+    parser.add_argument(
+        "--synthetic", type=int, default=10, help="Synthetic photos if no --images"
+    )
+    args = parser.parse_args()
+
+    formats: List[ImageFormat] = [f for f in (WEBP, AVIF) if can_encode(f)]
+    missing = [f.name for f in (WEBP, AVIF) if not can_encode(f)]
+    if missing:
+        print(f"No encoder in this Pillow for: {', '.join(missing)}")
+
+    photos = (
+        corpus_photos(args.images, args.limit)
+        if args.images
+        else synthetic_photos(args.synthetic)
+    )
+    total_bytes: Dict[str, int] = {f.name: 0 for f in [JPEG, *formats]}
+    total_cpu: Dict[str, float] = {f.name: 0.0 for f in [JPEG, *formats]}
+    encoded = 0
+    for _, img in photos:
+        for thumbnail, target in targets(img):
+            start = time.process_time()
+            jpeg = encode(target, JPEG, 85 if thumbnail else 90)
+            total_cpu[JPEG.name] += time.process_time() - start
+            total_bytes[JPEG.name] += len(jpeg)
+            budget = byte_budget(target.size, thumbnail=thumbnail)
+            for image_format in formats:
+                start = time.process_time()
+                data, _ = encode_to_budget(target, image_format, budget)
+                total_cpu[image_format.name] += time.process_time() - start
+                # Variants bigger than the JPEG are not stored; JPEG is served
+                total_bytes[image_format.name] += min(len(data), len(jpeg))
+            encoded += 1
+
+    if not encoded:
+        print("No images to benchmark")
+        return
+    print(f"{encoded} thumbnails/renditions")
+    print(f"{'format':<8} {'KiB total':>10} {'saving':>8} {'CPU ms/image':>14}")
+    jpeg_bytes = total_bytes[JPEG.name]
+    for name, size in total_bytes.items():
+        print(
+            f"{name:<8} {size / 1024:>10.1f} {1 - size / jpeg_bytes:>8.0%} "
+            f"{total_cpu[name] * 1000 / encoded:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark the column-only read model against the ORM list path.
+
+Seeds an in-memory SQLite database, then builds the same /v1/logs and
+/v1/photos pages both ways, reporting per-page CPU time and the peak memory
+allocated while building each page (via tracemalloc).
+
+Usage:
+    python scripts/benchmark_read_model.py --logs 5000 --limit 100 --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from datetime import time as dtime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+# Ensure repository root is on sys.path when running this file directly
+REPO_ROOT = str(Path(__file__).resolve().parents[1])
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Import after sys.path manipulation
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from api.api.v1.endpoints.logs import enrich_logs_with_names  # noqa: E402
+from api.crud import read_model  # noqa: E402
+from api.crud import tlog as tlog_crud  # noqa: E402
+from api.crud import tphoto as tphoto_crud  # noqa: E402
+from api.db.database import Base  # noqa: E402
+from api.models.server import Server  # noqa: E402
+from api.models.tphoto import TPhoto  # noqa: E402
+from api.models.user import TLog, User  # noqa: E402
+from api.utils.url import join_url  # noqa: E402
+
+
+def seed(db: Session, logs: int, users: int) -> None:
+    db.add(Server(id=1, url="https://photos.example.com", path="/", name="S3"))
+    db.add_all(
+        User(id=i, name=f"user{i}", email=f"u{i}@example.com")
+        for i in range(1, users + 1)
+    )
+    for i in range(1, logs + 1):
+        db.add(
+            TLog(
+                id=i,
+                trig_id=i % 500 + 1,
+                user_id=i % users + 1,
+                date=date(2000 + i % 25, i % 12 + 1, i % 28 + 1),
+                time=dtime(i % 24, i % 60),
+                osgb_eastings=400000 + i,
+                osgb_northings=300000 + i,
+                osgb_gridref="SK 00000 00000",
+                fb_number="",
+                condition="G",
+                comment="Found the pillar in good condition. " * 4,
+                score=5,
+                ip_addr="127.0.0.1",
+                source="W",
+            )
+        )
+        db.add(
+            TPhoto(
+                id=i,
+                tlog_id=i,
+                server_id=1,
+                type="T",
+                filename=f"{i // 1000:03d}/P{i:05d}.jpg",
+                filesize=250000,
+                height=480,
+                width=640,
+                icon_filename=f"{i // 1000:03d}/I{i:05d}.jpg",
+                icon_filesize=5000,
+                icon_height=90,
+                icon_width=120,
+                name="Pillar",
+                text_desc="Looking north",
+                ip_addr="127.0.0.1",
+                public_ind="Y",
+                deleted_ind="N",
+                source="W",
+                crt_timestamp=datetime(2024, 1, 1),
+            )
+        )
+    db.commit()
+
+
+def logs_page_orm(db: Session, skip: int, limit: int) -> List[Dict[str, Any]]:
+    items = tlog_crud.list_logs_filtered(db, skip=skip, limit=limit)
+    return enrich_logs_with_names(db, items)
+
+
+def logs_page_read_model(db: Session, skip: int, limit: int) -> List[Dict[str, Any]]:
+    return read_model.list_logs(db, skip=skip, limit=limit)
+
+
+def photos_page_orm(db: Session, skip: int, limit: int) -> List[Dict[str, Any]]:
+    """The pre-read-model /v1/photos serialisation loop."""
+    result = []
+    for p in tphoto_crud.list_photos_filtered(db, skip=skip, limit=limit):
+        tlog = db.query(TLog).filter(TLog.id == p.tlog_id).first()
+        server = db.query(Server).filter(Server.id == p.server_id).first()
+        base_url = str(server.url) if server and server.url else ""
+        result.append(
+            {
+                "id": int(p.id),
+                "log_id": int(p.tlog_id),
+                "user_id": int(tlog.user_id) if tlog else 0,
+                "type": str(p.type),
+                "filesize": int(p.filesize),
+                "height": int(p.height),
+                "width": int(p.width),
+                "icon_filesize": int(p.icon_filesize),
+                "icon_height": int(p.icon_height),
+                "icon_width": int(p.icon_width),
+                "caption": str(p.name),
+                "text_desc": str(p.text_desc),
+                "license": str(p.public_ind),
+                "photo_url": join_url(base_url, str(p.filename)),
+                "icon_url": join_url(base_url, str(p.icon_filename)),
+            }
+        )
+    return result
+
+
+def photos_page_read_model(db: Session, skip: int, limit: int) -> List[Dict[str, Any]]:
+    return read_model.list_photos(db, skip=skip, limit=limit)
+
+
+def measure(
+    session_factory: Callable[[], Session],
+    build_page: Callable[[Session, int, int], List[Dict[str, Any]]],
+    limit: int,
+    repeat: int,
+) -> Tuple[float, float]:
+    """Return (mean CPU ms per page, mean peak KiB allocated per page)."""
+    cpu_total = 0.0
+    alloc_total = 0
+    for i in range(repeat):
+        # Fresh session per page, as in a request, so the identity map is empty
+        db = session_factory()
+        try:
+            tracemalloc.start()
+            start = time.process_time()
+            build_page(db, i * limit % 1000, limit)
+            cpu_total += time.process_time() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            alloc_total += peak
+        finally:
+            db.close()
+    return cpu_total * 1000 / repeat, alloc_total / 1024 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare ORM and read-model list page costs"
+    )
+    parser.add_argument("--logs", type=int, default=5000, help="Logs/photos to seed")
+    parser.add_argument("--users", type=int, default=200, help="Users to seed")
+    parser.add_argument("--limit", type=int, default=100, help="Page size")
+    parser.add_argument("--repeat", type=int, default=50, help="Pages per variant")
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_factory() as db:
+        seed(db, args.logs, args.users)
+
+    print(f"{args.logs} logs/photos, page size {args.limit}, {args.repeat} pages each")
+    print(f"{'endpoint':<12} {'variant':<12} {'CPU ms/page':>12} {'peak KiB':>10}")
+    variants = [
+        ("/v1/logs", logs_page_orm, logs_page_read_model),
+        ("/v1/photos", photos_page_orm, photos_page_read_model),
+    ]
+    for endpoint, orm_page, read_model_page in variants:
+        orm_cpu, orm_kib = measure(session_factory, orm_page, args.limit, args.repeat)
+        rm_cpu, rm_kib = measure(
+            session_factory, read_model_page, args.limit, args.repeat
+        )
+        print(f"{endpoint:<12} {'orm':<12} {orm_cpu:>12.2f} {orm_kib:>10.1f}")
+        print(f"{endpoint:<12} {'read model':<12} {rm_cpu:>12.2f} {rm_kib:>10.1f}")
+        print(
+            f"{endpoint:<12} {'saving':<12} {1 - rm_cpu / orm_cpu:>12.0%} "
+            f"{1 - rm_kib / orm_kib:>10.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Delete the S3 objects of photos soft-deleted or moderated long enough ago.
+
+Marks newly deleted photos in tphoto_purge (created if missing), then
+removes the photo, thumbnail, rendition and variant objects of photos
+marked more than --retention-days ago, in DeleteObjects batches of up to
+1000 keys across concurrent workers. Rows are kept. With --checkpoint an
+interrupted run resumes after the last fully processed photo.
+
+Usage:
+    python scripts/cleanup_deleted_photos.py --dry-run
+    python scripts/cleanup_deleted_photos.py --workers 8 \
+        --checkpoint /var/tmp/photo-cleanup.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ensure repository root is on sys.path when running this file directly
+REPO_ROOT = str(Path(__file__).resolve().parents[1])
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Import after sys.path manipulation
+from api.core.config import settings  # noqa: E402
+from api.db.database import get_engine, get_session_local  # noqa: E402
+from api.models.tphoto import TPhotoPurge  # noqa: E402
+from api.services.photo_cleanup import (  # noqa: E402
+    CleanupCheckpoint,
+    cleanup_deleted_photos,
+)
+from api.services.s3_service import S3Service  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Remove S3 objects of deleted and moderated photos"
+    )
+    parser.add_argument(
+        "--retention-days", type=int, default=settings.PHOTO_PURGE_RETENTION_DAYS
+    )
+    parser.add_argument("--batch-size", type=int, default=2000, help="Photos a page")
+    parser.add_argument(
+        "--workers", type=int, default=4, help="Concurrent delete requests"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Report, change nothing")
+    parser.add_argument("--checkpoint", help="JSON file to resume from")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    TPhotoPurge.__table__.create(bind=get_engine(), checkfirst=True)
+
+    with get_session_local()() as db:
+        stats = cleanup_deleted_photos(
+            db,
+            s3_service=S3Service(),
+            retention_days=args.retention_days,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            dry_run=args.dry_run,
+            checkpoint=CleanupCheckpoint(args.checkpoint) if args.checkpoint else None,
+        )
+    action = "Would delete" if args.dry_run else "Deleted"
+    print(
+        f"Marked {stats.marked}, scanned {stats.scanned}, purged {stats.purged}; "
+        f"{action} {stats.keys_deleted} keys ({stats.keys_failed} failed); "
+        f"last photo id {stats.last_photo_id}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Compare the photo bucket with the tphoto tables.
+
+Reports orphaned objects (in S3 but referenced by no photo row) and
+missing keys (referenced by a live photo but not in S3), one JSON object
+per line. With --fix, orphans older than --min-age-hours are deleted;
+missing keys are never changed.
+
+Usage:
+    python scripts/reconcile_photo_storage.py --report differences.jsonl
+    python scripts/reconcile_photo_storage.py --prefix 012/ --fix
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Ensure repository root is on sys.path when running this file directly
+REPO_ROOT = str(Path(__file__).resolve().parents[1])
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Import after sys.path manipulation
+from api.db.database import get_engine, get_session_local  # noqa: E402
+from api.models.tphoto import TPhotoPurge  # noqa: E402
+from api.services.photo_reconcile import (  # noqa: E402
+    Difference,
+    reconcile_photo_storage,
+)
+from api.services.s3_service import S3Service  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Find orphaned and missing photo objects in S3"
+    )
+    parser.add_argument(
+        "--prefix",
+        action="append",
+        help="Folder to check, e.g. 012/ (repeatable; default all)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Folders listed concurrently"
+    )
+    parser.add_argument("--fix", action="store_true", help="Delete orphaned objects")
+    parser.add_argument(
+        "--min-age-hours",
+        type=float,
+        default=24,
+        help="Only delete orphans older than this",
+    )
+    parser.add_argument("--report", help="JSON lines file (default stdout)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    TPhotoPurge.__table__.create(bind=get_engine(), checkfirst=True)
+
+    out = open(args.report, "w") if args.report else sys.stdout
+
+    def report(difference: Difference) -> None:
+        out.write(json.dumps(difference.as_dict()) + "\n")
+
+    try:
+        with get_session_local()() as db:
+            stats = reconcile_photo_storage(
+                db,
+                s3_service=S3Service(),
+                workers=args.workers,
+                prefixes=args.prefix,
+                fix=args.fix,
+                min_age=timedelta(hours=args.min_age_hours),
+                report=report,
+            )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(
+        f"Checked {stats.prefixes} folders, {stats.objects} objects against "
+        f"{stats.expected} keys: {stats.orphans} orphans "
+        f"({stats.orphan_bytes} bytes), {stats.missing} missing; "
+        f"deleted {stats.deleted} ({stats.delete_failed} failed)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()